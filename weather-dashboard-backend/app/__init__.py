@@ -1,7 +1,25 @@
 from flask import Flask
 from flask_cors import CORS
 import os
+from concurrent.futures import ThreadPoolExecutor
 from config import get_config, Config
+from app.breaker import create_circuit_breakers
+from app.cache import create_cache_backend
+from app.compression import create_response_compressor
+from app.geocoding import create_geocode_store
+from app.health import create_health_reporter
+from app.history import create_history_store
+from app.metrics import create_metrics
+from app.quota import create_upstream_quota
+from app.ratelimit import create_client_rate_limiter
+from app.search import create_city_search_index
+from app.snapshot import create_cache_snapshotter
+from app.spatial import create_spatial_index
+from app.serialization import configure_json
+from app.services import SingleFlight
+from app.refresh import RefreshScheduler
+from app.stream import create_stream_hub
+from app.upstream import create_http_session
 
 def create_app(config_name: str = None) -> Flask:
     """Create and configure the Flask application."""
@@ -29,6 +47,94 @@ def create_app(config_name: str = None) -> Flask:
     # Store config class in app for easy access
     app.config['CONFIG_CLASS'] = config_class
     
+    # Encode responses and cache entries with the same (optionally orjson) encoder
+    configure_json(app, config_class)
+    
+    # Request and upstream metrics; registered first so timing covers the other hooks
+    metrics = create_metrics(config_class)
+    if metrics is not None:
+        app.extensions['weather_metrics'] = metrics
+        metrics.init_app(app)
+    
+    # Compress responses; cached payloads are compressed once, when stored
+    compressor = create_response_compressor(config_class)
+    if compressor is not None:
+        app.extensions['weather_compressor'] = compressor
+        app.after_request(compressor.after_request)
+    
+    # Initialize the response cache shared by all requests in this process
+    cache = create_cache_backend(config_class, compressor)
+    if cache is not None:
+        app.extensions['weather_cache'] = cache
+    
+    # Persistent city to coordinates index, seeded from the bundled city list
+    geocode_store = create_geocode_store(config_class)
+    if geocode_store is not None:
+        app.extensions['weather_geocode_store'] = geocode_store
+    
+    # Grid of known locations and their latest weather, for map queries
+    spatial_index = create_spatial_index(config_class)
+    if spatial_index is not None:
+        app.extensions['weather_spatial_index'] = spatial_index
+    
+    # City autocomplete index over the bundled city list, built on first use
+    city_search = create_city_search_index(config_class)
+    if city_search is not None:
+        app.extensions['weather_city_search'] = city_search
+    
+    # Append-only history of every successful fetch, for trend queries
+    history = create_history_store(config_class)
+    if history is not None:
+        app.extensions['weather_history'] = history
+    
+    # Token buckets for OpenWeather calls, shared by all workers on the node
+    quota = create_upstream_quota(config_class)
+    if quota is not None:
+        app.extensions['weather_upstream_quota'] = quota
+    
+    # Pooled keep-alive session reused for every OpenWeather request
+    app.extensions['weather_http_session'] = create_http_session(config_class, quota)
+    
+    # Bounded thread pool for running independent upstream calls concurrently
+    app.extensions['weather_executor'] = ThreadPoolExecutor(
+        max_workers=config_class.UPSTREAM_MAX_WORKERS,
+        thread_name_prefix='weather-upstream'
+    )
+    
+    # Per-endpoint circuit breakers failing fast while OpenWeather is down
+    breakers = create_circuit_breakers(config_class)
+    if breakers is not None:
+        app.extensions['weather_circuit_breakers'] = breakers
+    
+    # Recent upstream outcomes and the cached readiness report built from them
+    monitor, health = create_health_reporter(app, config_class)
+    app.extensions['weather_upstream_monitor'] = monitor
+    app.extensions['weather_health'] = health
+    
+    # Coalesce concurrent identical upstream fetches
+    app.extensions['weather_single_flight'] = SingleFlight()
+    
+    # Stale-while-revalidate and hot city refreshes
+    if cache is not None:
+        app.extensions['weather_refresher'] = RefreshScheduler(app, config_class)
+    
+    # Warm start: restore the cache entries and request counts saved by earlier workers
+    snapshotter = create_cache_snapshotter(app, config_class)
+    if snapshotter is not None:
+        app.extensions['weather_cache_snapshotter'] = snapshotter
+        snapshotter.load()
+    
+    # Live city streams: one fetch per city and interval, fanned out to subscribers
+    stream_hub = create_stream_hub(app, config_class)
+    if stream_hub is not None:
+        app.extensions['weather_stream_hub'] = stream_hub
+    
+    # Per-client inbound rate limiting, checked before every request
+    client_limiter = create_client_rate_limiter(config_class)
+    if client_limiter is not None:
+        app.extensions['weather_client_limiter'] = client_limiter
+        app.before_request(client_limiter.check_request)
+    
     # Register routes
     from app.routes import weather_bp
     app.register_blueprint(weather_bp)
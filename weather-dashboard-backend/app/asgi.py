@@ -0,0 +1,449 @@
+"""
+Weather Dashboard Backend - ASGI Application
+
+Serves the upstream-bound API routes natively on asyncio through
+AsyncWeatherService, and hands every other request (health checks, CORS
+preflights, unknown paths, unsupported methods) to the Flask application
+through asgiref's WSGI adapter, so both entry points expose the same API.
+
+Live streams (/api/stream) are served natively as well: an open stream
+waits on an asyncio event instead of holding a thread.
+"""
+
+import asyncio
+import json
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+from urllib.parse import parse_qs
+
+from asgiref.wsgi import WsgiToAsgi
+from flask import Flask, current_app
+
+from app.async_services import AsyncSingleFlight, AsyncWeatherService, create_async_http_client
+from app.compression import ResponseCompressor
+from app.http_cache import cache_headers, entry_matches, is_not_modified
+from app.series import forecast_view
+from app.services import WeatherService
+from app.stream import HEARTBEAT, STREAM_HEADERS, StreamCapacityError, Subscription
+from app.units import field_conversions, parse_units, weather_view
+
+# (JSON payload, pre-encoded JSON bytes or None for an empty body, status code, extra headers)
+JSONResult = Tuple[Union[Dict[str, Any], bytes, None], int, Dict[str, str]]
+Headers = Dict[str, str]
+
+
+def _error(message: str, status_code: int = 400) -> JSONResult:
+    return {'error': message, 'status': 'error'}, status_code, {}
+
+
+def _service_response(data: Dict[str, Any]) -> JSONResult:
+    if data['status'] != 'error':
+        return data, 200, {}
+    if data.get('code') in ('upstream_rate_limited', 'upstream_unavailable', 'stream_capacity'):
+        return data, 503, {'Retry-After': str(data['retry_after'])}
+    return data, 400, {}
+
+
+async def _cached_service_response(endpoint: str, city: str, days: Optional[int], headers: Headers,
+                                   transform: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+                                   view: str = '') -> JSONResult:
+    """Serve a cacheable service call from the cached JSON bytes, like the Flask routes."""
+    entry = await asyncio.to_thread(WeatherService.lookup_cache_entry, endpoint, city, days)
+
+    if entry is None:
+        data = await AsyncWeatherService.fetch_result(endpoint, city, days)
+        if data['status'] == 'error':
+            return _service_response(data)
+
+        entry = await asyncio.to_thread(WeatherService.peek_cache_entry, endpoint, city, days)
+        if not entry_matches(entry, data):
+            return transform(data) if transform else data, 200, {}
+
+    if is_not_modified(entry, headers.get('if-none-match'), headers.get('if-modified-since'), view):
+        return None, 304, cache_headers(entry, view=view)
+
+    if transform is not None:
+        return transform(entry.value), 200, cache_headers(entry, view=view)
+
+    response_headers = cache_headers(entry)
+    if current_app.json.compact is False:
+        return entry.value, 200, response_headers
+
+    body = entry.body
+    compressor = current_app.extensions.get('weather_compressor')
+    if compressor is not None:
+        body = _compress(compressor, body, headers, response_headers, entry.encodings)
+    return body, 200, response_headers
+
+
+def _compress(compressor: ResponseCompressor, body: bytes, request_headers: Headers,
+              response_headers: Dict[str, str], variants: Optional[Dict[str, bytes]] = None) -> bytes:
+    """Compress a response body and set its headers, like ResponseCompressor.apply."""
+    response_headers['Vary'] = 'Accept-Encoding'
+    encoding, body = compressor.select(body, request_headers.get('accept-encoding'), variants)
+    if encoding is not None:
+        response_headers['Content-Encoding'] = encoding
+        etag = response_headers.get('ETag')
+        if etag and not etag.startswith('W/'):
+            response_headers['ETag'] = f'W/{etag}'
+    return body
+
+
+def _int_arg(query: Dict[str, List[str]], name: str, default: Optional[int]) -> Optional[int]:
+    """Read an integer query parameter the way Flask's ``type=int`` does."""
+    try:
+        return int(query[name][0])
+    except (KeyError, IndexError, ValueError):
+        return default
+
+
+class WeatherASGIApp:
+    """ASGI application wrapping the Flask app with native async routes."""
+
+    def __init__(self, flask_app: Flask):
+        self.flask_app = flask_app
+        self.config = flask_app.config['CONFIG_CLASS']
+        self.wsgi_app = WsgiToAsgi(flask_app)
+        self._started = False
+
+        # path -> (allowed methods, handler)
+        self.routes: Dict[str, Tuple[Tuple[str, ...], Callable[..., Awaitable[JSONResult]]]] = {
+            '/api/weather': (('GET',), self.get_current_weather),
+            '/api/weather/batch': (('GET', 'POST'), self.get_current_weather_batch),
+            '/api/forecast': (('GET',), self.get_weather_forecast),
+            '/api/alerts': (('GET',), self.get_weather_alerts),
+            '/api/dashboard': (('GET',), self.get_dashboard),
+        }
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+
+        if scope['type'] == 'http' and scope['path'] == '/api/stream' and scope['method'] == 'GET':
+            await self._startup()
+            await self._stream(scope, receive, send)
+            return
+
+        route = self.routes.get(scope['path']) if scope['type'] == 'http' else None
+        if route is None or scope['method'] not in route[0]:
+            await self.wsgi_app(scope, receive, send)
+            return
+
+        await self._startup()
+
+        metrics = self.flask_app.extensions.get('weather_metrics')
+        if metrics is None:
+            await self._handle(scope, receive, send, route[1])
+            return
+
+        # Native routes are exact paths, so the path doubles as the route label
+        metrics.requests_in_flight.inc()
+        start = time.perf_counter()
+        status_code = 500
+        try:
+            status_code = await self._handle(scope, receive, send, route[1])
+        finally:
+            metrics.requests_in_flight.dec()
+            metrics.observe_request(scope['path'], scope['method'], status_code, time.perf_counter() - start)
+
+    async def _handle(self, scope: Dict[str, Any], receive: Callable, send: Callable, handler: Callable) -> int:
+        """Serve a request on a native route; returns the response status code."""
+        headers = {name.decode('latin-1').lower(): value.decode('latin-1') for name, value in scope['headers']}
+
+        limited = self._check_rate_limit(scope, headers)
+        if limited is not None:
+            await self._send_json(scope, send, limited, headers)
+            return limited[1]
+
+        query = parse_qs(scope['query_string'].decode('latin-1'))
+        body = await self._read_body(receive) if scope['method'] == 'POST' else None
+
+        with self.flask_app.app_context():
+            try:
+                result = await handler(query, body, headers)
+            except Exception as e:
+                result = _error(f'Internal server error: {str(e)}', 500)
+
+        await self._send_json(scope, send, result, headers)
+        return result[1]
+
+    async def _stream(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        """Serve a live stream; the request is counted in the metrics once the headers are sent."""
+        start = time.perf_counter()
+        headers = {name.decode('latin-1').lower(): value.decode('latin-1') for name, value in scope['headers']}
+        loop = asyncio.get_running_loop()
+        ready = asyncio.Event()
+
+        subscription, result = None, self._check_rate_limit(scope, headers)
+        if result is None:
+            subscription, result = self._subscribe(
+                parse_qs(scope['query_string'].decode('latin-1')), lambda: loop.call_soon_threadsafe(ready.set)
+            )
+        if subscription is None:
+            await self._send_json(scope, send, result, headers)
+            self._observe_request(scope, result[1], start)
+            return
+
+        hub = self.flask_app.extensions['weather_stream_hub']
+        disconnected = asyncio.ensure_future(self._wait_for_disconnect(receive))
+        try:
+            response_headers = [(b'content-type', b'text/event-stream; charset=utf-8')]
+            response_headers.extend(
+                (name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in STREAM_HEADERS.items()
+            )
+            response_headers.extend(self._cors_headers(scope))
+            await send({'type': 'http.response.start', 'status': 200, 'headers': response_headers})
+            self._observe_request(scope, 200, start)
+            await send({'type': 'http.response.body', 'body': hub.preamble, 'more_body': True})
+
+            while True:
+                ready.clear()
+                events = subscription.drain()
+                if events:
+                    await send({'type': 'http.response.body', 'body': b''.join(events), 'more_body': True})
+                    continue
+                if subscription.closed:
+                    break
+
+                waiter = asyncio.ensure_future(ready.wait())
+                done, _ = await asyncio.wait(
+                    {waiter, disconnected}, timeout=hub.heartbeat_interval, return_when=asyncio.FIRST_COMPLETED
+                )
+                waiter.cancel()
+                if disconnected.done():
+                    return
+                if not done:
+                    await send({'type': 'http.response.body', 'body': HEARTBEAT, 'more_body': True})
+
+            await send({'type': 'http.response.body', 'body': b''})
+        finally:
+            disconnected.cancel()
+            hub.unsubscribe(subscription)
+
+    def _subscribe(self, query: Dict[str, List[str]],
+                   wake: Callable[[], None]) -> Tuple[Optional[Subscription], Optional[JSONResult]]:
+        """Validate a stream request and subscribe; returns the subscription or an error result."""
+        city = self._city_arg(query)
+        days = _int_arg(query, 'days', 5)
+        if not city:
+            return None, _error('City parameter is required')
+        if days < 1 or days > 5:
+            return None, _error('Days parameter must be between 1 and 5')
+
+        hub = self.flask_app.extensions.get('weather_stream_hub')
+        if hub is None:
+            return None, _error('Live streams are disabled', 404)
+        try:
+            return hub.subscribe(city.strip(), days, wake=wake, blocking=False), None
+        except StreamCapacityError as e:
+            return None, _service_response(e.error_result())
+
+    @staticmethod
+    async def _wait_for_disconnect(receive: Callable) -> None:
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+
+    def _observe_request(self, scope: Dict[str, Any], status_code: int, start: float) -> None:
+        metrics = self.flask_app.extensions.get('weather_metrics')
+        if metrics is not None:
+            metrics.observe_request(scope['path'], scope['method'], status_code, time.perf_counter() - start)
+
+    async def _send_json(self, scope: Dict[str, Any], send: Callable, result: JSONResult,
+                         request_headers: Headers) -> None:
+        """Send a JSON response with the headers the Flask routes and hooks would add."""
+        payload, status_code, extra_headers = result
+
+        if payload is None:
+            content = b''
+            headers = []
+        else:
+            if isinstance(payload, bytes):
+                content = payload
+            else:
+                with self.flask_app.app_context():
+                    # Serialize exactly as jsonify does in the Flask routes
+                    content = self.flask_app.json.response(payload).get_data()
+
+            compressor = self.flask_app.extensions.get('weather_compressor')
+            if compressor is not None and status_code == 200 and 'Content-Encoding' not in extra_headers:
+                content = _compress(compressor, content, request_headers, extra_headers)
+
+            headers = [
+                (b'content-type', b'application/json'),
+                (b'content-length', str(len(content)).encode('latin-1')),
+            ]
+
+        headers.extend(
+            (name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in extra_headers.items()
+        )
+        headers.extend(self._cors_headers(scope))
+
+        await send({'type': 'http.response.start', 'status': status_code, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': content})
+
+    def _check_rate_limit(self, scope: Dict[str, Any], headers: Headers) -> Optional[JSONResult]:
+        """Apply the inbound rate limiter the Flask app runs before each request."""
+        limiter = self.flask_app.extensions.get('weather_client_limiter')
+        if limiter is None:
+            return None
+
+        client = limiter.client(
+            headers.get(limiter.key_header.lower()),
+            headers.get('x-forwarded-for'),
+            scope['client'][0] if scope.get('client') else None
+        )
+        retry_after = limiter.hit(client, scope['path'])
+        if retry_after is None:
+            return None
+        payload = limiter.error_result(retry_after)
+        return payload, 429, {'Retry-After': str(payload['retry_after'])}
+
+    async def _lifespan(self, receive: Callable, send: Callable) -> None:
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await self._startup()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self._shutdown()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _startup(self) -> None:
+        """Create the event-loop bound client; runs lazily if lifespan is unsupported."""
+        if self._started:
+            return
+        self._started = True
+        self.flask_app.extensions['weather_async_client'] = create_async_http_client(self.config)
+        self.flask_app.extensions['weather_async_single_flight'] = AsyncSingleFlight()
+
+    async def _shutdown(self) -> None:
+        # End open streams so the server is not kept waiting on them
+        hub = self.flask_app.extensions.get('weather_stream_hub')
+        if hub is not None:
+            hub.stop()
+        client = self.flask_app.extensions.pop('weather_async_client', None)
+        if client is not None:
+            await client.aclose()
+        self._started = False
+
+    @staticmethod
+    async def _read_body(receive: Callable) -> bytes:
+        body = b''
+        while True:
+            message = await receive()
+            body += message.get('body', b'')
+            if not message.get('more_body'):
+                return body
+
+    def _cors_headers(self, scope: Dict[str, Any]) -> List[Tuple[bytes, bytes]]:
+        """Mirror the headers Flask-CORS adds to simple requests."""
+        origin = next((value for name, value in scope['headers'] if name == b'origin'), None)
+        if origin is None:
+            return []
+
+        cors_origins = self.config.CORS_ORIGINS
+        if cors_origins == '*':
+            return [(b'access-control-allow-origin', b'*')]
+
+        allowed = {item.strip() for item in cors_origins.split(',')}
+        if origin.decode('latin-1') in allowed:
+            return [(b'access-control-allow-origin', origin), (b'vary', b'Origin')]
+        return []
+
+    @staticmethod
+    def _city_arg(query: Dict[str, List[str]]) -> Optional[str]:
+        values = query.get('city')
+        return values[0] if values else None
+
+    async def get_current_weather(self, query: Dict[str, List[str]], body: Optional[bytes],
+                                  headers: Headers) -> JSONResult:
+        city = self._city_arg(query)
+        if not city:
+            return _error('City parameter is required')
+
+        try:
+            transform, view = weather_view(self.config.DEFAULT_UNITS, parse_units(query.get('units', [None])[0]))
+        except ValueError as e:
+            return _error(str(e))
+
+        return await _cached_service_response('weather', city.strip(), None, headers, transform, view)
+
+    async def get_weather_forecast(self, query: Dict[str, List[str]], body: Optional[bytes],
+                                   headers: Headers) -> JSONResult:
+        city = self._city_arg(query)
+        days = _int_arg(query, 'days', 5)
+        if not city:
+            return _error('City parameter is required')
+        if days < 1 or days > 5:
+            return _error('Days parameter must be between 1 and 5')
+
+        points = _int_arg(query, 'points', None)
+        try:
+            units = parse_units(query.get('units', [None])[0])
+            transform, view = forecast_view(
+                query.get('format', ['list'])[0], query.get('aggregate', [None])[0], points,
+                units, field_conversions(self.config.DEFAULT_UNITS, units)
+            )
+        except ValueError as e:
+            return _error(str(e))
+
+        return await _cached_service_response('forecast', city.strip(), days, headers, transform, view)
+
+    async def get_weather_alerts(self, query: Dict[str, List[str]], body: Optional[bytes],
+                                 headers: Headers) -> JSONResult:
+        city = self._city_arg(query)
+        if not city:
+            return _error('City parameter is required')
+
+        return _service_response(await AsyncWeatherService.get_weather_alerts(city.strip()))
+
+    async def get_dashboard(self, query: Dict[str, List[str]], body: Optional[bytes],
+                            headers: Headers) -> JSONResult:
+        city = self._city_arg(query)
+        days = _int_arg(query, 'days', 5)
+        if not city:
+            return _error('City parameter is required')
+        if days < 1 or days > 5:
+            return _error('Days parameter must be between 1 and 5')
+
+        return _service_response(await AsyncWeatherService.get_dashboard(city.strip(), days))
+
+    async def get_current_weather_batch(self, query: Dict[str, List[str]], body: Optional[bytes],
+                                        headers: Headers) -> JSONResult:
+        if body is not None:
+            try:
+                payload = json.loads(body)
+            except ValueError:
+                payload = None
+            cities = payload.get('cities') if isinstance(payload, dict) else None
+
+            if not isinstance(cities, list) or not all(isinstance(city, str) for city in cities):
+                return _error('Request body must be a JSON object with a list of city names in "cities"')
+        else:
+            cities = list(query.get('city', []))
+            for value in query.get('cities', []):
+                cities.extend(value.split(','))
+
+        cities = [city.strip() for city in cities if city.strip()]
+
+        if not cities:
+            return _error('At least one city is required')
+        if len(cities) > self.config.BATCH_MAX_CITIES:
+            return _error(f'A batch may contain at most {self.config.BATCH_MAX_CITIES} cities')
+
+        return await AsyncWeatherService.get_current_weather_batch(cities), 200, {}
+
+
+def create_asgi_app(flask_app: Flask) -> WeatherASGIApp:
+    """
+    Wrap a Flask application created by create_app for ASGI servers.
+
+    Args:
+        flask_app (Flask): The configured Flask application
+
+    Returns:
+        WeatherASGIApp: ASGI application serving the same routes
+    """
+    return WeatherASGIApp(flask_app)
@@ -0,0 +1,563 @@
+"""
+Weather Dashboard Backend - Async Service Layer
+
+Asyncio counterpart of WeatherService used by the ASGI entry point. An
+upstream request in flight is a suspended coroutine rather than a blocked
+worker thread, so one process can wait on thousands of OpenWeather calls
+at once. Configuration, the response cache, the geocoding store and the
+response formatting are shared with the synchronous WeatherService.
+Those may read or write SQLite (the cache, the geocoding store, history),
+so they run in worker threads through asyncio.to_thread; contextvars are
+copied, so current_app still works there.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+from flask import current_app
+
+from app.breaker import CircuitOpenError
+from app.metrics import timed_phase, timed_upstream
+from app.quota import UpstreamQuota, UpstreamQuotaExceeded
+from app.services import WeatherService
+from app.upstream import RETRY_STATUS_CODES, backoff_delay, parse_retry_after
+
+
+def create_async_http_client(config) -> httpx.AsyncClient:
+    """
+    Create the HTTP client for async OpenWeather requests.
+
+    The client must be created and closed on the event loop that uses it.
+
+    Args:
+        config: Configuration class
+
+    Returns:
+        httpx.AsyncClient: Client with a keep-alive connection pool
+    """
+    limits = httpx.Limits(
+        max_connections=config.ASYNC_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=config.HTTP_POOL_MAXSIZE if config.HTTP_KEEP_ALIVE else 0,
+    )
+    timeout = httpx.Timeout(config.API_READ_TIMEOUT, connect=config.API_CONNECT_TIMEOUT, pool=None)
+    return httpx.AsyncClient(limits=limits, timeout=timeout)
+
+
+class AsyncSingleFlight:
+    """
+    Coalesce concurrent identical coroutine calls into a single execution.
+
+    The shared call runs as its own task, so a caller that is cancelled
+    (for example because its client disconnected) does not cancel the
+    fetch for the other callers waiting on it.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Task] = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Await fn for key unless an identical call is already in flight.
+
+        Args:
+            key (str): Identity of the call
+            fn (Callable): Coroutine function producing the result
+
+        Returns:
+            Any: The result of fn, possibly shared with other callers
+        """
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            self.executions += 1
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self.coalesced += 1
+
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task: asyncio.Task) -> None:
+        """Forget a finished call and mark its exception as retrieved."""
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get coalescing statistics.
+
+        Returns:
+            Dict[str, int]: Executed calls, coalesced callers and calls in flight
+        """
+        return {
+            'executions': self.executions,
+            'coalesced': self.coalesced,
+            'in_flight': len(self._calls),
+        }
+
+
+class AsyncWeatherService:
+    """Async service class for OpenWeather API interactions."""
+
+    @staticmethod
+    def _get_client() -> httpx.AsyncClient:
+        """Get the async HTTP client created at ASGI startup."""
+        return current_app.extensions['weather_async_client']
+
+    @staticmethod
+    def _get_single_flight() -> Optional[AsyncSingleFlight]:
+        """Get the request coalescer for the running event loop."""
+        return current_app.extensions.get('weather_async_single_flight')
+
+    @staticmethod
+    async def _request(upstream: str, url: str, params: Dict[str, Any]) -> httpx.Response:
+        """
+        Perform a GET request against an OpenWeather endpoint.
+
+        429/5xx responses and transport errors are retried with the same
+        jittered backoff and Retry-After limit as the synchronous session.
+        Every attempt draws on the shared upstream quota.
+
+        Args:
+            upstream (str): Upstream endpoint name ('weather', 'forecast', 'geocoding', 'onecall')
+            url (str): Request URL
+            params (Dict[str, Any]): Query parameters
+
+        Returns:
+            httpx.Response: The upstream response
+
+        Raises:
+            CircuitOpenError: If the endpoint's circuit breaker is open
+            UpstreamQuotaExceeded: If the quota does not allow another call
+        """
+        config = WeatherService._get_config()
+        client = AsyncWeatherService._get_client()
+        quota = WeatherService._get_quota()
+        metrics = WeatherService._get_metrics()
+
+        WeatherService._before_upstream(upstream)
+
+        with timed_upstream(metrics, upstream) as outcome:
+            try:
+                response = await AsyncWeatherService._request_with_retries(config, client, quota, url, params)
+            except httpx.TransportError as e:
+                WeatherService._record_upstream(upstream, error=type(e).__name__)
+                raise
+            outcome['status'] = response.status_code
+
+        WeatherService._record_upstream(upstream, response.status_code)
+        return response
+
+    @staticmethod
+    async def _request_with_retries(config: Any, client: httpx.AsyncClient, quota: Optional[UpstreamQuota],
+                                    url: str, params: Dict[str, Any]) -> httpx.Response:
+        """Send a request, retrying retryable failures as described in _request."""
+        metrics = WeatherService._get_metrics()
+        attempt = 0
+
+        while True:
+            if quota is not None:
+                with timed_phase(metrics, 'quota_wait'):
+                    await quota.acquire_async()
+
+            retry_after = None
+            try:
+                response = await client.get(url, params=params)
+            except httpx.TransportError:
+                if attempt >= config.HTTP_MAX_RETRIES:
+                    raise
+            else:
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                if response.status_code == 429 and quota is not None:
+                    await asyncio.to_thread(quota.report_throttled, retry_after)
+                if response.status_code not in RETRY_STATUS_CODES or attempt >= config.HTTP_MAX_RETRIES:
+                    return response
+                if retry_after is not None and retry_after > config.HTTP_MAX_RETRY_AFTER:
+                    return response
+
+            await asyncio.sleep(retry_after if retry_after is not None else backoff_delay(config, attempt))
+            attempt += 1
+
+    @staticmethod
+    def _status_error(status_code: int, error: httpx.HTTPStatusError,
+                      not_found: str = 'City not found') -> Dict[str, Any]:
+        """Map an upstream HTTP error status to a service error result."""
+        if status_code == 429:
+            return WeatherService._throttled_error(error.response)
+        elif status_code == 404:
+            return {
+                'error': not_found,
+                'status': 'error'
+            }
+        elif status_code == 401:
+            return {
+                'error': 'Invalid API key',
+                'status': 'error'
+            }
+        return {
+            'error': f'API error: {error}',
+            'status': 'error'
+        }
+
+    @staticmethod
+    async def _cached(endpoint: str, city: str, days: Optional[int],
+                      fetch: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """
+        Serve a service call from the response cache, fetching on a miss.
+
+        Args:
+            endpoint (str): Service endpoint name used for the key and TTL
+            city (str): City name
+            days (Optional[int]): Number of forecast days, if applicable
+            fetch (Callable): Coroutine function performing the upstream request
+
+        Returns:
+            Dict containing the cached or freshly fetched result
+        """
+        cached = await asyncio.to_thread(WeatherService._cache_lookup, endpoint, city, days)
+        if cached is not None:
+            return cached
+
+        return await AsyncWeatherService._fetch_and_cache(endpoint, city, days, fetch)
+
+    @staticmethod
+    async def _fetch_and_cache(endpoint: str, city: str, days: Optional[int],
+                               fetch: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """
+        Fetch a result from OpenWeather and store it in the response cache,
+        sharing one upstream request between concurrent identical calls and
+        falling back to the last cached result while the circuit is open.
+        """
+        rejected = await asyncio.to_thread(WeatherService._unknown_city_error, city)
+        if rejected is not None:
+            return rejected
+
+        single_flight = AsyncWeatherService._get_single_flight()
+
+        async def fetch_and_store() -> Dict[str, Any]:
+            return await asyncio.to_thread(WeatherService._store_result, endpoint, city, days, await fetch())
+
+        if single_flight is None:
+            result = await fetch_and_store()
+        else:
+            result = await single_flight.do(WeatherService._cache_key(endpoint, city, days), fetch_and_store)
+        return await asyncio.to_thread(WeatherService._stale_fallback, endpoint, city, days, result)
+
+    @staticmethod
+    async def fetch_result(endpoint: str, city: str, days: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Fetch a service result from OpenWeather and store it in the cache,
+        without looking it up first, like WeatherService.fetch_result.
+
+        Args:
+            endpoint (str): Service endpoint name ('weather', 'forecast', 'alerts')
+            city (str): City name
+            days (Optional[int]): Number of forecast days, if applicable
+
+        Returns:
+            Dict containing the fetched data or error information
+        """
+        if endpoint == 'weather':
+            fetch = lambda: AsyncWeatherService._fetch_current_weather(city)
+        elif endpoint == 'forecast':
+            fetch = lambda: AsyncWeatherService._fetch_forecast(city, days)
+        else:
+            fetch = lambda: AsyncWeatherService._fetch_weather_alerts(city)
+
+        return await AsyncWeatherService._fetch_and_cache(endpoint, city, days, fetch)
+
+    @staticmethod
+    async def get_current_weather(city: str) -> Dict[str, Any]:
+        """
+        Get current weather for a specific city, served from cache when fresh.
+
+        Args:
+            city (str): City name
+
+        Returns:
+            Dict containing weather data or error information
+        """
+        return await AsyncWeatherService._cached(
+            'weather', city, None,
+            lambda: AsyncWeatherService._fetch_current_weather(city)
+        )
+
+    @staticmethod
+    async def get_forecast(city: str, days: int = 5) -> Dict[str, Any]:
+        """
+        Get weather forecast for a specific city, served from cache when fresh.
+
+        Args:
+            city (str): City name
+            days (int): Number of days for forecast (default: 5)
+
+        Returns:
+            Dict containing forecast data or error information
+        """
+        return await AsyncWeatherService._cached(
+            'forecast', city, days,
+            lambda: AsyncWeatherService._fetch_forecast(city, days)
+        )
+
+    @staticmethod
+    async def get_weather_alerts(city: str) -> Dict[str, Any]:
+        """
+        Get weather alerts for a specific city, served from cache when fresh.
+
+        Args:
+            city (str): City name
+
+        Returns:
+            Dict containing alerts data or error information
+        """
+        return await AsyncWeatherService._cached(
+            'alerts', city, None,
+            lambda: AsyncWeatherService._fetch_weather_alerts(city)
+        )
+
+    @staticmethod
+    async def get_dashboard(city: str, days: int = 5) -> Dict[str, Any]:
+        """
+        Get current weather, forecast and alerts for a city concurrently.
+
+        Args:
+            city (str): City name
+            days (int): Number of days for forecast (default: 5)
+
+        Returns:
+            Dict containing the merged sections or error information
+        """
+        results = await asyncio.gather(
+            AsyncWeatherService.get_current_weather(city),
+            AsyncWeatherService.get_forecast(city, days),
+            AsyncWeatherService.get_weather_alerts(city),
+            return_exceptions=True
+        )
+        return WeatherService._merge_dashboard(city, dict(zip(('weather', 'forecast', 'alerts'), results)))
+
+    @staticmethod
+    async def get_current_weather_batch(cities: List[str]) -> Dict[str, Any]:
+        """
+        Get current weather for many cities, fetching cache misses with at
+        most BATCH_MAX_CONCURRENCY upstream requests in flight.
+
+        Args:
+            cities (List[str]): City names
+
+        Returns:
+            Dict mapping each requested city to a result shaped like
+            get_current_weather's
+        """
+        config = WeatherService._get_config()
+        results, misses = await asyncio.to_thread(WeatherService._partition_batch, cities)
+        semaphore = asyncio.Semaphore(config.BATCH_MAX_CONCURRENCY)
+
+        async def fetch(city: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await AsyncWeatherService._fetch_and_cache(
+                    'weather', city, None,
+                    lambda: AsyncWeatherService._fetch_current_weather(city)
+                )
+
+        fetched = await asyncio.gather(*(fetch(city) for city in misses), return_exceptions=True)
+        return WeatherService._batch_response(results, misses, list(fetched))
+
+    @staticmethod
+    async def _geocode(city: str) -> Optional[Dict[str, Any]]:
+        """
+        Resolve a city to coordinates, calling the geocoding API only on a
+        local miss.
+
+        Raises:
+            httpx.HTTPError: If the geocoding request fails
+        """
+        store = WeatherService._get_geocode_store()
+        if store is not None:
+            location = await asyncio.to_thread(store.lookup, city)
+            if location is not None:
+                return location
+
+        config = WeatherService._get_config()
+        urls = config.get_openweather_urls()
+        geo_params = {
+            'q': city,
+            'appid': config.OPENWEATHER_API_KEY,
+            'limit': 1
+        }
+
+        geo_response = await AsyncWeatherService._request('geocoding', urls['geocoding'], geo_params)
+        geo_response.raise_for_status()
+        geo_data = geo_response.json()
+
+        if not geo_data:
+            return None
+
+        location = {
+            'name': geo_data[0].get('name', city),
+            'country': geo_data[0].get('country'),
+            'lat': geo_data[0]['lat'],
+            'lon': geo_data[0]['lon']
+        }
+        await asyncio.to_thread(
+            WeatherService._remember_location, city, location['name'], location['country'], location
+        )
+        return location
+
+    @staticmethod
+    async def _fetch_current_weather(city: str) -> Dict[str, Any]:
+        """Fetch current weather for a specific city from OpenWeather."""
+        try:
+            config = WeatherService._get_config()
+
+            if not config.OPENWEATHER_API_KEY:
+                return {
+                    'error': 'API key not configured',
+                    'status': 'error'
+                }
+
+            urls = config.get_openweather_urls()
+            params = config.get_api_params_template()
+            location_params, location = await asyncio.to_thread(WeatherService._location_params, city)
+            params.update(location_params)
+
+            response = await AsyncWeatherService._request('weather', urls['weather'], params)
+            response.raise_for_status()
+
+            with timed_phase(WeatherService._get_metrics(), 'format'):
+                # Formatting writes coordinates of cities not yet in the geocoding store
+                return await asyncio.to_thread(
+                    WeatherService._format_current_weather, city, response.json(), location
+                )
+
+        except UpstreamQuotaExceeded as e:
+            return WeatherService._quota_error(e)
+        except CircuitOpenError as e:
+            return WeatherService._circuit_open_error(e)
+        except httpx.HTTPStatusError as e:
+            return AsyncWeatherService._status_error(e.response.status_code, e)
+        except httpx.HTTPError as e:
+            return {
+                'error': f'Network error: {str(e)}',
+                'status': 'error'
+            }
+        except Exception as e:
+            return {
+                'error': f'Unexpected error: {str(e)}',
+                'status': 'error'
+            }
+
+    @staticmethod
+    async def _fetch_forecast(city: str, days: int = 5) -> Dict[str, Any]:
+        """Fetch weather forecast for a specific city from OpenWeather."""
+        try:
+            config = WeatherService._get_config()
+
+            if not config.OPENWEATHER_API_KEY:
+                return {
+                    'error': 'API key not configured',
+                    'status': 'error'
+                }
+
+            urls = config.get_openweather_urls()
+            params = config.get_api_params_template()
+            location_params, location = await asyncio.to_thread(WeatherService._location_params, city)
+            params.update(location_params)
+            params['cnt'] = days * 8  # 8 forecasts per day (every 3 hours)
+
+            response = await AsyncWeatherService._request('forecast', urls['forecast'], params)
+            response.raise_for_status()
+
+            with timed_phase(WeatherService._get_metrics(), 'format'):
+                return await asyncio.to_thread(WeatherService._format_forecast, city, response.json(), location)
+
+        except UpstreamQuotaExceeded as e:
+            return WeatherService._quota_error(e)
+        except CircuitOpenError as e:
+            return WeatherService._circuit_open_error(e)
+        except httpx.HTTPStatusError as e:
+            return AsyncWeatherService._status_error(e.response.status_code, e)
+        except httpx.HTTPError as e:
+            return {
+                'error': f'Network error: {str(e)}',
+                'status': 'error'
+            }
+        except Exception as e:
+            return {
+                'error': f'Unexpected error: {str(e)}',
+                'status': 'error'
+            }
+
+    @staticmethod
+    async def _fetch_weather_alerts(city: str) -> Dict[str, Any]:
+        """Fetch weather alerts for a specific city from OpenWeather."""
+        premium_required = {
+            'status': 'success',
+            'data': {
+                'city': city,
+                'alerts': [],
+                'message': 'Weather alerts require a premium API subscription'
+            }
+        }
+
+        try:
+            config = WeatherService._get_config()
+
+            if not config.OPENWEATHER_API_KEY:
+                return {
+                    'error': 'API key not configured',
+                    'status': 'error'
+                }
+
+            urls = config.get_openweather_urls()
+
+            # First, get city coordinates (from the local store when known)
+            location = await AsyncWeatherService._geocode(city)
+
+            if location is None:
+                return {
+                    'error': 'City not found',
+                    'status': 'error'
+                }
+
+            # Now get alerts using One Call API
+            alert_params = {
+                'lat': location['lat'],
+                'lon': location['lon'],
+                'appid': config.OPENWEATHER_API_KEY,
+                'exclude': 'minutely,hourly,daily,current'  # Only get alerts
+            }
+
+            alert_response = await AsyncWeatherService._request('onecall', urls['onecall'], alert_params)
+
+            # Handle case where alerts API might not be available
+            if alert_response.status_code == 401:
+                return premium_required
+
+            alert_response.raise_for_status()
+
+            with timed_phase(WeatherService._get_metrics(), 'format'):
+                return WeatherService._format_alerts(city, alert_response.json())
+
+        except UpstreamQuotaExceeded as e:
+            return WeatherService._quota_error(e)
+        except CircuitOpenError as e:
+            return WeatherService._circuit_open_error(e)
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 401:
+                return premium_required
+            return AsyncWeatherService._status_error(e.response.status_code, e, not_found='Location not found')
+        except httpx.HTTPError as e:
+            return {
+                'error': f'Network error: {str(e)}',
+                'status': 'error'
+            }
+        except Exception as e:
+            return {
+                'error': f'Unexpected error: {str(e)}',
+                'status': 'error'
+            }
@@ -0,0 +1,195 @@
+"""
+Weather Dashboard Backend - Upstream Circuit Breakers
+
+One circuit breaker per OpenWeather endpoint (weather, forecast, geocoding,
+onecall). After CIRCUIT_BREAKER_FAILURE_THRESHOLD consecutive failures
+(timeouts, connection errors or 5xx responses) the circuit opens and calls
+to that endpoint fail at once with CircuitOpenError instead of holding a
+worker for the full request timeout. After CIRCUIT_BREAKER_RESET_TIMEOUT
+seconds a single probe call is let through (half-open): success closes
+the circuit, failure opens it again.
+
+Callers turn CircuitOpenError into an 'upstream_unavailable' result, which
+the service layer answers with the last cached result, flagged as stale,
+when one is available.
+
+Breaker state is kept per process.
+"""
+
+import threading
+import time
+from typing import Any, Dict, Optional
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# Upstream statuses counted as failures; 4xx responses mean the service is up
+TRIP_STATUS_CODES = frozenset({500, 502, 503, 504})
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is refused because the endpoint's circuit is open."""
+
+    def __init__(self, upstream: str, retry_after: float):
+        super().__init__(f'OpenWeather {upstream} endpoint is unavailable, retry in {retry_after:.0f}s')
+        self.upstream = upstream
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Closed/open/half-open state machine for one upstream endpoint."""
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self._lock = threading.Lock()
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_started_at: Optional[float] = None
+        self.opened = 0
+        self.rejected = 0
+
+    def before_call(self, now: Optional[float] = None) -> None:
+        """
+        Admit or refuse a call.
+
+        Args:
+            now (Optional[float]): Current time, defaults to time.time()
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with its
+                probe still in flight
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            if self.state == CLOSED:
+                return
+
+            reopen_at = self.opened_at + self.reset_timeout
+            # A probe that never reported back no longer blocks the next one
+            probe_pending = self.probe_started_at is not None and now - self.probe_started_at < self.reset_timeout
+            if now >= reopen_at and not probe_pending:
+                self.state = HALF_OPEN
+                self.probe_started_at = now
+                return
+
+            self.rejected += 1
+            retry_after = max(reopen_at - now, 1.0)
+        raise CircuitOpenError(self.name, retry_after)
+
+    def record(self, failed: bool, now: Optional[float] = None) -> None:
+        """
+        Record the outcome of an admitted call.
+
+        Args:
+            failed (bool): True for a timeout, connection error or 5xx response
+            now (Optional[float]): Current time, defaults to time.time()
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            if not failed:
+                self.state = CLOSED
+                self.failures = 0
+                self.probe_started_at = None
+                return
+
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    self.opened += 1
+                self.state = OPEN
+                self.opened_at = now
+                self.probe_started_at = None
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the breaker's state.
+
+        Returns:
+            Dict[str, Any]: State, consecutive failures, seconds until the next
+            probe while open, and the opened and rejected counters
+        """
+        with self._lock:
+            return {
+                'state': self.state,
+                'failures': self.failures,
+                'retry_in': round(max(0.0, self.opened_at + self.reset_timeout - time.time()), 1)
+                if self.state == OPEN else 0.0,
+                'opened': self.opened,
+                'rejected': self.rejected,
+            }
+
+
+class CircuitBreakers:
+    """Circuit breakers keyed by upstream endpoint, created on first use."""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, upstream: str) -> CircuitBreaker:
+        """Get the breaker for an upstream endpoint."""
+        with self._lock:
+            breaker = self._breakers.get(upstream)
+            if breaker is None:
+                breaker = self._breakers[upstream] = CircuitBreaker(
+                    upstream, self.failure_threshold, self.reset_timeout
+                )
+            return breaker
+
+    def before_call(self, upstream: str) -> None:
+        """Admit or refuse a call to an upstream endpoint; see CircuitBreaker.before_call."""
+        self.get(upstream).before_call()
+
+    def record(self, upstream: str, status_code: Optional[int] = None) -> None:
+        """
+        Record the outcome of a call to an upstream endpoint.
+
+        Args:
+            upstream (str): Upstream endpoint name
+            status_code (Optional[int]): Final HTTP status, None if no response arrived
+        """
+        self.get(upstream).record(status_code is None or status_code in TRIP_STATUS_CODES)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the state of every breaker.
+
+        Returns:
+            Dict[str, Any]: Number of open circuits, opened and rejected totals,
+            and per-endpoint details
+        """
+        with self._lock:
+            breakers = list(self._breakers.values())
+        upstreams = {breaker.name: breaker.stats() for breaker in breakers}
+        return {
+            'open': sum(1 for stats in upstreams.values() if stats['state'] == OPEN),
+            'opened': sum(stats['opened'] for stats in upstreams.values()),
+            'rejected': sum(stats['rejected'] for stats in upstreams.values()),
+            'upstreams': upstreams,
+        }
+
+
+def create_circuit_breakers(config) -> Optional[CircuitBreakers]:
+    """
+    Create the upstream circuit breakers selected by the configuration.
+
+    Args:
+        config: Configuration class
+
+    Returns:
+        Optional[CircuitBreakers]: The breakers, or None when disabled
+    """
+    if not config.CIRCUIT_BREAKER_ENABLED:
+        return None
+
+    return CircuitBreakers(
+        failure_threshold=config.CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+        reset_timeout=config.CIRCUIT_BREAKER_RESET_TIMEOUT,
+    )
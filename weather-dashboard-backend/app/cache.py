@@ -0,0 +1,538 @@
+"""
+Weather Dashboard Backend - Response Cache
+
+This module provides the response cache that sits in front of the
+OpenWeather API calls made by WeatherService. Entries expire after a
+per-endpoint TTL and the least recently used entries are evicted once the
+cache reaches its maximum size. Expired entries are kept for a further
+stale window so they can be served while a refresh runs in the background.
+
+Two backends are available, selected with the CACHE_BACKEND setting:
+
+- ``memory``: a per-process dictionary, fastest but private to each worker
+- ``sqlite``: a local SQLite file shared by every worker process on a node
+
+Values are encoded to JSON once, when they are stored. Each entry keeps the
+encoded bytes, which double as the response body for cache hits, an entity
+tag computed from them and, when response compression is enabled, the
+compressed variants of the body.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.compression import ResponseCompressor
+from app.serialization import dumps, loads
+from app.storage import ThreadLocalSQLite
+
+# Marks an entry whose value has not been decoded from its body yet
+_UNDECODED = object()
+
+
+def normalize_city(city: str) -> str:
+    """
+    Normalize a city name so equivalent spellings share a cache entry.
+
+    Args:
+        city (str): City name as supplied by the client
+
+    Returns:
+        str: Lower-cased city name with collapsed whitespace
+    """
+    return ' '.join(city.split()).lower()
+
+
+def make_cache_key(endpoint: str, city: str, units: str, days: Optional[int] = None) -> str:
+    """
+    Build the cache key for an upstream request.
+
+    Args:
+        endpoint (str): Service endpoint name ('weather', 'forecast', 'alerts')
+        city (str): City name
+        units (str): Unit system the data was fetched in
+        days (Optional[int]): Number of forecast days, if applicable
+
+    Returns:
+        str: Cache key
+    """
+    return f"{endpoint}|{normalize_city(city)}|{units}|{days if days is not None else ''}"
+
+
+def compute_etag(body: bytes) -> str:
+    """
+    Compute the entity tag of an encoded cache value.
+
+    Args:
+        body (bytes): Encoded JSON
+
+    Returns:
+        str: Hex digest identifying the value
+    """
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+class CacheEntry:
+    """
+    A cached value with its compact JSON encoding, storage and expiry
+    timestamps, and an entity tag that changes whenever the value does.
+
+    Entries read back from a shared backend are decoded lazily: a response
+    served straight from ``body`` never builds the Python value.
+    ``encodings`` maps a content coding ('gzip', 'br') to the compressed body.
+    """
+
+    __slots__ = ('_value', 'body', 'stored_at', 'expires_at', 'etag', 'encodings')
+
+    def __init__(self, value: Any, body: bytes, stored_at: float, expires_at: float,
+                 etag: Optional[str] = None, encodings: Optional[Dict[str, bytes]] = None):
+        self._value = value
+        self.body = body
+        self.stored_at = stored_at
+        self.expires_at = expires_at
+        self.etag = etag or compute_etag(body)
+        self.encodings = encodings or {}
+
+    @classmethod
+    def from_body(cls, body: bytes, stored_at: float, expires_at: float,
+                  etag: Optional[str] = None, encodings: Optional[Dict[str, bytes]] = None) -> 'CacheEntry':
+        """Create an entry whose value is decoded from body on first access."""
+        return cls(_UNDECODED, body, stored_at, expires_at, etag, encodings)
+
+    @property
+    def value(self) -> Any:
+        """The cached value."""
+        if self._value is _UNDECODED:
+            self._value = loads(self.body)
+        return self._value
+
+    def ttl_remaining(self, now: Optional[float] = None) -> float:
+        """Return the number of seconds until this entry expires."""
+        if now is None:
+            now = time.time()
+        return max(0.0, self.expires_at - now)
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        """Return whether this entry has not yet expired."""
+        if now is None:
+            now = time.time()
+        return self.expires_at > now
+
+
+class CacheBackend:
+    """
+    Interface implemented by every cache backend.
+
+    Values must be JSON-serializable so that any backend can store them.
+    With a compressor, compressed variants of each body are computed when
+    the entry is stored. Entries stay readable with ``allow_stale`` for ``stale_ttl`` seconds
+    after they expire. Hit, miss, eviction and expiration counters are kept
+    per process.
+    """
+
+    name = 'base'
+
+    def __init__(self, max_entries: int = 1000, stale_ttl: float = 0, fast_json: bool = True,
+                 compressor: Optional[ResponseCompressor] = None):
+        self.max_entries = max_entries
+        self.stale_ttl = stale_ttl
+        self.fast_json = fast_json
+        self.compressor = compressor
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str, allow_stale: bool = False) -> Optional[CacheEntry]:
+        """Return the entry stored under key, or None if it is missing or
+        expired (or past its stale window when allow_stale is set)."""
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl: float) -> CacheEntry:
+        """Store value under key for ttl seconds and return the new entry."""
+        raise NotImplementedError
+
+    def peek(self, key: str) -> Optional[CacheEntry]:
+        """Return the entry under key, fresh or stale, without touching
+        statistics or LRU order."""
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        """Remove a single entry if present."""
+        raise NotImplementedError
+
+    def snapshot(self, limit: int) -> List[Tuple[str, CacheEntry]]:
+        """Return up to limit unexpired entries, most recently used first,
+        without touching statistics or LRU order."""
+        raise NotImplementedError
+
+    def restore(self, key: str, entry: CacheEntry) -> bool:
+        """Store an existing entry as it is, unless the cache is full or
+        already holds a newer entry under key. Returns whether it was stored."""
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def _make_entry(self, value: Any, ttl: float) -> CacheEntry:
+        """Encode a value, and compress the encoding, into a new entry."""
+        now = time.time()
+        body = dumps(value, fast=self.fast_json)
+        encodings = self.compressor.encode_variants(body) if self.compressor is not None else None
+        return CacheEntry(value, body, now, now + ttl, encodings=encodings)
+
+    def _count(self, hits: int = 0, stale_hits: int = 0, misses: int = 0,
+               evictions: int = 0, expirations: int = 0) -> None:
+        """Update the statistics counters."""
+        with self._stats_lock:
+            self.hits += hits
+            self.stale_hits += stale_hits
+            self.misses += misses
+            self.evictions += evictions
+            self.expirations += expirations
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dict[str, Any]: Entry count, capacity and hit/miss/eviction counters
+        """
+        entries = len(self)
+        with self._stats_lock:
+            lookups = self.hits + self.misses
+            return {
+                'backend': self.name,
+                'entries': entries,
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'stale_hits': self.stale_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Thread-safe in-process cache with TTL expiry and LRU eviction."""
+
+    name = 'memory'
+
+    def __init__(self, max_entries: int = 1000, stale_ttl: float = 0, fast_json: bool = True,
+                 compressor: Optional[ResponseCompressor] = None):
+        super().__init__(max_entries, stale_ttl, fast_json, compressor)
+        self._entries: 'OrderedDict[str, CacheEntry]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, allow_stale: bool = False) -> Optional[CacheEntry]:
+        """
+        Look up an entry.
+
+        Args:
+            key (str): Cache key
+            allow_stale (bool): Also return expired entries still within
+                the stale window
+
+        Returns:
+            Optional[CacheEntry]: The entry, or None on a miss or expiry
+        """
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at + self.stale_ttl <= now:
+                del self._entries[key]
+                self._count(misses=1, expirations=1)
+                return None
+
+            fresh = entry is not None and entry.is_fresh(now)
+            if entry is None or not (fresh or allow_stale):
+                self._count(misses=1)
+                return None
+
+            self._entries.move_to_end(key)
+
+        self._count(hits=1, stale_hits=0 if fresh else 1)
+        return entry
+
+    def set(self, key: str, value: Any, ttl: float) -> CacheEntry:
+        """
+        Store a value for the given number of seconds.
+
+        Args:
+            key (str): Cache key
+            value (Any): Value to store
+            ttl (float): Time to live in seconds
+
+        Returns:
+            CacheEntry: The stored entry
+        """
+        entry = self._make_entry(value, ttl)
+
+        evicted = 0
+
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+
+        if evicted:
+            self._count(evictions=evicted)
+        return entry
+
+    def peek(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            return self._entries.get(key)
+
+    def delete(self, key: str) -> None:
+        """Remove a single entry if present."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def snapshot(self, limit: int) -> List[Tuple[str, CacheEntry]]:
+        now = time.time()
+        with self._lock:
+            entries = []
+            for key in reversed(self._entries):
+                if len(entries) >= limit:
+                    break
+                entry = self._entries[key]
+                if entry.is_fresh(now):
+                    entries.append((key, entry))
+            return entries
+
+    def restore(self, key: str, entry: CacheEntry) -> bool:
+        with self._lock:
+            current = self._entries.get(key)
+            if current is not None and current.stored_at >= entry.stored_at:
+                return False
+            if current is None and len(self._entries) >= self.max_entries:
+                return False
+            self._entries[key] = entry
+            if current is None:
+                # Restored entries rank below everything used since startup
+                self._entries.move_to_end(key, last=False)
+            return True
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """
+    Cache stored in a local SQLite database.
+
+    Every worker process that opens the same file shares its entries, so a
+    payload fetched by one gunicorn worker is served from cache by the
+    others. The database runs in WAL mode so readers never block writers.
+    """
+
+    name = 'sqlite'
+
+    # Skip the LRU bookkeeping write when an entry was touched this recently
+    ACCESS_RESOLUTION = 1.0
+
+    def __init__(self, path: str, max_entries: int = 1000, stale_ttl: float = 0, fast_json: bool = True,
+                 compressor: Optional[ResponseCompressor] = None):
+        super().__init__(max_entries, stale_ttl, fast_json, compressor)
+        self.path = path
+        self._db = ThreadLocalSQLite(path)
+
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS cache_entries ('
+                ' key TEXT PRIMARY KEY,'
+                ' value TEXT NOT NULL,'
+                ' stored_at REAL NOT NULL,'
+                ' expires_at REAL NOT NULL,'
+                ' accessed_at REAL NOT NULL,'
+                ' etag TEXT,'
+                ' body_gzip BLOB,'
+                ' body_br BLOB)'
+            )
+            columns = {row[1] for row in conn.execute('PRAGMA table_info(cache_entries)')}
+            # Files created before entity tags and compressed bodies were stored
+            for column, column_type in (('etag', 'TEXT'), ('body_gzip', 'BLOB'), ('body_br', 'BLOB')):
+                if column not in columns:
+                    conn.execute(f'ALTER TABLE cache_entries ADD COLUMN {column} {column_type}')
+            conn.execute(
+                'CREATE INDEX IF NOT EXISTS idx_cache_entries_accessed '
+                'ON cache_entries (accessed_at)'
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        """Get this thread's database connection."""
+        return self._db.connection()
+
+    def get(self, key: str, allow_stale: bool = False) -> Optional[CacheEntry]:
+        conn = self._connection()
+        row = conn.execute(
+            'SELECT value, stored_at, expires_at, accessed_at, etag, body_gzip, body_br '
+            'FROM cache_entries WHERE key = ?',
+            (key,)
+        ).fetchone()
+
+        if row is None:
+            self._count(misses=1)
+            return None
+
+        value, stored_at, expires_at, accessed_at, etag, body_gzip, body_br = row
+        now = time.time()
+
+        if expires_at + self.stale_ttl <= now:
+            conn.execute('DELETE FROM cache_entries WHERE key = ? AND expires_at <= ?', (key, now - self.stale_ttl))
+            self._count(misses=1, expirations=1)
+            return None
+
+        fresh = expires_at > now
+        if not (fresh or allow_stale):
+            self._count(misses=1)
+            return None
+
+        if now - accessed_at >= self.ACCESS_RESOLUTION:
+            conn.execute('UPDATE cache_entries SET accessed_at = ? WHERE key = ?', (now, key))
+
+        self._count(hits=1, stale_hits=0 if fresh else 1)
+        return CacheEntry.from_body(
+            self._body(value), stored_at, expires_at, etag, self._encodings(body_gzip, body_br)
+        )
+
+    @staticmethod
+    def _body(value: Any) -> bytes:
+        """Get the stored encoding; rows written before it was kept as a BLOB hold text."""
+        return value if isinstance(value, bytes) else value.encode('utf-8')
+
+    @staticmethod
+    def _encodings(body_gzip: Optional[bytes], body_br: Optional[bytes]) -> Dict[str, bytes]:
+        """Collect the compressed bodies stored for a row."""
+        encodings = {}
+        if body_gzip is not None:
+            encodings['gzip'] = body_gzip
+        if body_br is not None:
+            encodings['br'] = body_br
+        return encodings
+
+    def set(self, key: str, value: Any, ttl: float) -> CacheEntry:
+        entry = self._make_entry(value, ttl)
+        conn = self._connection()
+
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.execute(
+                'INSERT OR REPLACE INTO cache_entries '
+                '(key, value, stored_at, expires_at, accessed_at, etag, body_gzip, body_br) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (key, entry.body, entry.stored_at, entry.expires_at, entry.stored_at, entry.etag,
+                 entry.encodings.get('gzip'), entry.encodings.get('br'))
+            )
+            evicted = conn.execute(
+                'DELETE FROM cache_entries WHERE key IN ('
+                ' SELECT key FROM cache_entries ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)',
+                (self.max_entries,)
+            ).rowcount
+
+        if evicted > 0:
+            self._count(evictions=evicted)
+        return entry
+
+    def peek(self, key: str) -> Optional[CacheEntry]:
+        row = self._connection().execute(
+            'SELECT value, stored_at, expires_at, etag, body_gzip, body_br FROM cache_entries WHERE key = ?',
+            (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        value, stored_at, expires_at, etag, body_gzip, body_br = row
+        return CacheEntry.from_body(
+            self._body(value), stored_at, expires_at, etag, self._encodings(body_gzip, body_br)
+        )
+
+    def delete(self, key: str) -> None:
+        self._connection().execute('DELETE FROM cache_entries WHERE key = ?', (key,))
+
+    def snapshot(self, limit: int) -> List[Tuple[str, CacheEntry]]:
+        rows = self._connection().execute(
+            'SELECT key, value, stored_at, expires_at, etag, body_gzip, body_br FROM cache_entries '
+            'WHERE expires_at > ? ORDER BY accessed_at DESC LIMIT ?',
+            (time.time(), limit)
+        ).fetchall()
+        return [
+            (key, CacheEntry.from_body(self._body(value), stored_at, expires_at, etag,
+                                       self._encodings(body_gzip, body_br)))
+            for key, value, stored_at, expires_at, etag, body_gzip, body_br in rows
+        ]
+
+    def restore(self, key: str, entry: CacheEntry) -> bool:
+        conn = self._connection()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute('SELECT stored_at FROM cache_entries WHERE key = ?', (key,)).fetchone()
+            if row is not None and row[0] >= entry.stored_at:
+                return False
+            if row is None and conn.execute('SELECT COUNT(*) FROM cache_entries').fetchone()[0] >= self.max_entries:
+                return False
+            conn.execute(
+                'INSERT OR REPLACE INTO cache_entries '
+                '(key, value, stored_at, expires_at, accessed_at, etag, body_gzip, body_br) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (key, entry.body, entry.stored_at, entry.expires_at, entry.stored_at, entry.etag,
+                 entry.encodings.get('gzip'), entry.encodings.get('br'))
+            )
+        return True
+
+    def clear(self) -> None:
+        self._connection().execute('DELETE FROM cache_entries')
+
+    def __len__(self) -> int:
+        return self._connection().execute('SELECT COUNT(*) FROM cache_entries').fetchone()[0]
+
+
+def create_cache_backend(config, compressor: Optional[ResponseCompressor] = None) -> Optional[CacheBackend]:
+    """
+    Create the cache backend selected by the configuration.
+
+    Args:
+        config: Configuration class
+        compressor (Optional[ResponseCompressor]): Compressor producing the
+            compressed variants stored with each entry
+
+    Returns:
+        Optional[CacheBackend]: The backend, or None when caching is disabled
+    """
+    if not config.CACHE_ENABLED:
+        return None
+
+    if config.CACHE_BACKEND == 'sqlite':
+        return SQLiteCacheBackend(
+            config.CACHE_SQLITE_PATH,
+            max_entries=config.CACHE_MAX_ENTRIES,
+            stale_ttl=config.CACHE_STALE_TTL,
+            fast_json=config.JSON_FAST_ENCODER,
+            compressor=compressor
+        )
+
+    return MemoryCacheBackend(
+        max_entries=config.CACHE_MAX_ENTRIES,
+        stale_ttl=config.CACHE_STALE_TTL,
+        fast_json=config.JSON_FAST_ENCODER,
+        compressor=compressor
+    )
@@ -0,0 +1,227 @@
+"""
+Weather Dashboard Backend - Response Compression
+
+Compresses JSON responses with brotli or gzip, whichever the client
+prefers in its Accept-Encoding header. Forecast payloads repeat the same
+keys for every 3-hour slot and shrink to a fraction of their size.
+
+Responses built from a cache entry reuse the compressed variants the cache
+stored alongside the entry, so a payload is compressed once when it is
+cached rather than once per request. Other responses are compressed on the
+fly by an after_request hook. Bodies smaller than COMPRESSION_MIN_SIZE are
+sent as they are, since the framing overhead outweighs the saving.
+
+Brotli needs the optional ``brotli`` package; without it only gzip is offered.
+"""
+
+import gzip
+import threading
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from flask import request
+from werkzeug.http import parse_accept_header
+
+try:
+    import brotli
+except ImportError:  # Optional dependency
+    brotli = None
+
+# Content types worth compressing
+COMPRESSIBLE_MIMETYPES = frozenset({'application/json', 'text/plain', 'text/html', 'text/csv'})
+
+
+def available_encodings() -> Tuple[str, ...]:
+    """
+    Get the content codings this installation can produce.
+
+    Returns:
+        Tuple[str, ...]: 'br' when brotli is installed, and 'gzip'
+    """
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+class ResponseCompressor:
+    """Accept-Encoding negotiation and compression of response bodies."""
+
+    def __init__(self, encodings: Iterable[str] = ('br', 'gzip'), min_size: int = 500,
+                 gzip_level: int = 6, brotli_quality: int = 5):
+        # Server preference order, restricted to what can actually be produced
+        self.encodings = tuple(encoding for encoding in encodings if encoding in available_encodings())
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+        self._stats_lock = threading.Lock()
+        self.compressed = 0
+        self.precompressed = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        """
+        Compress a body with one content coding.
+
+        Args:
+            body (bytes): Uncompressed body
+            encoding (str): 'br' or 'gzip'
+
+        Returns:
+            bytes: Compressed body
+        """
+        if encoding == 'br':
+            return brotli.compress(body, quality=self.brotli_quality)
+        # mtime=0 keeps the output identical for identical input
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+    def encode_variants(self, body: bytes) -> Dict[str, bytes]:
+        """
+        Compress a body with every enabled coding, for storing next to a
+        cache entry.
+
+        Args:
+            body (bytes): Uncompressed body
+
+        Returns:
+            Dict[str, bytes]: Compressed body per coding, empty when the body
+            is below the minimum size
+        """
+        if len(body) < self.min_size:
+            return {}
+        return {encoding: self.compress(body, encoding) for encoding in self.encodings}
+
+    def negotiate(self, accept_encoding: Optional[str]) -> Optional[str]:
+        """
+        Pick the content coding for a request.
+
+        Args:
+            accept_encoding (Optional[str]): Accept-Encoding header value
+
+        Returns:
+            Optional[str]: The enabled coding with the highest client quality,
+            ties going to server preference, or None for an identity response
+        """
+        if not accept_encoding or not self.encodings:
+            return None
+
+        accepted = parse_accept_header(accept_encoding)
+        best, best_quality = None, 0.0
+        for encoding in self.encodings:
+            quality = accepted.quality(encoding)
+            if quality > best_quality:
+                best, best_quality = encoding, quality
+        return best
+
+    def select(self, body: bytes, accept_encoding: Optional[str],
+               variants: Optional[Dict[str, bytes]] = None) -> Tuple[Optional[str], bytes]:
+        """
+        Choose the representation of a body to send.
+
+        Args:
+            body (bytes): Uncompressed body
+            accept_encoding (Optional[str]): Accept-Encoding header value
+            variants (Optional[Dict[str, bytes]]): Precomputed compressed
+                bodies, used instead of compressing again
+
+        Returns:
+            Tuple[Optional[str], bytes]: The coding (None for identity) and
+            the body to send
+        """
+        if len(body) < self.min_size:
+            return None, body
+
+        encoding = self.negotiate(accept_encoding)
+        if encoding is None:
+            return None, body
+
+        if variants and encoding in variants:
+            compressed = variants[encoding]
+            reused = True
+        else:
+            compressed = self.compress(body, encoding)
+            reused = False
+
+        with self._stats_lock:
+            if reused:
+                self.precompressed += 1
+            else:
+                self.compressed += 1
+            self.bytes_in += len(body)
+            self.bytes_out += len(compressed)
+        return encoding, compressed
+
+    def apply(self, response: Any, accept_encoding: Optional[str],
+              variants: Optional[Dict[str, bytes]] = None) -> Any:
+        """
+        Compress a buffered Flask response in place.
+
+        Args:
+            response (Response): Response to compress
+            accept_encoding (Optional[str]): Accept-Encoding header value
+            variants (Optional[Dict[str, bytes]]): Precomputed compressed bodies
+
+        Returns:
+            Response: The same response
+        """
+        if (response.direct_passthrough or response.is_streamed
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES
+                or 'Content-Encoding' in response.headers):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        if response.status_code != 200:
+            return response
+
+        encoding, body = self.select(response.get_data(), accept_encoding, variants)
+        if encoding is None:
+            return response
+
+        response.set_data(body)
+        response.headers['Content-Encoding'] = encoding
+        # The compressed bytes are a different representation of the same data
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+
+    def after_request(self, response: Any) -> Any:
+        """Flask after_request hook compressing responses on the fly."""
+        return self.apply(response, request.headers.get('Accept-Encoding'))
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get compression statistics.
+
+        Returns:
+            Dict[str, Any]: Enabled codings, responses compressed on the fly
+            and from stored variants, and the overall compression ratio
+        """
+        with self._stats_lock:
+            return {
+                'encodings': list(self.encodings),
+                'min_size': self.min_size,
+                'compressed': self.compressed,
+                'precompressed': self.precompressed,
+                'ratio': round(self.bytes_out / self.bytes_in, 4) if self.bytes_in else None,
+            }
+
+
+def create_response_compressor(config) -> Optional[ResponseCompressor]:
+    """
+    Create the response compressor selected by the configuration.
+
+    Args:
+        config: Configuration class
+
+    Returns:
+        Optional[ResponseCompressor]: The compressor, or None when
+        compression is disabled
+    """
+    if not config.COMPRESSION_ENABLED:
+        return None
+
+    return ResponseCompressor(
+        encodings=config.get_compression_encodings(),
+        min_size=config.COMPRESSION_MIN_SIZE,
+        gzip_level=config.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=config.COMPRESSION_BROTLI_QUALITY,
+    )
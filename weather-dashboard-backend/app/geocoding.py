@@ -0,0 +1,182 @@
+"""
+Weather Dashboard Backend - Geocoding Store
+
+This module keeps a persistent mapping from normalized city names to
+coordinates in a local SQLite file. The store is seeded from the bundled
+city list and learns every location resolved through the OpenWeather
+geocoding API, so each city is geocoded upstream at most once per node.
+"""
+
+import csv
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from app.storage import ThreadLocalSQLite
+
+BUNDLED_CITY_LIST = os.path.join(os.path.dirname(__file__), 'data', 'cities.csv')
+
+
+def normalize_location_query(query: str) -> str:
+    """
+    Normalize a free-text location such as 'London, GB'.
+
+    Args:
+        query (str): City name, optionally followed by state and country codes
+
+    Returns:
+        str: Lower-cased query with collapsed whitespace, e.g. 'london,gb'
+    """
+    parts = (' '.join(part.split()).lower() for part in query.split(','))
+    return ','.join(part for part in parts if part)
+
+
+class GeocodeStore:
+    """Persistent city name to coordinates index backed by SQLite."""
+
+    def __init__(self, path: str, seed_path: Optional[str] = None):
+        self.path = path
+        self._db = ThreadLocalSQLite(path)
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        conn = self._db.connection()
+        with conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS locations ('
+                ' query TEXT PRIMARY KEY,'
+                ' name TEXT NOT NULL,'
+                ' country TEXT,'
+                ' lat REAL NOT NULL,'
+                ' lon REAL NOT NULL,'
+                ' source TEXT NOT NULL,'
+                ' updated_at REAL NOT NULL)'
+            )
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS store_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)'
+            )
+
+        if seed_path:
+            self.load_city_list(seed_path)
+
+    def load_city_list(self, path: str) -> int:
+        """
+        Seed the store from a CSV city list with name, country, lat, lon and
+        population columns.
+
+        Bare city names resolve to the most populous city of that name; the
+        'name,country' form is indexed for every row. Locations already in
+        the store are kept. The file is only read again when it changes.
+
+        Args:
+            path (str): Path to the CSV file
+
+        Returns:
+            int: Number of index entries added
+        """
+        stat = os.stat(path)
+        signature = f'{os.path.abspath(path)}:{stat.st_size}:{int(stat.st_mtime)}'
+
+        conn = self._db.connection()
+        row = conn.execute("SELECT value FROM store_meta WHERE key = 'seed'").fetchone()
+        if row is not None and row[0] == signature:
+            return 0
+
+        with open(path, newline='', encoding='utf-8') as f:
+            cities = sorted(csv.DictReader(f), key=lambda city: -int(city['population'] or 0))
+
+        now = time.time()
+        rows = []
+        for city in cities:
+            lat, lon = float(city['lat']), float(city['lon'])
+            for query in (city['name'], f"{city['name']},{city['country']}"):
+                rows.append((normalize_location_query(query), city['name'], city['country'], lat, lon, now))
+
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            before = conn.total_changes
+            conn.executemany(
+                'INSERT OR IGNORE INTO locations (query, name, country, lat, lon, source, updated_at) '
+                "VALUES (?, ?, ?, ?, ?, 'bundled', ?)",
+                rows
+            )
+            added = conn.total_changes - before
+            conn.execute("INSERT OR REPLACE INTO store_meta (key, value) VALUES ('seed', ?)", (signature,))
+
+        return added
+
+    def lookup(self, query: str) -> Optional[Dict[str, Any]]:
+        """
+        Resolve a location locally.
+
+        Args:
+            query (str): City name, optionally with state and country codes
+
+        Returns:
+            Optional[Dict[str, Any]]: name, country, lat and lon, or None
+        """
+        row = self._db.connection().execute(
+            'SELECT name, country, lat, lon FROM locations WHERE query = ?',
+            (normalize_location_query(query),)
+        ).fetchone()
+
+        with self._stats_lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+
+        name, country, lat, lon = row
+        return {'name': name, 'country': country, 'lat': lat, 'lon': lon}
+
+    def store(self, query: str, name: str, country: Optional[str], lat: float, lon: float,
+              source: str = 'api') -> None:
+        """
+        Remember the coordinates a query resolved to.
+
+        Args:
+            query (str): Location query as supplied by the client
+            name (str): Display name of the resolved location
+            country (Optional[str]): ISO country code
+            lat (float): Latitude
+            lon (float): Longitude
+            source (str): Where the coordinates came from
+        """
+        self._db.connection().execute(
+            'INSERT OR REPLACE INTO locations (query, name, country, lat, lon, source, updated_at) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (normalize_location_query(query), name, country, lat, lon, source, time.time())
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get geocoding store statistics.
+
+        Returns:
+            Dict[str, Any]: Indexed locations and local hit/miss counters
+        """
+        entries = self._db.connection().execute('SELECT COUNT(*) FROM locations').fetchone()[0]
+        with self._stats_lock:
+            return {
+                'entries': entries,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+def create_geocode_store(config) -> Optional[GeocodeStore]:
+    """
+    Create the geocoding store selected by the configuration.
+
+    Args:
+        config: Configuration class
+
+    Returns:
+        Optional[GeocodeStore]: The store, or None when it is disabled
+    """
+    if not config.GEOCODE_STORE_ENABLED:
+        return None
+
+    return GeocodeStore(config.GEOCODE_STORE_PATH, seed_path=config.GEOCODE_SEED_PATH or None)
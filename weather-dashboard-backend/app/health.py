@@ -0,0 +1,278 @@
+"""
+Weather Dashboard Backend - Liveness and Readiness
+
+Liveness only says the process is serving requests. Readiness says whether
+this node should receive traffic, from state the application already has:
+
+- upstream: outcomes of recent OpenWeather calls, so a probe never makes a
+  call of its own; an invalid API key or a run of failures marks it down,
+  which degrades the node without failing it: every node shares the same
+  upstream, a node out of rotation makes no calls that could bring it back,
+  and stale cached data can still be served
+- config: errors reported by ``Config.validate_config``
+- cache: fill and hit rate of the response cache
+- pool: kept-alive connections in use and the upstream thread pool backlog
+- rate_limit: remaining upstream quota and inbound limiter activity
+
+Each check reports 'ok', 'degraded' (still ready) or 'fail' (not ready).
+The report is cached for HEALTH_CACHE_TTL seconds, so probes arriving more
+often than that cost a dictionary lookup.
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from flask import Flask
+
+OK = 'ok'
+DEGRADED = 'degraded'
+FAIL = 'fail'
+
+# Upstream statuses meaning the call reached OpenWeather but could not be served;
+# a 429 only says this key is busy and is left to the quota and circuit breakers
+FAILURE_STATUS_CODES = frozenset({401, 500, 502, 503, 504})
+
+
+class _UpstreamState:
+    """Recent call outcomes of one upstream endpoint."""
+
+    __slots__ = ('recent', 'consecutive_failures', 'last_success', 'last_failure', 'last_error')
+
+    def __init__(self, window: int):
+        self.recent: Deque[Tuple[float, bool]] = deque(maxlen=window)
+        self.consecutive_failures = 0
+        self.last_success: Optional[float] = None
+        self.last_failure: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+
+class UpstreamMonitor:
+    """Records the outcome of every OpenWeather call, per upstream endpoint."""
+
+    def __init__(self, failure_threshold: int = 3, window: int = 50):
+        self.failure_threshold = failure_threshold
+        self.window = window
+        self._lock = threading.Lock()
+        self._upstreams: Dict[str, _UpstreamState] = {}
+
+    def record(self, upstream: str, status_code: Optional[int] = None, error: Optional[str] = None) -> None:
+        """
+        Record the outcome of one upstream call.
+
+        Args:
+            upstream (str): Upstream endpoint name ('weather', 'forecast', ...)
+            status_code (Optional[int]): Final HTTP status, None if no response arrived
+            error (Optional[str]): Description of the failure, if any
+        """
+        failed = status_code is None or status_code in FAILURE_STATUS_CODES
+        now = time.time()
+        with self._lock:
+            state = self._upstreams.get(upstream)
+            if state is None:
+                state = self._upstreams[upstream] = _UpstreamState(self.window)
+            state.recent.append((now, not failed))
+            if failed:
+                state.consecutive_failures += 1
+                state.last_failure = now
+                state.last_error = error or f'HTTP {status_code}'
+            else:
+                state.consecutive_failures = 0
+                state.last_success = now
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Summarize recent outcomes.
+
+        An upstream is 'down' when its last call was rejected for an invalid
+        API key or its last ``failure_threshold`` calls all failed. Upstream
+        trouble is never worse than 'degraded': it affects every node alike,
+        and a node taken out of rotation would make no call that could show
+        the upstream is back. Endpoints not called yet are not listed.
+
+        Returns:
+            Dict[str, Any]: Overall status and per-endpoint details
+        """
+        upstreams = {}
+        with self._lock:
+            for name, state in self._upstreams.items():
+                failures = sum(1 for _, ok in state.recent if not ok)
+                down = state.consecutive_failures >= self.failure_threshold or (
+                    state.last_error == 'HTTP 401' and state.consecutive_failures > 0)
+                upstreams[name] = {
+                    'status': DEGRADED if failures else OK,
+                    'down': down,
+                    'recent_calls': len(state.recent),
+                    'recent_failures': failures,
+                    'consecutive_failures': state.consecutive_failures,
+                    'last_success': state.last_success,
+                    'last_failure': state.last_failure,
+                    'last_error': state.last_error,
+                }
+        return {'status': _worst(entry['status'] for entry in upstreams.values()), 'endpoints': upstreams}
+
+
+def _worst(statuses) -> str:
+    statuses = set(statuses)
+    for status in (FAIL, DEGRADED):
+        if status in statuses:
+            return status
+    return OK
+
+
+def _session_pool_usage(session: Any) -> Dict[str, int]:
+    """Connections checked out of the requests session's urllib3 pools."""
+    in_use = 0
+    capacity = 0
+    for adapter in getattr(session, 'adapters', {}).values():
+        pools = getattr(getattr(adapter, 'poolmanager', None), 'pools', None)
+        if pools is None:
+            continue
+        for key in pools.keys():
+            pool = pools.get(key)
+            queue = getattr(pool, 'pool', None)
+            if queue is None:
+                continue
+            # The queue holds one slot per connection not currently checked out
+            capacity += queue.maxsize
+            in_use += queue.maxsize - queue.qsize()
+    return {'connections_in_use': in_use, 'connections_capacity': capacity}
+
+
+def _executor_usage(executor: Optional[ThreadPoolExecutor]) -> Dict[str, int]:
+    """Workers and queued tasks of the upstream thread pool."""
+    if executor is None:
+        return {}
+    return {
+        'workers': len(executor._threads),
+        'max_workers': executor._max_workers,
+        'queued': executor._work_queue.qsize(),
+    }
+
+
+class HealthReporter:
+    """Builds liveness and cached readiness reports for one application."""
+
+    def __init__(self, app: Flask, config, monitor: UpstreamMonitor):
+        self.app = app
+        self.config = config
+        self.monitor = monitor
+        self.ttl = config.HEALTH_CACHE_TTL
+        self.max_backlog = config.HEALTH_MAX_EXECUTOR_BACKLOG
+        self.started = time.time()
+
+        self._lock = threading.Lock()
+        self._readiness: Optional[Dict[str, Any]] = None
+        self._expires = 0.0
+
+    def liveness(self) -> Dict[str, Any]:
+        """
+        Report that the process is up.
+
+        Returns:
+            Dict[str, Any]: Status and uptime in seconds
+        """
+        return {
+            'status': 'success',
+            'message': 'Weather Dashboard API is alive',
+            'uptime': round(time.time() - self.started, 1),
+        }
+
+    def readiness(self) -> Dict[str, Any]:
+        """
+        Report whether this node should receive traffic.
+
+        Returns:
+            Dict[str, Any]: 'ready', the overall status, the names of failing
+            checks and each check's details; reused for HEALTH_CACHE_TTL seconds
+        """
+        now = time.time()
+        with self._lock:
+            if self._readiness is not None and now < self._expires:
+                return self._readiness
+
+            checks = self._checks()
+            failing = [name for name, check in checks.items() if check['status'] == FAIL]
+            report: Dict[str, Any] = {
+                'status': 'error' if failing else 'success',
+                'ready': not failing,
+                'checked_at': now,
+                'checks': checks,
+            }
+            if failing:
+                report['error'] = f"Not ready: {', '.join(failing)}"
+
+            self._readiness = report
+            self._expires = now + self.ttl
+            return report
+
+    def _checks(self) -> Dict[str, Dict[str, Any]]:
+        extensions = self.app.extensions
+        checks = {
+            'upstream': self._upstream_check(extensions.get('weather_circuit_breakers')),
+            'config': self._config_check(),
+            'pool': self._pool_check(extensions.get('weather_http_session'), extensions.get('weather_executor')),
+            'rate_limit': self._rate_limit_check(extensions.get('weather_upstream_quota'),
+                                                 extensions.get('weather_client_limiter')),
+        }
+
+        cache = extensions.get('weather_cache')
+        if cache is not None:
+            stats = cache.stats()
+            stats['fill'] = round(stats['entries'] / stats['max_entries'], 4) if stats.get('max_entries') else None
+            checks['cache'] = {'status': OK, **stats}
+        return checks
+
+    def _upstream_check(self, breakers: Any) -> Dict[str, Any]:
+        check = self.monitor.report()
+        if breakers is not None:
+            circuits = breakers.stats()['upstreams']
+            check['circuits'] = {name: stats['state'] for name, stats in circuits.items()}
+        return check
+
+    def _config_check(self) -> Dict[str, Any]:
+        errors = self.config.validate_config()
+        return {'status': FAIL if errors else OK, 'errors': errors}
+
+    def _pool_check(self, session: Any, executor: Optional[ThreadPoolExecutor]) -> Dict[str, Any]:
+        check = {**_session_pool_usage(session), **_executor_usage(executor)}
+        if check.get('queued', 0) > self.max_backlog:
+            check['status'] = FAIL
+        elif check.get('queued', 0) or (
+                check['connections_capacity'] and check['connections_in_use'] >= check['connections_capacity']):
+            check['status'] = DEGRADED
+        else:
+            check['status'] = OK
+        return check
+
+    @staticmethod
+    def _rate_limit_check(quota: Any, client_limiter: Any) -> Dict[str, Any]:
+        check: Dict[str, Any] = {'status': OK}
+        if quota is not None:
+            buckets = quota.stats()['buckets']
+            check['upstream_quota'] = buckets
+            if buckets.get('day', {}).get('remaining') == 0:
+                # Nothing can be fetched on this node until the daily budget refills
+                check['status'] = FAIL
+            elif any(levels['remaining'] == 0 for levels in buckets.values()):
+                check['status'] = DEGRADED
+        if client_limiter is not None:
+            check['client_limiter'] = client_limiter.stats()
+        return check
+
+
+def create_health_reporter(app: Flask, config) -> Tuple[UpstreamMonitor, HealthReporter]:
+    """
+    Create the upstream monitor and the health reporter reading it.
+
+    Args:
+        app (Flask): Application whose components are reported
+        config: Configuration class
+
+    Returns:
+        Tuple[UpstreamMonitor, HealthReporter]: The monitor and the reporter
+    """
+    monitor = UpstreamMonitor(failure_threshold=config.HEALTH_UPSTREAM_FAILURE_THRESHOLD)
+    return monitor, HealthReporter(app, config, monitor)
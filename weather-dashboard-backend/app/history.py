@@ -0,0 +1,389 @@
+"""
+Weather Dashboard Backend - Observation History
+
+An append-only time-series store of every successful OpenWeather fetch,
+kept in a local SQLite file shared by all workers on a node. Current
+weather is recorded as an 'observed' sample; each forecast fetch is
+recorded as a snapshot of 'forecast' samples stamped with the time it was
+issued. Range and aggregate queries are answered from the store, so trend
+views never go back upstream.
+
+Rows are clustered by city, units and UTC day (the table's primary key),
+which keeps a city's range scan and whole-day retention and compaction
+deletes contiguous. Maintenance runs at most once per
+HISTORY_MAINTENANCE_INTERVAL per node:
+
+- Days older than HISTORY_RETENTION_DAYS are deleted.
+- Days older than HISTORY_COMPACT_AFTER_DAYS are compacted into one sample
+  per HISTORY_COMPACT_RESOLUTION bucket, keeping the bucket's temperature
+  extremes. Overlapping forecast snapshots collapse into one sample too.
+"""
+
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from app.cache import normalize_city
+from app.storage import ThreadLocalSQLite
+
+DAY = 86400
+
+KINDS = ('observed', 'forecast')
+
+# Numeric columns kept for every sample, in table order
+SAMPLE_FIELDS = ('temperature', 'feels_like', 'humidity', 'pressure', 'wind_speed', 'wind_direction', 'pop')
+
+RESOLUTION_UNITS = {'m': 60, 'h': 3600, 'd': DAY}
+
+
+def parse_resolution(value: Optional[str]) -> int:
+    """
+    Parse a query resolution such as '1h', '30m' or '1d'.
+
+    Args:
+        value (Optional[str]): Resolution, or None/'raw' for raw samples
+
+    Returns:
+        int: Bucket width in seconds, 0 for raw samples
+
+    Raises:
+        ValueError: If the resolution is malformed
+    """
+    if value is None or value == 'raw':
+        return 0
+    match = re.fullmatch(r'(\d+)([mhd])', value.strip().lower())
+    if match is None or int(match.group(1)) == 0:
+        raise ValueError("Resolution must be 'raw' or a duration such as '30m', '1h' or '1d'")
+    return int(match.group(1)) * RESOLUTION_UNITS[match.group(2)]
+
+
+def utc_day(timestamp: float) -> str:
+    """Get the UTC calendar day of a Unix timestamp as YYYY-MM-DD."""
+    return datetime.fromtimestamp(timestamp, timezone.utc).date().isoformat()
+
+
+class HistoryStore:
+    """Append-only weather sample store backed by SQLite."""
+
+    def __init__(self, path: str, retention_days: int = 30, compact_after_days: int = 2,
+                 compact_resolution: int = 3600, maintenance_interval: int = 3600,
+                 max_points: int = 2000):
+        self.path = path
+        self.retention_days = retention_days
+        self.compact_after_days = compact_after_days
+        self.compact_resolution = compact_resolution
+        self.maintenance_interval = maintenance_interval
+        self.max_points = max_points
+        self._db = ThreadLocalSQLite(path)
+        self._stats_lock = threading.Lock()
+        self._next_maintenance = 0.0
+        self.appended = 0
+        self.queries = 0
+        self.compacted_days = 0
+        self.expired_rows = 0
+
+        conn = self._db.connection()
+        with conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS samples ('
+                ' city TEXT NOT NULL,'
+                ' units TEXT NOT NULL,'
+                ' day TEXT NOT NULL,'
+                ' kind TEXT NOT NULL,'
+                ' ts INTEGER NOT NULL,'
+                ' issued_at INTEGER NOT NULL,'
+                ' temperature REAL,'
+                ' temperature_min REAL,'
+                ' temperature_max REAL,'
+                ' feels_like REAL,'
+                ' humidity REAL,'
+                ' pressure REAL,'
+                ' wind_speed REAL,'
+                ' wind_direction REAL,'
+                ' pop REAL,'
+                ' description TEXT,'
+                ' icon TEXT,'
+                ' PRIMARY KEY (city, units, day, kind, ts, issued_at)'
+                ') WITHOUT ROWID'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_samples_day ON samples (day)')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS compacted_days (day TEXT PRIMARY KEY, compacted_at REAL NOT NULL)'
+            )
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS store_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)'
+            )
+
+    def append(self, city: str, units: str, kind: str, samples: List[Dict[str, Any]],
+               issued_at: Optional[int] = None) -> int:
+        """
+        Append samples for a city.
+
+        Args:
+            city (str): City name as requested
+            units (str): Unit system the samples were fetched in
+            kind (str): 'observed' or 'forecast'
+            samples (List[Dict[str, Any]]): Formatted samples with a 'datetime'
+                (or 'timestamp') field and the numeric SAMPLE_FIELDS
+            issued_at (Optional[int]): When the data was fetched, defaults to now
+
+        Returns:
+            int: Number of rows added; a sample already stored is skipped
+        """
+        if not samples:
+            return 0
+
+        city_key = normalize_city(city)
+        issued_at = int(issued_at if issued_at is not None else time.time())
+        # An observation is identified by its own timestamp alone
+        issued = 0 if kind == 'observed' else issued_at
+
+        rows = []
+        for sample in samples:
+            ts = int(sample.get('datetime', sample.get('timestamp', issued_at)))
+            temperature = sample.get('temperature')
+            rows.append((
+                city_key, units, utc_day(ts), kind, ts, issued,
+                temperature, temperature, temperature,
+                *(sample.get(field) for field in SAMPLE_FIELDS[1:]),
+                sample.get('description'), sample.get('icon'),
+            ))
+
+        conn = self._db.connection()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            added = conn.executemany(
+                'INSERT OR IGNORE INTO samples (city, units, day, kind, ts, issued_at, temperature,'
+                ' temperature_min, temperature_max, feels_like, humidity, pressure, wind_speed,'
+                ' wind_direction, pop, description, icon) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                rows
+            ).rowcount
+
+        with self._stats_lock:
+            self.appended += added
+        self.maybe_maintain()
+        return added
+
+    def query(self, city: str, units: str, start: int, end: int, resolution: int = 0,
+              kind: str = 'observed') -> List[Dict[str, Any]]:
+        """
+        Read samples for a city in [start, end).
+
+        Forecast queries return, for each forecast time, the most recently
+        issued value. With a resolution, samples are aggregated into buckets
+        aligned to multiples of the resolution (UTC).
+
+        Args:
+            city (str): City name
+            units (str): Unit system
+            start (int): Range start, Unix seconds (inclusive)
+            end (int): Range end, Unix seconds (exclusive)
+            resolution (int): Bucket width in seconds, 0 for raw samples
+            kind (str): 'observed' or 'forecast'
+
+        Returns:
+            List[Dict[str, Any]]: Samples ordered by time, at most max_points
+        """
+        with self._stats_lock:
+            self.queries += 1
+
+        # Day bounds let SQLite seek straight to the city's partition
+        params: List[Any] = [normalize_city(city), units, utc_day(start), utc_day(max(start, end - 1)), kind, start, end]
+        where = 'city = ? AND units = ? AND day BETWEEN ? AND ? AND kind = ? AND ts >= ? AND ts < ?'
+        columns = ('temperature, temperature_min, temperature_max, feels_like, humidity, pressure,'
+                   ' wind_speed, wind_direction, pop, description, icon')
+
+        if kind == 'forecast':
+            # SQLite takes the bare columns from the row holding MAX(issued_at)
+            source = f'SELECT ts, MAX(issued_at) AS issued_at, {columns} FROM samples WHERE {where} GROUP BY ts'
+        else:
+            source = f'SELECT ts, issued_at, {columns} FROM samples WHERE {where}'
+
+        conn = self._db.connection()
+        if not resolution:
+            rows = conn.execute(f'{source} ORDER BY ts LIMIT ?', params + [self.max_points]).fetchall()
+            return [
+                {
+                    'datetime': row[0],
+                    'temperature': row[2],
+                    'temperature_min': row[3],
+                    'temperature_max': row[4],
+                    'feels_like': row[5],
+                    'humidity': row[6],
+                    'pressure': row[7],
+                    'wind_speed': row[8],
+                    'wind_direction': row[9],
+                    'pop': row[10],
+                    'description': row[11],
+                    'icon': row[12],
+                }
+                for row in rows
+            ]
+
+        rows = conn.execute(
+            'SELECT (ts / ?) * ? AS bucket, COUNT(*), AVG(temperature), MIN(temperature_min),'
+            ' MAX(temperature_max), AVG(feels_like), AVG(humidity), AVG(pressure), AVG(wind_speed),'
+            ' MAX(wind_speed), MAX(pop)'
+            f' FROM ({source}) GROUP BY bucket ORDER BY bucket LIMIT ?',
+            [resolution, resolution] + params + [self.max_points]
+        ).fetchall()
+        return [
+            {
+                'datetime': row[0],
+                'samples': row[1],
+                'temperature': _round(row[2]),
+                'temperature_min': row[3],
+                'temperature_max': row[4],
+                'feels_like': _round(row[5]),
+                'humidity': _round(row[6]),
+                'pressure': _round(row[7]),
+                'wind_speed': _round(row[8]),
+                'wind_speed_max': row[9],
+                'pop_max': row[10],
+            }
+            for row in rows
+        ]
+
+    def maybe_maintain(self, now: Optional[float] = None) -> bool:
+        """
+        Run retention and compaction if they are due on this node.
+
+        The last run time is kept in the database, so only one worker runs
+        maintenance per interval. The work itself runs on a background
+        thread, off the request that triggered it.
+
+        Args:
+            now (Optional[float]): Current time, defaults to time.time()
+
+        Returns:
+            bool: True if maintenance was started
+        """
+        now = time.time() if now is None else now
+        if now < self._next_maintenance:
+            return False
+
+        conn = self._db.connection()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute("SELECT value FROM store_meta WHERE key = 'last_maintenance'").fetchone()
+            last = float(row[0]) if row else 0.0
+            if now - last < self.maintenance_interval:
+                self._next_maintenance = last + self.maintenance_interval
+                return False
+            conn.execute(
+                "INSERT OR REPLACE INTO store_meta (key, value) VALUES ('last_maintenance', ?)", (str(now),)
+            )
+
+        self._next_maintenance = now + self.maintenance_interval
+        threading.Thread(target=self.maintain, args=(now,), name='weather-history-maintenance', daemon=True).start()
+        return True
+
+    def maintain(self, now: Optional[float] = None) -> Dict[str, int]:
+        """
+        Delete days past retention and compact days past the compaction age.
+
+        Args:
+            now (Optional[float]): Current time, defaults to time.time()
+
+        Returns:
+            Dict[str, int]: Rows expired and days compacted
+        """
+        now = time.time() if now is None else now
+        retention_cutoff = utc_day(now - self.retention_days * DAY)
+        compact_cutoff = utc_day(now - self.compact_after_days * DAY)
+
+        conn = self._db.connection()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            expired = conn.execute('DELETE FROM samples WHERE day < ?', (retention_cutoff,)).rowcount
+            conn.execute('DELETE FROM compacted_days WHERE day < ?', (retention_cutoff,))
+            days = [
+                row[0] for row in conn.execute(
+                    'SELECT DISTINCT day FROM samples WHERE day < ?'
+                    ' AND day NOT IN (SELECT day FROM compacted_days) ORDER BY day',
+                    (compact_cutoff,)
+                )
+            ]
+
+        for day in days:
+            self._compact_day(day, now)
+
+        with self._stats_lock:
+            self.expired_rows += expired
+            self.compacted_days += len(days)
+        return {'expired_rows': expired, 'compacted_days': len(days)}
+
+    def _compact_day(self, day: str, now: float) -> None:
+        """Replace one day's samples with one aggregated sample per bucket."""
+        resolution = self.compact_resolution
+        conn = self._db.connection()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.execute(
+                'CREATE TEMP TABLE IF NOT EXISTS compacted AS SELECT * FROM samples WHERE 0'
+            )
+            conn.execute('DELETE FROM temp.compacted')
+            # Bare description/icon columns come from one of the bucket's samples
+            conn.execute(
+                'INSERT INTO temp.compacted SELECT city, units, day, kind, (ts / ?) * ? AS bucket,'
+                ' MAX(issued_at), AVG(temperature), MIN(temperature_min), MAX(temperature_max),'
+                ' AVG(feels_like), AVG(humidity), AVG(pressure), AVG(wind_speed), AVG(wind_direction),'
+                ' MAX(pop), description, icon'
+                ' FROM samples WHERE day = ? GROUP BY city, units, kind, bucket',
+                (resolution, resolution, day)
+            )
+            conn.execute('DELETE FROM samples WHERE day = ?', (day,))
+            conn.execute('INSERT INTO samples SELECT * FROM temp.compacted')
+            conn.execute('DELETE FROM temp.compacted')
+            conn.execute(
+                'INSERT OR REPLACE INTO compacted_days (day, compacted_at) VALUES (?, ?)', (day, now)
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get store statistics.
+
+        Returns:
+            Dict[str, Any]: Stored samples and cities, plus this process's
+            append, query, expiry and compaction counters
+        """
+        conn = self._db.connection()
+        samples, cities = conn.execute('SELECT COUNT(*), COUNT(DISTINCT city) FROM samples').fetchone()
+        with self._stats_lock:
+            return {
+                'samples': samples,
+                'cities': cities,
+                'appended': self.appended,
+                'queries': self.queries,
+                'expired_rows': self.expired_rows,
+                'compacted_days': self.compacted_days,
+            }
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, 2) if value is not None else None
+
+
+def create_history_store(config) -> Optional[HistoryStore]:
+    """
+    Create the observation history store selected by the configuration.
+
+    Args:
+        config: Configuration class
+
+    Returns:
+        Optional[HistoryStore]: The store, or None when it is disabled
+    """
+    if not config.HISTORY_ENABLED:
+        return None
+
+    return HistoryStore(
+        config.HISTORY_SQLITE_PATH,
+        retention_days=config.HISTORY_RETENTION_DAYS,
+        compact_after_days=config.HISTORY_COMPACT_AFTER_DAYS,
+        compact_resolution=config.HISTORY_COMPACT_RESOLUTION,
+        maintenance_interval=config.HISTORY_MAINTENANCE_INTERVAL,
+        max_points=config.HISTORY_MAX_POINTS,
+    )
@@ -0,0 +1,95 @@
+"""
+Weather Dashboard Backend - HTTP Caching Headers
+
+Builds the validators (ETag, Last-Modified) and Cache-Control header for
+responses served from the response cache, and evaluates conditional
+requests against them. The entity tag is computed once when a payload is
+cached, so a poll that finds its data unchanged is answered with 304 Not
+Modified without serializing the payload again.
+"""
+
+from typing import Any, Dict, Optional
+
+from werkzeug.http import http_date, parse_date, parse_etags
+
+from app.cache import CacheEntry
+
+
+def entity_tag(entry: CacheEntry, view: str = '') -> str:
+    """
+    Get the entity tag of a representation built from a cache entry.
+
+    Args:
+        entry (CacheEntry): Entry the representation is built from
+        view (str): Tag naming a derived representation (such as a
+            columnar forecast), empty for the cached payload itself
+
+    Returns:
+        str: Entity tag, without quotes
+    """
+    return f'{entry.etag}-{view}' if view else entry.etag
+
+
+def cache_headers(entry: CacheEntry, now: Optional[float] = None, view: str = '') -> Dict[str, str]:
+    """
+    Get the caching headers for a response built from a cache entry.
+
+    Args:
+        entry (CacheEntry): Entry the response body was taken from
+        now (Optional[float]): Current time, defaults to time.time()
+        view (str): Tag naming a derived representation, if any
+
+    Returns:
+        Dict[str, str]: ETag, Last-Modified and Cache-Control headers; the
+        max-age is the entry's remaining TTL, or 0 for a stale entry
+    """
+    return {
+        'ETag': f'"{entity_tag(entry, view)}"',
+        'Last-Modified': http_date(entry.stored_at),
+        'Cache-Control': f'public, max-age={int(entry.ttl_remaining(now))}',
+    }
+
+
+def is_not_modified(entry: CacheEntry, if_none_match: Optional[str],
+                    if_modified_since: Optional[str], view: str = '') -> bool:
+    """
+    Decide whether a conditional GET can be answered with 304.
+
+    If-None-Match takes precedence over If-Modified-Since, as required by
+    RFC 9110. Entity tags are compared weakly, so tags marked weak by a
+    compressing proxy still match.
+
+    Args:
+        entry (CacheEntry): Cache entry the response would be built from
+        if_none_match (Optional[str]): If-None-Match header value
+        if_modified_since (Optional[str]): If-Modified-Since header value
+        view (str): Tag naming a derived representation, if any
+
+    Returns:
+        bool: True if the client's copy is current
+    """
+    if if_none_match:
+        return parse_etags(if_none_match).contains_weak(entity_tag(entry, view))
+
+    if if_modified_since:
+        since = parse_date(if_modified_since)
+        return since is not None and int(entry.stored_at) <= since.timestamp()
+
+    return False
+
+
+def entry_matches(entry: Optional[CacheEntry], data: Dict[str, Any]) -> bool:
+    """
+    Check that a cache entry still holds the result a response is built from.
+
+    A background refresh can replace the entry between the service call and
+    the header lookup; validators must only describe the body actually sent.
+
+    Args:
+        entry (Optional[CacheEntry]): Entry looked up after the service call
+        data (Dict[str, Any]): Result returned by the service
+
+    Returns:
+        bool: True if the entry's validators describe data
+    """
+    return entry is not None and (entry.value is data or entry.value == data)
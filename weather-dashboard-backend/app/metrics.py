@@ -0,0 +1,410 @@
+"""
+Weather Dashboard Backend - Metrics
+
+In-process counters, gauges and latency histograms exposed at /api/metrics
+in the Prometheus text format:
+
+- HTTP requests by route, method and status, with latency histograms and
+  an in-flight gauge, recorded by before/after/teardown request hooks
+- OpenWeather calls by upstream endpoint and outcome, with latency
+  histograms and an in-flight gauge
+- Time spent in individual phases (quota wait, response formatting, JSON
+  encoding, cache and history writes)
+- Cache, coalescing, quota, rate limiter, refresh, compression, history,
+  circuit breaker, spatial index and live stream statistics, read from
+  those components only when metrics are scraped
+
+Every series is a fixed-size slot allocated on first use. Label values
+come from small closed sets (route rules, upstream names, status codes)
+and each family is capped at MAX_SERIES, so memory stays bounded. Metrics
+are kept per process; with several gunicorn workers each scrape sees the
+worker that served it.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from flask import Flask, g, request
+
+# Latency buckets in seconds, sized for cache hits through slow upstream calls
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Upper bound on label combinations per family; later ones share one series
+MAX_SERIES = 500
+
+OVERFLOW_LABEL = 'other'
+
+HTTP_METHODS = frozenset({'GET', 'POST', 'PUT', 'PATCH', 'DELETE', 'HEAD', 'OPTIONS'})
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+Labels = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _Family:
+    """A named metric with one series per combination of label values."""
+
+    kind = 'untyped'
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._series: Dict[Labels, Any] = {}
+
+    def _new_series(self) -> Any:
+        raise NotImplementedError
+
+    def _slot(self, labels: Labels) -> Any:
+        """Get the series for a label combination. Caller holds the lock."""
+        series = self._series.get(labels)
+        if series is None:
+            if len(self._series) >= MAX_SERIES:
+                labels = (OVERFLOW_LABEL,) * len(self.labelnames)
+                series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = self._new_series()
+        return series
+
+    def _header(self) -> List[str]:
+        return [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} {self.kind}']
+
+
+class Counter(_Family):
+    """Monotonically increasing value."""
+
+    kind = 'counter'
+
+    def _new_series(self) -> List[float]:
+        return [0.0]
+
+    def inc(self, labels: Labels = (), amount: float = 1.0) -> None:
+        with self._lock:
+            self._slot(labels)[0] += amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((labels, series[0]) for labels, series in self._series.items())
+        return self._header() + [
+            f'{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}' for labels, value in items
+        ]
+
+
+class Gauge(Counter):
+    """Value that can go up and down."""
+
+    kind = 'gauge'
+
+    def dec(self, labels: Labels = (), amount: float = 1.0) -> None:
+        self.inc(labels, -amount)
+
+    def set(self, labels: Labels = (), value: float = 0.0) -> None:
+        with self._lock:
+            self._slot(labels)[0] = value
+
+
+class Histogram(_Family):
+    """Distribution of observations over fixed buckets."""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_series(self) -> List[float]:
+        # Count per bucket (the last is +Inf), then sum and count
+        return [0] * (len(self.buckets) + 1) + [0.0, 0]
+
+    def observe(self, labels: Labels, value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._slot(labels)
+            series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((labels, list(series)) for labels, series in self._series.items())
+
+        lines = self._header()
+        bounds = self.buckets + (float('inf'),)
+        for labels, series in items:
+            cumulative = 0
+            for bound, count in zip(bounds, series):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f'{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}')
+            suffix = _format_labels(self.labelnames, labels)
+            lines.append(f'{self.name}_sum{suffix} {_format_value(series[-2])}')
+            lines.append(f'{self.name}_count{suffix} {series[-1]}')
+        return lines
+
+
+class WeatherMetrics:
+    """The application's metric families and the Flask hooks feeding them."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.requests = Counter(
+            'weather_http_requests_total', 'HTTP requests handled', ('route', 'method', 'status')
+        )
+        self.request_duration = Histogram(
+            'weather_http_request_duration_seconds', 'HTTP request latency', ('route', 'method'), buckets
+        )
+        self.requests_in_flight = Gauge(
+            'weather_http_requests_in_flight', 'HTTP requests being handled'
+        )
+        self.upstream_requests = Counter(
+            'weather_upstream_requests_total', 'OpenWeather requests by outcome', ('upstream', 'status')
+        )
+        self.upstream_duration = Histogram(
+            'weather_upstream_request_duration_seconds', 'OpenWeather request latency, including retries',
+            ('upstream',), buckets
+        )
+        self.upstream_in_flight = Gauge(
+            'weather_upstream_requests_in_flight', 'OpenWeather requests awaiting a response', ('upstream',)
+        )
+        self.phase_duration = Histogram(
+            'weather_phase_duration_seconds', 'Time spent in a processing phase', ('phase',), buckets
+        )
+        self.families = [
+            self.requests, self.request_duration, self.requests_in_flight,
+            self.upstream_requests, self.upstream_duration, self.upstream_in_flight,
+            self.phase_duration,
+        ]
+        self._started = time.time()
+
+    # Flask hooks
+
+    def before_request(self) -> None:
+        g.metrics_start = time.perf_counter()
+        g.metrics_in_flight = True
+        self.requests_in_flight.inc()
+
+    def after_request(self, response: Any) -> Any:
+        start = g.pop('metrics_start', None)
+        if start is not None:
+            self.observe_request(_route_label(), request.method, response.status_code, time.perf_counter() - start)
+        return response
+
+    def teardown_request(self, error: Optional[BaseException] = None) -> None:
+        start = g.pop('metrics_start', None)
+        if start is not None:
+            # after_request never ran: the request failed with an unhandled error
+            self.observe_request(_route_label(), request.method, 500, time.perf_counter() - start)
+        if g.pop('metrics_in_flight', False):
+            self.requests_in_flight.dec()
+
+    def init_app(self, app: Flask) -> None:
+        """Register the request hooks; call before other hooks so timing covers them."""
+        app.before_request(self.before_request)
+        app.after_request(self.after_request)
+        app.teardown_request(self.teardown_request)
+
+    # Recording helpers
+
+    def observe_request(self, route: str, method: str, status: int, seconds: float) -> None:
+        """Record one handled HTTP request."""
+        method = _method_label(method)
+        self.requests.inc((route, method, str(status)))
+        self.request_duration.observe((route, method), seconds)
+
+    @contextmanager
+    def upstream(self, name: str) -> Iterator[Dict[str, Any]]:
+        """
+        Time one OpenWeather request.
+
+        The caller stores the response status code under 'status' in the
+        yielded dict; requests that raise are counted as 'error'.
+        """
+        outcome: Dict[str, Any] = {'status': 'error'}
+        self.upstream_in_flight.inc((name,))
+        start = time.perf_counter()
+        try:
+            yield outcome
+        finally:
+            self.upstream_duration.observe((name,), time.perf_counter() - start)
+            self.upstream_in_flight.dec((name,))
+            self.upstream_requests.inc((name, str(outcome['status'])))
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time one processing phase."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phase_duration.observe((name,), time.perf_counter() - start)
+
+    # Exposition
+
+    def render(self, app: Flask) -> str:
+        """
+        Render every metric in the Prometheus text format.
+
+        Args:
+            app (Flask): Application whose components are reported
+
+        Returns:
+            str: Exposition text
+        """
+        lines: List[str] = []
+        for family in self.families:
+            lines.extend(family.render())
+        lines.extend(_render_component_stats(app))
+        lines.extend(_gauge_lines('weather_process_uptime_seconds', 'Seconds since the metrics were created',
+                                  [((), round(time.time() - self._started, 3))]))
+        return '\n'.join(lines) + '\n'
+
+
+def _method_label(method: str) -> str:
+    return method if method in HTTP_METHODS else OVERFLOW_LABEL
+
+
+def _route_label() -> str:
+    """Route rule of the current request, so paths with parameters share a series."""
+    rule = request.url_rule
+    return rule.rule if rule is not None else 'unmatched'
+
+
+def _gauge_lines(name: str, help_text: str, samples: List[Tuple[Labels, float]],
+                 labelnames: Sequence[str] = (), kind: str = 'gauge') -> List[str]:
+    lines = [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+    lines.extend(f'{name}{_format_labels(labelnames, labels)} {_format_value(value)}' for labels, value in samples)
+    return lines
+
+
+# (extension name, metric prefix, help prefix, {stat key: metric type}) read at scrape time
+COMPONENT_STATS: List[Tuple[str, str, str, Dict[str, str]]] = [
+    ('weather_cache', 'weather_cache', 'Response cache', {
+        'entries': 'gauge', 'hits': 'counter', 'stale_hits': 'counter', 'misses': 'counter',
+        'evictions': 'counter', 'expirations': 'counter', 'hit_rate': 'gauge',
+    }),
+    ('weather_single_flight', 'weather_single_flight', 'Upstream request coalescing', {
+        'executions': 'counter', 'coalesced': 'counter', 'in_flight': 'gauge',
+    }),
+    ('weather_refresher', 'weather_refresh', 'Background refresh', {
+        'tracked_keys': 'gauge', 'in_progress': 'gauge', 'refreshes': 'counter', 'failures': 'counter',
+        'skipped_budget': 'counter', 'skipped_concurrency': 'counter', 'budget_remaining': 'gauge',
+    }),
+    ('weather_cache_snapshotter', 'weather_cache_snapshot', 'Cache snapshots', {
+        'saves': 'counter', 'failures': 'counter', 'saved_entries': 'gauge', 'restored': 'gauge',
+        'skipped_expired': 'gauge', 'load_seconds': 'gauge',
+    }),
+    ('weather_client_limiter', 'weather_client_rate_limit', 'Inbound rate limiter', {
+        'active_buckets': 'gauge', 'allowed': 'counter', 'limited': 'counter', 'evicted': 'counter',
+    }),
+    ('weather_compressor', 'weather_compression', 'Response compression', {
+        'compressed': 'counter', 'precompressed': 'counter', 'ratio': 'gauge',
+    }),
+    ('weather_circuit_breakers', 'weather_circuit', 'Upstream circuit breakers', {
+        'open': 'gauge', 'opened': 'counter', 'rejected': 'counter',
+    }),
+    ('weather_spatial_index', 'weather_spatial', 'Spatial index', {
+        'locations': 'gauge', 'observed': 'gauge', 'cells': 'gauge', 'observations': 'counter',
+        'queries': 'counter', 'dropped': 'counter',
+    }),
+    ('weather_city_search', 'weather_city_search', 'City search', {
+        'cities': 'gauge', 'load_seconds': 'gauge', 'queries': 'counter', 'fuzzy_queries': 'counter',
+    }),
+    ('weather_stream_hub', 'weather_stream', 'Live city streams', {
+        'subscribers': 'gauge', 'cities': 'gauge', 'published': 'counter', 'fetch_failures': 'counter',
+        'rejected': 'counter', 'resyncs': 'counter',
+    }),
+    ('weather_history', 'weather_history', 'Observation history', {
+        'samples': 'gauge', 'appended': 'counter', 'queries': 'counter',
+    }),
+]
+
+
+def _render_component_stats(app: Flask) -> List[str]:
+    """Report the statistics the application's components already keep."""
+    lines: List[str] = []
+    for extension, prefix, help_prefix, fields in COMPONENT_STATS:
+        component = app.extensions.get(extension)
+        if component is None:
+            continue
+        stats = component.stats()
+        for key, kind in fields.items():
+            value = stats.get(key)
+            if value is None:
+                continue
+            name = f'{prefix}_{key}_total' if kind == 'counter' else f'{prefix}_{key}'
+            lines.extend(_gauge_lines(name, f'{help_prefix}: {key.replace("_", " ")}', [((), value)], kind=kind))
+
+    quota = app.extensions.get('weather_upstream_quota')
+    if quota is not None:
+        stats = quota.stats()
+        lines.extend(_gauge_lines(
+            'weather_upstream_quota_remaining', 'Upstream API calls left in each quota bucket',
+            [((bucket,), levels['remaining']) for bucket, levels in sorted(stats['buckets'].items())], ('bucket',)
+        ))
+        for key in ('granted', 'waited', 'rejected', 'throttled'):
+            lines.extend(_gauge_lines(
+                f'weather_upstream_quota_{key}_total', f'Upstream quota: {key} calls', [((), stats[key])], kind='counter'
+            ))
+    return lines
+
+
+def create_metrics(config) -> Optional[WeatherMetrics]:
+    """
+    Create the metrics registry selected by the configuration.
+
+    Args:
+        config: Configuration class
+
+    Returns:
+        Optional[WeatherMetrics]: The registry, or None when metrics are disabled
+    """
+    if not config.METRICS_ENABLED:
+        return None
+
+    try:
+        buckets = config.get_metrics_buckets()
+    except ValueError:
+        # Already reported by validate_config
+        buckets = DEFAULT_BUCKETS
+    return WeatherMetrics(buckets=buckets)
+
+
+@contextmanager
+def timed_phase(metrics: Optional[WeatherMetrics], name: str) -> Iterator[None]:
+    """Time a phase when metrics are enabled; a no-op otherwise."""
+    if metrics is None:
+        yield
+        return
+    with metrics.phase(name):
+        yield
+
+
+@contextmanager
+def timed_upstream(metrics: Optional[WeatherMetrics], name: str) -> Iterator[Dict[str, Any]]:
+    """Time an OpenWeather request when metrics are enabled; see WeatherMetrics.upstream."""
+    if metrics is None:
+        yield {}
+        return
+    with metrics.upstream(name) as outcome:
+        yield outcome
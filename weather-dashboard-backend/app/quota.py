@@ -0,0 +1,237 @@
+"""
+Weather Dashboard Backend - Upstream Quota Governor
+
+Every outbound OpenWeather call takes a token from a per-minute and a
+per-day token bucket before it is sent, so the application stays inside
+the API plan instead of discovering the limit through 429 responses. The
+buckets live in a local SQLite file, so all threads and all gunicorn
+workers on a node draw from the same budget. When a bucket is empty the
+caller waits briefly for a refill, or fails fast with UpstreamQuotaExceeded
+if the wait would exceed RATE_LIMIT_MAX_WAIT.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.storage import ThreadLocalSQLite
+
+MINUTE = 60.0
+DAY = 86400.0
+
+
+class UpstreamQuotaExceeded(Exception):
+    """Raised when an upstream call would exceed the configured API quota."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f'Upstream API quota exhausted, retry in {retry_after:.0f}s')
+        self.retry_after = retry_after
+
+
+class UpstreamQuota:
+    """Per-minute and per-day token buckets shared through SQLite."""
+
+    def __init__(self, path: str, per_minute: int, per_day: int = 0, max_wait: float = 2.0):
+        self.path = path
+        self.max_wait = max_wait
+        self._db = ThreadLocalSQLite(path)
+        self._stats_lock = threading.Lock()
+        self.granted = 0
+        self.waited = 0
+        self.rejected = 0
+        self.throttled = 0
+
+        # (name, capacity, tokens refilled per second); a limit of 0 disables the bucket
+        self.buckets: List[Tuple[str, float, float]] = [
+            (name, float(limit), limit / period)
+            for name, limit, period in (('minute', per_minute, MINUTE), ('day', per_day, DAY))
+            if limit > 0
+        ]
+
+        conn = self._db.connection()
+        with conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS quota_buckets ('
+                ' name TEXT PRIMARY KEY,'
+                ' tokens REAL NOT NULL,'
+                ' capacity REAL NOT NULL,'
+                ' updated_at REAL NOT NULL)'
+            )
+
+    def _levels(self, conn, now: float) -> Dict[str, float]:
+        """Read every bucket and add the tokens accrued since its last update."""
+        rows = {
+            name: (tokens, capacity, updated_at)
+            for name, tokens, capacity, updated_at
+            in conn.execute('SELECT name, tokens, capacity, updated_at FROM quota_buckets')
+        }
+
+        levels = {}
+        for name, capacity, rate in self.buckets:
+            row = rows.get(name)
+            if row is None or row[1] != capacity:
+                # New bucket, or the limit changed: start full
+                levels[name] = capacity
+            else:
+                tokens, _, updated_at = row
+                levels[name] = min(capacity, tokens + max(0.0, now - updated_at) * rate)
+        return levels
+
+    def _save(self, conn, levels: Dict[str, float], now: float) -> None:
+        conn.executemany(
+            'INSERT OR REPLACE INTO quota_buckets (name, tokens, capacity, updated_at) VALUES (?, ?, ?, ?)',
+            [(name, levels[name], capacity, now) for name, capacity, _ in self.buckets]
+        )
+
+    def try_acquire(self) -> float:
+        """
+        Take one token from every bucket if all of them have one.
+
+        Returns:
+            float: 0.0 if the call may proceed, otherwise the seconds until
+            every bucket holds a token again
+        """
+        if not self.buckets:
+            return 0.0
+
+        now = time.time()
+        conn = self._db.connection()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            levels = self._levels(conn, now)
+
+            wait = 0.0
+            for name, _, rate in self.buckets:
+                if levels[name] < 1.0:
+                    wait = max(wait, (1.0 - levels[name]) / rate)
+
+            if wait == 0.0:
+                for name in levels:
+                    levels[name] -= 1.0
+            self._save(conn, levels, now)
+
+        return wait
+
+    def acquire(self) -> None:
+        """
+        Take a token for one upstream call, waiting up to max_wait seconds.
+
+        Raises:
+            UpstreamQuotaExceeded: If no token becomes available in time
+        """
+        deadline = time.monotonic() + self.max_wait
+        waited = False
+
+        while True:
+            wait = self.try_acquire()
+            if wait == 0.0:
+                self._count_grant(waited)
+                return
+
+            self._check_deadline(wait, deadline)
+            waited = True
+            time.sleep(wait)
+
+    async def acquire_async(self) -> None:
+        """
+        Take a token for one upstream call without blocking the event loop,
+        neither on the SQLite transaction nor while waiting for a refill.
+
+        Raises:
+            UpstreamQuotaExceeded: If no token becomes available in time
+        """
+        deadline = time.monotonic() + self.max_wait
+        waited = False
+
+        while True:
+            wait = await asyncio.to_thread(self.try_acquire)
+            if wait == 0.0:
+                self._count_grant(waited)
+                return
+
+            self._check_deadline(wait, deadline)
+            waited = True
+            await asyncio.sleep(wait)
+
+    def _count_grant(self, waited: bool) -> None:
+        with self._stats_lock:
+            self.granted += 1
+            if waited:
+                self.waited += 1
+
+    def _check_deadline(self, wait: float, deadline: float) -> None:
+        """Fail fast when a refill would arrive after the caller's deadline."""
+        if time.monotonic() + wait > deadline:
+            with self._stats_lock:
+                self.rejected += 1
+            raise UpstreamQuotaExceeded(wait)
+
+    def report_throttled(self, retry_after: Optional[float] = None) -> None:
+        """
+        Drain the per-minute bucket after OpenWeather answered 429, so no
+        worker on the node calls again before the upstream window resets.
+
+        Args:
+            retry_after (Optional[float]): Upstream Retry-After in seconds
+        """
+        with self._stats_lock:
+            self.throttled += 1
+
+        minute = next((bucket for bucket in self.buckets if bucket[0] == 'minute'), None)
+        if minute is None:
+            return
+
+        _, _, rate = minute
+        now = time.time()
+        conn = self._db.connection()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            levels = self._levels(conn, now)
+            # Empty the bucket and hold it below zero for the Retry-After period
+            levels['minute'] = min(levels['minute'], -(retry_after or 0.0) * rate)
+            self._save(conn, levels, now)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the remaining budget and this process's quota counters.
+
+        Returns:
+            Dict[str, Any]: Limit and remaining tokens per bucket, plus
+            granted, waited, rejected and upstream-throttled call counts
+        """
+        levels = self._levels(self._db.connection(), time.time())
+        buckets = {
+            name: {'limit': int(capacity), 'remaining': max(0, int(levels[name]))}
+            for name, capacity, _ in self.buckets
+        }
+
+        with self._stats_lock:
+            return {
+                'buckets': buckets,
+                'granted': self.granted,
+                'waited': self.waited,
+                'rejected': self.rejected,
+                'throttled': self.throttled,
+            }
+
+
+def create_upstream_quota(config) -> Optional[UpstreamQuota]:
+    """
+    Create the upstream quota governor selected by the configuration.
+
+    Args:
+        config: Configuration class
+
+    Returns:
+        Optional[UpstreamQuota]: The governor, or None when it is disabled
+    """
+    if not config.RATE_LIMIT_ENABLED:
+        return None
+
+    return UpstreamQuota(
+        config.RATE_LIMIT_SQLITE_PATH,
+        per_minute=config.RATE_LIMIT_PER_MINUTE,
+        per_day=config.RATE_LIMIT_PER_DAY,
+        max_wait=config.RATE_LIMIT_MAX_WAIT,
+    )
@@ -0,0 +1,273 @@
+"""
+Weather Dashboard Backend - Inbound Rate Limiting
+
+Per-client token buckets applied to incoming requests before they reach
+the weather routes, so one caller polling in a tight loop cannot use up
+the upstream quota and worker threads for everyone else. Clients are told
+to back off with 429 and a Retry-After header.
+
+Clients are keyed by IP address, or by API token for tokens on the
+configured allow-list; an unknown token is ignored, so inventing tokens
+neither escapes the limit nor creates buckets.
+
+Buckets are kept in memory per process, ordered by last use. A bucket idle
+long enough to refill completely behaves exactly like a new one, so it is
+dropped, which keeps memory proportional to the number of active clients.
+Beyond max_buckets the least recently used bucket is dropped as well.
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import AbstractSet, Any, Dict, Iterable, Optional, Tuple
+
+from flask import jsonify, request
+
+# (burst capacity, tokens refilled per second)
+RateLimit = Tuple[float, float]
+
+PERIODS = {
+    'second': 1.0,
+    'minute': 60.0,
+    'hour': 3600.0,
+}
+
+# Bucket scope shared by every route without a limit of its own
+DEFAULT_SCOPE = '*'
+
+
+def parse_rate_limit(spec: str) -> RateLimit:
+    """
+    Parse a limit such as '120/minute'.
+
+    Args:
+        spec (str): Number of requests, a slash and 'second', 'minute' or 'hour'
+
+    Returns:
+        RateLimit: (burst capacity, tokens refilled per second)
+
+    Raises:
+        ValueError: If the limit is malformed
+    """
+    count, _, period = spec.strip().partition('/')
+    if period.strip() not in PERIODS or int(count) <= 0:
+        raise ValueError(f'Invalid rate limit {spec!r}, expected e.g. "120/minute"')
+    return float(count), int(count) / PERIODS[period.strip()]
+
+
+def client_key(api_key: Optional[str], forwarded_for: Optional[str],
+               remote_addr: Optional[str], trust_proxy: bool = False,
+               api_keys: AbstractSet[str] = frozenset()) -> str:
+    """
+    Identify the client a request is counted against.
+
+    Args:
+        api_key (Optional[str]): API token sent by the client, if any
+        forwarded_for (Optional[str]): X-Forwarded-For header value
+        remote_addr (Optional[str]): Peer address of the connection
+        trust_proxy (bool): Use the first X-Forwarded-For address, for
+            deployments behind a reverse proxy
+        api_keys (AbstractSet[str]): Tokens that get a bucket of their
+            own; any other token is keyed by address
+
+    Returns:
+        str: 'token:<api key>' or 'ip:<address>'
+    """
+    if api_key and api_key in api_keys:
+        return f'token:{api_key}'
+    if trust_proxy and forwarded_for:
+        return f"ip:{forwarded_for.split(',')[0].strip()}"
+    return f'ip:{remote_addr or "unknown"}'
+
+
+class ClientRateLimiter:
+    """Per-client, per-route token bucket limiter."""
+
+    def __init__(self, default_limit: Optional[RateLimit], route_limits: Dict[str, RateLimit],
+                 exempt_paths: Iterable[str] = (), key_header: str = 'X-API-Key',
+                 trust_proxy: bool = False, api_keys: Iterable[str] = (), max_buckets: int = 10000):
+        self.default_limit = default_limit
+        self.route_limits = dict(route_limits)
+        self.exempt_paths = frozenset(exempt_paths)
+        self.key_header = key_header
+        self.trust_proxy = trust_proxy
+        self.api_keys = frozenset(api_keys)
+        self.max_buckets = max_buckets
+
+        # Time for any bucket to refill from empty; idle longer than this means full
+        limits = list(self.route_limits.values()) + ([default_limit] if default_limit else [])
+        self.idle_ttl = max((capacity / rate for capacity, rate in limits), default=0.0)
+
+        self._lock = threading.Lock()
+        # (client, scope) -> [tokens, updated_at], least recently used first
+        self._buckets: 'OrderedDict[Tuple[str, str], list]' = OrderedDict()
+        self.allowed = 0
+        self.limited = 0
+        self.expired = 0
+        self.evicted = 0
+
+    def client(self, api_key: Optional[str], forwarded_for: Optional[str], remote_addr: Optional[str]) -> str:
+        """
+        Identify the client of a request with this limiter's settings.
+
+        Args:
+            api_key (Optional[str]): Value of the key header, if any
+            forwarded_for (Optional[str]): X-Forwarded-For header value
+            remote_addr (Optional[str]): Peer address of the connection
+
+        Returns:
+            str: Client key from client_key()
+        """
+        return client_key(api_key, forwarded_for, remote_addr, self.trust_proxy, self.api_keys)
+
+    def hit(self, client: str, path: str) -> Optional[float]:
+        """
+        Count a request against the client's bucket for a route.
+
+        Args:
+            client (str): Client key from client_key()
+            path (str): Request path
+
+        Returns:
+            Optional[float]: None if the request may proceed, otherwise the
+            seconds until the client may retry
+        """
+        if path in self.exempt_paths:
+            return None
+
+        scope = path if path in self.route_limits else DEFAULT_SCOPE
+        limit = self.route_limits.get(path, self.default_limit)
+        if limit is None:
+            return None
+
+        capacity, rate = limit
+        key = (client, scope)
+        now = time.monotonic()
+
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [capacity, now]
+            else:
+                bucket[0] = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+                bucket[1] = now
+                self._buckets.move_to_end(key)
+
+            if bucket[0] >= 1.0:
+                bucket[0] -= 1.0
+                self.allowed += 1
+                retry_after = None
+            else:
+                self.limited += 1
+                retry_after = (1.0 - bucket[0]) / rate
+
+            self._expire(now)
+
+        return retry_after
+
+    def _expire(self, now: float) -> None:
+        """Drop buckets that have refilled completely, then the least
+        recently used ones beyond max_buckets. Caller holds the lock."""
+        while self._buckets:
+            key, (_, updated_at) = next(iter(self._buckets.items()))
+            if now - updated_at < self.idle_ttl:
+                break
+            del self._buckets[key]
+            self.expired += 1
+        while len(self._buckets) > self.max_buckets:
+            self._buckets.popitem(last=False)
+            self.evicted += 1
+
+    def check_request(self) -> Optional[Any]:
+        """
+        Flask before_request hook rejecting clients over their limit.
+
+        Returns:
+            Optional[Response]: 429 response, or None to continue
+        """
+        if request.path in self.exempt_paths or request.method == 'OPTIONS':
+            return None
+
+        client = self.client(
+            request.headers.get(self.key_header),
+            request.headers.get('X-Forwarded-For'),
+            request.remote_addr
+        )
+        retry_after = self.hit(client, request.path)
+        if retry_after is None:
+            return None
+
+        payload = self.error_result(retry_after)
+        response = jsonify(payload)
+        response.status_code = 429
+        response.headers['Retry-After'] = str(payload['retry_after'])
+        return response
+
+    @staticmethod
+    def error_result(retry_after: float) -> Dict[str, Any]:
+        """
+        Build the error result for a rejected request.
+
+        Args:
+            retry_after (float): Seconds until the client may retry
+
+        Returns:
+            Dict containing the error, its code and the retry delay
+        """
+        return {
+            'error': 'Too many requests',
+            'status': 'error',
+            'code': 'client_rate_limited',
+            'retry_after': max(1, math.ceil(retry_after))
+        }
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get limiter statistics.
+
+        Returns:
+            Dict[str, int]: Active buckets and allowed, limited, expired and
+            evicted counts
+        """
+        with self._lock:
+            return {
+                'active_buckets': len(self._buckets),
+                'allowed': self.allowed,
+                'limited': self.limited,
+                'expired': self.expired,
+                'evicted': self.evicted,
+            }
+
+
+def create_client_rate_limiter(config) -> Optional[ClientRateLimiter]:
+    """
+    Create the inbound rate limiter selected by the configuration.
+
+    Args:
+        config: Configuration class
+
+    Returns:
+        Optional[ClientRateLimiter]: The limiter, or None when it is disabled
+    """
+    if not config.CLIENT_RATE_LIMIT_ENABLED:
+        return None
+
+    route_limits = {}
+    for path, spec in config.get_client_rate_limits().items():
+        try:
+            route_limits[path] = parse_rate_limit(spec)
+        except ValueError:
+            # Already reported by validate_config; leave the route unlimited
+            continue
+
+    default_limit = route_limits.pop(DEFAULT_SCOPE, None)
+    return ClientRateLimiter(
+        default_limit,
+        route_limits,
+        exempt_paths=config.get_client_rate_limit_exempt_paths(),
+        key_header=config.CLIENT_RATE_LIMIT_KEY_HEADER,
+        trust_proxy=config.CLIENT_RATE_LIMIT_TRUST_PROXY,
+        api_keys=config.get_client_rate_limit_api_keys(),
+        max_buckets=config.CLIENT_RATE_LIMIT_MAX_BUCKETS,
+    )
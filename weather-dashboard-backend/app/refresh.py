@@ -0,0 +1,297 @@
+"""
+Weather Dashboard Backend - Background Refresh
+
+This module keeps popular cache entries fresh without making clients wait
+on OpenWeather:
+
+- Stale-while-revalidate: a request that finds an expired entry is served
+  the stale value at once while a refresh runs in the background.
+- Hot city scheduler (optional): a daemon thread tracks the most requested
+  keys and refreshes them shortly before their TTL runs out.
+
+Refreshes run on the shared upstream thread pool, at most
+REFRESH_MAX_CONCURRENCY at a time and within REFRESH_BUDGET_PER_MINUTE
+upstream calls, so background work cannot exhaust the API quota. A refresh
+that needs more than one call, such as an alerts refresh that geocodes the
+city first, pays for each of them.
+"""
+
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from flask import Flask
+
+from app.quota import UpstreamQuotaExceeded
+from app.services import WeatherService
+
+# (endpoint, city, days) needed to repeat a service call
+RefreshTarget = Tuple[str, str, Optional[int]]
+
+
+class RefreshScheduler:
+    """Tracks request frequency per cache key and refreshes entries in the background."""
+
+    def __init__(self, app: Flask, config):
+        self.app = app
+        self.max_concurrency = config.REFRESH_MAX_CONCURRENCY
+        self.budget_per_minute = config.REFRESH_BUDGET_PER_MINUTE
+        self.scheduler_enabled = config.REFRESH_SCHEDULER_ENABLED
+        self.top_n = config.REFRESH_TOP_N
+        self.interval = config.REFRESH_INTERVAL
+        self.lead_time = config.REFRESH_LEAD_TIME
+        self.track_max = config.REFRESH_TRACK_MAX
+
+        self._lock = threading.Lock()
+        self._counts: Dict[str, float] = {}
+        self._targets: Dict[str, RefreshTarget] = {}
+        self._refreshing: Set[str] = set()
+        self._tokens = float(self.budget_per_minute)
+        self._refilled_at = time.monotonic()
+        # Calls already paid for by the refresh running on this thread
+        self._local = threading.local()
+
+        self._thread: Optional[threading.Thread] = None
+        self._thread_pid: Optional[int] = None
+        self._stop = threading.Event()
+
+        self.refreshes = 0
+        self.failures = 0
+        self.skipped_budget = 0
+        self.skipped_concurrency = 0
+
+    def record(self, key: str, endpoint: str, city: str, days: Optional[int]) -> None:
+        """
+        Count a request for a cache key.
+
+        Args:
+            key (str): Cache key
+            endpoint (str): Service endpoint name
+            city (str): City name
+            days (Optional[int]): Number of forecast days, if applicable
+        """
+        with self._lock:
+            self._counts[key] = self._counts.get(key, 0) + 1
+            if key not in self._targets:
+                self._targets[key] = (endpoint, city, days)
+                if len(self._targets) > self.track_max:
+                    self._trim()
+
+        if self.scheduler_enabled:
+            self._ensure_thread()
+
+    def _trim(self) -> None:
+        """Forget the least requested half of the tracked keys. Caller holds the lock."""
+        keep = sorted(self._counts, key=self._counts.__getitem__, reverse=True)[:self.track_max // 2]
+        keep_set = set(keep) | self._refreshing
+        self._counts = {key: self._counts[key] for key in keep_set if key in self._counts}
+        self._targets = {key: self._targets[key] for key in keep_set if key in self._targets}
+
+    def _take_budget(self) -> bool:
+        """Take one upstream call from the refresh budget. Caller holds the lock."""
+        now = time.monotonic()
+        self._tokens = min(
+            float(self.budget_per_minute),
+            self._tokens + (now - self._refilled_at) * self.budget_per_minute / 60.0
+        )
+        self._refilled_at = now
+
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    def request_refresh(self, key: str) -> bool:
+        """
+        Queue a background refresh of a cache key.
+
+        Args:
+            key (str): Cache key previously passed to record()
+
+        Returns:
+            bool: True if a refresh for the key is queued or already running,
+            False if the concurrency limit or budget does not allow one
+        """
+        with self._lock:
+            if key in self._refreshing:
+                return True
+
+            target = self._targets.get(key)
+            if target is None:
+                return False
+            if len(self._refreshing) >= self.max_concurrency:
+                self.skipped_concurrency += 1
+                return False
+            if not self._take_budget():
+                self.skipped_budget += 1
+                return False
+
+            self._refreshing.add(key)
+
+        executor = self.app.extensions.get('weather_executor')
+        if executor is None:
+            threading.Thread(target=self._run, args=(key, target), daemon=True).start()
+        else:
+            executor.submit(self._run, key, target)
+        return True
+
+    def charge_upstream(self) -> None:
+        """
+        Charge an upstream call to the refresh budget if it is made by a
+        background refresh. The token taken when the refresh was queued pays
+        for its first call; every further call takes another one.
+
+        Raises:
+            UpstreamQuotaExceeded: If the budget has no token left for the call
+        """
+        prepaid = getattr(self._local, 'prepaid', None)
+        if prepaid is None:
+            return
+        if prepaid > 0:
+            self._local.prepaid = prepaid - 1
+            return
+
+        with self._lock:
+            if self._take_budget():
+                return
+            self.skipped_budget += 1
+            retry_after = 60.0 * (1 - self._tokens) / self.budget_per_minute if self.budget_per_minute > 0 else 60.0
+        raise UpstreamQuotaExceeded(retry_after)
+
+    def _run(self, key: str, target: RefreshTarget) -> None:
+        """Refresh one cache key inside the application context."""
+        succeeded = False
+        self._local.prepaid = 1
+        try:
+            with self.app.app_context():
+                result = WeatherService.fetch_result(*target)
+                # A stale fallback means the upstream could not be reached
+                succeeded = result.get('status') == 'success' and not result.get('stale')
+        except Exception:
+            self.app.logger.exception(f'Background refresh of {key} failed')
+        finally:
+            self._local.prepaid = None
+            with self._lock:
+                self._refreshing.discard(key)
+                if succeeded:
+                    self.refreshes += 1
+                else:
+                    self.failures += 1
+
+    def hot_keys(self) -> List[str]:
+        """
+        Get the most requested keys and decay all counts, so popularity
+        reflects recent traffic.
+
+        Returns:
+            List[str]: Up to REFRESH_TOP_N keys, most requested first
+        """
+        with self._lock:
+            hot = sorted(self._counts, key=self._counts.__getitem__, reverse=True)[:self.top_n]
+
+            decayed = {}
+            for key, count in self._counts.items():
+                if count >= 1 or key in self._refreshing:
+                    decayed[key] = count / 2
+            self._counts = decayed
+            self._targets = {key: target for key, target in self._targets.items() if key in decayed}
+
+        return hot
+
+    def popular(self, limit: int) -> List[Tuple[str, float, RefreshTarget]]:
+        """
+        Get the most requested keys without decaying the counts.
+
+        Args:
+            limit (int): Maximum number of keys
+
+        Returns:
+            List of (key, count, target) tuples, most requested first
+        """
+        with self._lock:
+            keys = sorted(self._counts, key=self._counts.__getitem__, reverse=True)[:limit]
+            return [(key, self._counts[key], self._targets[key]) for key in keys if key in self._targets]
+
+    def restore_counts(self, counts: List[Tuple[str, float, RefreshTarget]]) -> int:
+        """
+        Seed request counts saved by another process, such as the previous
+        worker, keeping the larger count for keys already tracked.
+
+        Args:
+            counts: (key, count, target) tuples as returned by popular()
+
+        Returns:
+            int: Number of keys tracked afterwards
+        """
+        with self._lock:
+            for key, count, target in counts:
+                if count > self._counts.get(key, 0):
+                    self._counts[key] = count
+                self._targets.setdefault(key, target)
+            if len(self._targets) > self.track_max:
+                self._trim()
+            return len(self._counts)
+
+    def refresh_hot(self) -> int:
+        """
+        Refresh hot keys whose cached entry expires within REFRESH_LEAD_TIME.
+
+        Returns:
+            int: Number of refreshes queued
+        """
+        cache = self.app.extensions.get('weather_cache')
+        if cache is None:
+            return 0
+
+        now = time.time()
+        queued = 0
+        for key in self.hot_keys():
+            entry = cache.peek(key)
+            if entry is not None and entry.ttl_remaining(now) <= self.lead_time:
+                if key not in self._refreshing and self.request_refresh(key):
+                    queued += 1
+        return queued
+
+    def _ensure_thread(self) -> None:
+        """Start the scheduler thread in this process if it is not running."""
+        if self._thread is not None and self._thread_pid == os.getpid() and self._thread.is_alive():
+            return
+
+        with self._lock:
+            if self._thread is not None and self._thread_pid == os.getpid() and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name='weather-refresh', daemon=True)
+            self._thread_pid = os.getpid()
+            self._thread.start()
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.refresh_hot()
+            except Exception:
+                self.app.logger.exception('Hot city refresh cycle failed')
+
+    def stop(self) -> None:
+        """Stop the scheduler thread."""
+        self._stop.set()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get refresh statistics.
+
+        Returns:
+            Dict[str, Any]: Tracked keys, refresh outcomes and remaining budget
+        """
+        with self._lock:
+            return {
+                'tracked_keys': len(self._counts),
+                'in_progress': len(self._refreshing),
+                'refreshes': self.refreshes,
+                'failures': self.failures,
+                'skipped_budget': self.skipped_budget,
+                'skipped_concurrency': self.skipped_concurrency,
+                'budget_remaining': int(self._tokens),
+                'scheduler_running': self._thread is not None and self._thread.is_alive(),
+            }
@@ -1,16 +1,187 @@
-from flask import Blueprint, request, jsonify
+import math
+import time
+from datetime import datetime, timezone
+from flask import Blueprint, request, jsonify, current_app
+from app.history import KINDS, parse_resolution
+from app.http_cache import cache_headers, entry_matches, is_not_modified
+from app.metrics import CONTENT_TYPE
+from app.series import convert_columns, forecast_view, to_columnar
 from app.services import WeatherService
+from app.stream import STREAM_HEADERS, StreamCapacityError
+from app.units import convert_records, field_conversions, parse_units, weather_view
 
 # Create blueprint
 weather_bp = Blueprint('weather', __name__)
 
+# Unix seconds of 0001-01-01 and 9999-12-31 23:59:59 UTC, the range datetime can represent
+MIN_TIMESTAMP = -62135596800
+MAX_TIMESTAMP = 253402300799
+
+def _service_error_response(data):
+    """
+    Build the response for a service error result.
+    
+    Calls refused because of the upstream API quota, because the
+    upstream's circuit breaker is open, or because the live stream limits
+    are reached, are reported as 503 with a Retry-After header; every
+    other service error is a 400.
+    
+    Args:
+        data (dict): Service result with status 'error'
+        
+    Returns:
+        Tuple of the JSON response and status code
+    """
+    response = jsonify(data)
+    if data.get('code') in ('upstream_rate_limited', 'upstream_unavailable', 'stream_capacity'):
+        response.headers['Retry-After'] = str(data['retry_after'])
+        return response, 503
+    return response, 400
+
+def _timestamp_arg(name, default):
+    """
+    Read a time query parameter given as Unix seconds or an ISO 8601 date/time.
+    
+    Args:
+        name (str): Parameter name
+        default (int): Value when the parameter is absent
+        
+    Returns:
+        int: Unix timestamp in seconds
+        
+    Raises:
+        ValueError: If the value is neither a number nor ISO 8601, or is
+            outside the years 1 to 9999
+    """
+    value = request.args.get(name)
+    if not value:
+        return default
+    if value.lstrip('-').isdigit():
+        timestamp = int(value)
+    else:
+        try:
+            parsed = datetime.fromisoformat(value)
+        except ValueError:
+            raise ValueError(f'{name} must be Unix seconds or an ISO 8601 date/time') from None
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        timestamp = int(parsed.timestamp())
+    
+    if not MIN_TIMESTAMP <= timestamp <= MAX_TIMESTAMP:
+        raise ValueError(f'{name} must be between the years 1 and 9999')
+    return timestamp
+
+def _float_arg(name, default=None):
+    """
+    Read a numeric query parameter.
+    
+    Args:
+        name (str): Parameter name
+        default (float): Value when the parameter is absent
+        
+    Returns:
+        float: The value, or the default
+        
+    Raises:
+        ValueError: If the value is not a finite number
+    """
+    value = request.args.get(name)
+    if value is None or value == '':
+        return default
+    try:
+        number = float(value)
+    except ValueError:
+        raise ValueError(f'{name} must be a number') from None
+    if not math.isfinite(number):
+        raise ValueError(f'{name} must be a number')
+    return number
+
+def _spatial_args():
+    """
+    Read the result limit and refresh flag shared by the spatial queries.
+    
+    Returns:
+        Tuple of the limit and whether to refresh stale locations
+        
+    Raises:
+        ValueError: If the limit is out of range
+    """
+    max_results = current_app.config['CONFIG_CLASS'].SPATIAL_MAX_RESULTS
+    limit = request.args.get('limit', min(50, max_results), type=int)
+    if limit < 1 or limit > max_results:
+        raise ValueError(f'Limit must be between 1 and {max_results}')
+    fetch = request.args.get('fetch', 'true').lower() not in ('false', '0', 'no')
+    return limit, fetch
+
+def _cached_service_response(endpoint, city, days, transform=None, view=''):
+    """
+    Serve a cacheable service call.
+    
+    A cache hit is answered with the entry's pre-encoded JSON bytes, or
+    their stored gzip/brotli variant, so no payload object is built,
+    serialized or compressed per request. Responses carry the
+    entry's ETag, Last-Modified and Cache-Control max-age, and conditional
+    requests matching them get an empty 304.
+    
+    Args:
+        endpoint (str): Service endpoint name ('weather', 'forecast')
+        city (str): City name
+        days (int): Number of forecast days, or None
+        transform (callable): Builds a derived representation of a
+            successful result, such as a columnar forecast
+        view (str): Tag naming the derived representation
+        
+    Returns:
+        Response, or tuple of the JSON response and status code
+    """
+    entry = WeatherService.lookup_cache_entry(endpoint, city, days)
+    
+    if entry is None:
+        data = WeatherService.fetch_result(endpoint, city, days)
+        if data['status'] == 'error':
+            return _service_error_response(data)
+        
+        # A concurrent refresh may already have replaced the stored entry
+        entry = WeatherService.peek_cache_entry(endpoint, city, days)
+        if not entry_matches(entry, data):
+            return jsonify(transform(data) if transform else data), 200
+    
+    if is_not_modified(entry, request.headers.get('If-None-Match'), request.headers.get('If-Modified-Since'), view):
+        response = current_app.response_class(status=304)
+        response.headers.update(cache_headers(entry, view=view))
+        return response
+    
+    if transform is not None:
+        response = jsonify(transform(entry.value))
+        response.headers.update(cache_headers(entry, view=view))
+        return response
+    
+    if current_app.json.compact is False:
+        # Pretty-printed output cannot reuse the compact cached encoding
+        response = jsonify(entry.value)
+        response.headers.update(cache_headers(entry))
+        return response
+    
+    response = current_app.response_class(entry.body, mimetype='application/json')
+    response.headers.update(cache_headers(entry))
+    
+    # Send the compressed body stored with the entry instead of compressing it again
+    compressor = current_app.extensions.get('weather_compressor')
+    if compressor is not None:
+        compressor.apply(response, request.headers.get('Accept-Encoding'), entry.encodings)
+    return response
+
 @weather_bp.route('/api/weather', methods=['GET'])
 def get_current_weather():
     """
     Get current weather for a specific city.
     
+    Responses carry an ETag and a Cache-Control max-age from the cache
+    entry; If-None-Match and If-Modified-Since are answered with 304.
+    
     Query Parameters:
         city (str): City name (required)
+        units (str): 'metric', 'imperial' or 'kelvin' (optional, default: DEFAULT_UNITS)
         
     Returns:
         JSON response with weather data or error message
@@ -24,13 +195,251 @@ def get_current_weather():
                 'status': 'error'
             }), 400
         
-        # Get weather data from service
-        weather_data = WeatherService.get_current_weather(city.strip())
+        try:
+            stored_units = current_app.config['CONFIG_CLASS'].DEFAULT_UNITS
+            transform, view = weather_view(stored_units, parse_units(request.args.get('units')))
+        except ValueError as e:
+            return jsonify({
+                'error': str(e),
+                'status': 'error'
+            }), 400
+        
+        # Get weather data from cache or service
+        return _cached_service_response('weather', city.strip(), None, transform, view)
+        
+    except Exception as e:
+        return jsonify({
+            'error': f'Internal server error: {str(e)}',
+            'status': 'error'
+        }), 500
+
+@weather_bp.route('/api/weather/batch', methods=['GET', 'POST'])
+def get_current_weather_batch():
+    """
+    Get current weather for many cities in a single request.
+    
+    Query Parameters (GET):
+        cities (str): Comma-separated city names, and/or
+        city (str): City name, may be repeated
+        
+    JSON Body (POST):
+        cities (list[str]): City names
+        
+    Returns:
+        JSON response with a result per city or error message
+    """
+    try:
+        if request.method == 'POST':
+            payload = request.get_json(silent=True) or {}
+            cities = payload.get('cities')
+            
+            if not isinstance(cities, list) or not all(isinstance(city, str) for city in cities):
+                return jsonify({
+                    'error': 'Request body must be a JSON object with a list of city names in "cities"',
+                    'status': 'error'
+                }), 400
+        else:
+            cities = request.args.getlist('city')
+            for value in request.args.getlist('cities'):
+                cities.extend(value.split(','))
+        
+        cities = [city.strip() for city in cities if city.strip()]
+        
+        if not cities:
+            return jsonify({
+                'error': 'At least one city is required',
+                'status': 'error'
+            }), 400
+        
+        max_cities = current_app.config['CONFIG_CLASS'].BATCH_MAX_CITIES
+        if len(cities) > max_cities:
+            return jsonify({
+                'error': f'A batch may contain at most {max_cities} cities',
+                'status': 'error'
+            }), 400
+        
+        # Get weather data for every city from service
+        batch_data = WeatherService.get_current_weather_batch(cities)
+        
+        return jsonify(batch_data), 200
+        
+    except Exception as e:
+        return jsonify({
+            'error': f'Internal server error: {str(e)}',
+            'status': 'error'
+        }), 500
+
+@weather_bp.route('/api/weather/nearby', methods=['GET'])
+def get_nearby_weather():
+    """
+    Get the weather of known locations around a point, nearest first.
+    
+    Locations come from the in-memory spatial index; only those whose last
+    observation is older than the weather cache TTL are refreshed.
+    
+    Query Parameters:
+        lat (float): Centre latitude (required)
+        lon (float): Centre longitude (required)
+        radius (float): Radius in kilometres (optional, default: 50)
+        limit (int): Maximum number of locations (optional, default: 50)
+        fetch (bool): Refresh stale locations (optional, default: true)
+        
+    Returns:
+        JSON response with the locations or error message
+    """
+    try:
+        max_radius = current_app.config['CONFIG_CLASS'].SPATIAL_MAX_RADIUS_KM
+        try:
+            lat = _float_arg('lat')
+            lon = _float_arg('lon')
+            radius = _float_arg('radius', min(50.0, max_radius))
+            limit, fetch = _spatial_args()
+        except ValueError as e:
+            return jsonify({
+                'error': str(e),
+                'status': 'error'
+            }), 400
+        
+        if lat is None or lon is None:
+            return jsonify({
+                'error': 'lat and lon parameters are required',
+                'status': 'error'
+            }), 400
+        
+        if not -90 <= lat <= 90 or not -180 <= lon <= 180:
+            return jsonify({
+                'error': 'lat must be between -90 and 90 and lon between -180 and 180',
+                'status': 'error'
+            }), 400
+        
+        if radius <= 0 or radius > max_radius:
+            return jsonify({
+                'error': f'Radius must be greater than 0 and at most {max_radius:g} km',
+                'status': 'error'
+            }), 400
+        
+        nearby = WeatherService.get_nearby_weather(lat, lon, radius, limit, fetch)
+        
+        if nearby['status'] == 'error':
+            return _service_error_response(nearby)
+        
+        return jsonify(nearby), 200
+        
+    except Exception as e:
+        return jsonify({
+            'error': f'Internal server error: {str(e)}',
+            'status': 'error'
+        }), 500
+
+@weather_bp.route('/api/weather/bbox', methods=['GET'])
+def get_bbox_weather():
+    """
+    Get the weather of known locations inside a map viewport, most
+    populous first.
+    
+    Locations come from the in-memory spatial index; only those whose last
+    observation is older than the weather cache TTL are refreshed.
+    
+    Query Parameters:
+        bbox (str): 'west,south,east,north' in degrees (required); west
+            greater than east crosses the antimeridian
+        limit (int): Maximum number of locations (optional, default: 50)
+        fetch (bool): Refresh stale locations (optional, default: true)
+        
+    Returns:
+        JSON response with the locations or error message
+    """
+    try:
+        bbox = request.args.get('bbox')
+        
+        if not bbox:
+            return jsonify({
+                'error': 'bbox parameter is required',
+                'status': 'error'
+            }), 400
+        
+        try:
+            west, south, east, north = (float(value) for value in bbox.split(','))
+            if not all(math.isfinite(value) for value in (west, south, east, north)):
+                raise ValueError
+        except ValueError:
+            return jsonify({
+                'error': 'bbox must be four numbers: west,south,east,north',
+                'status': 'error'
+            }), 400
+        
+        if not -90 <= south <= north <= 90 or not (-180 <= west <= 180 and -180 <= east <= 180):
+            return jsonify({
+                'error': 'bbox latitudes must be between -90 and 90 with south <= north, '
+                         'and longitudes between -180 and 180',
+                'status': 'error'
+            }), 400
+        
+        try:
+            limit, fetch = _spatial_args()
+        except ValueError as e:
+            return jsonify({
+                'error': str(e),
+                'status': 'error'
+            }), 400
+        
+        locations = WeatherService.get_bbox_weather(west, south, east, north, limit, fetch)
+        
+        if locations['status'] == 'error':
+            return _service_error_response(locations)
+        
+        return jsonify(locations), 200
+        
+    except Exception as e:
+        return jsonify({
+            'error': f'Internal server error: {str(e)}',
+            'status': 'error'
+        }), 500
+
+@weather_bp.route('/api/cities/search', methods=['GET'])
+def search_cities():
+    """
+    Suggest cities for a partial or misspelled name, for location autocomplete.
+    
+    Answered from the in-memory city search index; prefix matches rank by
+    population and fuzzy matches fill the remaining places.
+    
+    Query Parameters:
+        q (str): City name or prefix, optionally with a country code (required)
+        limit (int): Maximum number of cities (optional, default: 10)
+        
+    Returns:
+        JSON response with the matching cities or error message
+    """
+    try:
+        query = request.args.get('q', '').strip()
+        max_results = current_app.config['CONFIG_CLASS'].CITY_SEARCH_MAX_RESULTS
+        limit = request.args.get('limit', min(10, max_results), type=int)
+        
+        if not query:
+            return jsonify({
+                'error': 'q parameter is required',
+                'status': 'error'
+            }), 400
+        
+        if len(query) > 100:
+            return jsonify({
+                'error': 'q must be at most 100 characters',
+                'status': 'error'
+            }), 400
+        
+        if limit < 1 or limit > max_results:
+            return jsonify({
+                'error': f'Limit must be between 1 and {max_results}',
+                'status': 'error'
+            }), 400
         
-        if weather_data['status'] == 'error':
-            return jsonify(weather_data), 400
+        cities = WeatherService.search_cities(query, limit)
         
-        return jsonify(weather_data), 200
+        if cities['status'] == 'error':
+            return _service_error_response(cities)
+        
+        return jsonify(cities), 200
         
     except Exception as e:
         return jsonify({
@@ -43,9 +452,16 @@ def get_weather_forecast():
     """
     Get weather forecast for a specific city.
     
+    Responses carry an ETag and a Cache-Control max-age from the cache
+    entry; If-None-Match and If-Modified-Since are answered with 304.
+    
     Query Parameters:
         city (str): City name (required)
         days (int): Number of days for forecast (optional, default: 5, max: 5)
+        format (str): 'list' of records (default) or 'columnar' parallel arrays
+        aggregate (str): 'daily' for min/max/mean per day (optional)
+        points (int): Downsample the 3-hourly series to at most this many points (optional)
+        units (str): 'metric', 'imperial' or 'kelvin' (optional, default: DEFAULT_UNITS)
         
     Returns:
         JSON response with forecast data or error message
@@ -53,6 +469,7 @@ def get_weather_forecast():
     try:
         city = request.args.get('city')
         days = request.args.get('days', 5, type=int)
+        points = request.args.get('points', type=int)
         
         if not city:
             return jsonify({
@@ -67,13 +484,21 @@ def get_weather_forecast():
                 'status': 'error'
             }), 400
         
-        # Get forecast data from service
-        forecast_data = WeatherService.get_forecast(city.strip(), days)
-        
-        if forecast_data['status'] == 'error':
-            return jsonify(forecast_data), 400
+        try:
+            stored_units = current_app.config['CONFIG_CLASS'].DEFAULT_UNITS
+            units = parse_units(request.args.get('units'))
+            transform, view = forecast_view(
+                request.args.get('format', 'list'), request.args.get('aggregate'), points,
+                units, field_conversions(stored_units, units)
+            )
+        except ValueError as e:
+            return jsonify({
+                'error': str(e),
+                'status': 'error'
+            }), 400
         
-        return jsonify(forecast_data), 200
+        # Get forecast data from cache or service
+        return _cached_service_response('forecast', city.strip(), days, transform, view)
         
     except Exception as e:
         return jsonify({
@@ -105,7 +530,7 @@ def get_weather_alerts():
         alerts_data = WeatherService.get_weather_alerts(city.strip())
         
         if alerts_data['status'] == 'error':
-            return jsonify(alerts_data), 400
+            return _service_error_response(alerts_data)
         
         return jsonify(alerts_data), 200
         
@@ -115,19 +540,253 @@ def get_weather_alerts():
             'status': 'error'
         }), 500
 
+@weather_bp.route('/api/dashboard', methods=['GET'])
+def get_dashboard():
+    """
+    Get current weather, forecast and alerts for a city in a single request.
+    
+    The upstream lookups run concurrently. A section that fails is returned
+    as null with its message under 'errors', leaving the others intact.
+    
+    Query Parameters:
+        city (str): City name (required)
+        days (int): Number of days for forecast (optional, default: 5, max: 5)
+        
+    Returns:
+        JSON response with the combined data or error message
+    """
+    try:
+        city = request.args.get('city')
+        days = request.args.get('days', 5, type=int)
+        
+        if not city:
+            return jsonify({
+                'error': 'City parameter is required',
+                'status': 'error'
+            }), 400
+        
+        # Validate days parameter
+        if days < 1 or days > 5:
+            return jsonify({
+                'error': 'Days parameter must be between 1 and 5',
+                'status': 'error'
+            }), 400
+        
+        # Get combined data from service
+        dashboard_data = WeatherService.get_dashboard(city.strip(), days)
+        
+        if dashboard_data['status'] == 'error':
+            return _service_error_response(dashboard_data)
+        
+        return jsonify(dashboard_data), 200
+        
+    except Exception as e:
+        return jsonify({
+            'error': f'Internal server error: {str(e)}',
+            'status': 'error'
+        }), 500
+
+@weather_bp.route('/api/stream', methods=['GET'])
+def stream_city():
+    """
+    Stream live weather for a city as Server-Sent Events.
+    
+    Sends a 'snapshot' event with the current weather and forecast, then an
+    'update' event with the changed fields whenever the city's data
+    changes, and an 'error' event when a refresh fails. All clients of a
+    city share one fetch per STREAM_REFRESH_INTERVAL.
+    
+    Query Parameters:
+        city (str): City name (required)
+        days (int): Number of days for forecast (optional, default: 5, max: 5)
+        
+    Returns:
+        text/event-stream response, or JSON error message; 503 when the
+        stream limits are reached
+    """
+    try:
+        city = request.args.get('city')
+        days = request.args.get('days', 5, type=int)
+        
+        if not city:
+            return jsonify({
+                'error': 'City parameter is required',
+                'status': 'error'
+            }), 400
+        
+        # Validate days parameter
+        if days < 1 or days > 5:
+            return jsonify({
+                'error': 'Days parameter must be between 1 and 5',
+                'status': 'error'
+            }), 400
+        
+        hub = current_app.extensions.get('weather_stream_hub')
+        if hub is None:
+            return jsonify({
+                'error': 'Live streams are disabled',
+                'status': 'error'
+            }), 404
+        
+        try:
+            subscription = hub.subscribe(city.strip(), days)
+        except StreamCapacityError as e:
+            return _service_error_response(e.error_result())
+        
+        return current_app.response_class(
+            hub.events(subscription), mimetype='text/event-stream', headers=STREAM_HEADERS
+        )
+        
+    except Exception as e:
+        return jsonify({
+            'error': f'Internal server error: {str(e)}',
+            'status': 'error'
+        }), 500
+
+@weather_bp.route('/api/history', methods=['GET'])
+def get_history():
+    """
+    Get recorded weather for a city from the local history store.
+    
+    Query Parameters:
+        city (str): City name (required)
+        from (str): Range start, Unix seconds or ISO 8601 (default: 24 hours before 'to')
+        to (str): Range end, exclusive (default: now)
+        resolution (str): 'raw' (default) or a bucket such as '30m', '1h', '1d'
+        kind (str): 'observed' (default) or 'forecast'
+        format (str): 'list' of points (default) or 'columnar' parallel arrays
+        units (str): 'metric', 'imperial' or 'kelvin' (optional, default: DEFAULT_UNITS)
+        
+    Returns:
+        JSON response with history points or error message
+    """
+    try:
+        city = request.args.get('city')
+        kind = request.args.get('kind', 'observed')
+        fmt = request.args.get('format', 'list')
+        
+        if not city:
+            return jsonify({
+                'error': 'City parameter is required',
+                'status': 'error'
+            }), 400
+        
+        try:
+            end = _timestamp_arg('to', int(time.time()))
+            start = _timestamp_arg('from', end - 86400)
+            resolution = parse_resolution(request.args.get('resolution'))
+            stored_units = current_app.config['CONFIG_CLASS'].DEFAULT_UNITS
+            conversions = field_conversions(stored_units, parse_units(request.args.get('units')))
+        except ValueError as e:
+            return jsonify({
+                'error': str(e),
+                'status': 'error'
+            }), 400
+        
+        if start >= end:
+            return jsonify({
+                'error': "'from' must be before 'to'",
+                'status': 'error'
+            }), 400
+        
+        if kind not in KINDS:
+            return jsonify({
+                'error': f"Kind must be one of: {', '.join(KINDS)}",
+                'status': 'error'
+            }), 400
+        
+        if fmt not in ('list', 'columnar'):
+            return jsonify({
+                'error': 'Format must be one of: list, columnar',
+                'status': 'error'
+            }), 400
+        
+        history = WeatherService.get_history(city.strip(), start, end, resolution, kind)
+        
+        if history['status'] == 'error':
+            return _service_error_response(history)
+        
+        # History is stored in the deployment's units and converted column by column
+        points = history['data']['points']
+        if fmt == 'columnar':
+            columns = to_columnar(points, list(points[0]) if points else ['datetime'])
+            history['data']['points'] = convert_columns(columns, conversions)
+        else:
+            history['data']['points'] = convert_records(points, conversions)
+        history['data']['format'] = fmt
+        
+        return jsonify(history), 200
+        
+    except Exception as e:
+        return jsonify({
+            'error': f'Internal server error: {str(e)}',
+            'status': 'error'
+        }), 500
+
 @weather_bp.route('/api/health', methods=['GET'])
 def health_check():
     """
     Health check endpoint.
     
     Returns:
-        JSON response indicating the API is running
+        JSON response indicating the API is running, with the remaining
+        upstream quota when the quota governor is enabled
     """
-    return jsonify({
+    health = {
         'status': 'success',
         'message': 'Weather Dashboard API is running',
         'version': '1.0.0'
-    }), 200
+    }
+    
+    quota = current_app.extensions.get('weather_upstream_quota')
+    if quota is not None:
+        health['upstream_quota'] = quota.stats()
+    
+    return jsonify(health), 200
+
+@weather_bp.route('/api/health/live', methods=['GET'])
+def liveness_check():
+    """
+    Liveness endpoint for process supervisors.
+    
+    Returns:
+        JSON response saying the process is serving requests
+    """
+    return jsonify(current_app.extensions['weather_health'].liveness()), 200
+
+@weather_bp.route('/api/health/ready', methods=['GET'])
+def readiness_check():
+    """
+    Readiness endpoint for load balancers.
+    
+    Reports upstream reachability from recent call outcomes, configuration
+    errors, cache, connection pool and rate limit state. The report is
+    reused for HEALTH_CACHE_TTL seconds.
+    
+    Returns:
+        JSON response with each check's status; 503 when the node should
+        not receive traffic
+    """
+    report = current_app.extensions['weather_health'].readiness()
+    return jsonify(report), 200 if report['ready'] else 503
+
+@weather_bp.route('/api/metrics', methods=['GET'])
+def metrics():
+    """
+    Metrics endpoint in the Prometheus text exposition format.
+    
+    Returns:
+        Request and upstream latency histograms, counters and component
+        statistics for this process, or 404 when metrics are disabled
+    """
+    registry = current_app.extensions.get('weather_metrics')
+    if registry is None:
+        return jsonify({
+            'error': 'Metrics are disabled',
+            'status': 'error'
+        }), 404
+    
+    return current_app.response_class(registry.render(current_app), content_type=CONTENT_TYPE), 200
 
 # Error handlers
 @weather_bp.errorhandler(404)
@@ -0,0 +1,276 @@
+"""
+Weather Dashboard Backend - City Search Index
+
+An in-memory index over the bundled city list answering location
+autocomplete queries without touching OpenWeather:
+
+- Prefix matches come from a sorted array of search keys (each city's
+  full name and every word suffix of it, so 'york' finds 'New York'),
+  searched with binary search and ranked by population.
+- When a query has too few prefix matches, misspellings are matched by
+  trigram similarity through an inverted index of name trigrams.
+
+Names are folded to lower-case ASCII, so 'sao paulo' finds 'São Paulo'.
+The index is built on the first query rather than at startup; the list
+is small enough that building it takes a few milliseconds.
+"""
+
+import bisect
+import csv
+import heapq
+import threading
+import time
+import unicodedata
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+# (name, country, lat, lon, population) of a bundled city
+City = Tuple[str, Optional[str], float, float, int]
+
+
+def fold_name(name: str) -> str:
+    """
+    Fold a city name for matching.
+
+    Args:
+        name (str): City name
+
+    Returns:
+        str: Lower-cased name without accents or punctuation, with
+        collapsed whitespace, e.g. 'sao paulo'
+    """
+    decomposed = unicodedata.normalize('NFKD', name)
+    ascii_name = ''.join(
+        char if char.isalnum() else ' ' for char in decomposed if not unicodedata.combining(char)
+    )
+    return ' '.join(ascii_name.lower().split())
+
+
+def trigrams(name: str) -> Set[str]:
+    """
+    Character trigrams of a folded name, padded so that word starts weigh more.
+
+    Args:
+        name (str): Folded city name
+
+    Returns:
+        Set[str]: Trigrams of the name
+    """
+    padded = f'  {name} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class CitySearchIndex:
+    """Prefix and fuzzy search over a CSV city list."""
+
+    def __init__(self, path: str, min_similarity: float = 0.25):
+        self.path = path
+        self.min_similarity = min_similarity
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._cities: List[City] = []
+        self._folded: List[str] = []
+        self._keys: List[str] = []
+        self._key_cities: List[int] = []
+        self._trigrams: Dict[str, List[int]] = {}
+        self._trigram_counts: List[int] = []
+        self.load_seconds = 0.0
+        self.queries = 0
+        self.fuzzy_queries = 0
+
+    def _ensure_loaded(self) -> None:
+        """Build the index from the city list on first use."""
+        if self._loaded:
+            return
+        with self._lock:
+            if not self._loaded:
+                self._load()
+                self._loaded = True
+
+    def _load(self) -> None:
+        """Read the city list and build the search structures. Caller holds the lock."""
+        started = time.perf_counter()
+        with open(self.path, newline='', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+
+        keys: List[Tuple[str, int]] = []
+        for row in rows:
+            folded = fold_name(row['name'])
+            if not folded:
+                continue
+            city_id = len(self._cities)
+            self._cities.append((
+                row['name'], row.get('country') or None, float(row['lat']), float(row['lon']),
+                int(row.get('population') or 0)
+            ))
+            self._folded.append(folded)
+
+            words = folded.split(' ')
+            keys.extend((' '.join(words[i:]), city_id) for i in range(len(words)))
+
+            grams = trigrams(folded)
+            self._trigram_counts.append(len(grams))
+            for gram in grams:
+                self._trigrams.setdefault(gram, []).append(city_id)
+
+        keys.sort()
+        self._keys = [key for key, _ in keys]
+        self._key_cities = [city_id for _, city_id in keys]
+        self.load_seconds = time.perf_counter() - started
+
+    def _prefix_matches(self, prefix: str) -> Set[int]:
+        """Cities with a search key starting with the prefix. Caller has loaded the index."""
+        start = bisect.bisect_left(self._keys, prefix)
+        end = bisect.bisect_left(self._keys, prefix + '\uffff', start)
+        return set(self._key_cities[start:end])
+
+    def _fuzzy_matches(self, name: str) -> Dict[int, float]:
+        """Jaccard similarity of the name's trigrams to every city sharing one."""
+        query_grams = trigrams(name)
+        shared: Dict[int, int] = {}
+        for gram in query_grams:
+            for city_id in self._trigrams.get(gram, ()):
+                shared[city_id] = shared.get(city_id, 0) + 1
+
+        matches = {}
+        for city_id, count in shared.items():
+            similarity = count / (len(query_grams) + self._trigram_counts[city_id] - count)
+            if similarity >= self.min_similarity:
+                matches[city_id] = similarity
+        return matches
+
+    @staticmethod
+    def _parse_query(query: str) -> Tuple[str, Optional[str]]:
+        """Split 'London, GB' into the folded name and the upper-cased country code."""
+        name, _, country = query.partition(',')
+        country = country.split(',')[-1].strip().upper()
+        return fold_name(name), country or None
+
+    def _to_dict(self, city_id: int, match: str) -> Dict[str, Any]:
+        """Snapshot of a city and how it matched the query."""
+        name, country, lat, lon, population = self._cities[city_id]
+        return {
+            'name': name,
+            'country': country,
+            'lat': lat,
+            'lon': lon,
+            'population': population,
+            'match': match,
+        }
+
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Find the cities matching a partial or misspelled name.
+
+        Exact name matches come first, then prefix matches of the name or
+        of any word in it, most populous first; fuzzy matches fill the
+        remaining places, most similar first.
+
+        Args:
+            query (str): City name or prefix, optionally followed by a
+                country code as in 'London, GB'
+            limit (int): Maximum number of cities
+
+        Returns:
+            List[Dict[str, Any]]: Cities with their coordinates, population
+            and how they matched ('exact', 'prefix' or 'fuzzy')
+        """
+        self._ensure_loaded()
+        name, country = self._parse_query(query)
+        self.queries += 1
+        if not name:
+            return []
+
+        def in_country(city_id: int) -> bool:
+            return country is None or self._cities[city_id][1] == country
+
+        prefix_ids = [city_id for city_id in self._prefix_matches(name) if in_country(city_id)]
+        ranked = heapq.nsmallest(
+            limit, prefix_ids,
+            key=lambda city_id: (self._folded[city_id] != name, -self._cities[city_id][4], city_id)
+        )
+        results = [
+            self._to_dict(city_id, 'exact' if self._folded[city_id] == name else 'prefix')
+            for city_id in ranked
+        ]
+
+        if len(results) < limit and len(name) >= 3:
+            self.fuzzy_queries += 1
+            found = set(prefix_ids)
+            fuzzy = [
+                (similarity, city_id) for city_id, similarity in self._fuzzy_matches(name).items()
+                if city_id not in found and in_country(city_id)
+            ]
+            fuzzy = heapq.nsmallest(
+                limit - len(results), fuzzy,
+                key=lambda match: (-match[0], -self._cities[match[1]][4], match[1])
+            )
+            results.extend(self._to_dict(city_id, 'fuzzy') for _, city_id in fuzzy)
+
+        return results
+
+    def contains(self, query: str) -> bool:
+        """
+        Whether a city name, optionally with a country code, is in the list.
+
+        Args:
+            query (str): City name such as 'London' or 'London, GB'
+
+        Returns:
+            bool: True if some city has exactly this name (and country)
+        """
+        self._ensure_loaded()
+        name, country = self._parse_query(query)
+        return any(
+            self._folded[city_id] == name and (country is None or self._cities[city_id][1] == country)
+            for city_id in self._prefix_matches(name)
+        )
+
+    def suggest(self, query: str, limit: int = 5) -> List[str]:
+        """
+        Suggest city names for a name that did not resolve.
+
+        Args:
+            query (str): City name as requested
+            limit (int): Maximum number of suggestions
+
+        Returns:
+            List[str]: 'Name,CC' strings ready to be sent back as a city
+        """
+        return [
+            f"{city['name']},{city['country']}" if city['country'] else city['name']
+            for city in self.search(query, limit)
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get index statistics.
+
+        Returns:
+            Dict[str, Any]: Indexed cities, search keys and trigrams (zero
+            until the first query builds the index), build time, and
+            queries answered, with how many fell back to fuzzy matching
+        """
+        return {
+            'cities': len(self._cities),
+            'keys': len(self._keys),
+            'trigrams': len(self._trigrams),
+            'load_seconds': round(self.load_seconds, 6),
+            'queries': self.queries,
+            'fuzzy_queries': self.fuzzy_queries,
+        }
+
+
+def create_city_search_index(config) -> Optional[CitySearchIndex]:
+    """
+    Create the city search index selected by the configuration.
+
+    Args:
+        config: Configuration class
+
+    Returns:
+        Optional[CitySearchIndex]: The index, built lazily from the city
+        list on the first query, or None when search is disabled
+    """
+    if not config.CITY_SEARCH_ENABLED or not config.CITY_SEARCH_PATH:
+        return None
+    return CitySearchIndex(config.CITY_SEARCH_PATH, config.CITY_SEARCH_MIN_SIMILARITY)
@@ -0,0 +1,106 @@
+"""
+Weather Dashboard Backend - JSON Serialization
+
+One JSON encoding shared by the Flask responses and the response cache,
+so a cached payload is encoded once and its bytes can be sent as the body
+of every later response. When the optional orjson package is installed
+and JSON_FAST_ENCODER is on, orjson does the encoding; otherwise the
+standard library json module is used. Keys are always sorted, so equal
+payloads encode to identical bytes (and identical ETags).
+"""
+
+import json
+from typing import Any, Callable, Optional, Union
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from app.metrics import timed_phase
+
+try:
+    import orjson
+except ImportError:  # Optional dependency
+    orjson = None
+
+
+def dumps(obj: Any, fast: bool = True, compact: bool = True,
+          default: Optional[Callable[[Any], Any]] = None) -> bytes:
+    """
+    Encode a value as JSON with sorted keys.
+
+    Args:
+        obj (Any): JSON-serializable value
+        fast (bool): Use orjson if it is installed
+        compact (bool): Omit all insignificant whitespace; otherwise indent
+            by two spaces
+        default (Optional[Callable]): Converter for values JSON cannot
+            represent natively
+
+    Returns:
+        bytes: UTF-8 encoded JSON
+    """
+    if fast and orjson is not None:
+        option = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if not compact:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=default, option=option)
+
+    if compact:
+        return json.dumps(obj, default=default, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    return json.dumps(obj, default=default, sort_keys=True, indent=2).encode('utf-8')
+
+
+def loads(data: Union[bytes, str], fast: bool = True) -> Any:
+    """
+    Decode JSON produced by dumps.
+
+    Args:
+        data (Union[bytes, str]): Encoded JSON
+        fast (bool): Use orjson if it is installed
+
+    Returns:
+        Any: The decoded value
+    """
+    if fast and orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider encoding through dumps, so jsonify output matches
+    the bytes stored in the response cache.
+    """
+
+    fast = True
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if kwargs:
+            # Callers asking for specific json.dumps options get exactly those
+            return super().dumps(obj, **kwargs)
+        return dumps(obj, fast=self.fast, compact=self.compact is not False, default=self.default).decode('utf-8')
+
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return loads(s, fast=self.fast)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        with timed_phase(self._app.extensions.get('weather_metrics'), 'serialize'):
+            body = dumps(obj, fast=self.fast, compact=self.compact is not False, default=self.default)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def configure_json(app: Flask, config) -> None:
+    """
+    Install the JSON provider selected by the configuration.
+
+    Args:
+        app (Flask): Application to configure
+        config: Configuration class
+    """
+    provider = FastJSONProvider(app)
+    provider.fast = config.JSON_FAST_ENCODER
+    provider.compact = config.JSON_COMPACT
+    app.json = provider
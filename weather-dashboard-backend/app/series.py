@@ -0,0 +1,258 @@
+"""
+Weather Dashboard Backend - Time Series Shaping
+
+Reshapes lists of forecast records for charting, so clients receive the
+series they plot instead of rebuilding them from per-slot dictionaries:
+
+- ``to_columnar``: parallel arrays, one per field, sharing an index
+- ``downsample``: at most N points, each the mean of an equal-width bucket
+- ``daily_summary``: min, max and mean per local calendar day
+- ``convert_columns``: linear unit conversions applied to whole columns
+
+Records are transposed in one pass with ``operator.itemgetter`` and
+``zip``, and every later step works on whole columns, which keeps the
+transforms cheap enough to run per request on top of the cached payload.
+"""
+
+import math
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from operator import itemgetter
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# Columns emitted for forecast records, in output order
+FORECAST_FIELDS = (
+    'datetime', 'temperature', 'feels_like', 'humidity', 'pressure',
+    'wind_speed', 'wind_direction', 'pop', 'description', 'icon',
+)
+
+# Columns summarized with the most frequent value instead of a mean
+CATEGORICAL_FIELDS = frozenset({'description', 'icon'})
+
+# Angles in degrees, averaged on the circle
+ANGULAR_FIELDS = frozenset({'wind_direction'})
+
+FORMATS = ('list', 'columnar')
+AGGREGATES = ('daily',)
+
+
+def to_columnar(records: Sequence[Dict[str, Any]],
+                fields: Sequence[str] = FORECAST_FIELDS) -> Dict[str, List[Any]]:
+    """
+    Transpose records into one list per field.
+
+    Args:
+        records (Sequence[Dict[str, Any]]): Records sharing the same keys
+        fields (Sequence[str]): Fields to extract, in output order
+
+    Returns:
+        Dict[str, List[Any]]: Column per field, all of the same length
+    """
+    if not records:
+        return {field: [] for field in fields}
+    if len(fields) == 1:
+        return {fields[0]: [record[fields[0]] for record in records]}
+
+    rows = map(itemgetter(*fields), records)
+    return {field: list(column) for field, column in zip(fields, zip(*rows))}
+
+
+def from_columnar(columns: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    """
+    Turn parallel columns back into a list of records.
+
+    Args:
+        columns (Dict[str, List[Any]]): Columns of equal length
+
+    Returns:
+        List[Dict[str, Any]]: One record per index
+    """
+    fields = list(columns)
+    return [dict(zip(fields, row)) for row in zip(*columns.values())]
+
+
+def convert_columns(columns: Dict[str, List[Any]],
+                    conversions: Dict[str, Tuple[float, float]]) -> Dict[str, List[Any]]:
+    """
+    Apply linear unit conversions to whole columns.
+
+    Args:
+        columns (Dict[str, List[Any]]): Columnar series
+        conversions (Dict[str, Tuple[float, float]]): (scale, offset) per
+            field; other fields are passed through
+
+    Returns:
+        Dict[str, List[Any]]: Columns with converted values rounded to two
+        decimals; missing values stay None
+    """
+    converted = dict(columns)
+    for field, (scale, offset) in conversions.items():
+        values = columns.get(field)
+        if values is not None:
+            converted[field] = [None if value is None else round(value * scale + offset, 2) for value in values]
+    return converted
+
+
+def _mean(values: Sequence[float]) -> float:
+    return round(math.fsum(values) / len(values), 2)
+
+
+def _angular_mean(degrees: Sequence[float]) -> float:
+    """Mean direction of angles in degrees, so 350 and 10 average to 0."""
+    x = math.fsum(math.cos(math.radians(angle)) for angle in degrees)
+    y = math.fsum(math.sin(math.radians(angle)) for angle in degrees)
+    if abs(x) < 1e-9 and abs(y) < 1e-9:
+        # Opposing directions cancel out; no meaningful mean exists
+        return round(_mean(degrees), 1) % 360
+    return round(math.degrees(math.atan2(y, x)), 1) % 360
+
+
+def _mode(values: Sequence[Any]) -> Any:
+    """Most frequent value, ties going to the earliest."""
+    return Counter(values).most_common(1)[0][0]
+
+
+def _summarize(field: str, values: Sequence[Any]) -> Any:
+    """Collapse one column slice into a single value."""
+    if field == 'datetime':
+        return values[0]
+    if field in CATEGORICAL_FIELDS:
+        return _mode(values)
+    if field in ANGULAR_FIELDS:
+        return _angular_mean(values)
+    return _mean(values)
+
+
+def _bucket_bounds(length: int, buckets: int) -> List[Tuple[int, int]]:
+    """Split range(length) into contiguous, nearly equal slices."""
+    return [(length * i // buckets, length * (i + 1) // buckets) for i in range(buckets)]
+
+
+def downsample(columns: Dict[str, List[Any]], points: int) -> Dict[str, List[Any]]:
+    """
+    Reduce columns to at most ``points`` entries.
+
+    Each output point summarizes an equal-width run of input points: the
+    first timestamp, the mean of numeric fields (circular mean for wind
+    direction) and the most frequent description and icon.
+
+    Args:
+        columns (Dict[str, List[Any]]): Columnar series
+        points (int): Maximum number of points, at least 1
+
+    Returns:
+        Dict[str, List[Any]]: Downsampled columns; the input when it is
+        already short enough
+    """
+    length = len(next(iter(columns.values()), []))
+    if length <= points:
+        return columns
+
+    bounds = _bucket_bounds(length, points)
+    return {
+        field: [_summarize(field, values[start:end]) for start, end in bounds]
+        for field, values in columns.items()
+    }
+
+
+def daily_summary(columns: Dict[str, List[Any]], utc_offset: int = 0) -> Dict[str, List[Any]]:
+    """
+    Aggregate a 3-hourly series into one entry per local calendar day.
+
+    Args:
+        columns (Dict[str, List[Any]]): Columnar forecast series
+        utc_offset (int): Offset of the city's local time from UTC, in seconds
+
+    Returns:
+        Dict[str, List[Any]]: Columns 'date', 'temperature_min',
+        'temperature_max', 'temperature_mean', the mean of every other
+        numeric field, 'pop_max', 'pop_mean' and the most frequent
+        description and icon
+    """
+    local = timezone(timedelta(seconds=utc_offset))
+    dates = [datetime.fromtimestamp(ts, local).date().isoformat() for ts in columns.get('datetime', [])]
+
+    # Days in order of appearance, with the index range each one covers
+    spans: Dict[str, List[int]] = {}
+    for index, date in enumerate(dates):
+        span = spans.setdefault(date, [index, index])
+        span[1] = index + 1
+
+    summary: Dict[str, List[Any]] = {'date': list(spans)}
+    for field, values in columns.items():
+        if field == 'datetime':
+            continue
+        slices = [values[start:end] for start, end in spans.values()]
+        if field == 'temperature':
+            summary['temperature_min'] = [min(day) for day in slices]
+            summary['temperature_max'] = [max(day) for day in slices]
+            summary['temperature_mean'] = [_mean(day) for day in slices]
+        elif field == 'pop':
+            summary['pop_max'] = [max(day) for day in slices]
+            summary['pop_mean'] = [_mean(day) for day in slices]
+        else:
+            summary[field] = [_summarize(field, day) for day in slices]
+    return summary
+
+
+def forecast_view(fmt: str = 'list', aggregate: Optional[str] = None, points: Optional[int] = None,
+                  units: Optional[str] = None, conversions: Optional[Dict[str, Tuple[float, float]]] = None
+                  ) -> Tuple[Optional[Callable[[Dict[str, Any]], Dict[str, Any]]], str]:
+    """
+    Build the transform for the requested forecast representation.
+
+    Unit conversions are applied to the columns before they are
+    aggregated or downsampled, so every value is converted exactly once.
+
+    Args:
+        fmt (str): 'list' (records) or 'columnar' (parallel arrays)
+        aggregate (Optional[str]): 'daily' for one entry per day
+        points (Optional[int]): Maximum number of 3-hourly points
+        units (Optional[str]): Unit system the values are converted to
+        conversions (Optional[Dict]): (scale, offset) per field, from
+            units.field_conversions; empty or None to keep stored units
+
+    Returns:
+        Tuple of the transform applied to a successful forecast result (None
+        for the unmodified payload) and a short tag naming the view, used to
+        give each view its own entity tag
+
+    Raises:
+        ValueError: If the parameters are invalid or conflict
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Format must be one of: {', '.join(FORMATS)}")
+    if aggregate is not None and aggregate not in AGGREGATES:
+        raise ValueError(f"Aggregate must be one of: {', '.join(AGGREGATES)}")
+    if points is not None and points < 1:
+        raise ValueError('Points parameter must be a positive integer')
+    if aggregate is not None and points is not None:
+        raise ValueError('Points cannot be combined with aggregate')
+
+    # Only forecast columns are converted; visibility is not part of a forecast
+    conversions = {field: conversion for field, conversion in (conversions or {}).items() if field in FORECAST_FIELDS}
+
+    if fmt == 'list' and aggregate is None and points is None and not conversions:
+        return None, ''
+
+    def transform(result: Dict[str, Any]) -> Dict[str, Any]:
+        data = result['data']
+        columns = to_columnar(data['forecasts'])
+        if conversions:
+            columns = convert_columns(columns, conversions)
+        if aggregate == 'daily':
+            columns = daily_summary(columns, data.get('timezone', 0))
+        elif points is not None:
+            columns = downsample(columns, points)
+
+        shaped = dict(data)
+        shaped['forecasts'] = columns if fmt == 'columnar' else from_columnar(columns)
+        shaped['format'] = fmt
+        if aggregate is not None:
+            shaped['aggregate'] = aggregate
+        return {**result, 'data': shaped}
+
+    tag = '-'.join(
+        part for part in (fmt, aggregate, f'p{points}' if points else None, units if conversions else None) if part
+    )
+    return transform, tag
@@ -1,7 +1,105 @@
+import math
+import sqlite3
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 import requests
 from flask import current_app
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Callable, Iterable, List, Sequence, Tuple
 from config import Config
+from app.breaker import CircuitBreakers, CircuitOpenError
+from app.cache import CacheBackend, CacheEntry, make_cache_key, normalize_city
+from app.geocoding import GeocodeStore
+from app.health import UpstreamMonitor
+from app.history import HistoryStore
+from app.metrics import WeatherMetrics, timed_phase, timed_upstream
+from app.quota import UpstreamQuota, UpstreamQuotaExceeded
+from app.search import CitySearchIndex
+from app.spatial import SpatialIndex
+from app.upstream import parse_retry_after
+
+# Sections of a dashboard response, in the order they are reported
+DASHBOARD_SECTIONS = ('weather', 'forecast', 'alerts')
+
+
+class _InFlightCall:
+    """An upstream fetch that other callers can wait on."""
+    
+    __slots__ = ('done', 'result', 'error')
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent identical calls into a single execution.
+    
+    The first caller for a key runs the function; callers arriving while it
+    is in flight block until it finishes and receive the same result, or the
+    same exception if it raised.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _InFlightCall] = {}
+        self.executions = 0
+        self.coalesced = 0
+    
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """
+        Run fn for key unless an identical call is already in flight.
+        
+        Args:
+            key (str): Identity of the call
+            fn (Callable): Function producing the result
+            
+        Returns:
+            Any: The result of fn, possibly shared with other callers
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _InFlightCall()
+                self._calls[key] = call
+                self.executions += 1
+            else:
+                self.coalesced += 1
+        
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+    
+    def stats(self) -> Dict[str, int]:
+        """
+        Get coalescing statistics.
+        
+        Returns:
+            Dict[str, int]: Executed calls, coalesced callers and calls in flight
+        """
+        with self._lock:
+            return {
+                'executions': self.executions,
+                'coalesced': self.coalesced,
+                'in_flight': len(self._calls),
+            }
+
 
 class WeatherService:
     """Service class for OpenWeather API interactions."""
@@ -17,10 +115,1183 @@ class WeatherService:
         config = WeatherService._get_config()
         return config.get_api_params_template()
     
+    @staticmethod
+    def _get_cache() -> Optional[CacheBackend]:
+        """Get the response cache, or None when caching is disabled."""
+        return current_app.extensions.get('weather_cache')
+    
+    @staticmethod
+    def _get_http_session() -> requests.Session:
+        """Get the pooled HTTP session, falling back to the requests module."""
+        return current_app.extensions.get('weather_http_session', requests)
+    
+    @staticmethod
+    def _get_quota() -> Optional[UpstreamQuota]:
+        """Get the upstream quota governor, or None when it is disabled."""
+        return current_app.extensions.get('weather_upstream_quota')
+    
+    @staticmethod
+    def _get_metrics() -> Optional[WeatherMetrics]:
+        """Get the metrics registry, or None when metrics are disabled."""
+        return current_app.extensions.get('weather_metrics')
+    
+    @staticmethod
+    def _get_circuit_breakers() -> Optional[CircuitBreakers]:
+        """Get the upstream circuit breakers, or None when they are disabled."""
+        return current_app.extensions.get('weather_circuit_breakers')
+    
+    @staticmethod
+    def _before_upstream(upstream: str) -> None:
+        """
+        Refuse a call to an upstream endpoint whose circuit is open.
+        
+        Raises:
+            CircuitOpenError: If the endpoint's circuit breaker is open
+        """
+        breakers = WeatherService._get_circuit_breakers()
+        if breakers is not None:
+            breakers.before_call(upstream)
+    
+    @staticmethod
+    def _record_upstream(upstream: str, status_code: Optional[int] = None, error: Optional[str] = None) -> None:
+        """Report an upstream call outcome to the circuit breaker and the readiness check."""
+        breakers = WeatherService._get_circuit_breakers()
+        if breakers is not None:
+            breakers.record(upstream, status_code)
+        monitor: Optional[UpstreamMonitor] = current_app.extensions.get('weather_upstream_monitor')
+        if monitor is not None:
+            monitor.record(upstream, status_code, error)
+    
+    @staticmethod
+    def _request(upstream: str, url: str, params: Dict[str, Any]) -> requests.Response:
+        """
+        Perform a GET request against an OpenWeather endpoint, within the
+        upstream quota.
+        
+        Args:
+            upstream (str): Upstream endpoint name ('weather', 'forecast', 'geocoding', 'onecall')
+            url (str): Request URL
+            params (Dict[str, Any]): Query parameters
+            
+        Returns:
+            requests.Response: The upstream response
+            
+        Raises:
+            CircuitOpenError: If the endpoint's circuit breaker is open
+            UpstreamQuotaExceeded: If the quota or, for a background refresh,
+                the refresh budget does not allow another call
+        """
+        config = WeatherService._get_config()
+        session = WeatherService._get_http_session()
+        quota = WeatherService._get_quota()
+        metrics = WeatherService._get_metrics()
+        refresher = WeatherService._get_refresher()
+        
+        WeatherService._before_upstream(upstream)
+        if refresher is not None:
+            refresher.charge_upstream()
+        if quota is not None:
+            with timed_phase(metrics, 'quota_wait'):
+                quota.acquire()
+        
+        with timed_upstream(metrics, upstream) as outcome:
+            try:
+                response = session.get(url, params=params, timeout=config.get_request_timeout())
+            except requests.RequestException as e:
+                WeatherService._record_upstream(upstream, error=type(e).__name__)
+                raise
+            outcome['status'] = response.status_code
+        
+        WeatherService._record_upstream(upstream, response.status_code)
+        if response.status_code == 429 and quota is not None:
+            quota.report_throttled(parse_retry_after(response.headers.get('Retry-After')))
+        return response
+    
+    @staticmethod
+    def _rate_limited_error(message: str, retry_after: Optional[float]) -> Dict[str, Any]:
+        """
+        Build the error result for a call refused because of the API quota.
+        
+        Args:
+            message (str): Error message
+            retry_after (Optional[float]): Seconds until a retry may succeed
+            
+        Returns:
+            Dict containing the error, its code and the retry delay
+        """
+        return {
+            'error': message,
+            'status': 'error',
+            'code': 'upstream_rate_limited',
+            'retry_after': max(1, math.ceil(retry_after or 60))
+        }
+    
+    @staticmethod
+    def _quota_error(error: UpstreamQuotaExceeded) -> Dict[str, Any]:
+        """Map a local quota refusal to a service error result."""
+        return WeatherService._rate_limited_error('Upstream API quota exhausted', error.retry_after)
+    
+    @staticmethod
+    def _circuit_open_error(error: CircuitOpenError) -> Dict[str, Any]:
+        """Map a call refused by an open circuit breaker to a service error result."""
+        return {
+            'error': str(error),
+            'status': 'error',
+            'code': 'upstream_unavailable',
+            'retry_after': max(1, math.ceil(error.retry_after))
+        }
+    
+    @staticmethod
+    def _stale_fallback(endpoint: str, city: str, days: Optional[int],
+                        result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Replace an 'upstream unavailable' error with the last cached result.
+        
+        Args:
+            endpoint (str): Service endpoint name
+            city (str): City name
+            days (Optional[int]): Number of forecast days, if applicable
+            result (Dict[str, Any]): Result of the fetch
+            
+        Returns:
+            Dict containing the result unchanged, or the cached result with
+            'stale' set, the time it was fetched and the reason it is served
+        """
+        if result.get('code') != 'upstream_unavailable':
+            return result
+        
+        entry = WeatherService.peek_cache_entry(endpoint, city, days)
+        if entry is None or entry.value.get('status') != 'success':
+            return result
+        
+        return {
+            **entry.value,
+            'stale': True,
+            'stale_reason': result['error'],
+            'fetched_at': int(entry.stored_at)
+        }
+    
+    @staticmethod
+    def _throttled_error(response: Any) -> Dict[str, Any]:
+        """Map an upstream 429 response to a service error result."""
+        return WeatherService._rate_limited_error(
+            'OpenWeather rate limit exceeded',
+            parse_retry_after(response.headers.get('Retry-After'))
+        )
+    
+    @staticmethod
+    def _get_geocode_store() -> Optional[GeocodeStore]:
+        """Get the persistent geocoding store, or None when it is disabled."""
+        return current_app.extensions.get('weather_geocode_store')
+    
+    @staticmethod
+    def _location_params(city: str) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+        """
+        Get the query parameters identifying a city.
+        
+        Cities known to the geocoding store are queried by coordinates;
+        anything else falls back to a free-text 'q' lookup.
+        
+        Args:
+            city (str): City name
+            
+        Returns:
+            Tuple of the query parameters and the locally resolved location,
+            or None if the city is not in the store
+        """
+        store = WeatherService._get_geocode_store()
+        location = store.lookup(city) if store is not None else None
+        
+        if location is None:
+            return {'q': city}, None
+        
+        return {'lat': location['lat'], 'lon': location['lon']}, location
+    
+    @staticmethod
+    def _remember_location(city: str, name: str, country: Optional[str],
+                           coord: Optional[Dict[str, float]]) -> None:
+        """Write coordinates learned from an upstream response to the geocoding store."""
+        store = WeatherService._get_geocode_store()
+        if store is not None and coord:
+            store.store(city, name, country, coord['lat'], coord['lon'])
+    
+    @staticmethod
+    def _geocode(city: str) -> Optional[Dict[str, Any]]:
+        """
+        Resolve a city to coordinates, calling the geocoding API only on a
+        local miss.
+        
+        Args:
+            city (str): City name
+            
+        Returns:
+            Optional[Dict[str, Any]]: name, country, lat and lon, or None if
+            the city does not exist
+            
+        Raises:
+            requests.exceptions.RequestException: If the geocoding request fails
+        """
+        store = WeatherService._get_geocode_store()
+        if store is not None:
+            location = store.lookup(city)
+            if location is not None:
+                return location
+        
+        config = WeatherService._get_config()
+        urls = config.get_openweather_urls()
+        geo_params = {
+            'q': city,
+            'appid': config.OPENWEATHER_API_KEY,
+            'limit': 1
+        }
+        
+        geo_response = WeatherService._request('geocoding', urls['geocoding'], geo_params)
+        geo_response.raise_for_status()
+        geo_data = geo_response.json()
+        
+        if not geo_data:
+            return None
+        
+        location = {
+            'name': geo_data[0].get('name', city),
+            'country': geo_data[0].get('country'),
+            'lat': geo_data[0]['lat'],
+            'lon': geo_data[0]['lon']
+        }
+        WeatherService._remember_location(city, location['name'], location['country'], location)
+        return location
+    
+    @staticmethod
+    def _get_single_flight() -> Optional[SingleFlight]:
+        """Get the process-wide request coalescer."""
+        return current_app.extensions.get('weather_single_flight')
+    
+    @staticmethod
+    def _get_executor() -> Optional[ThreadPoolExecutor]:
+        """Get the bounded thread pool used for concurrent upstream calls."""
+        return current_app.extensions.get('weather_executor')
+    
+    @staticmethod
+    def _submit(fn: Callable[..., Any], *args: Any) -> Future:
+        """
+        Run a service call on the upstream thread pool inside the app context.
+        
+        Args:
+            fn (Callable): Service function to call
+            *args: Arguments passed to fn
+            
+        Returns:
+            Future: Future resolving to the result of fn
+        """
+        app = current_app._get_current_object()
+        
+        def run() -> Any:
+            with app.app_context():
+                return fn(*args)
+        
+        executor = WeatherService._get_executor()
+        if executor is None:
+            future = Future()
+            try:
+                future.set_result(run())
+            except Exception as e:
+                future.set_exception(e)
+            return future
+        
+        return executor.submit(run)
+    
+    @staticmethod
+    def _map_bounded(fn: Callable[..., Any], args_list: Iterable[tuple], limit: int) -> List[Any]:
+        """
+        Run fn for every argument tuple with at most limit calls in flight.
+        
+        Args:
+            fn (Callable): Service function to call
+            args_list (Iterable[tuple]): Positional arguments for each call
+            limit (int): Maximum number of concurrent calls
+            
+        Returns:
+            List[Any]: Results in the order of args_list; a call that raised
+            yields its exception instead of a result
+        """
+        pending_args = list(enumerate(args_list))
+        pending_args.reverse()
+        results: List[Any] = [None] * len(pending_args)
+        running: Dict[Future, int] = {}
+        
+        while pending_args or running:
+            while pending_args and len(running) < limit:
+                index, args = pending_args.pop()
+                running[WeatherService._submit(fn, *args)] = index
+            
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = running.pop(future)
+                try:
+                    results[index] = future.result()
+                except Exception as e:
+                    results[index] = e
+        
+        return results
+    
+    @staticmethod
+    def _cache_key(endpoint: str, city: str, days: Optional[int]) -> str:
+        """Build the cache and coalescing key for a service call."""
+        config = WeatherService._get_config()
+        return make_cache_key(endpoint, city, config.DEFAULT_UNITS, days)
+    
+    @staticmethod
+    def peek_cache_entry(endpoint: str, city: str, days: Optional[int] = None) -> Optional[CacheEntry]:
+        """
+        Get the cache entry behind a service result, fresh or stale, without
+        counting a lookup. Used to build HTTP caching headers.
+        
+        Args:
+            endpoint (str): Service endpoint name ('weather', 'forecast', 'alerts')
+            city (str): City name
+            days (Optional[int]): Number of forecast days, if applicable
+            
+        Returns:
+            Optional[CacheEntry]: The entry, or None if not cached
+        """
+        cache = WeatherService._get_cache()
+        if cache is None:
+            return None
+        return cache.peek(WeatherService._cache_key(endpoint, city, days))
+    
+    @staticmethod
+    def _get_history() -> Optional[HistoryStore]:
+        """Get the observation history store, or None when it is disabled."""
+        return current_app.extensions.get('weather_history')
+    
+    @staticmethod
+    def _record_history(endpoint: str, city: str, result: Dict[str, Any]) -> None:
+        """
+        Append a freshly fetched result to the observation history.
+        
+        A failure to write history is logged and never fails the request.
+        
+        Args:
+            endpoint (str): Service endpoint name
+            city (str): City name
+            result (Dict[str, Any]): Successful result of the upstream fetch
+        """
+        history = WeatherService._get_history()
+        if history is None or endpoint not in ('weather', 'forecast'):
+            return
+        
+        config = WeatherService._get_config()
+        try:
+            if endpoint == 'weather':
+                history.append(city, config.DEFAULT_UNITS, 'observed', [result['data']])
+            else:
+                history.append(city, config.DEFAULT_UNITS, 'forecast', result['data']['forecasts'])
+        except sqlite3.Error as e:
+            current_app.logger.warning(f'Could not record history for {city}: {e}')
+    
+    @staticmethod
+    def get_history(city: str, start: int, end: int, resolution: int = 0,
+                    kind: str = 'observed') -> Dict[str, Any]:
+        """
+        Get recorded observations or forecasts for a city from the local
+        history store, without contacting OpenWeather.
+        
+        Args:
+            city (str): City name
+            start (int): Range start, Unix seconds
+            end (int): Range end, Unix seconds
+            resolution (int): Aggregation bucket in seconds, 0 for raw samples
+            kind (str): 'observed' or 'forecast'
+            
+        Returns:
+            Dict containing the samples or error information
+        """
+        history = WeatherService._get_history()
+        if history is None:
+            return {
+                'error': 'History is not enabled',
+                'status': 'error'
+            }
+        
+        config = WeatherService._get_config()
+        try:
+            points = history.query(city, config.DEFAULT_UNITS, start, end, resolution, kind)
+        except sqlite3.Error as e:
+            return {
+                'error': f'History query failed: {str(e)}',
+                'status': 'error'
+            }
+        
+        return {
+            'status': 'success',
+            'data': {
+                'city': city,
+                'kind': kind,
+                'from': start,
+                'to': end,
+                'resolution': resolution,
+                'points': points
+            }
+        }
+    
+    @staticmethod
+    def _get_city_search() -> Optional[CitySearchIndex]:
+        """Get the city search index, or None when it is disabled."""
+        return current_app.extensions.get('weather_city_search')
+    
+    @staticmethod
+    def search_cities(query: str, limit: int = 10) -> Dict[str, Any]:
+        """
+        Find the bundled cities matching a partial or misspelled name.
+        
+        Answered from the in-memory search index without any upstream call.
+        
+        Args:
+            query (str): City name or prefix, optionally with a country code
+            limit (int): Maximum number of cities
+            
+        Returns:
+            Dict containing the matching cities or error information
+        """
+        index = WeatherService._get_city_search()
+        if index is None:
+            return {
+                'error': 'City search is not enabled',
+                'status': 'error'
+            }
+        
+        results = index.search(query, limit)
+        return {
+            'status': 'success',
+            'data': {
+                'query': query,
+                'count': len(results),
+                'results': results
+            }
+        }
+    
+    @staticmethod
+    def _unknown_city_error(city: str) -> Optional[Dict[str, Any]]:
+        """
+        Reject a city that cannot resolve before calling OpenWeather.
+        
+        Only active with CITY_SEARCH_VALIDATE. A city is known when the
+        geocoding store has it (bundled or learned from an earlier
+        response) or it is in the search index; anything else is refused
+        with the closest names as suggestions, saving a round trip and
+        quota on typos.
+        
+        Args:
+            city (str): City name as requested
+            
+        Returns:
+            Optional[Dict[str, Any]]: The error result, or None if the
+            city may be fetched
+        """
+        index = WeatherService._get_city_search()
+        if index is None or not WeatherService._get_config().CITY_SEARCH_VALIDATE:
+            return None
+        
+        store = WeatherService._get_geocode_store()
+        if (store is not None and store.lookup(city) is not None) or index.contains(city):
+            return None
+        
+        return {
+            'error': 'City not found',
+            'status': 'error',
+            'suggestions': index.suggest(city)
+        }
+    
+    @staticmethod
+    def _get_spatial_index() -> Optional[SpatialIndex]:
+        """Get the spatial index of locations and observations, or None when it is disabled."""
+        return current_app.extensions.get('weather_spatial_index')
+    
+    @staticmethod
+    def _index_observation(endpoint: str, city: str, result: Dict[str, Any],
+                           observed_at: Optional[float] = None) -> None:
+        """
+        Write a current weather result to the spatial index.
+        
+        Locations missing from the index are added with the coordinates
+        the geocoding store resolved the city to.
+        
+        Args:
+            endpoint (str): Service endpoint name
+            city (str): City name as requested
+            result (Dict[str, Any]): Successful service result
+            observed_at (Optional[float]): When the result was fetched,
+                defaults to now
+        """
+        index = WeatherService._get_spatial_index()
+        if index is None or endpoint != 'weather':
+            return
+        
+        data = result['data']
+        if not index.has_location(data['city'], data['country']):
+            store = WeatherService._get_geocode_store()
+            location = store.lookup(city) if store is not None else None
+            if location is None:
+                return
+            index.add_location(data['city'], data['country'], location['lat'], location['lon'])
+        index.observe(data['city'], data['country'], data, observed_at)
+    
+    @staticmethod
+    def get_nearby_weather(lat: float, lon: float, radius_km: float, limit: int,
+                           fetch: bool = True) -> Dict[str, Any]:
+        """
+        Get the latest weather of the known locations around a point.
+        
+        Args:
+            lat (float): Centre latitude
+            lon (float): Centre longitude
+            radius_km (float): Search radius in kilometres
+            limit (int): Maximum number of locations, nearest first
+            fetch (bool): Refresh stale locations; False answers from the
+                index alone
+            
+        Returns:
+            Dict containing the locations or error information
+        """
+        index = WeatherService._get_spatial_index()
+        if index is None:
+            return {
+                'error': 'Spatial index is not enabled',
+                'status': 'error'
+            }
+        
+        locations = index.within_radius(lat, lon, radius_km, limit)
+        return WeatherService._spatial_response(
+            locations, fetch, {'center': {'lat': lat, 'lon': lon}, 'radius_km': radius_km}
+        )
+    
+    @staticmethod
+    def get_bbox_weather(west: float, south: float, east: float, north: float, limit: int,
+                         fetch: bool = True) -> Dict[str, Any]:
+        """
+        Get the latest weather of the known locations inside a bounding box.
+        
+        Args:
+            west (float): Western longitude; greater than east for a box
+                crossing the antimeridian
+            south (float): Southern latitude
+            east (float): Eastern longitude
+            north (float): Northern latitude
+            limit (int): Maximum number of locations, most populous first
+            fetch (bool): Refresh stale locations; False answers from the
+                index alone
+            
+        Returns:
+            Dict containing the locations or error information
+        """
+        index = WeatherService._get_spatial_index()
+        if index is None:
+            return {
+                'error': 'Spatial index is not enabled',
+                'status': 'error'
+            }
+        
+        locations = index.within_bbox(west, south, east, north, limit)
+        return WeatherService._spatial_response(locations, fetch, {'bbox': [west, south, east, north]})
+    
+    @staticmethod
+    def _spatial_response(locations: List[Dict[str, Any]], fetch: bool,
+                          query: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Refresh the stale locations of a spatial query and build its response.
+        
+        A location is stale when its observation is older than the weather
+        cache TTL. Up to SPATIAL_MAX_FETCH stale locations per query are
+        looked up through the batch path, which serves them from the
+        response cache when it can and fetches the rest upstream; the
+        others are returned with their last observation, flagged stale.
+        
+        Args:
+            locations (List[Dict[str, Any]]): Location snapshots from the index
+            fetch (bool): Whether to refresh stale locations
+            query (Dict[str, Any]): Query description echoed in the response
+            
+        Returns:
+            Dict containing the locations with their weather
+        """
+        config = WeatherService._get_config()
+        ttl = config.get_cache_ttls()['weather']
+        now = time.time()
+        
+        def is_stale(location: Dict[str, Any]) -> bool:
+            return location['observed_at'] is None or now - location['observed_at'] >= ttl
+        
+        refresh = [location for location in locations if is_stale(location)][:config.SPATIAL_MAX_FETCH] if fetch else []
+        upstream_fetches = 0
+        if refresh:
+            queries = [
+                f"{location['name']},{location['country']}" if location['country'] else location['name']
+                for location in refresh
+            ]
+            batch = WeatherService.get_current_weather_batch(queries)['data']
+            upstream_fetches = batch['count'] - batch['cached']
+            
+            for location, query_city in zip(refresh, queries):
+                result = batch['results'].get(query_city)
+                if result is None or result['status'] != 'success':
+                    continue
+                # Cached results keep the time they were fetched
+                entry = WeatherService.peek_cache_entry('weather', query_city)
+                observed_at = entry.stored_at if entry is not None and entry.value == result else now
+                WeatherService._index_observation('weather', query_city, result, observed_at)
+                location['weather'] = result['data']
+                location['observed_at'] = observed_at
+        
+        for location in locations:
+            location['stale'] = is_stale(location)
+            if location['observed_at'] is not None:
+                location['observed_at'] = int(location['observed_at'])
+        
+        return {
+            'status': 'success',
+            'data': {
+                **query,
+                'count': len(locations),
+                'observed': sum(1 for location in locations if location['weather'] is not None),
+                'refreshed': len(refresh),
+                'upstream_fetches': upstream_fetches,
+                'locations': locations
+            }
+        }
+    
+    @staticmethod
+    def _get_refresher() -> Optional[Any]:
+        """Get the background refresh scheduler, or None when caching is disabled."""
+        return current_app.extensions.get('weather_refresher')
+    
+    @staticmethod
+    def _get_snapshotter() -> Optional[Any]:
+        """Get the cache snapshotter, or None when snapshots are disabled."""
+        return current_app.extensions.get('weather_cache_snapshotter')
+    
+    @staticmethod
+    def lookup_cache_entry(endpoint: str, city: str, days: Optional[int] = None) -> Optional[CacheEntry]:
+        """
+        Look up a cached result without contacting OpenWeather.
+        
+        With stale-while-revalidate enabled, an expired entry that is still
+        within its stale window is returned as well, and a background
+        refresh is queued for it. If no refresh can be queued (refresh
+        budget or concurrency exhausted) the lookup counts as a miss.
+        
+        Args:
+            endpoint (str): Service endpoint name ('weather', 'forecast', 'alerts')
+            city (str): City name
+            days (Optional[int]): Number of forecast days, if applicable
+            
+        Returns:
+            Optional[CacheEntry]: The cached entry, or None on a miss
+        """
+        cache = WeatherService._get_cache()
+        if cache is None:
+            return None
+        
+        config = WeatherService._get_config()
+        key = WeatherService._cache_key(endpoint, city, days)
+        refresher = WeatherService._get_refresher()
+        if refresher is not None:
+            refresher.record(key, endpoint, city, days)
+        
+        entry = cache.get(key, allow_stale=config.CACHE_STALE_WHILE_REVALIDATE and refresher is not None)
+        if entry is None:
+            return None
+        
+        if not entry.is_fresh() and not refresher.request_refresh(key):
+            return None
+        
+        return entry
+    
+    @staticmethod
+    def _cache_lookup(endpoint: str, city: str, days: Optional[int]) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached result without contacting OpenWeather.
+        
+        Args:
+            endpoint (str): Service endpoint name
+            city (str): City name
+            days (Optional[int]): Number of forecast days, if applicable
+            
+        Returns:
+            Optional[Dict]: The cached result, or None on a miss
+        """
+        entry = WeatherService.lookup_cache_entry(endpoint, city, days)
+        return entry.value if entry is not None else None
+    
+    @staticmethod
+    def _fetch_and_cache(endpoint: str, city: str, days: Optional[int],
+                         fetch: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Fetch a result from OpenWeather and store it in the response cache.
+        
+        Only successful results are cached; errors are always retried.
+        Unknown cities are refused without an upstream call when city
+        validation is enabled. Concurrent fetches for the same key share a single upstream request.
+        While the endpoint's circuit is open the last cached result is
+        returned instead, flagged as stale.
+        
+        Args:
+            endpoint (str): Service endpoint name used for the key and TTL
+            city (str): City name
+            days (Optional[int]): Number of forecast days, if applicable
+            fetch (Callable): Performs the upstream request
+            
+        Returns:
+            Dict containing the freshly fetched result
+        """
+        rejected = WeatherService._unknown_city_error(city)
+        if rejected is not None:
+            return rejected
+        
+        single_flight = WeatherService._get_single_flight()
+        key = WeatherService._cache_key(endpoint, city, days)
+        
+        def fetch_and_store() -> Dict[str, Any]:
+            return WeatherService._store_result(endpoint, city, days, fetch())
+        
+        if single_flight is None:
+            result = fetch_and_store()
+        else:
+            result = single_flight.do(key, fetch_and_store)
+        return WeatherService._stale_fallback(endpoint, city, days, result)
+    
+    @staticmethod
+    def _upstream_fetch(endpoint: str, city: str, days: Optional[int]) -> Dict[str, Any]:
+        """
+        Fetch a service result from OpenWeather, bypassing the cache.
+        
+        Args:
+            endpoint (str): Service endpoint name ('weather', 'forecast', 'alerts')
+            city (str): City name
+            days (Optional[int]): Number of forecast days, if applicable
+            
+        Returns:
+            Dict containing the fetched data or error information
+        """
+        if endpoint == 'weather':
+            return WeatherService._fetch_current_weather(city)
+        elif endpoint == 'forecast':
+            return WeatherService._fetch_forecast(city, days)
+        return WeatherService._fetch_weather_alerts(city)
+    
+    @staticmethod
+    def fetch_result(endpoint: str, city: str, days: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Fetch a service result from OpenWeather and store it in the cache,
+        without looking it up first. Used after a cache miss and by
+        background refreshes.
+        
+        Args:
+            endpoint (str): Service endpoint name
+            city (str): City name
+            days (Optional[int]): Number of forecast days, if applicable
+            
+        Returns:
+            Dict containing the fetched data or error information
+        """
+        return WeatherService._fetch_and_cache(
+            endpoint, city, days,
+            lambda: WeatherService._upstream_fetch(endpoint, city, days)
+        )
+    
+    @staticmethod
+    def _store_result(endpoint: str, city: str, days: Optional[int],
+                      result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Cache a freshly fetched result, and record it in the observation
+        history and the spatial index, if it was successful.
+        
+        Args:
+            endpoint (str): Service endpoint name used for the key and TTL
+            city (str): City name
+            days (Optional[int]): Number of forecast days, if applicable
+            result (Dict[str, Any]): Result of the upstream fetch
+            
+        Returns:
+            Dict containing the result, unchanged
+        """
+        if result.get('status') != 'success':
+            return result
+        
+        metrics = WeatherService._get_metrics()
+        cache = WeatherService._get_cache()
+        if cache is not None:
+            config = WeatherService._get_config()
+            with timed_phase(metrics, 'cache_store'):
+                cache.set(WeatherService._cache_key(endpoint, city, days), result, config.get_cache_ttls()[endpoint])
+            snapshotter = WeatherService._get_snapshotter()
+            if snapshotter is not None:
+                snapshotter.ensure_running()
+        
+        with timed_phase(metrics, 'history_store'):
+            WeatherService._record_history(endpoint, city, result)
+        WeatherService._index_observation(endpoint, city, result)
+        return result
+    
+    @staticmethod
+    def _cached(endpoint: str, city: str, days: Optional[int],
+                fetch: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Serve a service call from the response cache, fetching on a miss.
+        
+        Args:
+            endpoint (str): Service endpoint name used for the key and TTL
+            city (str): City name
+            days (Optional[int]): Number of forecast days, if applicable
+            fetch (Callable): Performs the upstream request on a miss
+            
+        Returns:
+            Dict containing the cached or freshly fetched result
+        """
+        cached = WeatherService._cache_lookup(endpoint, city, days)
+        if cached is not None:
+            return cached
+        
+        return WeatherService._fetch_and_cache(endpoint, city, days, fetch)
+    
     @staticmethod
     def get_current_weather(city: str) -> Dict[str, Any]:
         """
-        Get current weather for a specific city.
+        Get current weather for a specific city, served from cache when fresh.
+        
+        Args:
+            city (str): City name
+            
+        Returns:
+            Dict containing weather data or error information
+        """
+        return WeatherService._cached(
+            'weather', city, None,
+            lambda: WeatherService._fetch_current_weather(city)
+        )
+    
+    @staticmethod
+    def get_forecast(city: str, days: int = 5) -> Dict[str, Any]:
+        """
+        Get weather forecast for a specific city, served from cache when fresh.
+        
+        Args:
+            city (str): City name
+            days (int): Number of days for forecast (default: 5)
+            
+        Returns:
+            Dict containing forecast data or error information
+        """
+        return WeatherService._cached(
+            'forecast', city, days,
+            lambda: WeatherService._fetch_forecast(city, days)
+        )
+    
+    @staticmethod
+    def get_weather_alerts(city: str) -> Dict[str, Any]:
+        """
+        Get weather alerts for a specific city, served from cache when fresh.
+        
+        Args:
+            city (str): City name
+            
+        Returns:
+            Dict containing alerts data or error information
+        """
+        return WeatherService._cached(
+            'alerts', city, None,
+            lambda: WeatherService._fetch_weather_alerts(city)
+        )
+    
+    @staticmethod
+    def get_dashboard(city: str, days: int = 5,
+                      sections: Sequence[str] = DASHBOARD_SECTIONS) -> Dict[str, Any]:
+        """
+        Get current weather, forecast and alerts for a city in one call.
+        
+        The lookups run concurrently on the upstream thread pool. A
+        failing section is reported under 'errors' and set to None without
+        affecting the others; the result is only an error if all fail.
+        
+        Args:
+            city (str): City name
+            days (int): Number of days for forecast (default: 5)
+            sections (Sequence[str]): Sections to include, a subset of
+                'weather', 'forecast' and 'alerts' (default: all)
+            
+        Returns:
+            Dict containing the merged sections or error information
+        """
+        lookups = {
+            'weather': (WeatherService.get_current_weather, city),
+            'forecast': (WeatherService.get_forecast, city, days),
+            'alerts': (WeatherService.get_weather_alerts, city),
+        }
+        futures = {name: WeatherService._submit(*lookups[name]) for name in sections}
+        
+        results: Dict[str, Any] = {}
+        for name, future in futures.items():
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                results[name] = e
+        
+        return WeatherService._merge_dashboard(city, results)
+    
+    @staticmethod
+    def _merge_dashboard(city: str, results: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Merge per-section results into a dashboard response.
+        
+        Args:
+            city (str): City name
+            results (Dict[str, Any]): Service result, or the exception raised,
+                for each section
+            
+        Returns:
+            Dict containing the merged sections or error information
+        """
+        sections: Dict[str, Any] = {}
+        errors: Dict[str, str] = {}
+        failed: Dict[str, Dict[str, Any]] = {}
+        stale: List[str] = []
+        for name, result in results.items():
+            if isinstance(result, Exception):
+                result = {
+                    'error': f'Unexpected error: {str(result)}',
+                    'status': 'error'
+                }
+            
+            if result['status'] == 'success':
+                sections[name] = result['data']
+                if result.get('stale'):
+                    stale.append(name)
+            else:
+                sections[name] = None
+                errors[name] = result['error']
+                failed[name] = result
+        
+        if len(errors) == len(results):
+            return failed.get('weather') or next(iter(failed.values()))
+        
+        response = {
+            'status': 'success',
+            'data': {
+                'city': city,
+                **sections
+            }
+        }
+        if errors:
+            response['errors'] = errors
+        if stale:
+            response['stale'] = True
+            response['stale_sections'] = stale
+        return response
+    
+    @staticmethod
+    def get_current_weather_batch(cities: List[str]) -> Dict[str, Any]:
+        """
+        Get current weather for many cities in one call.
+        
+        Cities are deduplicated by their normalized name, fresh results are
+        served from cache, and the misses are fetched concurrently with at
+        most BATCH_MAX_CONCURRENCY upstream requests in flight.
+        
+        Args:
+            cities (List[str]): City names
+            
+        Returns:
+            Dict mapping each requested city to a result shaped like
+            get_current_weather's
+        """
+        config = WeatherService._get_config()
+        results, misses = WeatherService._partition_batch(cities)
+        
+        fetched = WeatherService._map_bounded(
+            lambda city: WeatherService._fetch_and_cache(
+                'weather', city, None,
+                lambda: WeatherService._fetch_current_weather(city)
+            ),
+            [(city,) for city in misses],
+            config.BATCH_MAX_CONCURRENCY
+        )
+        return WeatherService._batch_response(results, misses, fetched)
+    
+    @staticmethod
+    def _partition_batch(cities: List[str]) -> Tuple[Dict[str, Dict[str, Any]], List[str]]:
+        """
+        Deduplicate batch cities and split them into cache hits and misses.
+        
+        Args:
+            cities (List[str]): City names as requested
+            
+        Returns:
+            Tuple of the cached results keyed by city and the cities to fetch
+        """
+        unique: Dict[str, str] = {}
+        for city in cities:
+            unique.setdefault(normalize_city(city), city.strip())
+        
+        results: Dict[str, Dict[str, Any]] = {}
+        misses: List[str] = []
+        for city in unique.values():
+            cached = WeatherService._cache_lookup('weather', city, None)
+            if cached is not None:
+                results[city] = cached
+            else:
+                misses.append(city)
+        
+        return results, misses
+    
+    @staticmethod
+    def _batch_response(results: Dict[str, Dict[str, Any]], misses: List[str],
+                        fetched: List[Any]) -> Dict[str, Any]:
+        """
+        Build the batch response from cached and freshly fetched results.
+        
+        Args:
+            results (Dict): Cached results keyed by city
+            misses (List[str]): Cities that were fetched
+            fetched (List[Any]): Result, or the exception raised, per miss
+            
+        Returns:
+            Dict containing a result per city
+        """
+        for city, result in zip(misses, fetched):
+            if isinstance(result, Exception):
+                result = {
+                    'error': f'Unexpected error: {str(result)}',
+                    'status': 'error'
+                }
+            results[city] = result
+        
+        return {
+            'status': 'success',
+            'data': {
+                'results': results,
+                'count': len(results),
+                'cached': len(results) - len(misses),
+                'errors': sum(1 for result in results.values() if result['status'] == 'error')
+            }
+        }
+    
+    @staticmethod
+    def _format_current_weather(city: str, data: Dict[str, Any],
+                                location: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Format an OpenWeather current weather payload.
+        
+        Args:
+            city (str): City name as requested
+            data (Dict[str, Any]): Upstream response body
+            location (Optional[Dict]): Locally resolved location, if the
+                request was made by coordinates
+            
+        Returns:
+            Dict containing the formatted weather data
+        """
+        if location is None:
+            WeatherService._remember_location(city, data['name'], data['sys'].get('country'), data.get('coord'))
+            location = {'name': data['name'], 'country': data['sys']['country']}
+        
+        return {
+            'status': 'success',
+            'data': {
+                'city': location['name'],
+                'country': location['country'],
+                'temperature': data['main']['temp'],
+                'feels_like': data['main']['feels_like'],
+                'humidity': data['main']['humidity'],
+                'pressure': data['main']['pressure'],
+                'description': data['weather'][0]['description'],
+                'icon': data['weather'][0]['icon'],
+                'wind_speed': data['wind']['speed'],
+                'wind_direction': data['wind'].get('deg', 0),
+                'visibility': data.get('visibility', 0) / 1000,  # Convert to km
+                'timestamp': data['dt']
+            }
+        }
+    
+    @staticmethod
+    def _format_forecast(city: str, data: Dict[str, Any],
+                         location: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Format an OpenWeather 5 day / 3 hour forecast payload.
+        
+        Args:
+            city (str): City name as requested
+            data (Dict[str, Any]): Upstream response body
+            location (Optional[Dict]): Locally resolved location, if the
+                request was made by coordinates
+            
+        Returns:
+            Dict containing the formatted forecast data
+        """
+        if location is None:
+            WeatherService._remember_location(
+                city, data['city']['name'], data['city'].get('country'), data['city'].get('coord')
+            )
+            location = {'name': data['city']['name'], 'country': data['city']['country']}
+        
+        forecasts = []
+        for item in data['list']:
+            forecasts.append({
+                'datetime': item['dt'],
+                'temperature': item['main']['temp'],
+                'feels_like': item['main']['feels_like'],
+                'humidity': item['main']['humidity'],
+                'pressure': item['main']['pressure'],
+                'description': item['weather'][0]['description'],
+                'icon': item['weather'][0]['icon'],
+                'wind_speed': item['wind']['speed'],
+                'wind_direction': item['wind'].get('deg', 0),
+                'pop': item.get('pop', 0) * 100  # Probability of precipitation as percentage
+            })
+        
+        return {
+            'status': 'success',
+            'data': {
+                'city': location['name'],
+                'country': location['country'],
+                'timezone': data['city'].get('timezone', 0),  # UTC offset in seconds
+                'forecasts': forecasts
+            }
+        }
+    
+    @staticmethod
+    def _format_alerts(city: str, alert_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Format the alerts section of an OpenWeather One Call payload.
+        
+        Args:
+            city (str): City name as requested
+            alert_data (Dict[str, Any]): Upstream response body
+            
+        Returns:
+            Dict containing the formatted alerts data
+        """
+        alerts = []
+        if 'alerts' in alert_data:
+            for alert in alert_data['alerts']:
+                alerts.append({
+                    'sender_name': alert.get('sender_name', 'Unknown'),
+                    'event': alert.get('event', 'Weather Alert'),
+                    'start': alert.get('start'),
+                    'end': alert.get('end'),
+                    'description': alert.get('description', 'No description available')
+                })
+        
+        return {
+            'status': 'success',
+            'data': {
+                'city': city,
+                'alerts': alerts
+            }
+        }
+    
+    @staticmethod
+    def _fetch_current_weather(city: str) -> Dict[str, Any]:
+        """
+        Fetch current weather for a specific city from OpenWeather.
         
         Args:
             city (str): City name
@@ -39,43 +1310,32 @@ class WeatherService:
             
             urls = config.get_openweather_urls()
             params = config.get_api_params_template()
-            params['q'] = city
+            location_params, location = WeatherService._location_params(city)
+            params.update(location_params)
             
-            response = requests.get(urls['weather'], params=params, timeout=config.API_TIMEOUT)
+            response = WeatherService._request('weather', urls['weather'], params)
             response.raise_for_status()
             
-            data = response.json()
-            
-            # Format the response
-            return {
-                'status': 'success',
-                'data': {
-                    'city': data['name'],
-                    'country': data['sys']['country'],
-                    'temperature': data['main']['temp'],
-                    'feels_like': data['main']['feels_like'],
-                    'humidity': data['main']['humidity'],
-                    'pressure': data['main']['pressure'],
-                    'description': data['weather'][0]['description'],
-                    'icon': data['weather'][0]['icon'],
-                    'wind_speed': data['wind']['speed'],
-                    'wind_direction': data['wind'].get('deg', 0),
-                    'visibility': data.get('visibility', 0) / 1000,  # Convert to km
-                    'timestamp': data['dt']
-                }
-            }
+            with timed_phase(WeatherService._get_metrics(), 'format'):
+                return WeatherService._format_current_weather(city, response.json(), location)
             
+        except UpstreamQuotaExceeded as e:
+            return WeatherService._quota_error(e)
+        except CircuitOpenError as e:
+            return WeatherService._circuit_open_error(e)
         except requests.exceptions.HTTPError as e:
-            if response.status_code == 404:
+            if e.response.status_code == 404:
                 return {
                     'error': 'City not found',
                     'status': 'error'
                 }
-            elif response.status_code == 401:
+            elif e.response.status_code == 401:
                 return {
                     'error': 'Invalid API key',
                     'status': 'error'
                 }
+            elif e.response.status_code == 429:
+                return WeatherService._throttled_error(e.response)
             else:
                 return {
                     'error': f'API error: {e}',
@@ -93,9 +1353,9 @@ class WeatherService:
             }
     
     @staticmethod
-    def get_forecast(city: str, days: int = 5) -> Dict[str, Any]:
+    def _fetch_forecast(city: str, days: int = 5) -> Dict[str, Any]:
         """
-        Get weather forecast for a specific city.
+        Fetch weather forecast for a specific city from OpenWeather.
         
         Args:
             city (str): City name
@@ -115,52 +1375,33 @@ class WeatherService:
             
             urls = config.get_openweather_urls()
             params = config.get_api_params_template()
-            params.update({
-                'q': city,
-                'cnt': days * 8  # 8 forecasts per day (every 3 hours)
-            })
+            location_params, location = WeatherService._location_params(city)
+            params.update(location_params)
+            params['cnt'] = days * 8  # 8 forecasts per day (every 3 hours)
             
-            response = requests.get(urls['forecast'], params=params, timeout=config.API_TIMEOUT)
+            response = WeatherService._request('forecast', urls['forecast'], params)
             response.raise_for_status()
             
-            data = response.json()
-            
-            # Format the forecast data
-            forecasts = []
-            for item in data['list']:
-                forecasts.append({
-                    'datetime': item['dt'],
-                    'temperature': item['main']['temp'],
-                    'feels_like': item['main']['feels_like'],
-                    'humidity': item['main']['humidity'],
-                    'pressure': item['main']['pressure'],
-                    'description': item['weather'][0]['description'],
-                    'icon': item['weather'][0]['icon'],
-                    'wind_speed': item['wind']['speed'],
-                    'wind_direction': item['wind'].get('deg', 0),
-                    'pop': item.get('pop', 0) * 100  # Probability of precipitation as percentage
-                })
-            
-            return {
-                'status': 'success',
-                'data': {
-                    'city': data['city']['name'],
-                    'country': data['city']['country'],
-                    'forecasts': forecasts
-                }
-            }
+            with timed_phase(WeatherService._get_metrics(), 'format'):
+                return WeatherService._format_forecast(city, response.json(), location)
             
+        except UpstreamQuotaExceeded as e:
+            return WeatherService._quota_error(e)
+        except CircuitOpenError as e:
+            return WeatherService._circuit_open_error(e)
         except requests.exceptions.HTTPError as e:
-            if response.status_code == 404:
+            if e.response.status_code == 404:
                 return {
                     'error': 'City not found',
                     'status': 'error'
                 }
-            elif response.status_code == 401:
+            elif e.response.status_code == 401:
                 return {
                     'error': 'Invalid API key',
                     'status': 'error'
                 }
+            elif e.response.status_code == 429:
+                return WeatherService._throttled_error(e.response)
             else:
                 return {
                     'error': f'API error: {e}',
@@ -178,9 +1419,9 @@ class WeatherService:
             }
     
     @staticmethod
-    def get_weather_alerts(city: str) -> Dict[str, Any]:
+    def _fetch_weather_alerts(city: str) -> Dict[str, Any]:
         """
-        Get weather alerts for a specific city.
+        Fetch weather alerts for a specific city from OpenWeather.
         Note: This requires coordinates, so we'll first get city info then alerts.
         
         Args:
@@ -200,25 +1441,17 @@ class WeatherService:
             
             urls = config.get_openweather_urls()
             
-            # First, get city coordinates
-            geo_params = {
-                'q': city,
-                'appid': config.OPENWEATHER_API_KEY,
-                'limit': 1
-            }
-            
-            geo_response = requests.get(urls['geocoding'], params=geo_params, timeout=config.API_TIMEOUT)
-            geo_response.raise_for_status()
-            geo_data = geo_response.json()
+            # First, get city coordinates (from the local store when known)
+            location = WeatherService._geocode(city)
             
-            if not geo_data:
+            if location is None:
                 return {
                     'error': 'City not found',
                     'status': 'error'
                 }
             
-            lat = geo_data[0]['lat']
-            lon = geo_data[0]['lon']
+            lat = location['lat']
+            lon = location['lon']
             
             # Now get alerts using One Call API
             alert_params = {
@@ -228,7 +1461,7 @@ class WeatherService:
                 'exclude': 'minutely,hourly,daily,current'  # Only get alerts
             }
             
-            alert_response = requests.get(urls['onecall'], params=alert_params, timeout=config.API_TIMEOUT)
+            alert_response = WeatherService._request('onecall', urls['onecall'], alert_params)
             
             # Handle case where alerts API might not be available
             if alert_response.status_code == 401:
@@ -242,34 +1475,22 @@ class WeatherService:
                 }
             
             alert_response.raise_for_status()
-            alert_data = alert_response.json()
-            
-            alerts = []
-            if 'alerts' in alert_data:
-                for alert in alert_data['alerts']:
-                    alerts.append({
-                        'sender_name': alert.get('sender_name', 'Unknown'),
-                        'event': alert.get('event', 'Weather Alert'),
-                        'start': alert.get('start'),
-                        'end': alert.get('end'),
-                        'description': alert.get('description', 'No description available')
-                    })
             
-            return {
-                'status': 'success',
-                'data': {
-                    'city': city,
-                    'alerts': alerts
-                }
-            }
+            with timed_phase(WeatherService._get_metrics(), 'format'):
+                return WeatherService._format_alerts(city, alert_response.json())
             
+        except UpstreamQuotaExceeded as e:
+            return WeatherService._quota_error(e)
+        except CircuitOpenError as e:
+            return WeatherService._circuit_open_error(e)
         except requests.exceptions.HTTPError as e:
-            if alert_response.status_code == 404:
+            status_code = e.response.status_code if e.response is not None else None
+            if status_code == 404:
                 return {
                     'error': 'Location not found',
                     'status': 'error'
                 }
-            elif alert_response.status_code == 401:
+            elif status_code == 401:
                 return {
                     'status': 'success',
                     'data': {
@@ -278,6 +1499,8 @@ class WeatherService:
                         'message': 'Weather alerts require a premium API subscription'
                     }
                 }
+            elif status_code == 429:
+                return WeatherService._throttled_error(e.response)
             else:
                 return {
                     'error': f'API error: {e}',
@@ -0,0 +1,314 @@
+"""
+Weather Dashboard Backend - Warm-Start Cache Snapshots
+
+Every new worker would otherwise start with an empty response cache and
+no idea which cities are popular, so the first minutes after a deploy
+send a burst of upstream calls. The snapshotter periodically, and when
+the process exits, writes the most recently used unexpired cache entries
+and the refresh scheduler's request counts to one compact file; a new
+worker restores them in create_app without any network access.
+
+The file is a small JSON header indexing the entries, followed by the
+raw response bodies (and their compressed variants). It is memory-mapped
+on load, so only the bodies of unexpired entries are copied out, and each
+value is decoded from its body only when first needed. Workers sharing a
+snapshot path merge their entries, newest first, into the same file.
+"""
+
+import atexit
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from flask import Flask
+
+from app.cache import CacheEntry
+from app.serialization import dumps, loads
+
+MAGIC = b'WDCACHE1'
+
+# Length of the JSON header following the magic bytes
+HEADER_LENGTH = struct.Struct('>I')
+
+# (key, entry) pairs and (key, count, (endpoint, city, days)) request counts
+Snapshot = Tuple[List[Tuple[str, CacheEntry]], List[Tuple[str, float, Tuple[str, str, Optional[int]]]]]
+
+
+def write_snapshot(path: str, entries: List[Tuple[str, CacheEntry]],
+                   counts: List[Tuple[str, float, Tuple[str, str, Optional[int]]]]) -> int:
+    """
+    Atomically write a snapshot file.
+
+    Args:
+        path (str): Snapshot file path
+        entries: (key, entry) pairs, most recently used first
+        counts: (key, count, target) request counts, most requested first
+
+    Returns:
+        int: Size of the file in bytes
+    """
+    index = []
+    chunks = []
+    offset = 0
+
+    def add(data: bytes) -> List[int]:
+        nonlocal offset
+        chunks.append(data)
+        offset += len(data)
+        return [offset - len(data), len(data)]
+
+    for key, entry in entries:
+        index.append([
+            key, entry.stored_at, entry.expires_at, entry.etag, add(entry.body),
+            {coding: add(body) for coding, body in entry.encodings.items()},
+        ])
+
+    header = dumps({
+        'created_at': time.time(),
+        'entries': index,
+        'counts': [[key, count, list(target)] for key, count, target in counts],
+    })
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(HEADER_LENGTH.pack(len(header)))
+        f.write(header)
+        for chunk in chunks:
+            f.write(chunk)
+    os.replace(temp_path, path)
+    return len(MAGIC) + HEADER_LENGTH.size + len(header) + offset
+
+
+def read_snapshot(path: str, now: Optional[float] = None) -> Tuple[Snapshot, int]:
+    """
+    Read the unexpired entries and the request counts of a snapshot file.
+
+    Args:
+        path (str): Snapshot file path
+        now (Optional[float]): Entries expiring before this time are
+            skipped, defaults to now
+
+    Returns:
+        Tuple of the snapshot and the number of expired entries skipped
+
+    Raises:
+        OSError: If the file cannot be read
+        ValueError: If the file is not a snapshot
+    """
+    now = time.time() if now is None else now
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size < len(MAGIC) + HEADER_LENGTH.size:
+            raise ValueError(f'{path} is not a cache snapshot')
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if data[:len(MAGIC)] != MAGIC:
+                raise ValueError(f'{path} is not a cache snapshot')
+            (header_length,) = HEADER_LENGTH.unpack_from(data, len(MAGIC))
+            start = len(MAGIC) + HEADER_LENGTH.size
+            header = loads(data[start:start + header_length])
+            base = start + header_length
+
+            def chunk(span: List[int]) -> bytes:
+                return data[base + span[0]:base + span[0] + span[1]]
+
+            entries = []
+            expired = 0
+            for key, stored_at, expires_at, etag, body, encodings in header['entries']:
+                if expires_at <= now:
+                    expired += 1
+                    continue
+                entries.append((key, CacheEntry.from_body(
+                    chunk(body), stored_at, expires_at, etag,
+                    {coding: chunk(span) for coding, span in encodings.items()}
+                )))
+
+    counts = [(key, count, tuple(target)) for key, count, target in header['counts']]
+    return (entries, counts), expired
+
+
+class CacheSnapshotter:
+    """Saves and restores warm-start snapshots of the response cache and request counts."""
+
+    def __init__(self, app: Flask, config):
+        self.app = app
+        self.path = config.CACHE_SNAPSHOT_PATH
+        self.interval = config.CACHE_SNAPSHOT_INTERVAL
+        self.max_entries = config.CACHE_SNAPSHOT_MAX_ENTRIES
+
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._thread_pid: Optional[int] = None
+        self._stop = threading.Event()
+
+        self.saves = 0
+        self.failures = 0
+        self.saved_entries = 0
+        self.restored = 0
+        self.skipped_expired = 0
+        self.load_seconds = 0.0
+
+    def load(self) -> int:
+        """
+        Restore the snapshot into the cache and the refresh scheduler.
+
+        A missing or unreadable file leaves both empty; entries already
+        expired are skipped.
+
+        Returns:
+            int: Number of cache entries restored
+        """
+        started = time.perf_counter()
+        try:
+            (entries, counts), expired = read_snapshot(self.path)
+        except FileNotFoundError:
+            return 0
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            self.app.logger.warning(f'Ignoring unreadable cache snapshot {self.path}: {e}')
+            return 0
+
+        cache = self.app.extensions.get('weather_cache')
+        restored = 0
+        if cache is not None:
+            restored = sum(1 for key, entry in entries if cache.restore(key, entry))
+
+        refresher = self.app.extensions.get('weather_refresher')
+        if refresher is not None and counts:
+            refresher.restore_counts(counts)
+
+        self.restored += restored
+        self.skipped_expired += expired
+        self.load_seconds = time.perf_counter() - started
+        return restored
+
+    def save(self) -> int:
+        """
+        Write the most recently used unexpired cache entries and the
+        request counts to the snapshot file.
+
+        Entries another worker saved to the same file are kept unless this
+        process holds a newer entry for the key. Nothing is written when
+        there is nothing to save.
+
+        Returns:
+            int: Number of cache entries written
+        """
+        cache = self.app.extensions.get('weather_cache')
+        refresher = self.app.extensions.get('weather_refresher')
+        entries = cache.snapshot(self.max_entries) if cache is not None else []
+        counts = refresher.popular(self.max_entries) if refresher is not None else []
+        if not entries and not counts:
+            return 0
+
+        with self._lock:
+            try:
+                try:
+                    (saved_entries, saved_counts), _ = read_snapshot(self.path)
+                except (OSError, ValueError, KeyError, TypeError):
+                    saved_entries, saved_counts = [], []
+
+                entries = self._merge_entries(entries, saved_entries)
+                counts = self._merge_counts(counts, saved_counts)
+                write_snapshot(self.path, entries, counts)
+            except OSError as e:
+                self.failures += 1
+                self.app.logger.warning(f'Failed to write cache snapshot {self.path}: {e}')
+                return 0
+
+            self.saves += 1
+            self.saved_entries = len(entries)
+            return len(entries)
+
+    def _merge_entries(self, entries: List[Tuple[str, CacheEntry]],
+                       saved: List[Tuple[str, CacheEntry]]) -> List[Tuple[str, CacheEntry]]:
+        """This process's entries first, then saved entries it lacks or holds older copies of."""
+        merged = dict(entries)
+        extra = []
+        for key, entry in saved:
+            current = merged.get(key)
+            if current is None:
+                extra.append((key, entry))
+            elif entry.stored_at > current.stored_at:
+                merged[key] = entry
+        return ([(key, merged[key]) for key, _ in entries] + extra)[:self.max_entries]
+
+    def _merge_counts(self, counts: List[Tuple[str, float, Any]],
+                      saved: List[Tuple[str, float, Any]]) -> List[Tuple[str, float, Any]]:
+        """This process's counts, which decay, plus saved counts of keys it does not track."""
+        merged: Dict[str, Tuple[str, float, Any]] = {key: (key, count, target) for key, count, target in saved}
+        merged.update((key, (key, count, target)) for key, count, target in counts)
+        return sorted(merged.values(), key=lambda item: item[1], reverse=True)[:self.max_entries]
+
+    def ensure_running(self) -> None:
+        """Start the periodic snapshot thread in this process if it is not running."""
+        if not self.interval:
+            return
+        if self._thread is not None and self._thread_pid == os.getpid() and self._thread.is_alive():
+            return
+
+        with self._lock:
+            if self._thread is not None and self._thread_pid == os.getpid() and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name='weather-cache-snapshot', daemon=True)
+            self._thread_pid = os.getpid()
+            self._thread.start()
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.save()
+            except Exception:
+                self.app.logger.exception('Cache snapshot failed')
+
+    def stop(self) -> None:
+        """Stop the snapshot thread and save a final snapshot."""
+        self._stop.set()
+        try:
+            self.save()
+        except Exception:
+            self.app.logger.exception('Final cache snapshot failed')
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get snapshot statistics.
+
+        Returns:
+            Dict[str, Any]: Snapshots written and failed, entries in the last
+            snapshot, entries restored at startup, expired entries skipped
+            and the restore time
+        """
+        return {
+            'saves': self.saves,
+            'failures': self.failures,
+            'saved_entries': self.saved_entries,
+            'restored': self.restored,
+            'skipped_expired': self.skipped_expired,
+            'load_seconds': round(self.load_seconds, 6),
+        }
+
+
+def create_cache_snapshotter(app: Flask, config) -> Optional[CacheSnapshotter]:
+    """
+    Create the cache snapshotter selected by the configuration and have it
+    save a final snapshot when the process exits.
+
+    Args:
+        app (Flask): Application whose cache and refresh scheduler are saved
+        config: Configuration class
+
+    Returns:
+        Optional[CacheSnapshotter]: The snapshotter, or None when snapshots
+        or the cache are disabled
+    """
+    if not config.CACHE_SNAPSHOT_ENABLED or not config.CACHE_ENABLED or not config.CACHE_SNAPSHOT_PATH:
+        return None
+
+    snapshotter = CacheSnapshotter(app, config)
+    atexit.register(snapshotter.stop)
+    return snapshotter
@@ -0,0 +1,357 @@
+"""
+Weather Dashboard Backend - Spatial Index
+
+An in-memory grid over every known location (the bundled city list plus
+locations learned from OpenWeather) holding the latest current weather
+observed for each. Map views ask for the weather inside a viewport or
+around a point; both queries are answered from the grid:
+
+- The world is split into square cells of SPATIAL_CELL_DEGREES. A query
+  visits only the cells overlapping its bounding box, or every occupied
+  cell when that is fewer, and filters the candidates exactly.
+- Observations are written incrementally whenever the service layer
+  stores a fresh current weather result, so the index never needs a
+  rebuild.
+
+The index is kept per process and is not persisted; observations are
+filled in again from the response cache and new fetches after a restart.
+"""
+
+import csv
+import math
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.geocoding import normalize_location_query
+
+EARTH_RADIUS_KM = 6371.0088
+
+# (row, column) of a grid cell
+Cell = Tuple[int, int]
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """
+    Great-circle distance between two points.
+
+    Args:
+        lat1 (float): Latitude of the first point
+        lon1 (float): Longitude of the first point
+        lat2 (float): Latitude of the second point
+        lon2 (float): Longitude of the second point
+
+    Returns:
+        float: Distance in kilometres
+    """
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def radius_bbox(lat: float, lon: float, radius_km: float) -> List[Tuple[float, float, float, float]]:
+    """
+    Bounding boxes covering a circle, split at the antimeridian.
+
+    Args:
+        lat (float): Centre latitude
+        lon (float): Centre longitude
+        radius_km (float): Radius in kilometres
+
+    Returns:
+        List of (west, south, east, north) boxes in degrees
+    """
+    dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    south, north = max(-90.0, lat - dlat), min(90.0, lat + dlat)
+    if south <= -90.0 or north >= 90.0:
+        # The circle covers a pole: every longitude is in range
+        return [(-180.0, south, 180.0, north)]
+
+    dlon = math.degrees(math.asin(min(1.0, math.sin(radius_km / EARTH_RADIUS_KM) / math.cos(math.radians(lat)))))
+    return split_bbox(lon - dlon, south, lon + dlon, north)
+
+
+def split_bbox(west: float, south: float, east: float, north: float) -> List[Tuple[float, float, float, float]]:
+    """
+    Split a box crossing the antimeridian into boxes within -180..180.
+
+    Args:
+        west (float): Western longitude; may be greater than east, or
+            outside -180..180, when the box crosses the antimeridian
+        south (float): Southern latitude
+        east (float): Eastern longitude
+        north (float): Northern latitude
+
+    Returns:
+        List of (west, south, east, north) boxes
+    """
+    if east - west >= 360.0:
+        return [(-180.0, south, 180.0, north)]
+
+    west = (west + 180.0) % 360.0 - 180.0
+    east = (east + 180.0) % 360.0 - 180.0
+    if west <= east:
+        return [(west, south, east, north)]
+    return [(west, south, 180.0, north), (-180.0, south, east, north)]
+
+
+class Location:
+    """A known location and its latest observation."""
+
+    __slots__ = ('key', 'name', 'country', 'lat', 'lon', 'population', 'cell', 'observation', 'observed_at')
+
+    def __init__(self, key: str, name: str, country: Optional[str], lat: float, lon: float,
+                 population: int, cell: Cell):
+        self.key = key
+        self.name = name
+        self.country = country
+        self.lat = lat
+        self.lon = lon
+        self.population = population
+        self.cell = cell
+        self.observation: Optional[Dict[str, Any]] = None
+        self.observed_at: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Snapshot of the location and its observation."""
+        return {
+            'name': self.name,
+            'country': self.country,
+            'lat': self.lat,
+            'lon': self.lon,
+            'population': self.population,
+            'observed_at': self.observed_at,
+            'weather': self.observation,
+        }
+
+
+class SpatialIndex:
+    """Uniform lat/lon grid over known locations and their latest weather."""
+
+    def __init__(self, cell_degrees: float = 1.0, max_locations: int = 20000):
+        self.cell_degrees = cell_degrees
+        self.max_locations = max_locations
+        self._lock = threading.Lock()
+        self._locations: Dict[str, Location] = {}
+        self._cells: Dict[Cell, Set[str]] = {}
+        self.observations = 0
+        self.queries = 0
+        self.dropped = 0
+
+    def _cell(self, lat: float, lon: float) -> Cell:
+        return math.floor(lat / self.cell_degrees), math.floor(lon / self.cell_degrees)
+
+    def load_city_list(self, path: str) -> int:
+        """
+        Add the locations of a CSV city list with name, country, lat, lon and
+        population columns.
+
+        Args:
+            path (str): Path to the CSV file
+
+        Returns:
+            int: Number of locations added
+        """
+        with open(path, newline='', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+
+        added = 0
+        for row in rows:
+            if self.add_location(row['name'], row['country'], float(row['lat']), float(row['lon']),
+                                 int(row['population'] or 0)) is not None:
+                added += 1
+        return added
+
+    def add_location(self, name: str, country: Optional[str], lat: float, lon: float,
+                     population: int = 0) -> Optional[str]:
+        """
+        Add a location, or move a known one to new coordinates.
+
+        Args:
+            name (str): Display name
+            country (Optional[str]): ISO country code
+            lat (float): Latitude
+            lon (float): Longitude
+            population (int): Population, used to rank viewport results
+
+        Returns:
+            Optional[str]: The location key, or None when the index is full
+        """
+        key = normalize_location_query(f'{name},{country}' if country else name)
+        cell = self._cell(lat, lon)
+        with self._lock:
+            location = self._locations.get(key)
+            if location is None:
+                if len(self._locations) >= self.max_locations:
+                    self.dropped += 1
+                    return None
+                location = self._locations[key] = Location(key, name, country, lat, lon, population, cell)
+                self._cells.setdefault(cell, set()).add(key)
+                return key
+
+            location.lat, location.lon = lat, lon
+            location.population = max(location.population, population)
+            if location.cell != cell:
+                self._remove_from_cell(location)
+                location.cell = cell
+                self._cells.setdefault(cell, set()).add(key)
+            return key
+
+    def _remove_from_cell(self, location: Location) -> None:
+        """Take a location out of its grid cell. Caller holds the lock."""
+        keys = self._cells.get(location.cell)
+        if keys is not None:
+            keys.discard(location.key)
+            if not keys:
+                del self._cells[location.cell]
+
+    def has_location(self, name: str, country: Optional[str]) -> bool:
+        """Whether a location with this name and country is indexed."""
+        with self._lock:
+            return normalize_location_query(f'{name},{country}' if country else name) in self._locations
+
+    def observe(self, name: str, country: Optional[str], observation: Dict[str, Any],
+                observed_at: Optional[float] = None) -> bool:
+        """
+        Record the latest current weather of an indexed location.
+
+        Older observations than the one held are ignored, so results
+        arriving out of order cannot move a location back in time.
+
+        Args:
+            name (str): Location name
+            country (Optional[str]): ISO country code
+            observation (Dict[str, Any]): Formatted current weather data
+            observed_at (Optional[float]): When the observation was fetched,
+                defaults to now
+
+        Returns:
+            bool: True if the location is indexed and the observation was kept
+        """
+        observed_at = time.time() if observed_at is None else observed_at
+        key = normalize_location_query(f'{name},{country}' if country else name)
+        with self._lock:
+            location = self._locations.get(key)
+            if location is None:
+                return False
+            if location.observed_at is not None and location.observed_at > observed_at:
+                return False
+            location.observation = observation
+            location.observed_at = observed_at
+            self.observations += 1
+            return True
+
+    def _candidates(self, boxes: Iterable[Tuple[float, float, float, float]]) -> List[Location]:
+        """Locations inside any of the boxes. Caller holds the lock."""
+        found: Dict[str, Location] = {}
+        for west, south, east, north in boxes:
+            (row_min, col_min), (row_max, col_max) = self._cell(south, west), self._cell(north, east)
+            probes = (row_max - row_min + 1) * (col_max - col_min + 1)
+
+            if probes <= len(self._cells):
+                cells = (
+                    (row, col) for row in range(row_min, row_max + 1) for col in range(col_min, col_max + 1)
+                )
+            else:
+                # A large box: visiting the occupied cells is cheaper than probing every cell
+                cells = (
+                    cell for cell in self._cells
+                    if row_min <= cell[0] <= row_max and col_min <= cell[1] <= col_max
+                )
+
+            for cell in cells:
+                for key in self._cells.get(cell, ()):
+                    location = self._locations[key]
+                    if south <= location.lat <= north and west <= location.lon <= east:
+                        found[key] = location
+        return list(found.values())
+
+    def within_radius(self, lat: float, lon: float, radius_km: float, limit: int) -> List[Dict[str, Any]]:
+        """
+        Find the locations within a distance of a point.
+
+        Args:
+            lat (float): Centre latitude
+            lon (float): Centre longitude
+            radius_km (float): Radius in kilometres
+            limit (int): Maximum number of locations
+
+        Returns:
+            List[Dict[str, Any]]: Location snapshots with 'distance_km',
+            nearest first
+        """
+        with self._lock:
+            self.queries += 1
+            matches = []
+            for location in self._candidates(radius_bbox(lat, lon, radius_km)):
+                distance = haversine_km(lat, lon, location.lat, location.lon)
+                if distance <= radius_km:
+                    matches.append((distance, location))
+            matches.sort(key=lambda match: (match[0], match[1].key))
+            return [
+                {**location.to_dict(), 'distance_km': round(distance, 2)}
+                for distance, location in matches[:limit]
+            ]
+
+    def within_bbox(self, west: float, south: float, east: float, north: float,
+                    limit: int) -> List[Dict[str, Any]]:
+        """
+        Find the locations inside a bounding box.
+
+        Args:
+            west (float): Western longitude; greater than east for a box
+                crossing the antimeridian
+            south (float): Southern latitude
+            east (float): Eastern longitude
+            north (float): Northern latitude
+            limit (int): Maximum number of locations
+
+        Returns:
+            List[Dict[str, Any]]: Location snapshots, most populous first
+        """
+        with self._lock:
+            self.queries += 1
+            candidates = self._candidates(split_bbox(west, south, east, north))
+            candidates.sort(key=lambda location: (-location.population, location.key))
+            return [location.to_dict() for location in candidates[:limit]]
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get index statistics.
+
+        Returns:
+            Dict[str, Any]: Indexed and observed locations, occupied cells,
+            observations recorded, queries answered and locations dropped
+            because the index was full
+        """
+        with self._lock:
+            return {
+                'locations': len(self._locations),
+                'observed': sum(1 for location in self._locations.values() if location.observed_at is not None),
+                'cells': len(self._cells),
+                'observations': self.observations,
+                'queries': self.queries,
+                'dropped': self.dropped,
+            }
+
+
+def create_spatial_index(config) -> Optional[SpatialIndex]:
+    """
+    Create the spatial index selected by the configuration.
+
+    Args:
+        config: Configuration class
+
+    Returns:
+        Optional[SpatialIndex]: The index, seeded from the bundled city
+        list, or None when it is disabled
+    """
+    if not config.SPATIAL_INDEX_ENABLED:
+        return None
+
+    index = SpatialIndex(config.SPATIAL_CELL_DEGREES, config.SPATIAL_MAX_LOCATIONS)
+    if config.GEOCODE_SEED_PATH:
+        index.load_city_list(config.GEOCODE_SEED_PATH)
+    return index
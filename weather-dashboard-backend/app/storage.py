@@ -0,0 +1,43 @@
+"""
+Weather Dashboard Backend - Local SQLite Storage
+
+Helpers shared by the components that keep state in local SQLite files
+(the shared cache backend and the geocoding store). Each thread gets its
+own connection, and connections are reopened after a fork so gunicorn
+workers never share a handle inherited from the master process.
+"""
+
+import os
+import sqlite3
+import threading
+
+
+class ThreadLocalSQLite:
+    """Per-thread, fork-safe connections to a single SQLite database file."""
+
+    def __init__(self, path: str, timeout: float = 5.0):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+    def connection(self) -> sqlite3.Connection:
+        """
+        Get this thread's connection, opening it on first use.
+
+        Connections run in autocommit mode with WAL journaling, so readers
+        in other processes never block on a writer.
+
+        Returns:
+            sqlite3.Connection: Connection for the calling thread
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
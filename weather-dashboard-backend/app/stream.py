@@ -0,0 +1,489 @@
+"""
+Weather Dashboard Backend - Live City Streams
+
+Server-Sent Events for clients keeping a dashboard open. Instead of every
+client re-polling /api/weather and /api/forecast, a client subscribes to
+/api/stream?city= and one publisher thread per process fetches each
+subscribed city once per STREAM_REFRESH_INTERVAL, through the response
+cache, and pushes the result to all of that city's subscribers:
+
+- ``snapshot``: the full payload, sent on subscribe and after a subscriber
+  fell behind
+- ``update``: only the fields that changed since the previous payload
+  (the full payload when STREAM_SEND_DIFFS is off); nothing is sent when
+  nothing changed
+- ``error``: the service error when a fetch failed; a city whose first
+  fetch fails has its streams closed, so unknown cities do not hold slots
+
+Each event is encoded once and shared by all subscribers. A subscriber
+buffers at most STREAM_SUBSCRIBER_QUEUE events; when a slow client falls
+further behind, its backlog is replaced by a single snapshot. Subscribers
+and cities are capped by STREAM_MAX_SUBSCRIBERS and STREAM_MAX_CITIES.
+
+Under the ASGI entry point an idle stream is a suspended coroutine. Under
+WSGI every open stream occupies a server thread until the client leaves,
+so those streams are also capped by STREAM_MAX_BLOCKING_SUBSCRIBERS. It
+defaults to 0: the deployment runs sync gunicorn workers, where a couple
+of streams would block every worker, so WSGI clients are sent to the ASGI
+entry point instead.
+"""
+
+import math
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Set, Tuple
+
+from flask import Flask
+
+from app.services import WeatherService
+
+# Comment line sent when no event was due, so proxies keep the connection open
+HEARTBEAT = b': keep-alive\n\n'
+
+# Response headers of an event stream; X-Accel-Buffering stops nginx buffering it
+STREAM_HEADERS = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+
+# (lowercased city, forecast days)
+TopicKey = Tuple[str, int]
+
+
+class StreamCapacityError(Exception):
+    """Raised when a subscription would exceed the stream limits."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+    def error_result(self) -> Dict[str, Any]:
+        """Service-style error result, answered with 503 and Retry-After."""
+        return {
+            'error': str(self),
+            'code': 'stream_capacity',
+            'retry_after': max(1, math.ceil(self.retry_after)),
+            'status': 'error'
+        }
+
+
+def changed_fields(old: Any, new: Any) -> Optional[Dict[str, Any]]:
+    """
+    Get the fields of a payload that differ from the previous one.
+
+    Nested objects are compared field by field; lists and other values are
+    replaced as a whole. Removed fields are reported as None.
+
+    Args:
+        old (Any): Previous payload
+        new (Any): Current payload
+
+    Returns:
+        Optional[Dict[str, Any]]: The changed fields, or None if nothing changed
+    """
+    changes: Dict[str, Any] = {}
+    for key, value in new.items():
+        if key not in old:
+            changes[key] = value
+        elif isinstance(value, dict) and isinstance(old[key], dict):
+            nested = changed_fields(old[key], value)
+            if nested is not None:
+                changes[key] = nested
+        elif old[key] != value:
+            changes[key] = value
+    for key in old.keys() - new.keys():
+        changes[key] = None
+    return changes or None
+
+
+def encode_event(event: str, event_id: int, body: bytes) -> bytes:
+    """
+    Encode one Server-Sent Event.
+
+    Args:
+        event (str): Event type
+        event_id (int): Sequence number of the event within its city
+        body (bytes): JSON data; pretty-printed JSON is split over data lines
+
+    Returns:
+        bytes: The event, terminated by a blank line
+    """
+    data = b''.join(b'data: ' + line + b'\n' for line in body.split(b'\n'))
+    return f'event: {event}\nid: {event_id}\n'.encode('ascii') + data + b'\n'
+
+
+class Subscription:
+    """Bounded event buffer of one stream client."""
+
+    def __init__(self, key: TopicKey, city: str, days: int, max_pending: int,
+                 wake: Optional[Callable[[], None]] = None, blocking: bool = True):
+        self.key = key
+        self.city = city
+        self.days = days
+        self.max_pending = max_pending
+        self.blocking = blocking
+        self._wake = wake
+        self._ready = threading.Condition(threading.Lock())
+        self._pending: Deque[bytes] = deque()
+        self.synced = False
+        self.closed = False
+
+    def push(self, snapshot: bytes, update: Optional[bytes]) -> bool:
+        """
+        Queue a published payload for this client.
+
+        Args:
+            snapshot (bytes): The payload as a snapshot event
+            update (Optional[bytes]): The changes as an update event, None to
+                send the snapshot
+
+        Returns:
+            bool: True if the client had fallen behind and its backlog was
+            replaced by the snapshot
+        """
+        resynced = False
+        with self._ready:
+            if self.closed:
+                return False
+            if update is None or not self.synced:
+                self._pending.clear()
+                self._pending.append(snapshot)
+                self.synced = True
+            elif len(self._pending) >= self.max_pending:
+                # Updates only apply on top of every earlier one: start over
+                self._pending.clear()
+                self._pending.append(snapshot)
+                resynced = True
+            else:
+                self._pending.append(update)
+            self._ready.notify()
+        if self._wake is not None:
+            self._wake()
+        return resynced
+
+    def push_event(self, event: bytes) -> None:
+        """Queue an event that does not depend on earlier ones, such as an error."""
+        with self._ready:
+            if self.closed:
+                return
+            if len(self._pending) >= self.max_pending:
+                # Dropping an update breaks the chain: resync with the next payload
+                self._pending.clear()
+                self.synced = False
+            self._pending.append(event)
+            self._ready.notify()
+        if self._wake is not None:
+            self._wake()
+
+    def close(self) -> None:
+        """End the stream after the queued events are sent."""
+        with self._ready:
+            self.closed = True
+            self._ready.notify()
+        if self._wake is not None:
+            self._wake()
+
+    def drain(self) -> List[bytes]:
+        """Take the queued events without waiting."""
+        with self._ready:
+            events = list(self._pending)
+            self._pending.clear()
+            return events
+
+    def get(self, timeout: float) -> List[bytes]:
+        """
+        Wait for queued events.
+
+        Args:
+            timeout (float): Seconds to wait
+
+        Returns:
+            List[bytes]: The queued events; empty on timeout or once closed
+        """
+        with self._ready:
+            if not self._pending and not self.closed:
+                self._ready.wait(timeout)
+            events = list(self._pending)
+            self._pending.clear()
+            return events
+
+
+class _Topic:
+    """Subscribers and last published payload of one city."""
+
+    def __init__(self, city: str, days: int):
+        self.city = city
+        self.days = days
+        self.subscribers: Set[Subscription] = set()
+        self.payload: Optional[Dict[str, Any]] = None
+        self.snapshot: Optional[bytes] = None
+        self.event_id = 0
+        self.next_due = 0.0
+
+
+class StreamHub:
+    """Per-city publishers fanning one fetch out to every subscriber."""
+
+    def __init__(self, app: Flask, config):
+        self.app = app
+        self.refresh_interval = config.STREAM_REFRESH_INTERVAL
+        self.heartbeat_interval = config.STREAM_HEARTBEAT_INTERVAL
+        self.max_subscribers = config.STREAM_MAX_SUBSCRIBERS
+        self.max_blocking_subscribers = config.STREAM_MAX_BLOCKING_SUBSCRIBERS
+        self.max_cities = config.STREAM_MAX_CITIES
+        self.max_pending = config.STREAM_SUBSCRIBER_QUEUE
+        self.send_diffs = config.STREAM_SEND_DIFFS
+        self.sections = config.get_stream_sections()
+
+        self._lock = threading.Lock()
+        self._topics: Dict[TopicKey, _Topic] = {}
+        self._subscribers = 0
+        self._blocking_subscribers = 0
+
+        self._thread: Optional[threading.Thread] = None
+        self._thread_pid: Optional[int] = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+
+        self.published = 0
+        self.fetch_failures = 0
+        self.rejected = 0
+        self.resyncs = 0
+
+    def subscribe(self, city: str, days: int, wake: Optional[Callable[[], None]] = None,
+                  blocking: bool = True) -> Subscription:
+        """
+        Subscribe to a city's updates.
+
+        Args:
+            city (str): City name
+            days (int): Number of forecast days
+            wake (Optional[Callable]): Called from the publisher thread when
+                events are queued, for consumers that do not block in get()
+            blocking (bool): Whether the consumer holds a thread while it waits
+
+        Returns:
+            Subscription: The new subscription, with the city's last snapshot
+            queued when there is one
+
+        Raises:
+            StreamCapacityError: If a subscriber or city limit is reached
+        """
+        key = (city.lower(), days)
+        subscription = Subscription(key, city, days, self.max_pending, wake, blocking)
+        with self._lock:
+            topic = self._topics.get(key)
+            if blocking and not self.max_blocking_subscribers:
+                reason = 'Live streams are only served by the ASGI entry point (uvicorn asgi:application)'
+            elif self._subscribers >= self.max_subscribers:
+                reason = 'Too many open streams'
+            elif blocking and self._blocking_subscribers >= self.max_blocking_subscribers:
+                reason = 'Too many open streams on this server'
+            elif topic is None and len(self._topics) >= self.max_cities:
+                reason = 'Too many cities streamed'
+            else:
+                reason = None
+            if reason is not None:
+                self.rejected += 1
+                raise StreamCapacityError(reason, self.refresh_interval)
+
+            if topic is None:
+                topic = self._topics[key] = _Topic(city, days)
+            topic.subscribers.add(subscription)
+            self._subscribers += 1
+            if blocking:
+                self._blocking_subscribers += 1
+            snapshot = topic.snapshot
+
+        if snapshot is not None:
+            subscription.push(snapshot, None)
+        else:
+            self._wake.set()
+        self._ensure_thread()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Remove a subscription; a city without subscribers is forgotten."""
+        subscription.close()
+        with self._lock:
+            topic = self._topics.get(subscription.key)
+            if topic is None or subscription not in topic.subscribers:
+                return
+            topic.subscribers.discard(subscription)
+            self._subscribers -= 1
+            if subscription.blocking:
+                self._blocking_subscribers -= 1
+            if not topic.subscribers:
+                del self._topics[subscription.key]
+
+    def publish(self, key: TopicKey) -> None:
+        """
+        Fetch one city and push the result to its subscribers.
+
+        Args:
+            key (TopicKey): Topic to refresh
+        """
+        with self._lock:
+            topic = self._topics.get(key)
+            if topic is None:
+                return
+            city, days = topic.city, topic.days
+
+        with self.app.app_context():
+            result = WeatherService.get_dashboard(city, days, sections=self.sections)
+            encoder = self.app.json
+
+            with self._lock:
+                if self._topics.get(key) is not topic:
+                    return
+                topic.next_due = time.monotonic() + self.refresh_interval
+                subscribers = list(topic.subscribers)
+
+                if result['status'] != 'success':
+                    self.fetch_failures += 1
+                    topic.event_id += 1
+                    event = encode_event('error', topic.event_id, encoder.dumps(result).encode('utf-8'))
+                    never_published = topic.snapshot is None
+                    if never_published:
+                        del self._topics[key]
+                        self._subscribers -= len(subscribers)
+                        self._blocking_subscribers -= sum(1 for subscription in subscribers if subscription.blocking)
+                    snapshot = update = None
+                else:
+                    changes = changed_fields(topic.payload, result) if topic.payload is not None else result
+                    if changes is None:
+                        return
+                    topic.event_id += 1
+                    snapshot = encode_event('snapshot', topic.event_id, encoder.dumps(result).encode('utf-8'))
+                    update = None
+                    if self.send_diffs and topic.payload is not None:
+                        update = encode_event('update', topic.event_id, encoder.dumps({
+                            'status': 'success', 'city': city, 'changes': changes,
+                        }).encode('utf-8'))
+                    topic.payload = result
+                    topic.snapshot = snapshot
+                    self.published += 1
+
+        if snapshot is None:
+            for subscription in subscribers:
+                subscription.push_event(event)
+                if never_published:
+                    subscription.close()
+            return
+
+        resyncs = sum(1 for subscription in subscribers if subscription.push(snapshot, update))
+        if resyncs:
+            with self._lock:
+                self.resyncs += resyncs
+
+    def publish_due(self) -> int:
+        """
+        Refresh every city whose refresh interval has passed.
+
+        Returns:
+            int: Number of cities refreshed
+        """
+        now = time.monotonic()
+        with self._lock:
+            due = [key for key, topic in self._topics.items() if topic.next_due <= now]
+        for key in due:
+            try:
+                self.publish(key)
+            except Exception:
+                self.app.logger.exception(f'Stream refresh of {key[0]} failed')
+        return len(due)
+
+    def _ensure_thread(self) -> None:
+        """Start the publisher thread in this process if it is not running."""
+        if self._thread is not None and self._thread_pid == os.getpid() and self._thread.is_alive():
+            return
+
+        with self._lock:
+            if self._thread is not None and self._thread_pid == os.getpid() and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name='weather-stream', daemon=True)
+            self._thread_pid = os.getpid()
+            self._thread.start()
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            self.publish_due()
+            with self._lock:
+                due = [topic.next_due for topic in self._topics.values()]
+            timeout = max(0.0, min(due) - time.monotonic()) if due else None
+            self._wake.wait(timeout)
+            self._wake.clear()
+
+    @property
+    def preamble(self) -> bytes:
+        """First bytes of every stream: the client's reconnect delay, one refresh interval."""
+        return f'retry: {int(self.refresh_interval * 1000)}\n\n'.encode('ascii')
+
+    def events(self, subscription: Subscription) -> Iterator[bytes]:
+        """
+        Yield a subscription's events as they are published, blocking in
+        between; used as a WSGI response body.
+
+        Args:
+            subscription (Subscription): Subscription to consume; removed
+                when the client disconnects or the stream ends
+
+        Yields:
+            bytes: Encoded events, or a heartbeat comment when idle
+        """
+        try:
+            yield self.preamble
+            while True:
+                events = subscription.get(self.heartbeat_interval)
+                if events:
+                    yield b''.join(events)
+                elif subscription.closed:
+                    return
+                else:
+                    yield HEARTBEAT
+        finally:
+            self.unsubscribe(subscription)
+
+    def stop(self) -> None:
+        """Stop the publisher thread and end every open stream."""
+        self._stop.set()
+        self._wake.set()
+        with self._lock:
+            subscribers = [subscription for topic in self._topics.values() for subscription in topic.subscribers]
+        for subscription in subscribers:
+            subscription.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get stream statistics.
+
+        Returns:
+            Dict[str, Any]: Open subscriptions and cities, published payloads,
+            failed fetches, rejected subscriptions and slow clients resynced
+        """
+        with self._lock:
+            return {
+                'subscribers': self._subscribers,
+                'blocking_subscribers': self._blocking_subscribers,
+                'cities': len(self._topics),
+                'published': self.published,
+                'fetch_failures': self.fetch_failures,
+                'rejected': self.rejected,
+                'resyncs': self.resyncs,
+            }
+
+
+def create_stream_hub(app: Flask, config) -> Optional[StreamHub]:
+    """
+    Create the live stream hub selected by the configuration.
+
+    Args:
+        app (Flask): Application the publisher fetches in
+        config: Configuration class
+
+    Returns:
+        Optional[StreamHub]: The hub, or None when streaming is disabled
+    """
+    if not config.STREAM_ENABLED:
+        return None
+    return StreamHub(app, config)
@@ -0,0 +1,164 @@
+"""
+Weather Dashboard Backend - Unit Conversion
+
+OpenWeather is always queried in the deployment's unit system
+(DEFAULT_UNITS), and every cache entry and history sample holds values in
+it. A request for other units is answered by converting the stored values
+on the way out, so the unit choice never multiplies upstream calls or
+cache entries.
+
+Each unit system fixes three quantities:
+
+- metric: temperatures in °C, wind speeds in m/s, visibility in km
+- imperial: temperatures in °F, wind speeds in mph, visibility in miles
+- kelvin: temperatures in K, wind speeds in m/s, visibility in km
+
+OpenWeather reports visibility in metres whatever units are requested, so
+it is stored in km in every unit system and converted to the unit system
+of each response, which is DEFAULT_UNITS when a client asks for none.
+
+Every conversion is linear, so a field converts as value * scale + offset
+and a whole forecast column converts in one list comprehension.
+"""
+
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.series import convert_columns, from_columnar, to_columnar
+
+UNIT_SYSTEMS = ('metric', 'imperial', 'kelvin')
+
+# (scale, offset) turning a metric value into the same quantity in each unit system
+FROM_METRIC: Dict[str, Dict[str, Tuple[float, float]]] = {
+    'metric': {'temperature': (1.0, 0.0), 'speed': (1.0, 0.0), 'distance': (1.0, 0.0)},
+    'imperial': {'temperature': (1.8, 32.0), 'speed': (1 / 0.44704, 0.0), 'distance': (1 / 1.609344, 0.0)},
+    'kelvin': {'temperature': (1.0, 273.15), 'speed': (1.0, 0.0), 'distance': (1.0, 0.0)},
+}
+
+# Quantity of every unit-bearing field in weather, forecast and history payloads
+FIELD_QUANTITIES = {
+    'temperature': 'temperature',
+    'feels_like': 'temperature',
+    'temperature_min': 'temperature',
+    'temperature_max': 'temperature',
+    'temperature_mean': 'temperature',
+    'wind_speed': 'speed',
+    'wind_speed_max': 'speed',
+    'visibility': 'distance',
+}
+
+# Quantities stored in metric units whatever DEFAULT_UNITS is
+STORED_METRIC = frozenset({'distance'})
+
+# Per-field (scale, offset) conversions
+Conversions = Dict[str, Tuple[float, float]]
+
+
+def parse_units(value: Optional[str]) -> Optional[str]:
+    """
+    Validate a requested unit system.
+
+    Args:
+        value (Optional[str]): Requested units, or None when the client
+            did not ask for any
+
+    Returns:
+        Optional[str]: The unit system, or None to serve the stored values
+        as they are
+
+    Raises:
+        ValueError: If the unit system is unknown
+    """
+    if value is None:
+        return None
+    units = value.strip().lower()
+    if units not in UNIT_SYSTEMS:
+        raise ValueError(f"Units must be one of: {', '.join(UNIT_SYSTEMS)}")
+    return units
+
+
+@lru_cache(maxsize=None)
+def field_conversions(from_units: str, to_units: Optional[str]) -> Conversions:
+    """
+    Get the conversion of every unit-bearing field between two unit systems.
+
+    Args:
+        from_units (str): Unit system the values are stored in
+        to_units (Optional[str]): Unit system requested, None for the
+            stored unit system
+
+    Returns:
+        Conversions: (scale, offset) per field whose values change; empty
+        when nothing changes
+    """
+    # Quantities stored in metric still follow the stored system when no units are requested
+    to_units = to_units or from_units
+    conversions = {}
+    for field, quantity in FIELD_QUANTITIES.items():
+        stored_units = 'metric' if quantity in STORED_METRIC else from_units
+        from_scale, from_offset = FROM_METRIC[stored_units][quantity]
+        to_scale, to_offset = FROM_METRIC[to_units][quantity]
+        # Undo the stored system's conversion from metric, then apply the requested one
+        scale = to_scale / from_scale
+        offset = to_offset - from_offset * scale
+        if (scale, offset) != (1.0, 0.0):
+            conversions[field] = (scale, offset)
+    return conversions
+
+
+def convert_record(record: Dict[str, Any], conversions: Conversions) -> Dict[str, Any]:
+    """
+    Convert the unit-bearing fields of one record.
+
+    Args:
+        record (Dict[str, Any]): Weather record, such as current weather data
+        conversions (Conversions): Per-field conversions
+
+    Returns:
+        Dict[str, Any]: A converted copy of the record
+    """
+    converted = dict(record)
+    for field, (scale, offset) in conversions.items():
+        value = converted.get(field)
+        if value is not None:
+            converted[field] = round(value * scale + offset, 2)
+    return converted
+
+
+def convert_records(records: Sequence[Dict[str, Any]], conversions: Conversions) -> List[Dict[str, Any]]:
+    """
+    Convert a list of records sharing the same keys, column by column.
+
+    Args:
+        records (Sequence[Dict[str, Any]]): Records such as history points
+        conversions (Conversions): Per-field conversions
+
+    Returns:
+        List[Dict[str, Any]]: Converted records
+    """
+    if not records or not conversions:
+        return list(records)
+    return from_columnar(convert_columns(to_columnar(records, list(records[0])), conversions))
+
+
+def weather_view(from_units: str, to_units: Optional[str]) -> Tuple[Optional[Callable[[Dict[str, Any]], Dict[str, Any]]], str]:
+    """
+    Build the transform converting a current weather result.
+
+    Args:
+        from_units (str): Unit system the result is stored in
+        to_units (Optional[str]): Unit system requested, None for the
+            stored unit system
+
+    Returns:
+        Tuple of the transform (None when nothing changes) and the view
+        tag, like series.forecast_view
+    """
+    conversions = field_conversions(from_units, to_units)
+    if not conversions:
+        return None, ''
+
+    def transform(result: Dict[str, Any]) -> Dict[str, Any]:
+        return {**result, 'data': convert_record(result['data'], conversions)}
+
+    return transform, to_units or from_units
@@ -0,0 +1,149 @@
+"""
+Weather Dashboard Backend - Upstream HTTP Session
+
+This module builds the pooled, keep-alive HTTP session used for every
+OpenWeather request. Connections are reused across requests so each call
+skips the TCP and TLS handshake, and transient failures (429 and 5xx
+responses, dropped connections) are retried with jittered exponential
+backoff that honours the upstream Retry-After header. Retries draw on the
+upstream quota like first attempts do.
+"""
+
+import random
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import MaxRetryError, ResponseError
+from urllib3.util.retry import Retry
+
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+def backoff_delay(config, attempt: int) -> float:
+    """
+    Compute the jittered exponential backoff before a retry.
+
+    Args:
+        config: Configuration class
+        attempt (int): Number of retries already made
+
+    Returns:
+        float: Seconds to wait
+    """
+    delay = config.HTTP_BACKOFF_FACTOR * (2 ** attempt) + random.uniform(0, config.HTTP_BACKOFF_JITTER)
+    return min(delay, config.HTTP_BACKOFF_MAX)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header given in seconds or as an HTTP date.
+
+    Args:
+        value (Optional[str]): Header value
+
+    Returns:
+        Optional[float]: Seconds to wait, or None if absent or malformed
+    """
+    if not value:
+        return None
+
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class BoundedRetry(Retry):
+    """
+    Retry policy that gives up instead of sleeping on a long Retry-After.
+
+    A Retry-After longer than ``max_retry_after`` seconds would hold the
+    calling worker for longer than the client is willing to wait, so the
+    upstream response is returned as-is and handled as an error.
+
+    With a quota governor attached, a 429 response drains the shared quota
+    and every retry takes a token before it is sent.
+    """
+
+    def __init__(self, *args, max_retry_after: float = 5.0, quota=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_retry_after = max_retry_after
+        self.quota = quota
+
+    def new(self, **kw) -> 'BoundedRetry':
+        retry = super().new(**kw)
+        retry.max_retry_after = self.max_retry_after
+        retry.quota = self.quota
+        return retry
+
+    def sleep(self, response=None) -> None:
+        super().sleep(response)
+        if self.quota is not None:
+            self.quota.acquire()
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        if response is not None and self.respect_retry_after_header:
+            retry_after = self.get_retry_after(response)
+            if retry_after is not None and retry_after > self.max_retry_after:
+                raise MaxRetryError(_pool, url, ResponseError(
+                    f'Retry-After of {retry_after:.0f}s exceeds the {self.max_retry_after:.0f}s limit'
+                ))
+        retry = super().increment(method, url, response, error, _pool, _stacktrace)
+        if response is not None and response.status == 429 and self.quota is not None:
+            # The final 429 is reported by the caller once it gives up
+            self.quota.report_throttled(self.get_retry_after(response))
+        return retry
+
+
+def create_http_session(config, quota=None) -> requests.Session:
+    """
+    Create the process-wide HTTP session for OpenWeather requests.
+
+    Args:
+        config: Configuration class
+        quota (Optional[UpstreamQuota]): Quota governor charged for retries
+
+    Returns:
+        requests.Session: Session with a pooled, retrying transport adapter
+    """
+    retry = BoundedRetry(
+        total=config.HTTP_MAX_RETRIES,
+        connect=config.HTTP_MAX_RETRIES,
+        read=config.HTTP_MAX_RETRIES,
+        status=config.HTTP_MAX_RETRIES,
+        allowed_methods=frozenset({'GET'}),
+        status_forcelist=RETRY_STATUS_CODES,
+        backoff_factor=config.HTTP_BACKOFF_FACTOR,
+        backoff_jitter=config.HTTP_BACKOFF_JITTER,
+        backoff_max=config.HTTP_BACKOFF_MAX,
+        respect_retry_after_header=True,
+        raise_on_status=False,
+        max_retry_after=config.HTTP_MAX_RETRY_AFTER,
+        quota=quota,
+    )
+
+    adapter = HTTPAdapter(
+        pool_connections=config.HTTP_POOL_CONNECTIONS,
+        pool_maxsize=config.HTTP_POOL_MAXSIZE,
+        max_retries=retry,
+    )
+
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+
+    if not config.HTTP_KEEP_ALIVE:
+        session.headers['Connection'] = 'close'
+
+    return session
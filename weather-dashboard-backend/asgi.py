@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+ASGI Entry Point for Weather Dashboard Backend
+
+This module provides the ASGI application entry point for running the API
+on an asyncio server, e.g. ``uvicorn asgi:application``. The weather,
+forecast, alerts, dashboard and batch routes are served by the async
+service layer; all other routes are served by the Flask application.
+"""
+
+import os
+from app import create_app
+from app.asgi import create_asgi_app
+
+# Set environment to production
+os.environ.setdefault('FLASK_ENV', 'production')
+
+# Create the ASGI application instance
+application = create_asgi_app(create_app())
+
+# For compatibility with different ASGI servers
+app = application
+
+if __name__ == "__main__":
+    # For debugging purposes
+    import uvicorn
+    uvicorn.run(application, host=application.config.HOST, port=application.config.PORT)
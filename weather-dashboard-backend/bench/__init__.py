@@ -0,0 +1,15 @@
+"""
+Weather Dashboard Backend - Benchmark Suite
+
+Load tests the API against a local OpenWeather stand-in, so throughput and
+latency can be measured without spending API quota:
+
+- ``bench.mock_openweather``: mock OpenWeather server with configurable
+  latency, error rate and payload size
+- ``bench.loadgen``: fixed-concurrency HTTP load driver
+- ``bench.run``: starts the mock and each server setup, drives the routes
+  and writes the results as JSON
+- ``bench.compare``: compares two result files and flags regressions
+
+Everything uses the standard library only.
+"""
@@ -0,0 +1,134 @@
+"""
+Weather Dashboard Backend - Benchmark Comparison
+
+Compares two result files written by ``bench.run``, matching results by
+server setup, route and concurrency level. A result regresses when its
+throughput drops, or its p95 or p99 latency grows, by more than the
+allowed percentage, or when its error rate rises by more than half a
+percentage point. The exit status is 1 if any result regressed, so the
+comparison can gate a CI job.
+
+Usage:
+    python -m bench.compare baseline.json candidate.json --threshold 10
+"""
+
+import argparse
+import json
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+# (server, route, concurrency)
+ResultKey = Tuple[str, str, int]
+
+# Absolute error rate increase tolerated, for runs with injected upstream errors
+ERROR_RATE_TOLERANCE = 0.005
+
+
+def load_results(path: str) -> Dict[ResultKey, Dict[str, Any]]:
+    """
+    Load the measured results of a benchmark run.
+
+    Args:
+        path (str): Result file written by bench.run
+
+    Returns:
+        Dict[ResultKey, Dict[str, Any]]: Results by server, route and
+        concurrency; skipped servers are left out
+    """
+    with open(path) as f:
+        report = json.load(f)
+    return {
+        (result['server'], result['route'], result['concurrency']): result
+        for result in report['results']
+        if 'skipped' not in result
+    }
+
+
+def _change(before: Optional[float], after: Optional[float]) -> Optional[float]:
+    """Relative change in percent, or None when it cannot be computed."""
+    if before is None or after is None or before == 0:
+        return None
+    return round((after - before) / before * 100, 2)
+
+
+def compare_results(baseline: Dict[ResultKey, Dict[str, Any]], candidate: Dict[ResultKey, Dict[str, Any]],
+                    threshold: float) -> List[Dict[str, Any]]:
+    """
+    Compare the results both runs have in common.
+
+    Args:
+        baseline (Dict): Results of the reference run
+        candidate (Dict): Results of the run under test
+        threshold (float): Allowed worsening in percent
+
+    Returns:
+        List[Dict[str, Any]]: Per result, the relative change of throughput,
+        p50, p95 and p99 latency, the error rate change, and the list of
+        metrics that regressed
+    """
+    comparisons = []
+    for key in sorted(baseline.keys() & candidate.keys()):
+        before, after = baseline[key], candidate[key]
+        changes = {
+            'throughput_rps': _change(before['throughput_rps'], after['throughput_rps']),
+            **{
+                f'{name}_ms': _change(before['latency_ms'][name], after['latency_ms'][name])
+                for name in ('p50', 'p95', 'p99')
+            },
+        }
+
+        regressions = []
+        if changes['throughput_rps'] is not None and changes['throughput_rps'] < -threshold:
+            regressions.append('throughput_rps')
+        regressions.extend(
+            name for name in ('p95_ms', 'p99_ms') if changes[name] is not None and changes[name] > threshold
+        )
+        if after['error_rate'] > before['error_rate'] + ERROR_RATE_TOLERANCE:
+            regressions.append('error_rate')
+
+        server, route, concurrency = key
+        comparisons.append({
+            'server': server,
+            'route': route,
+            'concurrency': concurrency,
+            'change_percent': changes,
+            'error_rate': {'baseline': before['error_rate'], 'candidate': after['error_rate']},
+            'regressions': regressions,
+        })
+    return comparisons
+
+
+def _format_change(value: Optional[float]) -> str:
+    return 'n/a' if value is None else f'{value:+.1f}%'
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Compare two benchmark result files')
+    parser.add_argument('baseline', help='Result file of the reference run')
+    parser.add_argument('candidate', help='Result file of the run under test')
+    parser.add_argument('--threshold', type=float, default=10.0,
+                        help='Allowed worsening of throughput and p95/p99 latency, in percent (default: 10)')
+    parser.add_argument('--json', action='store_true', help='Print the comparison as JSON')
+    args = parser.parse_args(argv)
+
+    comparisons = compare_results(load_results(args.baseline), load_results(args.candidate), args.threshold)
+    regressed = [comparison for comparison in comparisons if comparison['regressions']]
+
+    if args.json:
+        print(json.dumps({'threshold': args.threshold, 'comparisons': comparisons,
+                          'regressed': len(regressed)}, indent=2))
+    else:
+        print(f"{'server':6} {'route':10} {'conc':>5} {'rps':>9} {'p50':>9} {'p95':>9} {'p99':>9}  regressions")
+        for comparison in comparisons:
+            changes = comparison['change_percent']
+            print(f"{comparison['server']:6} {comparison['route']:10} {comparison['concurrency']:>5} "
+                  f"{_format_change(changes['throughput_rps']):>9} {_format_change(changes['p50_ms']):>9} "
+                  f"{_format_change(changes['p95_ms']):>9} {_format_change(changes['p99_ms']):>9}  "
+                  f"{', '.join(comparison['regressions']) or '-'}")
+        print(f'{len(regressed)} of {len(comparisons)} results regressed beyond {args.threshold:g}%')
+
+    return 1 if regressed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,201 @@
+"""
+Weather Dashboard Backend - Load Driver
+
+Sends GET requests to a running server from a fixed number of worker
+threads, each holding one keep-alive connection, for a fixed duration
+(closed-loop: a worker sends its next request when the previous response
+has been read). Every request's latency is recorded, and the run is
+summarized as throughput and latency percentiles.
+
+Usage:
+    python -m bench.loadgen http://127.0.0.1:5000 "/api/weather?city=London" -c 16 -d 10
+"""
+
+import argparse
+import http.client
+import json
+import math
+import socket
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+from urllib.parse import urlparse
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> Optional[float]:
+    """
+    Nearest-rank percentile of sorted values.
+
+    Args:
+        sorted_values (Sequence[float]): Values in ascending order
+        q (float): Percentile between 0 and 100
+
+    Returns:
+        Optional[float]: The percentile, or None for no values
+    """
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(latencies: List[float], statuses: Dict[str, int], elapsed: float) -> Dict[str, Any]:
+    """
+    Summarize one load run.
+
+    Args:
+        latencies (List[float]): Latency of every completed request, in seconds
+        statuses (Dict[str, int]): Responses per status code, plus 'error'
+            for requests that got no response
+        elapsed (float): Measured wall time in seconds
+
+    Returns:
+        Dict[str, Any]: Request and error counts, throughput in requests per
+        second and latency statistics in milliseconds
+    """
+    latencies = sorted(latencies)
+    requests = sum(statuses.values())
+    errors = sum(count for status, count in statuses.items() if status == 'error' or int(status) >= 400)
+
+    def ms(value: Optional[float]) -> Optional[float]:
+        return round(value * 1000, 3) if value is not None else None
+
+    return {
+        'requests': requests,
+        'errors': errors,
+        'error_rate': round(errors / requests, 4) if requests else 0.0,
+        'statuses': dict(sorted(statuses.items())),
+        'duration': round(elapsed, 3),
+        'throughput_rps': round(len(latencies) / elapsed, 2) if elapsed > 0 else 0.0,
+        'latency_ms': {
+            'min': ms(latencies[0] if latencies else None),
+            'mean': ms(math.fsum(latencies) / len(latencies) if latencies else None),
+            'p50': ms(percentile(latencies, 50)),
+            'p90': ms(percentile(latencies, 90)),
+            'p95': ms(percentile(latencies, 95)),
+            'p99': ms(percentile(latencies, 99)),
+            'max': ms(latencies[-1] if latencies else None),
+        },
+    }
+
+
+class _Worker(threading.Thread):
+    """Sends requests over one keep-alive connection until the deadline."""
+
+    def __init__(self, host: str, port: int, paths: Sequence[str], offset: int,
+                 start_at: float, deadline: float, timeout: float, headers: Dict[str, str]):
+        super().__init__(daemon=True)
+        self.host = host
+        self.port = port
+        self.paths = paths
+        self.offset = offset
+        self.start_at = start_at
+        self.deadline = deadline
+        self.timeout = timeout
+        self.headers = headers
+        self.latencies: List[float] = []
+        self.statuses: Dict[str, int] = {}
+
+    def _connect(self) -> http.client.HTTPConnection:
+        connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        try:
+            connection.connect()
+            # Like browsers and HTTP client libraries; otherwise delayed ACKs
+            # add ~40 ms to responses sent in more than one segment
+            connection.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except OSError:
+            # Reported as an error by the first request on the connection
+            connection.close()
+        return connection
+
+    def run(self) -> None:
+        connection = self._connect()
+        index = self.offset
+        while True:
+            now = time.perf_counter()
+            if now < self.start_at:
+                time.sleep(self.start_at - now)
+                continue
+            if now >= self.deadline:
+                break
+
+            path = self.paths[index % len(self.paths)]
+            index += 1
+            started = time.perf_counter()
+            try:
+                connection.request('GET', path, headers=self.headers)
+                response = connection.getresponse()
+                response.read()
+                status = str(response.status)
+                if response.getheader('Connection', '').lower() == 'close':
+                    connection.close()
+                    connection = self._connect()
+            except (OSError, http.client.HTTPException):
+                status = 'error'
+                connection.close()
+                connection = self._connect()
+            finished = time.perf_counter()
+
+            # Requests still running at the deadline are not counted
+            if finished <= self.deadline:
+                self.statuses[status] = self.statuses.get(status, 0) + 1
+                if status != 'error':
+                    self.latencies.append(finished - started)
+        connection.close()
+
+
+def run_load(base_url: str, paths: Sequence[str], concurrency: int, duration: float,
+             timeout: float = 30.0, headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """
+    Drive a server at a fixed concurrency and summarize the results.
+
+    Args:
+        base_url (str): Server URL, such as http://127.0.0.1:5000
+        paths (Sequence[str]): Request paths with query strings; workers
+            cycle through them, starting at different offsets
+        concurrency (int): Number of concurrent connections
+        duration (float): Seconds to measure
+        timeout (float): Per-request socket timeout in seconds
+        headers (Optional[Dict[str, str]]): Extra request headers
+
+    Returns:
+        Dict[str, Any]: See summarize
+    """
+    url = urlparse(base_url)
+    host, port = url.hostname or '127.0.0.1', url.port or 80
+    # Give every worker time to connect before the clock starts
+    start_at = time.perf_counter() + 0.05 + concurrency * 0.001
+    deadline = start_at + duration
+
+    workers = [
+        _Worker(host, port, paths, offset, start_at, deadline, timeout, headers or {})
+        for offset in range(concurrency)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    for worker in workers:
+        latencies.extend(worker.latencies)
+        for status, count in worker.statuses.items():
+            statuses[status] = statuses.get(status, 0) + count
+    return summarize(latencies, statuses, duration)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Fixed-concurrency HTTP load driver')
+    parser.add_argument('base_url', help='Server URL, such as http://127.0.0.1:5000')
+    parser.add_argument('paths', nargs='+', help='Request paths, cycled through by the workers')
+    parser.add_argument('-c', '--concurrency', type=int, default=8)
+    parser.add_argument('-d', '--duration', type=float, default=10.0, help='Seconds to measure')
+    parser.add_argument('--timeout', type=float, default=30.0)
+    args = parser.parse_args()
+
+    print(json.dumps(run_load(args.base_url, args.paths, args.concurrency, args.duration, args.timeout), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,306 @@
+"""
+Weather Dashboard Backend - Mock OpenWeather Server
+
+Answers the four OpenWeather endpoints the backend calls (current weather,
+5 day forecast, geocoding and One Call alerts) with deterministic payloads
+shaped like the real API's. Latency, error rate and payload size are
+configurable, so the backend can be benchmarked against a slow or failing
+upstream without an API key or quota.
+
+GET /__stats returns the number of calls and injected errors per endpoint;
+add ``?reset=1`` to zero the counters after reading them.
+
+Usage:
+    python -m bench.mock_openweather --port 8900 --latency-ms 80 --error-rate 0.01
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+# Fixed reference time, so identical requests get identical payloads
+BASE_TIME = 1700000000
+
+DESCRIPTIONS = (
+    ('clear sky', '01d'), ('few clouds', '02d'), ('scattered clouds', '03d'),
+    ('broken clouds', '04d'), ('light rain', '10d'), ('thunderstorm', '11d'),
+)
+
+
+class MockSettings:
+    """Behaviour of the mock upstream."""
+
+    def __init__(self, latency: float = 0.05, jitter: float = 0.0, error_rate: float = 0.0,
+                 error_status: int = 503, pad_bytes: int = 0, alerts: int = 1, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.pad_bytes = pad_bytes
+        self.alerts = alerts
+        self.random = random.Random(seed)
+        self.random_lock = threading.Lock()
+
+    def delay(self) -> float:
+        """Response delay in seconds for one request."""
+        with self.random_lock:
+            return self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0.0)
+
+    def should_fail(self) -> bool:
+        """Whether to answer one request with an injected error."""
+        if self.error_rate <= 0:
+            return False
+        with self.random_lock:
+            return self.random.random() < self.error_rate
+
+
+class MockStats:
+    """Per-endpoint call and injected error counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+
+    def count(self, endpoint: str, failed: bool) -> None:
+        with self._lock:
+            self.calls[endpoint] = self.calls.get(endpoint, 0) + 1
+            if failed:
+                self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+    def snapshot(self, reset: bool = False) -> Dict[str, Any]:
+        with self._lock:
+            snapshot = {'calls': dict(self.calls), 'errors': dict(self.errors)}
+            if reset:
+                self.calls.clear()
+                self.errors.clear()
+        return snapshot
+
+
+def _location(query: Dict[str, str]) -> Tuple[str, float, float]:
+    """City name and coordinates for a query by name or by coordinates."""
+    if 'q' in query:
+        name = query['q'].split(',')[0].strip().title() or 'Unknown'
+        seed = zlib.crc32(name.lower().encode('utf-8'))
+        return name, round((seed % 17000) / 100 - 85, 4), round((seed // 17000 % 36000) / 100 - 180, 4)
+
+    lat, lon = float(query.get('lat', 0)), float(query.get('lon', 0))
+    return f'Place {lat:.2f},{lon:.2f}', lat, lon
+
+
+def _padding(settings: MockSettings) -> Dict[str, str]:
+    return {'padding': 'x' * settings.pad_bytes} if settings.pad_bytes else {}
+
+
+def _conditions(seed: int, index: int = 0) -> Dict[str, Any]:
+    description, icon = DESCRIPTIONS[(seed + index) % len(DESCRIPTIONS)]
+    return {'id': 800 + (seed + index) % 4, 'main': description.split()[-1].title(),
+            'description': description, 'icon': icon}
+
+
+def current_weather(query: Dict[str, str], settings: MockSettings) -> Dict[str, Any]:
+    """Payload of /data/2.5/weather."""
+    name, lat, lon = _location(query)
+    seed = zlib.crc32(name.encode('utf-8'))
+    return {
+        'coord': {'lat': lat, 'lon': lon},
+        'weather': [_conditions(seed)],
+        'main': {'temp': round(5 + seed % 2500 / 100, 2), 'feels_like': round(4 + seed % 2500 / 100, 2),
+                 'humidity': 40 + seed % 50, 'pressure': 995 + seed % 30},
+        'visibility': 10000,
+        'wind': {'speed': round(seed % 120 / 10, 1), 'deg': seed % 360},
+        'dt': BASE_TIME,
+        'sys': {'country': 'XX', 'sunrise': BASE_TIME - 21600, 'sunset': BASE_TIME + 21600},
+        'timezone': 0,
+        'name': name,
+        'cod': 200,
+        **_padding(settings),
+    }
+
+
+def forecast(query: Dict[str, str], settings: MockSettings) -> Dict[str, Any]:
+    """Payload of /data/2.5/forecast, with ``cnt`` 3-hourly entries."""
+    name, lat, lon = _location(query)
+    seed = zlib.crc32(name.encode('utf-8'))
+    count = max(1, min(int(query.get('cnt', 40)), 40))
+    entries = [
+        {
+            'dt': BASE_TIME + i * 10800,
+            'main': {'temp': round(5 + (seed + i * 37) % 2500 / 100, 2),
+                     'feels_like': round(4 + (seed + i * 37) % 2500 / 100, 2),
+                     'humidity': 40 + (seed + i) % 50, 'pressure': 995 + (seed + i) % 30},
+            'weather': [_conditions(seed, i)],
+            'wind': {'speed': round((seed + i) % 120 / 10, 1), 'deg': (seed + i * 15) % 360},
+            'pop': round((seed + i) % 100 / 100, 2),
+            'dt_txt': time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(BASE_TIME + i * 10800)),
+            **_padding(settings),
+        }
+        for i in range(count)
+    ]
+    return {
+        'cod': '200',
+        'cnt': count,
+        'list': entries,
+        'city': {'name': name, 'country': 'XX', 'coord': {'lat': lat, 'lon': lon}, 'timezone': 0},
+    }
+
+
+def geocoding(query: Dict[str, str], settings: MockSettings) -> Any:
+    """Payload of /geo/1.0/direct."""
+    name, lat, lon = _location(query)
+    return [{'name': name, 'lat': lat, 'lon': lon, 'country': 'XX'}]
+
+
+def onecall(query: Dict[str, str], settings: MockSettings) -> Dict[str, Any]:
+    """Payload of /data/3.0/onecall with only alerts requested."""
+    alerts = [
+        {
+            'sender_name': 'Mock Weather Service',
+            'event': f'Wind advisory {i + 1}',
+            'start': BASE_TIME + i * 3600,
+            'end': BASE_TIME + (i + 6) * 3600,
+            'description': 'Strong winds expected.',
+            'tags': ['Wind'],
+        }
+        for i in range(settings.alerts)
+    ]
+    return {'lat': float(query.get('lat', 0)), 'lon': float(query.get('lon', 0)), 'timezone': 'UTC', 'alerts': alerts}
+
+
+# Request path -> (endpoint name, payload builder)
+ENDPOINTS = {
+    '/data/2.5/weather': ('weather', current_weather),
+    '/data/2.5/forecast': ('forecast', forecast),
+    '/geo/1.0/direct': ('geocoding', geocoding),
+    '/data/3.0/onecall': ('onecall', onecall),
+}
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    """Request handler; the server carries the settings and stats."""
+
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately; without TCP_NODELAY the body
+    # waits for the client's delayed ACK and adds ~40 ms to every call
+    disable_nagle_algorithm = True
+    server: 'MockOpenWeatherServer'
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def _send_json(self, status: int, payload: Any) -> None:
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+
+        if url.path == '/__stats':
+            self._send_json(200, self.server.stats.snapshot(reset=query.get('reset') == '1'))
+            return
+
+        route = ENDPOINTS.get(url.path)
+        if route is None:
+            self._send_json(404, {'cod': '404', 'message': 'Not found'})
+            return
+
+        endpoint, build = route
+        settings = self.server.settings
+        failed = settings.should_fail()
+        self.server.stats.count(endpoint, failed)
+        time.sleep(settings.delay())
+
+        if failed:
+            self._send_json(settings.error_status, {'cod': settings.error_status, 'message': 'Injected error'})
+        else:
+            self._send_json(200, build(query, settings))
+
+
+class MockOpenWeatherServer(ThreadingHTTPServer):
+    """Threaded HTTP server for the mock endpoints."""
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], settings: Optional[MockSettings] = None):
+        super().__init__(address, MockHandler)
+        self.settings = settings or MockSettings()
+        self.stats = MockStats()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+
+def openweather_env(base_url: str) -> Dict[str, str]:
+    """
+    Get the environment variables pointing the backend at a mock server.
+
+    Args:
+        base_url (str): Mock server URL, such as http://127.0.0.1:8900
+
+    Returns:
+        Dict[str, str]: OpenWeather URLs and a placeholder API key
+    """
+    return {
+        'OPENWEATHER_API_KEY': 'b' * 32,
+        'OPENWEATHER_BASE_URL': f'{base_url}/data/2.5',
+        'OPENWEATHER_GEOCODING_URL': f'{base_url}/geo/1.0/direct',
+        'OPENWEATHER_ONECALL_URL': f'{base_url}/data/3.0/onecall',
+    }
+
+
+def add_settings_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the mock behaviour options to an argument parser."""
+    parser.add_argument('--latency-ms', type=float, default=50.0, help='Upstream response time (default: 50)')
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help='Random extra latency, up to this much')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of calls answered with an error')
+    parser.add_argument('--error-status', type=int, default=503, help='Status of injected errors (default: 503)')
+    parser.add_argument('--pad-bytes', type=int, default=0, help='Extra bytes per weather record, to grow payloads')
+    parser.add_argument('--alerts', type=int, default=1, help='Alerts returned per location (default: 1)')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for latency jitter and error injection')
+
+
+def settings_from_args(args: argparse.Namespace) -> MockSettings:
+    """Build mock settings from parsed options."""
+    return MockSettings(
+        latency=args.latency_ms / 1000,
+        jitter=args.jitter_ms / 1000,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        pad_bytes=args.pad_bytes,
+        alerts=args.alerts,
+        seed=args.seed,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Mock OpenWeather server for benchmarks')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8900)
+    add_settings_arguments(parser)
+    args = parser.parse_args()
+
+    server = MockOpenWeatherServer((args.host, args.port), settings_from_args(args))
+    print(f'Mock OpenWeather listening on {server.base_url}', flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,349 @@
+"""
+Weather Dashboard Backend - Benchmark Runner
+
+Starts the mock OpenWeather server, then for each server setup starts the
+backend pointed at it, drives every selected route at every concurrency
+level and records throughput, latency percentiles and the upstream calls
+the run caused. Results are written as one JSON document, which
+``bench.compare`` can diff against an earlier run.
+
+Server setups:
+
+- run: ``python run.py`` (Flask's threaded development server)
+- wsgi: ``gunicorn wsgi:application``, as in the Procfile
+- asgi: ``uvicorn asgi:application``, one event loop process
+
+Each setup gets fresh cache, quota, geocoding and history files, and the
+upstream and client rate limits are switched off so they do not cap the
+measured throughput. Pass ``--env NAME=VALUE`` to change any other setting,
+for example ``--env CACHE_ENABLED=False`` to measure uncached requests.
+
+Usage (from weather-dashboard-backend):
+    python -m bench.run --servers run,wsgi --concurrency 1,8,32 --duration 10 --output bench-results.json
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from urllib.parse import quote
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from bench.loadgen import run_load
+from bench.mock_openweather import (MockOpenWeatherServer, add_settings_arguments, openweather_env,
+                                    settings_from_args)
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cities requested, in order; --cities picks the first N
+CITIES = (
+    'London', 'Paris', 'Tokyo', 'New York', 'Sydney', 'Berlin', 'Madrid', 'Toronto', 'Mumbai', 'Cairo',
+    'Rome', 'Moscow', 'Beijing', 'Seoul', 'Mexico City', 'Lagos', 'Lima', 'Nairobi', 'Oslo', 'Dubai',
+)
+
+# Route name -> path template; {city} is one city, {cities} a comma-separated group
+ROUTES = {
+    'weather': '/api/weather?city={city}',
+    'forecast': '/api/forecast?city={city}&days=5',
+    'alerts': '/api/alerts?city={city}',
+    'dashboard': '/api/dashboard?city={city}&days=5',
+    'batch': '/api/weather/batch?cities={cities}',
+}
+
+BATCH_SIZE = 5
+
+# Server setup -> program it needs
+SERVERS = {'run': 'python', 'wsgi': 'gunicorn', 'asgi': 'uvicorn'}
+
+
+def free_port() -> int:
+    """Get a TCP port that is currently unused on the loopback interface."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def route_paths(route: str, cities: List[str]) -> List[str]:
+    """
+    Expand a route template into the request paths the workers cycle through.
+
+    Args:
+        route (str): Route name from ROUTES
+        cities (List[str]): Cities to request
+
+    Returns:
+        List[str]: One path per city (per group of cities for batch)
+    """
+    template = ROUTES[route]
+    if '{cities}' in template:
+        groups = [cities[i:] + cities[:i] for i in range(len(cities))]
+        return [template.format(cities=','.join(quote(city) for city in group[:BATCH_SIZE])) for group in groups]
+    return [template.format(city=quote(city)) for city in cities]
+
+
+def server_command(server: str, port: int, workers: int, threads: int) -> Optional[List[str]]:
+    """
+    Get the command starting a server setup.
+
+    Args:
+        server (str): 'run', 'wsgi' or 'asgi'
+        port (int): Port to listen on
+        workers (int): gunicorn worker processes
+        threads (int): Threads per gunicorn worker
+
+    Returns:
+        Optional[List[str]]: The command, or None if the server is not installed
+    """
+    if server == 'run':
+        return [sys.executable, 'run.py']
+    if server == 'wsgi':
+        if importlib.util.find_spec('gunicorn') is None:
+            return None
+        return [sys.executable, '-m', 'gunicorn', '--bind', f'127.0.0.1:{port}', '--workers', str(workers),
+                '--threads', str(threads), '--timeout', '120', 'wsgi:application']
+    if importlib.util.find_spec('uvicorn') is None:
+        return None
+    # One event loop process: with --workers, uvicorn binds the socket itself
+    # without TCP_NODELAY, and keep-alive responses then wait ~40 ms for
+    # delayed ACKs, which would dominate the measured latency
+    return [sys.executable, '-m', 'uvicorn', 'asgi:application', '--host', '127.0.0.1', '--port', str(port),
+            '--log-level', 'warning', '--no-access-log']
+
+
+def server_env(mock_url: str, port: int, state_dir: str, overrides: Dict[str, str]) -> Dict[str, str]:
+    """
+    Get the environment for a backend under test.
+
+    Args:
+        mock_url (str): Mock OpenWeather server URL
+        port (int): Port the backend listens on
+        state_dir (str): Directory for the backend's SQLite files
+        overrides (Dict[str, str]): Settings given with --env
+
+    Returns:
+        Dict[str, str]: Environment variables
+    """
+    env = dict(os.environ)
+    env.update(openweather_env(mock_url))
+    env.update({
+        'FLASK_ENV': 'production',
+        'HOST': '127.0.0.1',
+        'PORT': str(port),
+        'RATE_LIMIT_ENABLED': 'False',
+        'CLIENT_RATE_LIMIT_ENABLED': 'False',
+        'CACHE_SQLITE_PATH': os.path.join(state_dir, 'cache.sqlite3'),
+        'RATE_LIMIT_SQLITE_PATH': os.path.join(state_dir, 'quota.sqlite3'),
+        'GEOCODE_STORE_PATH': os.path.join(state_dir, 'geocode.sqlite3'),
+        'HISTORY_SQLITE_PATH': os.path.join(state_dir, 'history.sqlite3'),
+        'PYTHONUNBUFFERED': '1',
+    })
+    env.update(overrides)
+    return env
+
+
+def wait_until_ready(base_url: str, process: subprocess.Popen, timeout: float = 30.0) -> None:
+    """
+    Wait for a started server to answer its liveness check.
+
+    Raises:
+        RuntimeError: If the server exits or does not answer in time
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'server exited with status {process.returncode}')
+        try:
+            with urllib.request.urlopen(f'{base_url}/api/health/live', timeout=1) as response:
+                if response.status == 200:
+                    return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'server did not become ready within {timeout:.0f}s')
+
+
+def stop_server(process: subprocess.Popen) -> None:
+    """Stop a server and its workers."""
+    if process.poll() is None:
+        process.terminate()
+        try:
+            process.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+
+def mock_stats(mock: MockOpenWeatherServer) -> Dict[str, Any]:
+    """Read and reset the mock server's call counters."""
+    return mock.stats.snapshot(reset=True)
+
+
+def benchmark_server(server: str, args: argparse.Namespace, mock: MockOpenWeatherServer,
+                     overrides: Dict[str, str]) -> List[Dict[str, Any]]:
+    """
+    Run every route and concurrency level against one server setup.
+
+    Args:
+        server (str): Server setup name
+        args (argparse.Namespace): Parsed options
+        mock (MockOpenWeatherServer): Running mock upstream
+        overrides (Dict[str, str]): Settings given with --env
+
+    Returns:
+        List[Dict[str, Any]]: One result per route and concurrency level, or
+        a single entry with 'skipped' set if the server could not run
+    """
+    port = free_port()
+    command = server_command(server, port, args.workers, args.threads)
+    if command is None:
+        return [{'server': server, 'skipped': f'{SERVERS[server]} is not installed'}]
+
+    base_url = f'http://127.0.0.1:{port}'
+    cities = list(CITIES[:args.cities])
+    results = []
+
+    with tempfile.TemporaryDirectory(prefix=f'weather-bench-{server}-') as state_dir:
+        log = open(os.path.join(state_dir, 'server.log'), 'w+')
+        process = subprocess.Popen(command, cwd=BACKEND_DIR, env=server_env(mock.base_url, port, state_dir, overrides),
+                                   stdout=log, stderr=subprocess.STDOUT)
+        try:
+            try:
+                wait_until_ready(base_url, process)
+            except RuntimeError as e:
+                log.seek(0)
+                return [{'server': server, 'skipped': str(e), 'log': log.read()[-2000:]}]
+
+            for route in args.routes:
+                paths = route_paths(route, cities)
+                for concurrency in args.concurrency:
+                    if args.warmup > 0:
+                        run_load(base_url, paths, concurrency, args.warmup, args.timeout)
+                    mock_stats(mock)
+
+                    result = run_load(base_url, paths, concurrency, args.duration, args.timeout)
+                    upstream = mock_stats(mock)
+                    results.append({
+                        'server': server,
+                        'route': route,
+                        'concurrency': concurrency,
+                        **result,
+                        'upstream_calls': upstream['calls'],
+                        'upstream_errors': upstream['errors'],
+                    })
+                    print(f"{server:5} {route:10} c={concurrency:<4} {result['throughput_rps']:>9.1f} req/s  "
+                          f"p50={result['latency_ms']['p50']}ms p95={result['latency_ms']['p95']}ms "
+                          f"p99={result['latency_ms']['p99']}ms errors={result['errors']}",
+                          file=sys.stderr, flush=True)
+        finally:
+            stop_server(process)
+            log.close()
+    return results
+
+
+def git_commit() -> Optional[str]:
+    """Commit the benchmarked tree is at, if it is a git checkout."""
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=BACKEND_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _csv(value: str) -> List[str]:
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Benchmark the Weather Dashboard backend against a mock upstream')
+    parser.add_argument('--servers', type=_csv, default=['run', 'wsgi'],
+                        help=f"Comma-separated server setups: {', '.join(SERVERS)} (default: run,wsgi)")
+    parser.add_argument('--routes', type=_csv, default=list(ROUTES),
+                        help=f"Comma-separated routes: {', '.join(ROUTES)} (default: all)")
+    parser.add_argument('--concurrency', type=lambda value: [int(level) for level in _csv(value)],
+                        default=[1, 8, 32], help='Comma-separated concurrency levels (default: 1,8,32)')
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds measured per level (default: 10)')
+    parser.add_argument('--warmup', type=float, default=2.0, help='Unmeasured seconds before each level (default: 2)')
+    parser.add_argument('--timeout', type=float, default=30.0, help='Per-request timeout in seconds')
+    parser.add_argument('--cities', type=int, default=10, help=f'Distinct cities requested, 1-{len(CITIES)} (default: 10)')
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn worker processes (default: 2)')
+    parser.add_argument('--threads', type=int, default=8, help='Threads per gunicorn worker (default: 8)')
+    parser.add_argument('--env', action='append', default=[], metavar='NAME=VALUE',
+                        help='Backend setting for every server, may be repeated')
+    parser.add_argument('--output', help='File to write the JSON results to (default: stdout)')
+    add_settings_arguments(parser)
+    args = parser.parse_args(argv)
+
+    unknown = [name for name in args.servers if name not in SERVERS] + [name for name in args.routes if name not in ROUTES]
+    if unknown:
+        parser.error(f"Unknown server or route: {', '.join(unknown)}")
+    if not 1 <= args.cities <= len(CITIES):
+        parser.error(f'--cities must be between 1 and {len(CITIES)}')
+    if any(level < 1 for level in args.concurrency):
+        parser.error('--concurrency levels must be positive')
+    if any('=' not in item for item in args.env):
+        parser.error('--env takes NAME=VALUE')
+    return args
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    overrides = dict(item.split('=', 1) for item in args.env)
+
+    mock = MockOpenWeatherServer(('127.0.0.1', free_port()), settings_from_args(args))
+    threading.Thread(target=mock.serve_forever, daemon=True).start()
+
+    results: List[Dict[str, Any]] = []
+    try:
+        for server in args.servers:
+            results.extend(benchmark_server(server, args, mock, overrides))
+    finally:
+        mock.shutdown()
+        mock.server_close()
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'settings': {
+                'duration': args.duration,
+                'warmup': args.warmup,
+                'cities': args.cities,
+                'workers': args.workers,
+                'threads': args.threads,
+                'env': overrides,
+            },
+            'mock': {
+                'latency_ms': args.latency_ms,
+                'jitter_ms': args.jitter_ms,
+                'error_rate': args.error_rate,
+                'error_status': args.error_status,
+                'pad_bytes': args.pad_bytes,
+                'alerts': args.alerts,
+                'seed': args.seed,
+            },
+        },
+        'results': results,
+    }
+
+    document = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(document + '\n')
+    else:
+        print(document)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
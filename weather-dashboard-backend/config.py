@@ -9,6 +9,8 @@ with sensible defaults and validation.
 """
 
 import os
+import re
+import tempfile
 from dotenv import load_dotenv
 from typing import Optional, List
 
@@ -36,16 +38,162 @@ class Config:
     
     # API Request Configuration
     API_TIMEOUT = int(os.environ.get('API_TIMEOUT', 10))
+    API_CONNECT_TIMEOUT = float(os.environ.get('API_CONNECT_TIMEOUT', min(API_TIMEOUT, 3)))
+    API_READ_TIMEOUT = float(os.environ.get('API_READ_TIMEOUT', API_TIMEOUT))
     DEFAULT_UNITS = os.environ.get('DEFAULT_UNITS', 'metric')  # metric, imperial, kelvin
     
+    # Background Refresh Configuration
+    REFRESH_SCHEDULER_ENABLED = os.environ.get('REFRESH_SCHEDULER_ENABLED', 'False').lower() in ('true', '1', 'yes')
+    REFRESH_TOP_N = int(os.environ.get('REFRESH_TOP_N', 20))  # Hot keys refreshed ahead of expiry
+    REFRESH_INTERVAL = int(os.environ.get('REFRESH_INTERVAL', 15))  # Seconds between scheduler cycles
+    REFRESH_LEAD_TIME = int(os.environ.get('REFRESH_LEAD_TIME', 30))  # Refresh when this close to expiry
+    REFRESH_MAX_CONCURRENCY = int(os.environ.get('REFRESH_MAX_CONCURRENCY', 4))
+    REFRESH_BUDGET_PER_MINUTE = int(os.environ.get('REFRESH_BUDGET_PER_MINUTE', 30))  # Upstream calls for refreshes
+    REFRESH_TRACK_MAX = int(os.environ.get('REFRESH_TRACK_MAX', 2000))  # Keys tracked for popularity
+    
+    # Geocoding Store Configuration
+    GEOCODE_STORE_ENABLED = os.environ.get('GEOCODE_STORE_ENABLED', 'True').lower() in ('true', '1', 'yes')
+    GEOCODE_STORE_PATH = os.environ.get(
+        'GEOCODE_STORE_PATH',
+        os.path.join(tempfile.gettempdir(), 'weather-dashboard', 'geocode.sqlite3')
+    )
+    GEOCODE_SEED_PATH = os.environ.get(
+        'GEOCODE_SEED_PATH',
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app', 'data', 'cities.csv')
+    )
+    
+    # Upstream HTTP Connection Pool Configuration
+    HTTP_POOL_CONNECTIONS = int(os.environ.get('HTTP_POOL_CONNECTIONS', 4))  # Distinct upstream hosts
+    HTTP_POOL_MAXSIZE = int(os.environ.get('HTTP_POOL_MAXSIZE', 20))  # Kept-alive connections per host
+    HTTP_KEEP_ALIVE = os.environ.get('HTTP_KEEP_ALIVE', 'True').lower() in ('true', '1', 'yes')
+    HTTP_MAX_RETRIES = int(os.environ.get('HTTP_MAX_RETRIES', 2))
+    HTTP_BACKOFF_FACTOR = float(os.environ.get('HTTP_BACKOFF_FACTOR', 0.3))
+    HTTP_BACKOFF_JITTER = float(os.environ.get('HTTP_BACKOFF_JITTER', 0.2))
+    HTTP_BACKOFF_MAX = float(os.environ.get('HTTP_BACKOFF_MAX', 5))
+    HTTP_MAX_RETRY_AFTER = float(os.environ.get('HTTP_MAX_RETRY_AFTER', 5))
+    ASYNC_HTTP_MAX_CONNECTIONS = int(os.environ.get('ASYNC_HTTP_MAX_CONNECTIONS', 1000))  # ASGI upstream connections
+    UPSTREAM_MAX_WORKERS = int(os.environ.get('UPSTREAM_MAX_WORKERS', 16))  # Concurrent upstream calls per process
+    
+    # Batch Request Configuration
+    BATCH_MAX_CITIES = int(os.environ.get('BATCH_MAX_CITIES', 200))
+    BATCH_MAX_CONCURRENCY = int(os.environ.get('BATCH_MAX_CONCURRENCY', 8))
+    
     # CORS Configuration
     CORS_ORIGINS = os.environ.get('CORS_ORIGINS', '*')
     
-    # Rate Limiting (if needed in the future)
+    # Upstream Quota (OpenWeather calls, shared by all workers on the node)
+    RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', 'True').lower() in ('true', '1', 'yes')
     RATE_LIMIT_PER_MINUTE = int(os.environ.get('RATE_LIMIT_PER_MINUTE', 100))
+    RATE_LIMIT_PER_DAY = int(os.environ.get('RATE_LIMIT_PER_DAY', 0))  # 0 disables the daily budget
+    RATE_LIMIT_MAX_WAIT = float(os.environ.get('RATE_LIMIT_MAX_WAIT', 2))  # Seconds to queue for a token
+    RATE_LIMIT_SQLITE_PATH = os.environ.get(
+        'RATE_LIMIT_SQLITE_PATH',
+        os.path.join(tempfile.gettempdir(), 'weather-dashboard', 'quota.sqlite3')
+    )
+    
+    # Inbound Rate Limiting (per client, per process)
+    CLIENT_RATE_LIMIT_ENABLED = os.environ.get('CLIENT_RATE_LIMIT_ENABLED', 'True').lower() in ('true', '1', 'yes')
+    CLIENT_RATE_LIMIT_DEFAULT = os.environ.get('CLIENT_RATE_LIMIT_DEFAULT', '120/minute')  # Empty for no default limit
+    CLIENT_RATE_LIMIT_ROUTES = os.environ.get(
+        'CLIENT_RATE_LIMIT_ROUTES',
+        '/api/weather/batch=20/minute,/api/dashboard=60/minute'
+    )
+    CLIENT_RATE_LIMIT_EXEMPT = os.environ.get('CLIENT_RATE_LIMIT_EXEMPT', '/api/health,/api/health/live,/api/health/ready,/api/metrics')
+    CLIENT_RATE_LIMIT_KEY_HEADER = os.environ.get('CLIENT_RATE_LIMIT_KEY_HEADER', 'X-API-Key')
+    CLIENT_RATE_LIMIT_TRUST_PROXY = os.environ.get('CLIENT_RATE_LIMIT_TRUST_PROXY', 'False').lower() in ('true', '1', 'yes')
+    CLIENT_RATE_LIMIT_API_KEYS = os.environ.get('CLIENT_RATE_LIMIT_API_KEYS', '')  # Tokens limited on their own; others by IP
+    CLIENT_RATE_LIMIT_MAX_BUCKETS = int(os.environ.get('CLIENT_RATE_LIMIT_MAX_BUCKETS', 10000))  # Buckets kept per process
     
-    # Cache Configuration (for future enhancement)
+    # Cache Configuration
+    CACHE_ENABLED = os.environ.get('CACHE_ENABLED', 'True').lower() in ('true', '1', 'yes')
     CACHE_TTL = int(os.environ.get('CACHE_TTL', 300))  # 5 minutes default
+    CACHE_TTL_WEATHER = int(os.environ.get('CACHE_TTL_WEATHER', CACHE_TTL))
+    CACHE_TTL_FORECAST = int(os.environ.get('CACHE_TTL_FORECAST', 1800))  # Forecasts update every 3 hours
+    CACHE_TTL_ALERTS = int(os.environ.get('CACHE_TTL_ALERTS', 600))
+    CACHE_MAX_ENTRIES = int(os.environ.get('CACHE_MAX_ENTRIES', 1000))
+    CACHE_STALE_TTL = int(os.environ.get('CACHE_STALE_TTL', 3600))  # Keep expired entries this long
+    CACHE_STALE_WHILE_REVALIDATE = os.environ.get('CACHE_STALE_WHILE_REVALIDATE', 'True').lower() in ('true', '1', 'yes')
+    CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'memory')  # memory, sqlite
+    CACHE_SQLITE_PATH = os.environ.get(
+        'CACHE_SQLITE_PATH',
+        os.path.join(tempfile.gettempdir(), 'weather-dashboard', 'cache.sqlite3')
+    )
+    CACHE_SNAPSHOT_ENABLED = os.environ.get('CACHE_SNAPSHOT_ENABLED', 'True').lower() in ('true', '1', 'yes')
+    CACHE_SNAPSHOT_PATH = os.environ.get(
+        'CACHE_SNAPSHOT_PATH',
+        os.path.join(tempfile.gettempdir(), 'weather-dashboard', 'cache-snapshot.bin')
+    )
+    CACHE_SNAPSHOT_INTERVAL = int(os.environ.get('CACHE_SNAPSHOT_INTERVAL', 60))  # Seconds; 0 saves only at exit
+    CACHE_SNAPSHOT_MAX_ENTRIES = int(os.environ.get('CACHE_SNAPSHOT_MAX_ENTRIES', 500))
+    
+    # Observation History Configuration
+    HISTORY_ENABLED = os.environ.get('HISTORY_ENABLED', 'True').lower() in ('true', '1', 'yes')
+    HISTORY_SQLITE_PATH = os.environ.get(
+        'HISTORY_SQLITE_PATH',
+        os.path.join(tempfile.gettempdir(), 'weather-dashboard', 'history.sqlite3')
+    )
+    HISTORY_RETENTION_DAYS = int(os.environ.get('HISTORY_RETENTION_DAYS', 30))
+    HISTORY_COMPACT_AFTER_DAYS = int(os.environ.get('HISTORY_COMPACT_AFTER_DAYS', 2))  # Older days keep one sample per bucket
+    HISTORY_COMPACT_RESOLUTION = int(os.environ.get('HISTORY_COMPACT_RESOLUTION', 3600))  # Seconds
+    HISTORY_MAINTENANCE_INTERVAL = int(os.environ.get('HISTORY_MAINTENANCE_INTERVAL', 3600))  # Seconds
+    HISTORY_MAX_POINTS = int(os.environ.get('HISTORY_MAX_POINTS', 2000))  # Per query
+    
+    # Circuit Breaker Configuration
+    CIRCUIT_BREAKER_ENABLED = os.environ.get('CIRCUIT_BREAKER_ENABLED', 'True').lower() in ('true', '1', 'yes')
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD = int(os.environ.get('CIRCUIT_BREAKER_FAILURE_THRESHOLD', 5))  # Consecutive failures
+    CIRCUIT_BREAKER_RESET_TIMEOUT = float(os.environ.get('CIRCUIT_BREAKER_RESET_TIMEOUT', 30))  # Seconds before a probe
+    
+    # Health Check Configuration
+    HEALTH_CACHE_TTL = float(os.environ.get('HEALTH_CACHE_TTL', 2.0))  # Seconds a readiness report is reused
+    HEALTH_UPSTREAM_FAILURE_THRESHOLD = int(os.environ.get('HEALTH_UPSTREAM_FAILURE_THRESHOLD', 3))  # Consecutive failed calls
+    HEALTH_MAX_EXECUTOR_BACKLOG = int(os.environ.get('HEALTH_MAX_EXECUTOR_BACKLOG', 64))  # Queued upstream tasks
+    
+    # Spatial Index Configuration
+    SPATIAL_INDEX_ENABLED = os.environ.get('SPATIAL_INDEX_ENABLED', 'True').lower() in ('true', '1', 'yes')
+    SPATIAL_CELL_DEGREES = float(os.environ.get('SPATIAL_CELL_DEGREES', 1.0))  # Grid cell size
+    SPATIAL_MAX_LOCATIONS = int(os.environ.get('SPATIAL_MAX_LOCATIONS', 20000))
+    SPATIAL_MAX_RESULTS = int(os.environ.get('SPATIAL_MAX_RESULTS', 200))  # Per query
+    SPATIAL_MAX_RADIUS_KM = float(os.environ.get('SPATIAL_MAX_RADIUS_KM', 1000))
+    SPATIAL_MAX_FETCH = int(os.environ.get('SPATIAL_MAX_FETCH', 10))  # Stale locations refreshed per query
+    
+    # City Search Configuration
+    CITY_SEARCH_ENABLED = os.environ.get('CITY_SEARCH_ENABLED', 'True').lower() in ('true', '1', 'yes')
+    CITY_SEARCH_PATH = os.environ.get(
+        'CITY_SEARCH_PATH',
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app', 'data', 'cities.csv')
+    )
+    CITY_SEARCH_MAX_RESULTS = int(os.environ.get('CITY_SEARCH_MAX_RESULTS', 20))  # Per query
+    CITY_SEARCH_MIN_SIMILARITY = float(os.environ.get('CITY_SEARCH_MIN_SIMILARITY', 0.25))  # Trigram Jaccard
+    CITY_SEARCH_VALIDATE = os.environ.get('CITY_SEARCH_VALIDATE', 'False').lower() in ('true', '1', 'yes')
+    
+    # Live Stream (Server-Sent Events) Configuration
+    STREAM_ENABLED = os.environ.get('STREAM_ENABLED', 'True').lower() in ('true', '1', 'yes')
+    STREAM_SECTIONS = os.environ.get('STREAM_SECTIONS', 'weather,forecast')  # Dashboard sections pushed to clients
+    STREAM_REFRESH_INTERVAL = float(os.environ.get('STREAM_REFRESH_INTERVAL', 60))  # Seconds between fetches per city
+    STREAM_HEARTBEAT_INTERVAL = float(os.environ.get('STREAM_HEARTBEAT_INTERVAL', 15))  # Seconds between keep-alives
+    STREAM_SEND_DIFFS = os.environ.get('STREAM_SEND_DIFFS', 'True').lower() in ('true', '1', 'yes')  # Only changed fields
+    STREAM_MAX_SUBSCRIBERS = int(os.environ.get('STREAM_MAX_SUBSCRIBERS', 1000))  # Per process
+    STREAM_MAX_BLOCKING_SUBSCRIBERS = int(os.environ.get('STREAM_MAX_BLOCKING_SUBSCRIBERS', 0))  # WSGI streams hold a thread each; 0 for ASGI only
+    STREAM_MAX_CITIES = int(os.environ.get('STREAM_MAX_CITIES', 100))  # Per process
+    STREAM_SUBSCRIBER_QUEUE = int(os.environ.get('STREAM_SUBSCRIBER_QUEUE', 8))  # Buffered events per client
+    
+    # Metrics Configuration
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'True').lower() in ('true', '1', 'yes')
+    METRICS_BUCKETS = os.environ.get(
+        'METRICS_BUCKETS',
+        '0.001,0.0025,0.005,0.01,0.025,0.05,0.1,0.25,0.5,1,2.5,5,10'
+    )  # Latency histogram upper bounds in seconds
+    
+    # JSON Serialization Configuration
+    JSON_FAST_ENCODER = os.environ.get('JSON_FAST_ENCODER', 'True').lower() in ('true', '1', 'yes')  # Uses orjson when installed
+    JSON_COMPACT = os.environ.get('JSON_COMPACT', 'True').lower() in ('true', '1', 'yes')  # False pretty-prints responses
+    
+    # Response Compression Configuration
+    COMPRESSION_ENABLED = os.environ.get('COMPRESSION_ENABLED', 'True').lower() in ('true', '1', 'yes')
+    COMPRESSION_ENCODINGS = os.environ.get('COMPRESSION_ENCODINGS', 'br,gzip')  # Preference order; br needs brotli
+    COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', 500))  # Bytes
+    COMPRESSION_GZIP_LEVEL = int(os.environ.get('COMPRESSION_GZIP_LEVEL', 6))
+    COMPRESSION_BROTLI_QUALITY = int(os.environ.get('COMPRESSION_BROTLI_QUALITY', 5))
     
     @classmethod
     def validate_config(cls) -> list[str]:
@@ -72,6 +220,125 @@ class Config:
         # Validate timeout
         if cls.API_TIMEOUT <= 0:
             errors.append("API_TIMEOUT must be a positive integer")
+        if cls.API_CONNECT_TIMEOUT <= 0 or cls.API_READ_TIMEOUT <= 0:
+            errors.append("API_CONNECT_TIMEOUT and API_READ_TIMEOUT must be positive")
+        
+        # Validate background refresh settings
+        if cls.REFRESH_MAX_CONCURRENCY <= 0 or cls.REFRESH_INTERVAL <= 0 or cls.REFRESH_TRACK_MAX <= 0:
+            errors.append("REFRESH_MAX_CONCURRENCY, REFRESH_INTERVAL and REFRESH_TRACK_MAX must be positive integers")
+        if cls.REFRESH_BUDGET_PER_MINUTE < 0 or cls.REFRESH_TOP_N < 0 or cls.REFRESH_LEAD_TIME < 0:
+            errors.append("REFRESH_BUDGET_PER_MINUTE, REFRESH_TOP_N and REFRESH_LEAD_TIME must not be negative")
+        
+        # Validate connection pool settings
+        if cls.HTTP_POOL_CONNECTIONS <= 0 or cls.HTTP_POOL_MAXSIZE <= 0:
+            errors.append("HTTP_POOL_CONNECTIONS and HTTP_POOL_MAXSIZE must be positive integers")
+        if cls.HTTP_MAX_RETRIES < 0:
+            errors.append("HTTP_MAX_RETRIES must not be negative")
+        if cls.ASYNC_HTTP_MAX_CONNECTIONS <= 0:
+            errors.append("ASYNC_HTTP_MAX_CONNECTIONS must be a positive integer")
+        if cls.UPSTREAM_MAX_WORKERS <= 0:
+            errors.append("UPSTREAM_MAX_WORKERS must be a positive integer")
+        if cls.BATCH_MAX_CITIES <= 0 or cls.BATCH_MAX_CONCURRENCY <= 0:
+            errors.append("BATCH_MAX_CITIES and BATCH_MAX_CONCURRENCY must be positive integers")
+        
+        # Validate upstream quota settings
+        if cls.RATE_LIMIT_PER_MINUTE < 0 or cls.RATE_LIMIT_PER_DAY < 0:
+            errors.append("RATE_LIMIT_PER_MINUTE and RATE_LIMIT_PER_DAY must not be negative")
+        if cls.RATE_LIMIT_MAX_WAIT < 0:
+            errors.append("RATE_LIMIT_MAX_WAIT must not be negative")
+        
+        # Validate inbound rate limits
+        for path, spec in cls.get_client_rate_limits().items():
+            if not re.fullmatch(r'\s*[1-9]\d*\s*/\s*(second|minute|hour)\s*', spec):
+                errors.append(f"Rate limit {spec!r} for {path} must look like '120/minute'")
+        if cls.CLIENT_RATE_LIMIT_MAX_BUCKETS <= 0:
+            errors.append("CLIENT_RATE_LIMIT_MAX_BUCKETS must be a positive integer")
+        
+        # Validate cache settings
+        for name, ttl in cls.get_cache_ttls().items():
+            if ttl < 0:
+                errors.append(f"CACHE_TTL_{name.upper()} must not be negative")
+        if cls.CACHE_MAX_ENTRIES <= 0:
+            errors.append("CACHE_MAX_ENTRIES must be a positive integer")
+        if cls.CACHE_STALE_TTL < 0:
+            errors.append("CACHE_STALE_TTL must not be negative")
+        if cls.CACHE_BACKEND not in ('memory', 'sqlite'):
+            errors.append("CACHE_BACKEND must be 'memory' or 'sqlite'")
+        if cls.CACHE_SNAPSHOT_ENABLED:
+            if cls.CACHE_SNAPSHOT_INTERVAL < 0:
+                errors.append("CACHE_SNAPSHOT_INTERVAL must not be negative")
+            if cls.CACHE_SNAPSHOT_MAX_ENTRIES <= 0:
+                errors.append("CACHE_SNAPSHOT_MAX_ENTRIES must be a positive integer")
+        
+        # Validate observation history
+        if cls.HISTORY_ENABLED:
+            if cls.HISTORY_RETENTION_DAYS <= 0:
+                errors.append("HISTORY_RETENTION_DAYS must be a positive integer")
+            if cls.HISTORY_COMPACT_AFTER_DAYS < 0:
+                errors.append("HISTORY_COMPACT_AFTER_DAYS must not be negative")
+            if cls.HISTORY_COMPACT_RESOLUTION <= 0 or 86400 % cls.HISTORY_COMPACT_RESOLUTION:
+                errors.append("HISTORY_COMPACT_RESOLUTION must be a positive number of seconds dividing a day")
+            if cls.HISTORY_MAX_POINTS <= 0:
+                errors.append("HISTORY_MAX_POINTS must be a positive integer")
+        
+        # Validate circuit breakers
+        if cls.CIRCUIT_BREAKER_ENABLED:
+            if cls.CIRCUIT_BREAKER_FAILURE_THRESHOLD <= 0:
+                errors.append("CIRCUIT_BREAKER_FAILURE_THRESHOLD must be a positive integer")
+            if cls.CIRCUIT_BREAKER_RESET_TIMEOUT <= 0:
+                errors.append("CIRCUIT_BREAKER_RESET_TIMEOUT must be positive")
+        
+        # Validate health checks
+        if cls.HEALTH_CACHE_TTL < 0:
+            errors.append("HEALTH_CACHE_TTL must be non-negative")
+        if cls.HEALTH_UPSTREAM_FAILURE_THRESHOLD <= 0 or cls.HEALTH_MAX_EXECUTOR_BACKLOG <= 0:
+            errors.append("HEALTH_UPSTREAM_FAILURE_THRESHOLD and HEALTH_MAX_EXECUTOR_BACKLOG must be positive integers")
+        
+        # Validate spatial index
+        if cls.SPATIAL_INDEX_ENABLED:
+            if not 0 < cls.SPATIAL_CELL_DEGREES <= 90:
+                errors.append("SPATIAL_CELL_DEGREES must be between 0 and 90")
+            if cls.SPATIAL_MAX_LOCATIONS <= 0 or cls.SPATIAL_MAX_RESULTS <= 0 or cls.SPATIAL_MAX_RADIUS_KM <= 0:
+                errors.append("SPATIAL_MAX_LOCATIONS, SPATIAL_MAX_RESULTS and SPATIAL_MAX_RADIUS_KM must be positive")
+            if cls.SPATIAL_MAX_FETCH < 0:
+                errors.append("SPATIAL_MAX_FETCH must not be negative")
+        
+        # Validate city search
+        if cls.CITY_SEARCH_ENABLED:
+            if cls.CITY_SEARCH_MAX_RESULTS <= 0:
+                errors.append("CITY_SEARCH_MAX_RESULTS must be a positive integer")
+            if not 0 < cls.CITY_SEARCH_MIN_SIMILARITY <= 1:
+                errors.append("CITY_SEARCH_MIN_SIMILARITY must be between 0 and 1")
+        
+        # Validate live streams
+        if cls.STREAM_ENABLED:
+            if cls.STREAM_REFRESH_INTERVAL <= 0 or cls.STREAM_HEARTBEAT_INTERVAL <= 0:
+                errors.append("STREAM_REFRESH_INTERVAL and STREAM_HEARTBEAT_INTERVAL must be positive")
+            if (cls.STREAM_MAX_SUBSCRIBERS <= 0 or cls.STREAM_MAX_BLOCKING_SUBSCRIBERS < 0
+                    or cls.STREAM_MAX_CITIES <= 0 or cls.STREAM_SUBSCRIBER_QUEUE <= 0):
+                errors.append("STREAM_MAX_SUBSCRIBERS, STREAM_MAX_CITIES and STREAM_SUBSCRIBER_QUEUE must be positive "
+                              "integers and STREAM_MAX_BLOCKING_SUBSCRIBERS must not be negative")
+            if not cls.get_stream_sections():
+                errors.append("STREAM_SECTIONS must list at least one of: weather, forecast, alerts")
+        
+        # Validate metrics
+        if cls.METRICS_ENABLED:
+            try:
+                cls.get_metrics_buckets()
+            except ValueError:
+                errors.append("METRICS_BUCKETS must be a comma-separated list of positive numbers")
+        
+        # Validate response compression
+        if cls.COMPRESSION_ENABLED:
+            for encoding in cls.get_compression_encodings():
+                if encoding not in ('br', 'gzip'):
+                    errors.append(f"Unknown compression encoding '{encoding}' in COMPRESSION_ENCODINGS, expected 'br' or 'gzip'")
+            if cls.COMPRESSION_MIN_SIZE < 0:
+                errors.append("COMPRESSION_MIN_SIZE must not be negative")
+            if not 1 <= cls.COMPRESSION_GZIP_LEVEL <= 9:
+                errors.append("COMPRESSION_GZIP_LEVEL must be between 1 and 9")
+            if not 0 <= cls.COMPRESSION_BROTLI_QUALITY <= 11:
+                errors.append("COMPRESSION_BROTLI_QUALITY must be between 0 and 11")
         
         # Validate port
         if cls.PORT <= 0 or cls.PORT > 65535:
@@ -95,6 +362,106 @@ class Config:
             'forecast': f"{cls.OPENWEATHER_BASE_URL}/forecast",
         }
     
+    @classmethod
+    def get_request_timeout(cls) -> tuple[float, float]:
+        """
+        Get the timeout used for upstream API requests.
+        
+        Returns:
+            tuple[float, float]: (connect timeout, read timeout) in seconds
+        """
+        return (cls.API_CONNECT_TIMEOUT, cls.API_READ_TIMEOUT)
+    
+    @classmethod
+    def get_cache_ttls(cls) -> dict[str, int]:
+        """
+        Get the cache TTL for each service endpoint.
+        
+        Returns:
+            dict[str, int]: Time to live in seconds keyed by endpoint name
+        """
+        return {
+            'weather': cls.CACHE_TTL_WEATHER,
+            'forecast': cls.CACHE_TTL_FORECAST,
+            'alerts': cls.CACHE_TTL_ALERTS,
+        }
+    
+    @classmethod
+    def get_client_rate_limits(cls) -> dict[str, str]:
+        """
+        Get the inbound rate limit for each route.
+        
+        Returns:
+            dict[str, str]: Limits such as '20/minute' keyed by path, with
+            the default limit under '*'
+        """
+        limits = {}
+        if cls.CLIENT_RATE_LIMIT_DEFAULT.strip():
+            limits['*'] = cls.CLIENT_RATE_LIMIT_DEFAULT
+        for item in cls.CLIENT_RATE_LIMIT_ROUTES.split(','):
+            path, _, spec = item.partition('=')
+            if path.strip():
+                limits[path.strip()] = spec
+        return limits
+    
+    @classmethod
+    def get_metrics_buckets(cls) -> list[float]:
+        """
+        Get the latency histogram bucket bounds.
+        
+        Returns:
+            list[float]: Upper bounds in seconds, ascending
+            
+        Raises:
+            ValueError: If a bound is not a positive number
+        """
+        buckets = sorted(float(bound) for bound in cls.METRICS_BUCKETS.split(',') if bound.strip())
+        if not buckets or buckets[0] <= 0:
+            raise ValueError('Metrics buckets must be positive')
+        return buckets
+    
+    @classmethod
+    def get_stream_sections(cls) -> list[str]:
+        """
+        Get the dashboard sections pushed to live stream clients.
+        
+        Returns:
+            list[str]: Known section names, unknown names dropped
+        """
+        sections = [section.strip().lower() for section in cls.STREAM_SECTIONS.split(',')]
+        return [section for section in ('weather', 'forecast', 'alerts') if section in sections]
+    
+    @classmethod
+    def get_compression_encodings(cls) -> list[str]:
+        """
+        Get the enabled response content codings.
+        
+        Returns:
+            list[str]: Codings in server preference order
+        """
+        return [encoding.strip().lower() for encoding in cls.COMPRESSION_ENCODINGS.split(',') if encoding.strip()]
+    
+    @classmethod
+    def get_client_rate_limit_exempt_paths(cls) -> list[str]:
+        """
+        Get the paths that are never rate limited.
+        
+        Returns:
+            list[str]: Exempt request paths
+        """
+        return [path.strip() for path in cls.CLIENT_RATE_LIMIT_EXEMPT.split(',') if path.strip()]
+    
+    @classmethod
+    def get_client_rate_limit_api_keys(cls) -> list[str]:
+        """
+        Get the API tokens that are rate limited on their own.
+        
+        Returns:
+            list[str]: Allowed tokens; clients sending any other token are
+            limited by IP address
+        """
+        return [key.strip() for key in cls.CLIENT_RATE_LIMIT_API_KEYS.split(',') if key.strip()]
+    
     @classmethod
     def get_api_params_template(cls) -> dict[str, str]:
         """
@@ -126,6 +493,9 @@ class ProductionConfig(Config):
     
     # More restrictive CORS in production
     CORS_ORIGINS = os.environ.get('CORS_ORIGINS', 'http://localhost:3000,https://yourdomain.com')
+    
+    # Share cached responses between gunicorn workers on the same node
+    CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'sqlite')
 
 
 class TestingConfig(Config):
@@ -32,8 +32,10 @@ if __name__ == '__main__':
     print("=" * 60)
     print("Available Endpoints:")
     print("  🌡️  GET /api/weather?city=<city_name>")
+    print("  🗺️  GET|POST /api/weather/batch?cities=<city1>,<city2>")
     print("  📊 GET /api/forecast?city=<city_name>&days=<1-5>")
     print("  🚨 GET /api/alerts?city=<city_name>")
+    print("  🧭 GET /api/dashboard?city=<city_name>&days=<1-5>")
     print("  ❤️  GET /api/health")
     print("=" * 60)
     
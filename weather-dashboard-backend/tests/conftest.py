@@ -0,0 +1,98 @@
+"""
+Shared fixtures for the Weather Dashboard Backend tests.
+
+Every application built here talks to the bench package's mock OpenWeather
+server on a local port and keeps its SQLite files in the test's temporary
+directory, so the suite needs neither network access nor an API key.
+"""
+
+import threading
+
+import pytest
+
+import config
+from app import create_app
+from bench.mock_openweather import MockOpenWeatherServer, MockSettings, openweather_env
+
+
+@pytest.fixture(scope='session')
+def mock_server():
+    """Mock OpenWeather server shared by the whole session."""
+    server = MockOpenWeatherServer(('127.0.0.1', 0))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def upstream(mock_server):
+    """The mock server, answering instantly and with zeroed call counters."""
+    mock_server.settings = MockSettings(latency=0.0)
+    mock_server.stats.snapshot(reset=True)
+    return mock_server
+
+
+@pytest.fixture
+def upstream_calls(upstream):
+    """Get the number of calls the mock server received for an endpoint."""
+
+    def count(endpoint: str) -> int:
+        return upstream.stats.snapshot()['calls'].get(endpoint, 0)
+
+    return count
+
+
+@pytest.fixture
+def make_config(upstream, tmp_path):
+    """Build a configuration class pointed at the mock server, with overrides."""
+
+    def make(**overrides):
+        settings = {
+            **openweather_env(upstream.base_url),
+            'GEOCODE_STORE_PATH': str(tmp_path / 'geocode.sqlite3'),
+            'RATE_LIMIT_SQLITE_PATH': str(tmp_path / 'quota.sqlite3'),
+            'CACHE_SQLITE_PATH': str(tmp_path / 'cache.sqlite3'),
+            'CACHE_SNAPSHOT_PATH': str(tmp_path / 'cache-snapshot.bin'),
+            'HISTORY_SQLITE_PATH': str(tmp_path / 'history.sqlite3'),
+            # Background threads and shared budgets are switched on by the tests covering them
+            'CACHE_SNAPSHOT_ENABLED': False,
+            'REFRESH_SCHEDULER_ENABLED': False,
+            'RATE_LIMIT_ENABLED': False,
+            'CLIENT_RATE_LIMIT_ENABLED': False,
+            'HTTP_MAX_RETRIES': 0,
+        }
+        settings.update(overrides)
+        return type('PytestConfig', (config.TestingConfig,), settings)
+
+    return make
+
+
+@pytest.fixture
+def make_app(make_config, monkeypatch):
+    """Create applications from make_config overrides, shutting them down afterwards."""
+    apps = []
+
+    def make(**overrides):
+        monkeypatch.setitem(config.config_map, 'pytest', make_config(**overrides))
+        app = create_app('pytest')
+        apps.append(app)
+        return app
+
+    yield make
+
+    for app in apps:
+        app.extensions['weather_executor'].shutdown(wait=False)
+
+
+@pytest.fixture
+def app(make_app):
+    """Application with the default test configuration."""
+    return make_app()
+
+
+@pytest.fixture
+def client(app):
+    """Test client of the default application."""
+    return app.test_client()
@@ -0,0 +1,136 @@
+"""Tests for the ASGI entry point and the async service layer."""
+
+import asyncio
+import sqlite3
+import threading
+import time
+
+import httpx
+
+from app.asgi import create_asgi_app
+from app.quota import UpstreamQuota
+
+
+def run_requests(app, requests):
+    """Send (method, path, kwargs) requests concurrently to an ASGI app and return the responses."""
+    asgi_app = create_asgi_app(app)
+
+    async def main():
+        transport = httpx.ASGITransport(app=asgi_app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://testserver') as client:
+            try:
+                return await asyncio.gather(*(
+                    client.request(method, path, **kwargs) for method, path, kwargs in requests
+                ))
+            finally:
+                await asgi_app._shutdown()
+
+    return asyncio.run(main())
+
+
+def test_native_routes_match_the_flask_routes(app, client):
+    (asgi_response,) = run_requests(app, [('GET', '/api/weather?city=Oslo', {})])
+    flask_response = client.get('/api/weather?city=Oslo')
+
+    assert asgi_response.status_code == 200
+    assert asgi_response.json() == flask_response.get_json()
+    assert asgi_response.headers['etag'] == flask_response.headers['ETag']
+
+
+def test_other_routes_fall_back_to_flask(app):
+    health, missing = run_requests(app, [('GET', '/api/health', {}), ('GET', '/api/nope', {})])
+
+    assert health.status_code == 200 and health.json()['status'] == 'success'
+    assert missing.status_code == 404
+
+
+def test_concurrent_requests_share_one_upstream_call(app, upstream, upstream_calls):
+    upstream.settings.latency = 0.1
+
+    responses = run_requests(app, [('GET', '/api/weather?city=Oslo', {})] * 50)
+
+    assert {response.status_code for response in responses} == {200}
+    assert upstream_calls('weather') == 1
+
+
+def test_native_routes_validate_parameters(app):
+    missing_city, bad_days, bad_body = run_requests(app, [
+        ('GET', '/api/weather', {}),
+        ('GET', '/api/forecast?city=Oslo&days=9', {}),
+        ('POST', '/api/weather/batch', {'content': b'not json'}),
+    ])
+
+    assert (missing_city.status_code, bad_days.status_code, bad_body.status_code) == (400, 400, 400)
+
+
+def test_sqlite_backed_routes_work_off_the_event_loop(make_app, upstream_calls):
+    app = make_app(CACHE_BACKEND='sqlite', RATE_LIMIT_ENABLED=True)
+
+    first, second = run_requests(app, [('GET', '/api/forecast?city=Oslo&days=1', {})] * 2)
+    (cached,) = run_requests(app, [('GET', '/api/forecast?city=Oslo&days=1', {})])
+
+    assert first.status_code == second.status_code == cached.status_code == 200
+    assert cached.json() == first.json()
+    assert upstream_calls('forecast') == 1
+
+
+def test_quota_lock_wait_does_not_block_the_event_loop(tmp_path):
+    path = str(tmp_path / 'quota.sqlite3')
+    quota = UpstreamQuota(path, per_minute=60)
+
+    # Another worker holds the write lock for a while
+    holder = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+    holder.execute('BEGIN IMMEDIATE')
+    threading.Timer(0.3, holder.rollback).start()
+
+    async def main():
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        ticker = asyncio.create_task(tick())
+        started = time.monotonic()
+        await quota.acquire_async()
+        elapsed = time.monotonic() - started
+        ticker.cancel()
+        return ticks, elapsed
+
+    ticks, elapsed = asyncio.run(main())
+
+    assert elapsed >= 0.25
+    assert ticks >= 10
+    assert quota.stats()['granted'] == 1
+
+
+def test_upstream_429_drains_the_shared_quota(make_app, upstream):
+    upstream.settings.error_rate = 1.0
+    upstream.settings.error_status = 429
+    app = make_app(RATE_LIMIT_ENABLED=True, RATE_LIMIT_MAX_WAIT=0)
+
+    (throttled,) = run_requests(app, [('GET', '/api/weather?city=Oslo', {})])
+    # The drained bucket refuses the next city without calling OpenWeather
+    (refused,) = run_requests(app, [('GET', '/api/weather?city=Paris', {})])
+
+    quota = app.extensions['weather_upstream_quota']
+    assert throttled.status_code == refused.status_code == 503
+    assert quota.stats()['throttled'] == 1
+    assert quota.stats()['buckets']['minute']['remaining'] == 0
+    assert upstream.stats.snapshot()['calls'] == {'weather': 1}
+
+
+def test_city_validation_runs_through_the_native_routes(make_app, upstream_calls):
+    app = make_app(CITY_SEARCH_VALIDATE=True)
+
+    rejected, accepted = run_requests(app, [
+        ('GET', '/api/weather?city=Lodnon', {}),
+        ('GET', '/api/weather?city=London', {}),
+    ])
+
+    assert rejected.status_code == 400
+    assert rejected.json()['error'] == 'City not found'
+    assert accepted.status_code == 200
+    assert upstream_calls('weather') == 1
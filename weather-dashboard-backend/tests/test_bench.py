@@ -0,0 +1,98 @@
+"""Tests for the benchmark harness: mock upstream, load generator and comparison."""
+
+import json
+
+import pytest
+import requests
+
+from bench.compare import compare_results, load_results, main as compare_main
+from bench.loadgen import percentile, run_load, summarize
+from bench.mock_openweather import MockSettings
+from bench.run import BATCH_SIZE, route_paths
+
+
+def result(server='run', route='weather', concurrency=8, rps=1000.0, p95=10.0, p99=20.0, error_rate=0.0):
+    return {
+        'server': server, 'route': route, 'concurrency': concurrency, 'throughput_rps': rps,
+        'latency_ms': {'p50': 5.0, 'p95': p95, 'p99': p99}, 'error_rate': error_rate,
+    }
+
+
+def test_mock_upstream_payloads_are_deterministic(upstream):
+    first = requests.get(f'{upstream.base_url}/data/2.5/weather', params={'q': 'Oslo'}, timeout=5).json()
+    second = requests.get(f'{upstream.base_url}/data/2.5/weather', params={'q': 'oslo,NO'}, timeout=5).json()
+    forecast = requests.get(f'{upstream.base_url}/data/2.5/forecast', params={'q': 'Oslo', 'cnt': 8}, timeout=5).json()
+
+    assert first == second
+    assert first['name'] == 'Oslo'
+    assert forecast['cnt'] == len(forecast['list']) == 8
+    assert upstream.stats.snapshot()['calls'] == {'weather': 2, 'forecast': 1}
+
+
+def test_mock_upstream_injects_errors(upstream):
+    upstream.settings = MockSettings(latency=0.0, error_rate=1.0, error_status=502)
+
+    response = requests.get(f'{upstream.base_url}/data/2.5/weather', params={'q': 'Oslo'}, timeout=5)
+
+    assert response.status_code == 502
+    assert upstream.stats.snapshot()['errors'] == {'weather': 1}
+
+
+def test_percentile_and_summary():
+    assert percentile([], 50) is None
+    assert percentile([1, 2, 3, 4], 50) == 2
+    assert percentile([1, 2, 3, 4], 99) == 4
+
+    summary = summarize([0.001, 0.002, 0.003, 0.004], {'200': 3, '503': 1, 'error': 1}, elapsed=2.0)
+
+    assert summary['requests'] == 5
+    assert summary['errors'] == 2
+    assert summary['error_rate'] == 0.4
+    assert summary['throughput_rps'] == 2.0
+    assert summary['latency_ms']['p50'] == 2.0
+
+
+def test_load_generator_drives_a_local_server(upstream):
+    summary = run_load(upstream.base_url, ['/data/2.5/weather?q=Oslo', '/missing'], concurrency=2, duration=0.2)
+
+    assert summary['requests'] > 0
+    assert set(summary['statuses']) == {'200', '404'}
+    assert summary['errors'] == summary['statuses']['404']
+
+
+def test_route_paths_expand_cities():
+    cities = ['London', 'New York', 'Oslo']
+
+    assert route_paths('weather', cities)[1] == '/api/weather?city=New%20York'
+    batches = route_paths('batch', cities)
+    assert len(batches) == 3
+    assert batches[0] == '/api/weather/batch?cities=London,New%20York,Oslo'
+    assert all(path.count(',') < BATCH_SIZE for path in batches)
+
+
+def test_compare_flags_regressions_beyond_the_threshold():
+    key = ('run', 'weather', 8)
+    baseline = {key: result()}
+
+    assert compare_results(baseline, {key: result(rps=950.0, p95=10.5)}, threshold=10)[0]['regressions'] == []
+    regressed = compare_results(baseline, {key: result(rps=800.0, p99=30.0, error_rate=0.01)}, threshold=10)[0]
+    assert regressed['regressions'] == ['throughput_rps', 'p99_ms', 'error_rate']
+    assert regressed['change_percent']['throughput_rps'] == -20.0
+
+
+def test_compare_only_matches_common_results():
+    baseline = {('run', 'weather', 8): result()}
+    candidate = {('asgi', 'weather', 8): result(server='asgi', rps=1.0)}
+
+    assert compare_results(baseline, candidate, threshold=10) == []
+
+
+@pytest.mark.parametrize('candidate_rps, status', [(990.0, 0), (500.0, 1)])
+def test_compare_exit_status_gates_ci(tmp_path, capsys, candidate_rps, status):
+    baseline_path, candidate_path = tmp_path / 'baseline.json', tmp_path / 'candidate.json'
+    baseline_path.write_text(json.dumps({'results': [result(), {'server': 'asgi', 'skipped': 'uvicorn missing'}]}))
+    candidate_path.write_text(json.dumps({'results': [result(rps=candidate_rps)]}))
+
+    assert list(load_results(str(baseline_path))) == [('run', 'weather', 8)]
+    assert compare_main([str(baseline_path), str(candidate_path)]) == status
+    assert 'results regressed' in capsys.readouterr().out
@@ -0,0 +1,89 @@
+"""Tests for the upstream circuit breakers and the stale fallback."""
+
+import pytest
+
+from app.breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitBreakers, CircuitOpenError
+from bench.mock_openweather import MockSettings
+
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker('weather', failure_threshold=2, reset_timeout=30)
+    breaker.record(True, now=0)
+    breaker.record(False, now=1)
+    breaker.record(True, now=2)
+    assert breaker.state == CLOSED
+
+    breaker.record(True, now=3)
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError) as error:
+        breaker.before_call(now=10)
+    assert error.value.retry_after == 23
+    assert breaker.stats()['rejected'] == 1
+
+
+def test_half_open_breaker_admits_one_probe():
+    breaker = CircuitBreaker('weather', failure_threshold=1, reset_timeout=30)
+    breaker.record(True, now=0)
+
+    breaker.before_call(now=30)
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call(now=31)
+
+    breaker.record(True, now=32)
+    assert breaker.state == OPEN
+    assert breaker.opened == 2
+
+    breaker.before_call(now=62)
+    breaker.record(False, now=63)
+    assert breaker.state == CLOSED
+
+
+def test_client_errors_do_not_trip_the_breaker():
+    breakers = CircuitBreakers(failure_threshold=1)
+    breakers.record('geocoding', 404)
+    breakers.record('weather', 429)
+    breakers.record('forecast', None)
+
+    stats = breakers.stats()
+    assert stats['upstreams']['geocoding']['state'] == CLOSED
+    assert stats['upstreams']['weather']['state'] == CLOSED
+    assert stats['upstreams']['forecast']['state'] == OPEN
+    assert stats['open'] == 1
+
+
+@pytest.fixture
+def client(make_app):
+    """Test client whose cached weather expires at once and trips the breaker on one failure."""
+    return make_app(
+        CACHE_TTL_WEATHER=0, CACHE_STALE_WHILE_REVALIDATE=False, CIRCUIT_BREAKER_FAILURE_THRESHOLD=1
+    ).test_client()
+
+
+def test_open_circuit_serves_the_last_cached_result(client, upstream, upstream_calls):
+    fresh = client.get('/api/weather?city=Oslo').get_json()
+    upstream.settings = MockSettings(latency=0.0, error_rate=1.0, error_status=500)
+    client.get('/api/weather?city=Oslo')
+
+    response = client.get('/api/weather?city=Oslo')
+    body = response.get_json()
+
+    assert response.status_code == 200
+    assert body['stale'] is True
+    assert 'unavailable' in body['stale_reason']
+    assert isinstance(body['fetched_at'], int)
+    assert body['data'] == fresh['data']
+    # The open circuit refused the third call without reaching the upstream
+    assert upstream_calls('weather') == 2
+
+
+def test_open_circuit_without_a_cached_result_is_503(client, upstream):
+    upstream.settings = MockSettings(latency=0.0, error_rate=1.0, error_status=503)
+    client.get('/api/weather?city=Oslo')
+
+    response = client.get('/api/weather?city=Bergen')
+    body = response.get_json()
+
+    assert response.status_code == 503
+    assert body['code'] == 'upstream_unavailable'
+    assert int(response.headers['Retry-After']) >= 1
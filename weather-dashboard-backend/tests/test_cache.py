@@ -0,0 +1,120 @@
+"""Tests for the response cache backends and the cached service calls."""
+
+import threading
+
+from app.cache import MemoryCacheBackend, SQLiteCacheBackend, create_cache_backend, make_cache_key
+
+
+def test_memory_cache_serves_fresh_entries_and_expires_them():
+    cache = MemoryCacheBackend(max_entries=10)
+    cache.set('fresh', {'temperature': 10}, ttl=60)
+    cache.set('expired', {'temperature': 11}, ttl=0)
+
+    assert cache.get('fresh').value == {'temperature': 10}
+    assert cache.get('expired') is None
+    assert cache.stats()['expirations'] == 1
+
+
+def test_memory_cache_evicts_least_recently_used():
+    cache = MemoryCacheBackend(max_entries=2)
+    cache.set('a', 1, ttl=60)
+    cache.set('b', 2, ttl=60)
+    cache.get('a')
+    cache.set('c', 3, ttl=60)
+
+    assert cache.get('b') is None
+    assert cache.get('a').value == 1
+    assert cache.stats()['evictions'] == 1
+
+
+def test_memory_cache_peek_returns_expired_entries_without_counting():
+    cache = MemoryCacheBackend(max_entries=10)
+    cache.set('a', 1, ttl=0)
+
+    assert cache.peek('a').value == 1
+    assert cache.stats()['hits'] == cache.stats()['misses'] == 0
+
+
+def test_memory_cache_peek_is_safe_during_concurrent_writes():
+    cache = MemoryCacheBackend(max_entries=50)
+    errors = []
+
+    def write():
+        for i in range(2000):
+            cache.set(f'key-{i % 200}', i, ttl=60)
+
+    def read():
+        try:
+            for i in range(2000):
+                cache.peek(f'key-{i % 200}')
+        except Exception as e:  # pragma: no cover - only reached on a race
+            errors.append(e)
+
+    threads = [threading.Thread(target=write)] + [threading.Thread(target=read) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(cache) == 50
+
+
+def test_cache_keys_normalize_city_spelling():
+    assert make_cache_key('weather', '  New   York ', 'metric') == make_cache_key('weather', 'new york', 'metric')
+    assert make_cache_key('forecast', 'Oslo', 'metric', 3) != make_cache_key('forecast', 'Oslo', 'metric', 5)
+
+
+def test_repeated_weather_requests_call_upstream_once(client, upstream_calls):
+    first = client.get('/api/weather?city=Oslo')
+    second = client.get('/api/weather?city=oslo')
+
+    assert first.status_code == second.status_code == 200
+    assert first.get_json() == second.get_json()
+    assert upstream_calls('weather') == 1
+
+
+def test_disabled_cache_fetches_every_time(make_app, upstream_calls):
+    client = make_app(CACHE_ENABLED=False).test_client()
+    client.get('/api/weather?city=Oslo')
+    client.get('/api/weather?city=Oslo')
+
+    assert upstream_calls('weather') == 2
+
+
+def test_sqlite_cache_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / 'cache.sqlite3')
+    writer = SQLiteCacheBackend(path)
+    reader = SQLiteCacheBackend(path)
+    entry = writer.set('weather|oslo|metric|', {'temperature': 10}, ttl=60)
+
+    shared = reader.get('weather|oslo|metric|')
+    assert shared.value == {'temperature': 10}
+    assert shared.etag == entry.etag
+    assert len(reader) == 1
+
+
+def test_sqlite_cache_expires_and_evicts(tmp_path):
+    cache = SQLiteCacheBackend(str(tmp_path / 'cache.sqlite3'), max_entries=2)
+    cache.set('expired', 1, ttl=0)
+    assert cache.get('expired') is None
+
+    for key in ('a', 'b', 'c'):
+        cache.set(key, key, ttl=60)
+    assert len(cache) == 2
+    assert cache.get('c').value == 'c'
+
+
+def test_cache_backend_follows_configuration(make_config):
+    assert isinstance(create_cache_backend(make_config(CACHE_BACKEND='sqlite')), SQLiteCacheBackend)
+    assert isinstance(create_cache_backend(make_config(CACHE_BACKEND='memory')), MemoryCacheBackend)
+    assert create_cache_backend(make_config(CACHE_ENABLED=False)) is None
+
+
+def test_apps_sharing_a_sqlite_cache_share_upstream_results(make_app, upstream_calls):
+    first = make_app(CACHE_BACKEND='sqlite').test_client()
+    second = make_app(CACHE_BACKEND='sqlite').test_client()
+
+    assert first.get('/api/weather?city=Oslo').status_code == 200
+    assert second.get('/api/weather?city=Oslo').status_code == 200
+    assert upstream_calls('weather') == 1
@@ -0,0 +1,62 @@
+"""Tests for Accept-Encoding negotiation and stored compressed variants."""
+
+import gzip
+
+from app.compression import ResponseCompressor
+from app.services import WeatherService
+
+
+def test_negotiate_picks_the_preferred_enabled_coding():
+    compressor = ResponseCompressor(encodings=('gzip',))
+
+    assert compressor.negotiate('gzip, deflate') == 'gzip'
+    assert compressor.negotiate('br') is None
+    assert compressor.negotiate('gzip;q=0') is None
+    assert compressor.negotiate(None) is None
+
+
+def test_small_bodies_are_sent_uncompressed():
+    compressor = ResponseCompressor(encodings=('gzip',), min_size=500)
+
+    assert compressor.encode_variants(b'{}') == {}
+    assert compressor.select(b'{}', 'gzip') == (None, b'{}')
+
+
+def test_select_reuses_stored_variants():
+    compressor = ResponseCompressor(encodings=('gzip',), min_size=10)
+    body = b'{"forecasts":' + b'[1,2,3],' * 100 + b'0}'
+    variants = compressor.encode_variants(body)
+
+    encoding, compressed = compressor.select(body, 'gzip', variants)
+
+    assert encoding == 'gzip'
+    assert compressed is variants['gzip']
+    assert gzip.decompress(compressed) == body
+    assert compressor.stats()['precompressed'] == 1
+    assert compressor.stats()['compressed'] == 0
+
+
+def test_cached_forecasts_are_sent_gzipped(app, client):
+    client.get('/api/forecast?city=Oslo')
+
+    response = client.get('/api/forecast?city=Oslo', headers={'Accept-Encoding': 'gzip'})
+    plain = client.get('/api/forecast?city=Oslo')
+
+    with app.app_context():
+        entry = WeatherService.peek_cache_entry('forecast', 'Oslo', 5)
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.headers['ETag'].startswith('W/')
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert response.data == entry.encodings['gzip']
+    assert gzip.decompress(response.data) == plain.data
+    assert 'Content-Encoding' not in plain.headers
+
+
+def test_disabled_compression_sends_identity(make_app):
+    client = make_app(COMPRESSION_ENABLED=False).test_client()
+    client.get('/api/forecast?city=Oslo')
+
+    response = client.get('/api/forecast?city=Oslo', headers={'Accept-Encoding': 'gzip'})
+
+    assert 'Content-Encoding' not in response.headers
+    assert response.get_json()['status'] == 'success'
@@ -0,0 +1,60 @@
+"""Tests for the persistent geocoding store."""
+
+from app.geocoding import GeocodeStore, normalize_location_query
+
+
+def write_city_list(path, rows):
+    path.write_text('name,country,lat,lon,population\n' + ''.join(f'{row}\n' for row in rows), encoding='utf-8')
+    return str(path)
+
+
+def test_location_queries_are_normalized():
+    assert normalize_location_query(' London ,  GB ') == 'london,gb'
+    assert normalize_location_query('New   York,') == 'new york'
+
+
+def test_seeded_names_resolve_to_the_most_populous_city(tmp_path):
+    seed = write_city_list(tmp_path / 'cities.csv', [
+        'London,CA,42.98,-81.24,383000',
+        'London,GB,51.51,-0.13,8900000',
+    ])
+    store = GeocodeStore(str(tmp_path / 'geocode.sqlite3'), seed)
+
+    assert store.lookup('london')['country'] == 'GB'
+    assert store.lookup('London, CA')['lat'] == 42.98
+    assert store.lookup('Atlantis') is None
+    assert store.stats() == {'entries': 3, 'hits': 2, 'misses': 1}
+
+
+def test_seed_file_is_only_read_again_when_it_changes(tmp_path):
+    seed = write_city_list(tmp_path / 'cities.csv', ['Oslo,NO,59.91,10.75,700000'])
+    path = str(tmp_path / 'geocode.sqlite3')
+    GeocodeStore(path, seed)
+
+    assert GeocodeStore(path).load_city_list(seed) == 0
+
+
+def test_learned_locations_persist(tmp_path):
+    path = str(tmp_path / 'geocode.sqlite3')
+    GeocodeStore(path).store('Smallville', 'Smallville', 'US', 39.0, -95.0)
+
+    assert GeocodeStore(path).lookup('smallville') == {
+        'name': 'Smallville', 'country': 'US', 'lat': 39.0, 'lon': -95.0
+    }
+
+
+def test_alerts_for_a_bundled_city_skip_the_geocoding_api(client, upstream_calls):
+    response = client.get('/api/alerts?city=London')
+
+    assert response.status_code == 200
+    assert upstream_calls('geocoding') == 0
+    assert upstream_calls('onecall') == 1
+
+
+def test_unknown_cities_are_geocoded_once(app, client, upstream_calls):
+    client.get('/api/alerts?city=Smallville')
+    app.extensions['weather_cache'].clear()
+    client.get('/api/alerts?city=Smallville')
+
+    assert upstream_calls('geocoding') == 1
+    assert upstream_calls('onecall') == 2
@@ -0,0 +1,99 @@
+"""Tests for the upstream monitor and the liveness and readiness routes."""
+
+import pytest
+
+from app.health import DEGRADED, OK, UpstreamMonitor
+from bench.mock_openweather import MockSettings
+
+
+@pytest.fixture
+def client(make_app):
+    """Test client whose readiness report is rebuilt on every request."""
+    return make_app(HEALTH_CACHE_TTL=0).test_client()
+
+
+def test_monitor_marks_an_upstream_down_after_consecutive_failures():
+    monitor = UpstreamMonitor(failure_threshold=3)
+    monitor.record('weather', 200)
+    monitor.record('weather', 503)
+    monitor.record('weather', None, 'timeout')
+
+    report = monitor.report()
+    assert report['status'] == DEGRADED
+    assert report['endpoints']['weather']['down'] is False
+    assert report['endpoints']['weather']['last_error'] == 'timeout'
+
+    monitor.record('weather', 502)
+    assert monitor.report()['endpoints']['weather']['down'] is True
+
+    monitor.record('weather', 200)
+    assert monitor.report()['endpoints']['weather']['consecutive_failures'] == 0
+    assert monitor.report()['endpoints']['weather']['down'] is False
+
+
+def test_an_invalid_api_key_marks_the_upstream_down_at_once():
+    monitor = UpstreamMonitor(failure_threshold=3)
+    monitor.record('forecast', 401)
+
+    assert monitor.report()['endpoints']['forecast']['down'] is True
+
+
+def test_busy_upstream_responses_are_not_failures():
+    monitor = UpstreamMonitor()
+    monitor.record('weather', 429)
+    monitor.record('weather', 404)
+
+    report = monitor.report()
+    assert report['status'] == OK
+    assert report['endpoints']['weather']['recent_failures'] == 0
+
+
+def test_liveness(client):
+    response = client.get('/api/health/live')
+
+    assert response.status_code == 200
+    assert response.get_json()['status'] == 'success'
+
+
+def test_ready_before_any_upstream_call(client):
+    body = client.get('/api/health/ready').get_json()
+
+    assert body['ready'] is True
+    assert body['checks']['upstream']['status'] == OK
+    assert body['checks']['upstream']['endpoints'] == {}
+
+
+@pytest.mark.parametrize('status', [401, 500])
+def test_upstream_failures_degrade_but_keep_the_node_ready(client, upstream, status):
+    upstream.settings = MockSettings(latency=0.0, error_rate=1.0, error_status=status)
+    for city in ('Oslo', 'Bergen', 'Tromso'):
+        client.get(f'/api/weather?city={city}')
+
+    response = client.get('/api/health/ready')
+    body = response.get_json()
+
+    assert response.status_code == 200
+    assert body['ready'] is True
+    assert body['checks']['upstream']['status'] == DEGRADED
+    assert body['checks']['upstream']['endpoints']['weather']['down'] is True
+
+
+def test_configuration_errors_make_the_node_unready(make_app):
+    client = make_app(HEALTH_CACHE_TTL=0, COMPRESSION_GZIP_LEVEL=42).test_client()
+
+    response = client.get('/api/health/ready')
+    body = response.get_json()
+
+    assert response.status_code == 503
+    assert body['ready'] is False
+    assert body['error'] == 'Not ready: config'
+    assert 'COMPRESSION_GZIP_LEVEL must be between 1 and 9' in body['checks']['config']['errors']
+
+
+def test_readiness_reports_are_reused_for_the_cache_ttl(make_app):
+    client = make_app(HEALTH_CACHE_TTL=60).test_client()
+
+    first = client.get('/api/health/ready').get_json()
+    second = client.get('/api/health/ready').get_json()
+
+    assert first['checked_at'] == second['checked_at']
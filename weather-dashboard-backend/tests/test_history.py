@@ -0,0 +1,120 @@
+"""Tests for the observation history store and the /api/history route."""
+
+import time
+
+import pytest
+
+from app.history import DAY, HistoryStore, parse_resolution
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = HistoryStore(str(tmp_path / 'history.sqlite3'), retention_days=30, compact_after_days=2,
+                         compact_resolution=3600)
+    # Maintenance is run explicitly by the tests that cover it
+    store._next_maintenance = float('inf')
+    return store
+
+
+@pytest.fixture
+def client(make_app):
+    """Test client keeping the mock server's 2023 observations past retention."""
+    return make_app(HISTORY_RETENTION_DAYS=36500, HISTORY_COMPACT_AFTER_DAYS=36500).test_client()
+
+
+def sample(ts, temperature):
+    return {'datetime': ts, 'temperature': temperature, 'humidity': 50, 'wind_speed': 2.0, 'pop': 0.1}
+
+
+def test_parse_resolution():
+    assert parse_resolution(None) == 0
+    assert parse_resolution('raw') == 0
+    assert parse_resolution('30m') == 1800
+    assert parse_resolution('1D') == DAY
+    for value in ('0h', '1w', 'hourly'):
+        with pytest.raises(ValueError):
+            parse_resolution(value)
+
+
+def test_query_returns_the_range_and_aggregates_buckets(store):
+    base = 1_700_000_000 - 1_700_000_000 % 3600
+    assert store.append('Oslo', 'metric', 'observed', [sample(base + i * 900, float(i)) for i in range(8)]) == 8
+    # The same observation is stored once
+    assert store.append('oslo', 'metric', 'observed', [sample(base, 0.0)]) == 0
+
+    raw = store.query('Oslo', 'metric', base + 900, base + 3600)
+    hourly = store.query('Oslo', 'metric', base, base + 2 * 3600, resolution=3600)
+
+    assert [point['temperature'] for point in raw] == [1.0, 2.0, 3.0]
+    assert [point['datetime'] for point in hourly] == [base, base + 3600]
+    assert hourly[0]['samples'] == 4
+    assert hourly[0]['temperature'] == 1.5
+    assert hourly[1]['temperature_max'] == 7.0
+    assert store.query('Oslo', 'imperial', base, base + DAY) == []
+
+
+def test_forecast_queries_use_the_latest_issue(store):
+    ts = 1_700_000_000
+    store.append('Oslo', 'metric', 'forecast', [sample(ts, 1.0)], issued_at=ts - 7200)
+    store.append('Oslo', 'metric', 'forecast', [sample(ts, 2.0)], issued_at=ts - 3600)
+
+    points = store.query('Oslo', 'metric', ts, ts + 1, kind='forecast')
+
+    assert [point['temperature'] for point in points] == [2.0]
+
+
+def test_maintain_expires_and_compacts_old_days(store):
+    now = time.time()
+    old = int(now - 40 * DAY)
+    compactable = int(now - 5 * DAY) // DAY * DAY
+    store.append('Oslo', 'metric', 'observed', [sample(old, 1.0)])
+    store.append('Oslo', 'metric', 'observed', [sample(compactable + i * 600, float(i)) for i in range(6)])
+
+    result = store.maintain(now)
+
+    assert result == {'expired_rows': 1, 'compacted_days': 1}
+    points = store.query('Oslo', 'metric', compactable, compactable + DAY)
+    assert len(points) == 1
+    assert points[0]['temperature_min'] == 0.0
+    assert points[0]['temperature_max'] == 5.0
+
+
+def test_fetches_are_recorded_and_served_from_history(client, upstream_calls):
+    client.get('/api/weather?city=Oslo')
+
+    response = client.get('/api/history?city=Oslo&from=0')
+
+    body = response.get_json()
+    assert response.status_code == 200
+    assert len(body['data']['points']) == 1
+    assert upstream_calls('weather') == 1
+
+
+def test_history_points_can_be_columnar(client):
+    client.get('/api/weather?city=Oslo')
+
+    points = client.get('/api/history?city=Oslo&from=0&format=columnar').get_json()['data']['points']
+
+    assert len(points['datetime']) == 1
+
+
+@pytest.mark.parametrize('query', [
+    'from=99999999999999999999',
+    'to=-99999999999999999999',
+    'from=1e400',
+    'from=2024-01-02&to=2024-01-01',
+    'from=100&to=100',
+    'resolution=1w',
+    'kind=hourly',
+    'format=csv',
+    'units=rankine',
+])
+def test_invalid_history_queries_are_rejected(client, query):
+    response = client.get(f'/api/history?city=Oslo&{query}')
+
+    assert response.status_code == 400
+    assert response.get_json()['status'] == 'error'
+
+
+def test_history_requires_a_city(client):
+    assert client.get('/api/history').status_code == 400
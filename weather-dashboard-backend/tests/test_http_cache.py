@@ -0,0 +1,53 @@
+"""Tests for ETag, Last-Modified and Cache-Control handling."""
+
+from app.cache import MemoryCacheBackend
+from app.http_cache import cache_headers, is_not_modified
+
+
+def test_cache_headers_describe_the_entry():
+    entry = MemoryCacheBackend().set('weather|oslo|metric|', {'temperature': 10}, ttl=120)
+
+    headers = cache_headers(entry, now=entry.stored_at + 20)
+
+    assert headers['ETag'] == f'"{entry.etag}"'
+    assert headers['Cache-Control'] == 'public, max-age=100'
+    assert headers['Last-Modified'].endswith('GMT')
+
+
+def test_views_get_their_own_entity_tag():
+    entry = MemoryCacheBackend().set('forecast|oslo|metric|5', {'forecasts': []}, ttl=120)
+
+    assert cache_headers(entry)['ETag'] != cache_headers(entry, view='columnar')['ETag']
+
+
+def test_if_none_match_takes_precedence_over_if_modified_since():
+    entry = MemoryCacheBackend().set('key', 1, ttl=60)
+    last_modified = cache_headers(entry)['Last-Modified']
+
+    assert is_not_modified(entry, f'W/"{entry.etag}"', None)
+    assert is_not_modified(entry, None, last_modified)
+    assert not is_not_modified(entry, '"other"', last_modified)
+    assert not is_not_modified(entry, None, None)
+
+
+def test_conditional_requests_get_304(client, upstream_calls):
+    response = client.get('/api/weather?city=Oslo')
+    etag = response.headers['ETag']
+    assert response.headers['Cache-Control'].startswith('public, max-age=')
+
+    not_modified = client.get('/api/weather?city=Oslo', headers={'If-None-Match': etag})
+    modified = client.get('/api/weather?city=Oslo', headers={'If-None-Match': '"stale"'})
+
+    assert not_modified.status_code == 304
+    assert not_modified.data == b''
+    assert not_modified.headers['ETag'] == etag
+    assert modified.status_code == 200
+    assert upstream_calls('weather') == 1
+
+
+def test_forecast_views_revalidate_separately(client):
+    etag = client.get('/api/forecast?city=Oslo').headers['ETag']
+    columnar = client.get('/api/forecast?city=Oslo&format=columnar', headers={'If-None-Match': etag})
+
+    assert columnar.status_code == 200
+    assert columnar.headers['ETag'] != etag
@@ -0,0 +1,64 @@
+"""Tests for the Prometheus metrics registry and the /api/metrics route."""
+
+from app.metrics import MAX_SERIES, OVERFLOW_LABEL, Counter, Histogram
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram('latency_seconds', 'Latency', ('route',), buckets=(0.1, 1.0))
+    histogram.observe(('/a',), 0.05)
+    histogram.observe(('/a',), 0.5)
+    histogram.observe(('/a',), 5.0)
+
+    lines = histogram.render()
+
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{route="/a",le="1"} 2' in lines
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+    assert 'latency_seconds_count{route="/a"} 3' in lines
+
+
+def test_label_combinations_are_capped():
+    counter = Counter('requests_total', 'Requests', ('path',))
+    for i in range(MAX_SERIES + 10):
+        counter.inc((f'/{i}',))
+
+    lines = counter.render()
+
+    # HELP and TYPE, the first MAX_SERIES series and the shared overflow series
+    assert len(lines) == 2 + MAX_SERIES + 1
+    assert f'requests_total{{path="{OVERFLOW_LABEL}"}} 10' in lines
+
+
+def test_metrics_route_reports_requests_upstream_and_components(client):
+    client.get('/api/weather?city=Oslo')
+    client.get('/api/weather?city=Oslo')
+    client.get('/api/weather')
+
+    response = client.get('/api/metrics')
+    text = response.get_data(as_text=True)
+
+    assert response.status_code == 200
+    assert response.content_type.startswith('text/plain; version=0.0.4')
+    assert 'weather_http_requests_total{route="/api/weather",method="GET",status="200"} 2' in text
+    assert 'weather_http_requests_total{route="/api/weather",method="GET",status="400"} 1' in text
+    assert 'weather_http_request_duration_seconds_count{route="/api/weather",method="GET"} 3' in text
+    assert 'weather_upstream_requests_total{upstream="weather",status="200"} 1' in text
+    assert 'weather_cache_hits_total 1' in text
+    assert '# TYPE weather_cache_entries gauge' in text
+    assert 'weather_phase_duration_seconds_count{phase="cache_store"} 1' in text
+
+
+def test_unmatched_paths_share_one_series(client):
+    client.get('/no/such/path')
+    client.get('/another/missing/path')
+
+    text = client.get('/api/metrics').get_data(as_text=True)
+
+    assert 'weather_http_requests_total{route="unmatched",method="GET",status="404"} 2' in text
+
+
+def test_metrics_can_be_disabled(make_app):
+    response = make_app(METRICS_ENABLED=False).test_client().get('/api/metrics')
+
+    assert response.status_code == 404
+    assert response.get_json()['status'] == 'error'
@@ -0,0 +1,63 @@
+"""Tests for the upstream quota governor."""
+
+import pytest
+
+from app.quota import UpstreamQuota, UpstreamQuotaExceeded
+
+
+def test_quota_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / 'quota.sqlite3')
+    first = UpstreamQuota(path, per_minute=3, max_wait=0)
+    second = UpstreamQuota(path, per_minute=3, max_wait=0)
+
+    first.acquire()
+    second.acquire()
+    first.acquire()
+    with pytest.raises(UpstreamQuotaExceeded) as raised:
+        second.acquire()
+
+    assert 0 < raised.value.retry_after <= 20
+    assert second.stats()['buckets']['minute'] == {'limit': 3, 'remaining': 0}
+    assert second.stats()['rejected'] == 1
+
+
+def test_quota_waits_for_a_refill_within_max_wait(tmp_path):
+    # 600 per minute refills one token every 0.1 seconds
+    quota = UpstreamQuota(str(tmp_path / 'quota.sqlite3'), per_minute=600, max_wait=1.0)
+    for _ in range(600):
+        assert quota.try_acquire() == 0.0
+
+    quota.acquire()
+
+    assert quota.stats()['waited'] == 1
+
+
+def test_upstream_throttling_drains_the_minute_bucket(tmp_path):
+    quota = UpstreamQuota(str(tmp_path / 'quota.sqlite3'), per_minute=60, max_wait=0)
+    quota.report_throttled(retry_after=30)
+
+    assert quota.try_acquire() > 30
+    assert quota.stats()['throttled'] == 1
+
+
+def test_exhausted_quota_answers_503_without_calling_upstream(make_app, upstream_calls):
+    client = make_app(RATE_LIMIT_ENABLED=True, RATE_LIMIT_PER_MINUTE=1, RATE_LIMIT_MAX_WAIT=0).test_client()
+    assert client.get('/api/weather?city=Oslo').status_code == 200
+
+    response = client.get('/api/weather?city=Paris')
+
+    assert response.status_code == 503
+    assert int(response.headers['Retry-After']) >= 1
+    assert response.get_json()['code'] == 'upstream_rate_limited'
+    assert upstream_calls('weather') == 1
+
+
+def test_upstream_429_is_reported_as_503(make_app, upstream):
+    upstream.settings.error_rate = 1.0
+    upstream.settings.error_status = 429
+    client = make_app(RATE_LIMIT_ENABLED=True).test_client()
+
+    response = client.get('/api/weather?city=Oslo')
+
+    assert response.status_code == 503
+    assert response.get_json()['code'] == 'upstream_rate_limited'
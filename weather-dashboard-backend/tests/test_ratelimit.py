@@ -0,0 +1,75 @@
+"""Tests for inbound per-client rate limiting."""
+
+import pytest
+
+from app.ratelimit import ClientRateLimiter, client_key, parse_rate_limit
+
+
+def test_parse_rate_limit():
+    assert parse_rate_limit('120/minute') == (120.0, 2.0)
+    assert parse_rate_limit(' 5 / second ') == (5.0, 5.0)
+    for spec in ('0/minute', '10/day', 'ten/minute'):
+        with pytest.raises(ValueError):
+            parse_rate_limit(spec)
+
+
+def test_only_allow_listed_tokens_get_their_own_identity():
+    known = frozenset({'team-a'})
+
+    assert client_key('team-a', None, '10.0.0.1', api_keys=known) == 'token:team-a'
+    assert client_key('made-up', None, '10.0.0.1', api_keys=known) == 'ip:10.0.0.1'
+    assert client_key('team-a', None, '10.0.0.1') == 'ip:10.0.0.1'
+
+
+def test_forwarded_for_is_only_trusted_behind_a_proxy():
+    assert client_key(None, '203.0.113.5, 10.0.0.2', '10.0.0.1') == 'ip:10.0.0.1'
+    assert client_key(None, '203.0.113.5, 10.0.0.2', '10.0.0.1', trust_proxy=True) == 'ip:203.0.113.5'
+
+
+def test_limiter_enforces_route_and_default_limits():
+    limiter = ClientRateLimiter((2, 0.001), {'/api/weather/batch': (1, 0.001)})
+
+    assert limiter.hit('ip:a', '/api/weather') is None
+    assert limiter.hit('ip:a', '/api/forecast') is None
+    assert limiter.hit('ip:a', '/api/weather') > 0
+    assert limiter.hit('ip:a', '/api/weather/batch') is None
+    assert limiter.hit('ip:a', '/api/weather/batch') > 0
+    assert limiter.hit('ip:b', '/api/weather') is None
+
+
+def test_limiter_caps_the_number_of_buckets():
+    limiter = ClientRateLimiter((1, 0.001), {}, max_buckets=3)
+    for i in range(10):
+        limiter.hit(f'ip:{i}', '/api/weather')
+
+    stats = limiter.stats()
+    assert (stats['active_buckets'], stats['evicted']) == (3, 7)
+
+
+def test_rotating_unknown_tokens_does_not_escape_the_limit(make_app):
+    client = make_app(CLIENT_RATE_LIMIT_ENABLED=True, CLIENT_RATE_LIMIT_DEFAULT='2/minute',
+                      CLIENT_RATE_LIMIT_API_KEYS='team-a').test_client()
+
+    statuses = [
+        client.get('/api/weather?city=Oslo', headers={'X-API-Key': f'token-{i}'}).status_code
+        for i in range(4)
+    ]
+    limiter = client.application.extensions['weather_client_limiter']
+
+    assert statuses == [200, 200, 429, 429]
+    assert limiter.stats()['active_buckets'] == 1
+    # A listed token has a budget of its own
+    assert client.get('/api/weather?city=Oslo', headers={'X-API-Key': 'team-a'}).status_code == 200
+
+
+def test_limited_requests_get_429_with_retry_after(make_app):
+    client = make_app(CLIENT_RATE_LIMIT_ENABLED=True, CLIENT_RATE_LIMIT_DEFAULT='1/minute').test_client()
+    client.get('/api/weather?city=Oslo')
+
+    response = client.get('/api/weather?city=Oslo')
+
+    assert response.status_code == 429
+    assert response.get_json()['code'] == 'client_rate_limited'
+    assert 1 <= int(response.headers['Retry-After']) <= 60
+    # Health checks are exempt
+    assert client.get('/api/health').status_code == 200
@@ -0,0 +1,95 @@
+"""Tests for stale-while-revalidate and the hot city refresh scheduler."""
+
+import time
+
+
+def wait_for(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'condition not met in time'
+        time.sleep(0.01)
+
+
+def test_expired_entries_are_served_stale_while_refreshing(make_app, upstream, upstream_calls):
+    app = make_app(CACHE_TTL_WEATHER=0)
+    client = app.test_client()
+    first = client.get('/api/weather?city=Oslo')
+
+    upstream.settings.latency = 0.3
+    started = time.monotonic()
+    second = client.get('/api/weather?city=Oslo')
+
+    assert time.monotonic() - started < 0.25
+    assert second.status_code == 200
+    assert second.get_json()['data'] == first.get_json()['data']
+
+    refresher = app.extensions['weather_refresher']
+    wait_for(lambda: refresher.stats()['refreshes'] == 1)
+    assert upstream_calls('weather') == 2
+
+
+def test_expired_entries_are_fetched_inline_without_revalidation(make_app, upstream_calls):
+    client = make_app(CACHE_TTL_WEATHER=0, CACHE_STALE_WHILE_REVALIDATE=False).test_client()
+    client.get('/api/weather?city=Oslo')
+    client.get('/api/weather?city=Oslo')
+
+    assert upstream_calls('weather') == 2
+
+
+def test_stale_entries_are_fetched_inline_once_the_budget_is_spent(make_app, upstream_calls):
+    app = make_app(CACHE_TTL_WEATHER=0, REFRESH_BUDGET_PER_MINUTE=0)
+    client = app.test_client()
+    client.get('/api/weather?city=Oslo')
+    client.get('/api/weather?city=Oslo')
+
+    stats = app.extensions['weather_refresher'].stats()
+    assert (stats['skipped_budget'], stats['refreshes']) == (1, 0)
+    assert upstream_calls('weather') == 2
+
+
+def test_hot_keys_rank_by_recent_requests(app):
+    refresher = app.extensions['weather_refresher']
+    for _ in range(3):
+        refresher.record('weather|oslo|metric|', 'weather', 'Oslo', None)
+    refresher.record('weather|rome|metric|', 'weather', 'Rome', None)
+
+    assert refresher.hot_keys() == ['weather|oslo|metric|', 'weather|rome|metric|']
+    # Counts halve every cycle and keys below one request are forgotten
+    refresher.hot_keys()
+    assert refresher.hot_keys() == ['weather|oslo|metric|']
+
+
+def test_hot_keys_close_to_expiry_are_refreshed_ahead_of_time(make_app, upstream_calls):
+    app = make_app(CACHE_TTL_WEATHER=10, REFRESH_LEAD_TIME=30)
+    app.test_client().get('/api/weather?city=Oslo')
+    refresher = app.extensions['weather_refresher']
+
+    assert refresher.refresh_hot() == 1
+    wait_for(lambda: refresher.stats()['refreshes'] == 1)
+    assert upstream_calls('weather') == 2
+
+
+def test_each_upstream_call_of_a_refresh_is_charged_to_the_budget(make_app, upstream_calls):
+    app = make_app(REFRESH_BUDGET_PER_MINUTE=1, GEOCODE_STORE_ENABLED=False)
+    refresher = app.extensions['weather_refresher']
+    refresher.record('alerts|oslo', 'alerts', 'Oslo', None)
+
+    # Without a geocoding store an alerts refresh needs two calls
+    assert refresher.request_refresh('alerts|oslo')
+    wait_for(lambda: refresher.stats()['failures'] == 1)
+
+    stats = refresher.stats()
+    assert (stats['skipped_budget'], stats['refreshes']) == (1, 0)
+    assert (upstream_calls('geocoding'), upstream_calls('onecall')) == (1, 0)
+
+
+def test_refreshes_within_the_budget_pay_for_every_call(make_app, upstream_calls):
+    app = make_app(REFRESH_BUDGET_PER_MINUTE=2, GEOCODE_STORE_ENABLED=False)
+    refresher = app.extensions['weather_refresher']
+    refresher.record('alerts|oslo', 'alerts', 'Oslo', None)
+
+    assert refresher.request_refresh('alerts|oslo')
+    wait_for(lambda: refresher.stats()['refreshes'] == 1)
+
+    assert refresher.stats()['budget_remaining'] == 0
+    assert (upstream_calls('geocoding'), upstream_calls('onecall')) == (1, 1)
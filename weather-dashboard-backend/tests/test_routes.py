@@ -0,0 +1,84 @@
+"""Tests for the combined dashboard and batch routes."""
+
+import time
+
+from app.services import WeatherService
+
+
+def test_dashboard_combines_all_sections(client, upstream_calls):
+    response = client.get('/api/dashboard?city=Oslo&days=2')
+
+    assert response.status_code == 200
+    data = response.get_json()['data']
+    assert data['city'] == 'Oslo'
+    assert data['weather']['temperature'] is not None
+    assert len(data['forecast']['forecasts']) == 16
+    assert data['alerts']['alerts']
+    assert upstream_calls('weather') == upstream_calls('forecast') == upstream_calls('onecall') == 1
+
+
+def test_dashboard_validates_parameters(client):
+    assert client.get('/api/dashboard').status_code == 400
+    assert client.get('/api/dashboard?city=Oslo&days=9').status_code == 400
+
+
+def test_dashboard_keeps_sections_that_succeeded():
+    merged = WeatherService._merge_dashboard('Oslo', {
+        'weather': {'status': 'success', 'data': {'temperature': 10}},
+        'forecast': RuntimeError('boom'),
+        'alerts': {'status': 'error', 'error': 'API error'},
+    })
+
+    assert merged['status'] == 'success'
+    assert merged['data']['weather'] == {'temperature': 10}
+    assert merged['data']['forecast'] is None and merged['data']['alerts'] is None
+    assert merged['errors'] == {'forecast': 'Unexpected error: boom', 'alerts': 'API error'}
+
+
+def test_dashboard_fails_when_every_section_fails(client, upstream):
+    upstream.settings.error_rate = 1.0
+
+    response = client.get('/api/dashboard?city=Oslo')
+
+    assert response.status_code == 400
+    assert response.get_json()['error'].startswith('API error: 503')
+
+
+def test_batch_returns_a_result_per_city_and_deduplicates(client, upstream_calls):
+    client.get('/api/weather?city=Oslo')
+
+    response = client.post('/api/weather/batch', json={'cities': ['Oslo', 'Paris', 'paris ', 'Rome']})
+
+    data = response.get_json()['data']
+    assert response.status_code == 200
+    assert sorted(data['results']) == ['Oslo', 'Paris', 'Rome']
+    assert (data['count'], data['cached'], data['errors']) == (3, 1, 0)
+    assert upstream_calls('weather') == 3
+
+
+def test_batch_accepts_query_parameters(client):
+    response = client.get('/api/weather/batch?cities=Oslo,Paris&city=Rome')
+
+    assert sorted(response.get_json()['data']['results']) == ['Oslo', 'Paris', 'Rome']
+
+
+def test_batch_rejects_bad_bodies_and_oversized_batches(make_app):
+    client = make_app(BATCH_MAX_CITIES=2).test_client()
+
+    assert client.post('/api/weather/batch', json={'cities': 'Oslo'}).status_code == 400
+    assert client.post('/api/weather/batch', json={'cities': []}).status_code == 400
+    response = client.post('/api/weather/batch', json={'cities': ['Oslo', 'Paris', 'Rome']})
+    assert response.status_code == 400
+    assert 'at most 2' in response.get_json()['error']
+
+
+def test_batch_bounds_upstream_concurrency(make_app, upstream):
+    upstream.settings.latency = 0.1
+    client = make_app(BATCH_MAX_CONCURRENCY=2).test_client()
+
+    started = time.monotonic()
+    response = client.post('/api/weather/batch', json={'cities': ['A1', 'B2', 'C3', 'D4', 'E5', 'F6']})
+
+    # Six calls, at most two at a time, take at least three round trips
+    assert time.monotonic() - started >= 0.3
+    assert response.get_json()['data']['errors'] == 0
@@ -0,0 +1,94 @@
+"""Tests for the city search index and the /api/cities/search route."""
+
+import pytest
+
+from app.search import CitySearchIndex, fold_name
+
+
+@pytest.fixture
+def index(tmp_path):
+    path = tmp_path / 'cities.csv'
+    path.write_text(
+        'name,country,lat,lon,population\n'
+        'London,GB,51.5,-0.12,8982000\n'
+        'London,CA,42.98,-81.23,383000\n'
+        'Londonderry,GB,55.0,-7.3,85000\n'
+        'New York,US,40.71,-74.0,8336000\n'
+        'São Paulo,BR,-23.5,-46.6,12330000\n',
+        encoding='utf-8'
+    )
+    return CitySearchIndex(str(path))
+
+
+def test_fold_name():
+    assert fold_name('  São   Paulo ') == 'sao paulo'
+    assert fold_name("St. John's") == 'st john s'
+
+
+def test_prefix_matches_rank_exact_names_then_population(index):
+    results = index.search('lond')
+
+    assert [(city['name'], city['country']) for city in results[:3]] == [
+        ('London', 'GB'), ('London', 'CA'), ('Londonderry', 'GB'),
+    ]
+    assert {city['match'] for city in results[:3]} == {'prefix'}
+    assert index.search('london')[0]['match'] == 'exact'
+
+
+def test_word_suffixes_and_accents_match(index):
+    assert index.search('york')[0]['name'] == 'New York'
+    assert index.search('sao paulo')[0]['name'] == 'São Paulo'
+
+
+def test_misspellings_fall_back_to_fuzzy_matches(index):
+    results = index.search('Lodnon', limit=2)
+
+    assert results[0]['name'] == 'London'
+    assert results[0]['match'] == 'fuzzy'
+    assert index.stats()['fuzzy_queries'] == 1
+    assert index.search('zzzzzz') == []
+
+
+def test_country_codes_filter_results(index):
+    assert [city['country'] for city in index.search('London, CA')] == ['CA']
+    assert index.contains('London, GB')
+    assert not index.contains('London, FR')
+    assert not index.contains('Lond')
+    assert index.suggest('Londn, GB', limit=1) == ['London,GB']
+
+
+def test_index_is_built_on_first_query(index):
+    assert index.stats()['cities'] == 0
+
+    index.search('new')
+
+    assert index.stats()['cities'] == 5
+
+
+def test_search_route_uses_the_bundled_city_list(client, upstream_calls):
+    response = client.get('/api/cities/search?q=Lodnon&limit=3')
+    data = response.get_json()['data']
+
+    assert response.status_code == 200
+    assert data['results'][0]['name'] == 'London'
+    assert data['count'] == len(data['results']) <= 3
+    assert sum(upstream_calls(endpoint) for endpoint in ('weather', 'geocoding')) == 0
+
+
+@pytest.mark.parametrize('query', ['', 'q=', 'q=Oslo&limit=0', 'q=Oslo&limit=500', 'q=' + 'x' * 101])
+def test_invalid_search_queries_are_rejected(client, query):
+    assert client.get(f'/api/cities/search?{query}').status_code == 400
+
+
+def test_validation_refuses_unknown_cities_without_an_upstream_call(make_app, upstream_calls):
+    client = make_app(CITY_SEARCH_VALIDATE=True).test_client()
+
+    rejected = client.get('/api/weather?city=Lodnon')
+    accepted = client.get('/api/weather?city=London')
+
+    assert rejected.status_code == 400
+    assert rejected.get_json()['error'] == 'City not found'
+    assert 'London,GB' in rejected.get_json()['suggestions']
+    assert accepted.status_code == 200
+    assert upstream_calls('weather') == 1
+    assert upstream_calls('geocoding') == 0
@@ -0,0 +1,44 @@
+"""Tests for the shared JSON encoding of responses and cache entries."""
+
+from app import serialization
+from app.serialization import dumps, loads
+from app.services import WeatherService
+
+PAYLOAD = {'city': 'Oslo', 'temperature': 10.5, 'conditions': ['rain', 'wind'], 'alerts': None}
+
+
+def test_dumps_sorts_keys_and_round_trips():
+    body = dumps(PAYLOAD)
+
+    assert body.startswith(b'{"alerts":null,"city":"Oslo"')
+    assert loads(body) == PAYLOAD
+    assert loads(body.decode('utf-8')) == PAYLOAD
+
+
+def test_standard_library_encoding_matches_the_fast_encoder(monkeypatch):
+    fast = dumps(PAYLOAD)
+    monkeypatch.setattr(serialization, 'orjson', None)
+
+    assert dumps(PAYLOAD) == fast
+    assert dumps(PAYLOAD, compact=False).startswith(b'{\n  "alerts": null')
+
+
+def test_cache_hits_send_the_stored_body(app, client):
+    first = client.get('/api/weather?city=Oslo')
+    second = client.get('/api/weather?city=Oslo')
+
+    with app.app_context():
+        entry = WeatherService.peek_cache_entry('weather', 'Oslo')
+    assert second.data == entry.body
+    # The miss is encoded by the JSON provider with the same settings
+    assert first.data == second.data
+
+
+def test_pretty_printed_responses_do_not_reuse_the_compact_body(make_app):
+    client = make_app(JSON_COMPACT=False).test_client()
+    client.get('/api/weather?city=Oslo')
+
+    response = client.get('/api/weather?city=Oslo')
+
+    assert response.data.startswith(b'{\n  "data"')
+    assert response.get_json()['status'] == 'success'
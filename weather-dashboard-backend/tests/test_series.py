@@ -0,0 +1,102 @@
+"""Tests for columnar, downsampled and daily forecast series."""
+
+import pytest
+
+from app.series import daily_summary, downsample, forecast_view, from_columnar, to_columnar
+
+DAY = 86400
+
+
+def make_records(count, start=0):
+    return [{
+        'datetime': start + i * 10800,
+        'temperature': float(i),
+        'feels_like': float(i) - 1,
+        'humidity': 50,
+        'pressure': 1000,
+        'wind_speed': 2.0,
+        'wind_direction': 350 if i % 2 else 10,
+        'pop': i / 10,
+        'description': 'rain' if i < 2 else 'clear',
+        'icon': '01d',
+    } for i in range(count)]
+
+
+def test_columnar_round_trip():
+    records = make_records(3)
+    columns = to_columnar(records)
+
+    assert columns['temperature'] == [0.0, 1.0, 2.0]
+    assert from_columnar(columns) == records
+    assert to_columnar([])['datetime'] == []
+
+
+def test_downsample_averages_equal_buckets():
+    columns = downsample(to_columnar(make_records(8)), 4)
+
+    assert columns['datetime'] == [0, 21600, 43200, 64800]
+    assert columns['temperature'] == [0.5, 2.5, 4.5, 6.5]
+    # 10 and 350 degrees average across north, not to 180
+    assert columns['wind_direction'][0] == 0.0
+    assert columns['description'][0] == 'rain'
+    assert downsample(to_columnar(make_records(3)), 4)['temperature'] == [0.0, 1.0, 2.0]
+
+
+def test_daily_summary_uses_the_local_calendar_day():
+    columns = daily_summary(to_columnar(make_records(16)), utc_offset=0)
+
+    assert columns['date'] == ['1970-01-01', '1970-01-02']
+    assert columns['temperature_min'] == [0.0, 8.0]
+    assert columns['temperature_max'] == [7.0, 15.0]
+    assert columns['pop_max'] == [0.7, 1.5]
+
+    shifted = daily_summary(to_columnar(make_records(16)), utc_offset=-3600)
+    assert shifted['date'] == ['1969-12-31', '1970-01-01', '1970-01-02']
+
+
+@pytest.mark.parametrize('args', [
+    {'fmt': 'csv'},
+    {'aggregate': 'weekly'},
+    {'points': 0},
+    {'aggregate': 'daily', 'points': 4},
+])
+def test_forecast_view_rejects_invalid_parameters(args):
+    with pytest.raises(ValueError):
+        forecast_view(**args)
+
+
+def test_transform_keeps_result_metadata():
+    transform, tag = forecast_view('columnar', points=2)
+    result = {
+        'status': 'success', 'stale': True, 'stale_reason': 'circuit_open', 'fetched_at': 1.0,
+        'data': {'city': 'Oslo', 'forecasts': make_records(4)},
+    }
+
+    shaped = transform(result)
+
+    assert tag == 'columnar-p2'
+    assert shaped['stale'] is True
+    assert shaped['stale_reason'] == 'circuit_open'
+    assert shaped['fetched_at'] == 1.0
+    assert shaped['data']['forecasts']['temperature'] == [0.5, 2.5]
+    assert result['data']['forecasts'] == make_records(4)
+    assert forecast_view() == (None, '')
+
+
+def test_forecast_route_shapes_the_cached_payload(client, upstream_calls):
+    listed = client.get('/api/forecast?city=Oslo').get_json()['data']
+    columnar = client.get('/api/forecast?city=Oslo&format=columnar&points=4').get_json()['data']
+    daily = client.get('/api/forecast?city=Oslo&aggregate=daily').get_json()['data']
+
+    assert len(columnar['forecasts']['temperature']) == 4
+    assert columnar['format'] == 'columnar'
+    assert daily['aggregate'] == 'daily'
+    assert len(daily['forecasts']) < len(listed['forecasts'])
+    assert upstream_calls('forecast') == 1
+
+
+def test_forecast_route_rejects_conflicting_parameters(client):
+    response = client.get('/api/forecast?city=Oslo&aggregate=daily&points=4')
+
+    assert response.status_code == 400
+    assert response.get_json()['status'] == 'error'
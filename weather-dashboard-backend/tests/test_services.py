@@ -0,0 +1,70 @@
+"""Tests for the synchronous service layer."""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.services import SingleFlight
+
+
+def wait_for(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'condition not met in time'
+        time.sleep(0.001)
+
+
+def test_single_flight_runs_concurrent_identical_calls_once():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return {'temperature': 10}
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = [pool.submit(flight.do, 'weather|oslo', fetch) for _ in range(8)]
+        wait_for(lambda: flight.stats()['coalesced'] == 7)
+        release.set()
+        results = [future.result(timeout=5) for future in futures]
+
+    assert calls == [1]
+    assert all(result == {'temperature': 10} for result in results)
+    assert flight.stats() == {'executions': 1, 'coalesced': 7, 'in_flight': 0}
+
+
+def test_single_flight_shares_the_leaders_exception():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def fail():
+        release.wait(5)
+        raise RuntimeError('upstream down')
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        futures = [pool.submit(flight.do, 'key', fail) for _ in range(3)]
+        wait_for(lambda: flight.stats()['coalesced'] == 2)
+        release.set()
+        for future in futures:
+            with pytest.raises(RuntimeError, match='upstream down'):
+                future.result(timeout=5)
+
+    # The key is free again once the call finished
+    assert flight.do('key', lambda: 'ok') == 'ok'
+
+
+def test_concurrent_requests_for_one_city_share_an_upstream_call(app, upstream, upstream_calls):
+    upstream.settings.latency = 0.2
+
+    def get(_):
+        return app.test_client().get('/api/weather?city=Oslo').status_code
+
+    with ThreadPoolExecutor(max_workers=10) as pool:
+        statuses = list(pool.map(get, range(10)))
+
+    assert statuses == [200] * 10
+    assert upstream_calls('weather') == 1
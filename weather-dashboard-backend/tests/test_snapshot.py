@@ -0,0 +1,90 @@
+"""Tests for warm-start cache snapshots."""
+
+import time
+
+import pytest
+
+from app.cache import CacheEntry
+from app.serialization import dumps
+from app.snapshot import MAGIC, read_snapshot, write_snapshot
+
+
+def entry(value, stored_at, ttl, encodings=None):
+    return CacheEntry(value, dumps(value), stored_at, stored_at + ttl, encodings=encodings)
+
+
+def test_snapshot_round_trip_skips_expired_entries(tmp_path):
+    path = str(tmp_path / 'snapshot.bin')
+    fresh = entry({'city': 'Oslo'}, 1000.0, 300, {'gzip': b'compressed'})
+    write_snapshot(path, [('weather|oslo', fresh), ('weather|bergen', entry({'city': 'Bergen'}, 500.0, 100))],
+                   [('weather|oslo', 3.5, ('weather', 'Oslo', None))])
+
+    (entries, counts), expired = read_snapshot(path, now=1100.0)
+
+    assert expired == 1
+    assert [key for key, _ in entries] == ['weather|oslo']
+    restored = entries[0][1]
+    assert restored.value == {'city': 'Oslo'}
+    assert restored.body == fresh.body
+    assert restored.etag == fresh.etag
+    assert restored.encodings == {'gzip': b'compressed'}
+    assert (restored.stored_at, restored.expires_at) == (1000.0, 1300.0)
+    assert counts == [('weather|oslo', 3.5, ('weather', 'Oslo', None))]
+
+
+@pytest.mark.parametrize('content', [b'', b'not a snapshot file', MAGIC[:-1] + b'2\x00\x00\x00\x02{}'])
+def test_other_files_are_not_snapshots(tmp_path, content):
+    path = tmp_path / 'snapshot.bin'
+    path.write_bytes(content)
+
+    with pytest.raises(ValueError):
+        read_snapshot(str(path))
+
+
+def test_new_workers_start_warm_without_upstream_calls(make_app, upstream_calls):
+    settings = {'CACHE_SNAPSHOT_ENABLED': True, 'CACHE_SNAPSHOT_INTERVAL': 0}
+    app = make_app(**settings)
+    first = app.test_client().get('/api/weather?city=Oslo')
+    assert app.extensions['weather_cache_snapshotter'].save() == 1
+
+    restarted = make_app(**settings)
+    second = restarted.test_client().get('/api/weather?city=Oslo')
+
+    assert restarted.extensions['weather_cache_snapshotter'].stats()['restored'] == 1
+    assert second.data == first.data
+    assert second.headers['ETag'] == first.headers['ETag']
+    assert upstream_calls('weather') == 1
+
+
+def test_workers_sharing_a_snapshot_merge_their_entries(make_app):
+    settings = {'CACHE_SNAPSHOT_ENABLED': True, 'CACHE_SNAPSHOT_INTERVAL': 0}
+    first, second = make_app(**settings), make_app(**settings)
+    first.test_client().get('/api/weather?city=Oslo')
+    second.test_client().get('/api/weather?city=Bergen')
+
+    first.extensions['weather_cache_snapshotter'].save()
+    assert second.extensions['weather_cache_snapshotter'].save() == 2
+
+    assert make_app(**settings).extensions['weather_cache_snapshotter'].stats()['restored'] == 2
+
+
+def test_unreadable_snapshots_leave_the_cache_empty(make_app, tmp_path):
+    (tmp_path / 'cache-snapshot.bin').write_bytes(b'garbage')
+
+    app = make_app(CACHE_SNAPSHOT_ENABLED=True, CACHE_SNAPSHOT_INTERVAL=0)
+
+    assert app.extensions['weather_cache_snapshotter'].stats()['restored'] == 0
+    assert len(app.extensions['weather_cache']) == 0
+
+
+def test_expired_entries_are_not_restored(make_app):
+    settings = {'CACHE_SNAPSHOT_ENABLED': True, 'CACHE_SNAPSHOT_INTERVAL': 0, 'CACHE_TTL_WEATHER': 1}
+    app = make_app(**settings)
+    app.test_client().get('/api/weather?city=Oslo')
+    app.extensions['weather_cache_snapshotter'].save()
+    time.sleep(1.1)
+
+    stats = make_app(**settings).extensions['weather_cache_snapshotter'].stats()
+
+    assert stats['restored'] == 0
+    assert stats['skipped_expired'] == 1
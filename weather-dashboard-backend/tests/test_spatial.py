@@ -0,0 +1,84 @@
+"""Tests for the spatial index and the nearby and bounding box routes."""
+
+import pytest
+
+from app.spatial import SpatialIndex, haversine_km, radius_bbox, split_bbox
+
+
+def test_haversine_distance():
+    assert haversine_km(51.5074, -0.1278, 48.8566, 2.3522) == pytest.approx(343.5, abs=1)
+    assert haversine_km(0, 179.5, 0, -179.5) == pytest.approx(111.2, abs=0.5)
+
+
+def test_boxes_are_split_at_the_antimeridian():
+    assert split_bbox(170, -50, -170, -10) == [(170, -50, 180, -10), (-180, -50, -170, -10)]
+    assert split_bbox(-10, 0, 10, 5) == [(-10, 0, 10, 5)]
+    assert len(radius_bbox(0, 179.9, 100)) == 2
+    assert radius_bbox(89.5, 0, 100) == [(-180.0, pytest.approx(88.6, abs=0.1), 180.0, 90.0)]
+
+
+def test_index_finds_locations_across_cells_and_the_antimeridian():
+    index = SpatialIndex(cell_degrees=1.0, max_locations=3)
+    index.add_location('West', None, 0.0, 179.9, population=10)
+    index.add_location('East', None, 0.0, -179.9, population=20)
+    index.add_location('Far', None, 10.0, 0.0)
+
+    nearby = index.within_radius(0.0, 179.95, 50, limit=10)
+    boxed = index.within_bbox(179.0, -1.0, -179.0, 1.0, limit=10)
+
+    assert [location['name'] for location in nearby] == ['West', 'East']
+    assert nearby[0]['distance_km'] < nearby[1]['distance_km']
+    assert [location['name'] for location in boxed] == ['East', 'West']
+    assert index.add_location('Dropped', None, 5.0, 5.0) is None
+    assert index.stats()['dropped'] == 1
+
+
+def test_out_of_order_observations_are_ignored():
+    index = SpatialIndex()
+    index.add_location('Oslo', 'NO', 59.9, 10.7)
+
+    assert index.observe('Oslo', 'NO', {'temperature': 2}, observed_at=200)
+    assert not index.observe('Oslo', 'NO', {'temperature': 1}, observed_at=100)
+    assert not index.observe('Bergen', 'NO', {'temperature': 5})
+    assert index.within_radius(59.9, 10.7, 1, limit=1)[0]['weather'] == {'temperature': 2}
+
+
+def test_nearby_refreshes_stale_locations_once(client, upstream_calls):
+    first = client.get('/api/weather/nearby?lat=53.48&lon=-2.24&radius=60').get_json()['data']
+    second = client.get('/api/weather/nearby?lat=53.48&lon=-2.24&radius=60').get_json()['data']
+
+    names = [location['name'] for location in first['locations']]
+    assert names[0] == 'Manchester'
+    assert set(names) == {'Manchester', 'Liverpool', 'Leeds'}
+    assert first['upstream_fetches'] == upstream_calls('weather') == 3
+    assert all(location['weather'] is not None and not location['stale'] for location in first['locations'])
+    assert second['refreshed'] == second['upstream_fetches'] == 0
+
+
+def test_bbox_without_fetch_answers_from_the_index(client, upstream_calls):
+    response = client.get('/api/weather/bbox?bbox=170,-45,-175,-15&fetch=false')
+    data = response.get_json()['data']
+
+    assert response.status_code == 200
+    assert [location['name'] for location in data['locations']] == ['Auckland', 'Christchurch', 'Wellington', 'Suva']
+    assert all(location['stale'] and location['weather'] is None for location in data['locations'])
+    assert upstream_calls('weather') == 0
+
+
+@pytest.mark.parametrize('path', [
+    '/api/weather/nearby?lat=53',
+    '/api/weather/nearby?lat=91&lon=0',
+    '/api/weather/nearby?lat=53&lon=-2&radius=0',
+    '/api/weather/nearby?lat=53&lon=-2&radius=5000',
+    '/api/weather/nearby?lat=nan&lon=-2',
+    '/api/weather/nearby?lat=53&lon=-2&limit=0',
+    '/api/weather/bbox',
+    '/api/weather/bbox?bbox=1,2,3',
+    '/api/weather/bbox?bbox=0,10,10,5',
+    '/api/weather/bbox?bbox=0,0,inf,5',
+])
+def test_invalid_spatial_queries_are_rejected(client, path):
+    response = client.get(path)
+
+    assert response.status_code == 400
+    assert response.get_json()['status'] == 'error'
@@ -0,0 +1,153 @@
+"""Tests for the live city streams under WSGI and ASGI."""
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.asgi import create_asgi_app
+from app.serialization import loads
+from app.stream import StreamCapacityError, Subscription, changed_fields, encode_event
+
+
+def parse_events(chunk):
+    """(event type, data) of every complete event in a chunk of the stream."""
+    events = []
+    for block in chunk.decode('utf-8').split('\n\n'):
+        fields = dict(line.split(': ', 1) for line in block.splitlines() if ': ' in line and not line.startswith(':'))
+        if 'event' in fields:
+            events.append((fields['event'], loads(fields['data'])))
+    return events
+
+
+def test_changed_fields_reports_nested_changes_and_removals():
+    old = {'status': 'success', 'data': {'weather': {'temperature': 10, 'humidity': 50}, 'alerts': [1]}}
+    new = {'status': 'success', 'data': {'weather': {'temperature': 11, 'humidity': 50}, 'forecast': []}}
+
+    assert changed_fields(old, new) == {
+        'data': {'weather': {'temperature': 11}, 'forecast': [], 'alerts': None},
+    }
+    assert changed_fields(new, new) is None
+
+
+def test_encode_event_splits_multiline_data():
+    assert encode_event('update', 3, b'{\n  "a": 1\n}') == (
+        b'event: update\nid: 3\ndata: {\ndata:   "a": 1\ndata: }\n\n'
+    )
+
+
+def test_slow_subscribers_are_resynced_with_a_snapshot():
+    subscription = Subscription(('oslo', 5), 'Oslo', 5, max_pending=2)
+    subscription.push(b'snapshot-1', None)
+    subscription.push(b'snapshot-2', b'update-2')
+
+    assert subscription.push(b'snapshot-3', b'update-3') is True
+    assert subscription.drain() == [b'snapshot-3']
+
+    subscription.close()
+    assert subscription.push(b'snapshot-4', b'update-4') is False
+    assert subscription.get(0.01) == []
+
+
+def test_wsgi_streams_are_refused_by_default(client):
+    response = client.get('/api/stream?city=Oslo')
+    body = response.get_json()
+
+    assert response.status_code == 503
+    assert body['code'] == 'stream_capacity'
+    assert 'ASGI' in body['error']
+    assert int(response.headers['Retry-After']) >= 1
+
+
+def test_blocking_subscribers_are_capped(make_app):
+    hub = make_app(STREAM_MAX_BLOCKING_SUBSCRIBERS=1).extensions['weather_stream_hub']
+    try:
+        hub.subscribe('Oslo', 5)
+        with pytest.raises(StreamCapacityError, match='on this server'):
+            hub.subscribe('Bergen', 5)
+        hub.subscribe('Bergen', 5, blocking=False)
+        assert hub.stats()['blocking_subscribers'] == 1
+        assert hub.stats()['rejected'] == 1
+    finally:
+        hub.stop()
+
+
+def test_stream_parameters_are_validated(client):
+    assert client.get('/api/stream').status_code == 400
+    assert client.get('/api/stream?city=Oslo&days=9').status_code == 400
+
+
+def test_subscribers_of_a_city_share_one_fetch(app, upstream_calls):
+    hub = app.extensions['weather_stream_hub']
+    try:
+        first = hub.subscribe('Oslo', 5, blocking=False)
+        second = hub.subscribe('oslo', 5, blocking=False)
+
+        events = [parse_events(b''.join(subscription.get(5))) for subscription in (first, second)]
+
+        assert events[0] == events[1]
+        (event, payload), = events[0]
+        assert event == 'snapshot'
+        assert set(payload['data']) >= {'weather', 'forecast'}
+        assert upstream_calls('weather') == 1
+        assert hub.stats()['cities'] == 1
+    finally:
+        hub.stop()
+
+
+def test_asgi_streams_do_not_block_other_requests(app, upstream_calls):
+    asgi_app = create_asgi_app(app)
+
+    async def open_stream(disconnect, chunks):
+        scope = {
+            'type': 'http', 'method': 'GET', 'path': '/api/stream', 'query_string': b'city=Oslo',
+            'headers': [], 'client': ('127.0.0.1', 1234),
+        }
+        messages = iter([{'type': 'http.request', 'body': b'', 'more_body': False}])
+
+        async def receive():
+            message = next(messages, None)
+            if message is not None:
+                return message
+            await disconnect.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            chunks.append(message)
+
+        await asyncio.wait_for(asgi_app(scope, receive, send), 10)
+
+    async def fetch_weather():
+        transport = httpx.ASGITransport(app=asgi_app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://testserver') as client:
+            return await client.get('/api/weather?city=Bergen')
+
+    async def main():
+        disconnect = asyncio.Event()
+        streams = [[] for _ in range(3)]
+        tasks = [asyncio.ensure_future(open_stream(disconnect, chunks)) for chunks in streams]
+        try:
+            # Other requests are served while every stream is open
+            weather = await asyncio.wait_for(fetch_weather(), 5)
+
+            async def snapshots_arrived():
+                while not all(b'event: snapshot' in b''.join(m.get('body', b'') for m in chunks) for chunks in streams):
+                    await asyncio.sleep(0.01)
+
+            await asyncio.wait_for(snapshots_arrived(), 5)
+            return weather, streams
+        finally:
+            disconnect.set()
+            await asyncio.gather(*tasks)
+            await asgi_app._shutdown()
+
+    weather, streams = asyncio.run(main())
+
+    assert weather.status_code == 200
+    for chunks in streams:
+        assert chunks[0]['status'] == 200
+        assert (b'content-type', b'text/event-stream; charset=utf-8') in chunks[0]['headers']
+        assert chunks[1]['body'].startswith(b'retry: ')
+    # One fetch of Oslo for all three streams, one for the plain request
+    assert upstream_calls('weather') == 2
+    assert app.extensions['weather_stream_hub'].stats()['subscribers'] == 0
@@ -0,0 +1,117 @@
+"""Tests for unit conversion of stored weather, forecast and history values."""
+
+import pytest
+
+from app.units import convert_record, convert_records, field_conversions, parse_units, weather_view
+
+
+def test_parse_units():
+    assert parse_units(None) is None
+    assert parse_units(' Imperial ') == 'imperial'
+    with pytest.raises(ValueError, match='metric, imperial, kelvin'):
+        parse_units('rankine')
+
+
+def test_conversions_between_unit_systems():
+    to_imperial = field_conversions('metric', 'imperial')
+    assert to_imperial['temperature'] == (1.8, 32.0)
+    assert to_imperial['wind_speed'][0] == pytest.approx(2.23694, abs=1e-5)
+    assert to_imperial['visibility'][0] == pytest.approx(0.621371, abs=1e-6)
+
+    to_kelvin = field_conversions('imperial', 'kelvin')
+    assert convert_record({'temperature': 32.0}, to_kelvin) == {'temperature': 273.15}
+
+    assert field_conversions('metric', 'metric') == {}
+    assert field_conversions('metric', None) == {}
+
+
+def test_visibility_is_stored_in_km_in_every_unit_system():
+    to_miles = {'visibility': field_conversions('metric', 'imperial')['visibility']}
+
+    assert 'visibility' not in field_conversions('imperial', 'metric')
+    assert 'visibility' not in field_conversions('imperial', 'kelvin')
+    assert field_conversions('imperial', 'imperial') == to_miles
+    assert field_conversions('imperial', None) == to_miles
+
+
+def test_convert_records_keeps_missing_values():
+    records = [{'datetime': 1, 'temperature': 0.0}, {'datetime': 2, 'temperature': None}]
+
+    converted = convert_records(records, field_conversions('metric', 'imperial'))
+
+    assert converted == [{'datetime': 1, 'temperature': 32.0}, {'datetime': 2, 'temperature': None}]
+    assert records[0]['temperature'] == 0.0
+
+
+def test_weather_transform_keeps_result_metadata():
+    transform, view = weather_view('metric', 'kelvin')
+    result = {'status': 'success', 'stale': True, 'stale_reason': 'down', 'fetched_at': 5,
+              'data': {'temperature': 0.0, 'visibility': 10.0}}
+
+    converted = transform(result)
+
+    assert view == 'kelvin'
+    assert converted == {**result, 'data': {'temperature': 273.15, 'visibility': 10.0}}
+    assert weather_view('metric', None) == (None, '')
+
+
+def test_requested_units_share_one_cache_entry(client, upstream_calls):
+    stored = client.get('/api/weather?city=Oslo')
+    imperial = client.get('/api/weather?city=Oslo&units=imperial')
+    metric = client.get('/api/weather?city=Oslo&units=metric')
+
+    data, converted = stored.get_json()['data'], imperial.get_json()['data']
+    assert converted['temperature'] == round(data['temperature'] * 1.8 + 32, 2)
+    assert converted['visibility'] == round(data['visibility'] / 1.609344, 2)
+    assert imperial.headers['ETag'] != stored.headers['ETag']
+    assert metric.data == stored.data
+    assert upstream_calls('weather') == 1
+
+
+def test_imperial_deployments_answer_in_imperial_units_by_default(make_app):
+    client = make_app(DEFAULT_UNITS='imperial').test_client()
+
+    default = client.get('/api/weather?city=Oslo')
+    imperial = client.get('/api/weather?city=Oslo&units=imperial')
+    metric = client.get('/api/weather?city=Oslo&units=metric').get_json()['data']
+
+    # The mock reports 10000 m of visibility
+    assert default.get_json() == imperial.get_json()
+    assert default.get_json()['data']['visibility'] == 6.21
+    assert default.headers['ETag'] == imperial.headers['ETag']
+    assert metric['visibility'] == 10.0
+    assert metric['temperature'] == round((default.get_json()['data']['temperature'] - 32) / 1.8, 2)
+
+
+def test_imperial_forecasts_match_with_and_without_units(make_app):
+    client = make_app(DEFAULT_UNITS='imperial').test_client()
+
+    default = client.get('/api/forecast?city=Oslo').get_json()['data']['forecasts']
+    imperial = client.get('/api/forecast?city=Oslo&units=imperial').get_json()['data']['forecasts']
+
+    assert default and default == imperial
+
+
+def test_forecast_and_history_are_converted(make_app):
+    # Long retention keeps the mock server's 2023 observations
+    client = make_app(HISTORY_RETENTION_DAYS=36500, HISTORY_COMPACT_AFTER_DAYS=36500).test_client()
+    forecast = client.get('/api/forecast?city=Oslo').get_json()['data']['forecasts']
+    kelvin = client.get('/api/forecast?city=Oslo&units=kelvin&format=columnar').get_json()['data']['forecasts']
+
+    assert kelvin['temperature'][0] == round(forecast[0]['temperature'] + 273.15, 2)
+
+    weather = client.get('/api/weather?city=Bergen').get_json()['data']
+    history = client.get('/api/history?city=Bergen&from=0&units=kelvin').get_json()['data']['points']
+    assert [point['temperature'] for point in history] == [round(weather['temperature'] + 273.15, 2)]
+
+
+@pytest.mark.parametrize('path', [
+    '/api/weather?city=Oslo&units=rankine',
+    '/api/forecast?city=Oslo&units=',
+    '/api/history?city=Oslo&units=celsius',
+])
+def test_unknown_units_are_rejected(client, path):
+    response = client.get(path)
+
+    assert response.status_code == 400
+    assert 'Units must be one of' in response.get_json()['error']
@@ -0,0 +1,50 @@
+"""Tests for the pooled, retrying upstream HTTP session."""
+
+import time
+from email.utils import formatdate
+
+import pytest
+
+from app.upstream import backoff_delay, create_http_session, parse_retry_after
+
+
+def test_backoff_grows_exponentially_and_is_capped(make_config):
+    config = make_config(HTTP_BACKOFF_FACTOR=0.5, HTTP_BACKOFF_JITTER=0.0, HTTP_BACKOFF_MAX=3.0)
+
+    assert [backoff_delay(config, attempt) for attempt in range(4)] == [0.5, 1.0, 2.0, 3.0]
+
+
+@pytest.mark.parametrize('value, expected', [('7', 7.0), (None, None), ('', None), ('soon', None)])
+def test_parse_retry_after_seconds_and_garbage(value, expected):
+    assert parse_retry_after(value) == expected
+
+
+def test_parse_retry_after_http_date():
+    assert 25 <= parse_retry_after(formatdate(time.time() + 30, usegmt=True)) <= 30
+    assert parse_retry_after(formatdate(time.time() - 30, usegmt=True)) == 0.0
+
+
+def test_session_retries_transient_errors(make_config, upstream, upstream_calls):
+    upstream.settings.error_rate = 1.0
+    upstream.settings.error_status = 503
+    config = make_config(HTTP_MAX_RETRIES=2, HTTP_BACKOFF_FACTOR=0.0, HTTP_BACKOFF_JITTER=0.0)
+    session = create_http_session(config)
+
+    response = session.get(f'{upstream.base_url}/data/2.5/weather', params={'q': 'Oslo'})
+
+    assert response.status_code == 503
+    assert upstream_calls('weather') == 3
+
+
+def test_session_does_not_retry_client_errors(make_config, upstream, upstream_calls):
+    upstream.settings.error_rate = 1.0
+    upstream.settings.error_status = 401
+    session = create_http_session(make_config(HTTP_MAX_RETRIES=2, HTTP_BACKOFF_FACTOR=0.0))
+
+    assert session.get(f'{upstream.base_url}/data/2.5/weather', params={'q': 'Oslo'}).status_code == 401
+    assert upstream_calls('weather') == 1
+
+
+def test_session_without_keep_alive_closes_connections(make_config):
+    assert create_http_session(make_config(HTTP_KEEP_ALIVE=False)).headers['Connection'] == 'close'
+    assert create_http_session(make_config()).headers['Connection'] == 'keep-alive'